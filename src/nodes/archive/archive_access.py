@@ -0,0 +1,490 @@
+"""
+压缩包统一访问层
+
+列出成员、读取成员、流式遍历、完整性测试都通过同一组接口完成，
+不再在各个脚本里各自调用 `7z l` / `7z t` 再按行切分文本输出：
+
+    from nodes.archive.archive_access import ArchiveAccess
+    members = ArchiveAccess.list_members(path)
+    data = ArchiveAccess.read_member(path, members[0].name)
+    ok = ArchiveAccess.test_archive(path)   # True 完好 / False 损坏 / None 无法判断（加密、超时）
+
+后端选择：
+- ZIP/CBZ（以及扩展名不对但实际是 ZIP 的文件）：zipfile，进程内完成
+- 7Z：py7zr
+- RAR/CBR：rarfile
+- 以上库缺失或不支持（如 py7zr 不支持的压缩算法、rarfile 找不到 unrar）时回退到 7z 命令行
+
+成员列表按 (路径, 大小, 修改时间) 缓存在磁盘上（见 listing_cache），同一个压缩包
+在多个脚本之间只列出一次。
+"""
+
+import os
+import shutil
+import logging
+import zipfile
+import tempfile
+import subprocess
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from .zip_encoding import decode_member_name, detect_zip_encoding
+from .archive_listing import IMAGE_EXTENSIONS, ArchiveMember, parse_slt
+from .listing_cache import ArchiveListingCache
+
+logger = logging.getLogger(__name__)
+
+SEVEN_ZIP_TIMEOUT = 55  # 7z 命令行超时（秒）
+SEVEN_ZIP_TEST_RATE = 20 * 1024 * 1024  # 7z 测试按每秒至少处理的字节数放宽超时
+
+
+class ArchiveError(Exception):
+    """压缩包无法读取（损坏、格式不支持或 7z 不可用）"""
+
+
+class ArchiveTimeout(ArchiveError):
+    """7z 命令行执行超时"""
+
+
+class BackendUnavailable(Exception):
+    """当前后端无法处理该压缩包，应回退到下一个后端"""
+
+
+def _format_mtime(date_time) -> Optional[str]:
+    if not date_time:
+        return None
+    return '%04d-%02d-%02d %02d:%02d:%02d' % tuple(date_time[:6])
+
+
+def _zip_methods() -> set:
+    """当前 Python 的 zipfile 能解压的压缩方法（bz2/lzma 模块可能缺失）"""
+    methods = {zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED}
+    for method, module in ((zipfile.ZIP_BZIP2, 'bz2'), (zipfile.ZIP_LZMA, 'lzma')):
+        try:
+            __import__(module)
+        except ImportError:
+            continue
+        methods.add(method)
+    return methods
+
+
+class ZipBackend:
+    """
+    基于 zipfile 的 ZIP/CBZ 后端
+
+    zipfile 不支持 Deflate64（WinRAR/Windows 资源管理器压缩大文件时常用）等压缩方法，
+    遇到时抛出 BackendUnavailable 交给 7z，而不是把合法的压缩包当成损坏
+    """
+    name = 'zipfile'
+    supported_methods = _zip_methods()
+
+    @classmethod
+    def _check_methods(cls, infos: List[zipfile.ZipInfo]):
+        unsupported = {info.compress_type for info in infos} - cls.supported_methods
+        if unsupported:
+            raise BackendUnavailable(f"zipfile 不支持的压缩方法: {sorted(unsupported)}")
+
+    def list(self, path: str) -> List[ArchiveMember]:
+        with zipfile.ZipFile(path) as zf:
+            # 未设置 UTF-8 标志的文件名按整个压缩包检测一次编码
+            infos = zf.infolist()
+            verdict = detect_zip_encoding(infos)
+            return [
+                ArchiveMember(
+                    name=decode_member_name(info, verdict).replace('\\', '/'),
+                    size=info.file_size,
+                    packed_size=info.compress_size,
+                    crc=None if info.is_dir() else info.CRC,
+                    is_dir=info.is_dir(),
+                    mtime=_format_mtime(info.date_time),
+                    raw_name=info.filename,
+                    encrypted=bool(info.flag_bits & 0x1),
+                )
+                for info in infos
+            ]
+
+    @staticmethod
+    def _open(path: str) -> zipfile.ZipFile:
+        try:
+            return zipfile.ZipFile(path)
+        except zipfile.BadZipFile as e:
+            # 无法识别为 ZIP（可能是扩展名错误的其他格式），交给 7z 判断
+            raise BackendUnavailable(str(e))
+
+    def iter(self, path: str, members: List[ArchiveMember]) -> Iterator[Tuple[ArchiveMember, bytes]]:
+        with self._open(path) as zf:
+            # 产出第一个成员之前检查压缩方法，保证 ArchiveAccess 还能回退
+            names = [member.raw_name or member.name for member in members]
+            try:
+                infos = [zf.getinfo(name) for name in names]
+            except KeyError as e:
+                raise BackendUnavailable(f"zipfile 中找不到成员: {e}")
+            self._check_methods(infos)
+            for member, name in zip(members, names):
+                try:
+                    data = zf.read(name)
+                except NotImplementedError as e:
+                    raise BackendUnavailable(str(e))
+                yield member, data
+
+    def test(self, path: str) -> Optional[bool]:
+        with self._open(path) as zf:
+            infos = zf.infolist()
+            self._check_methods(infos)
+            if any(info.flag_bits & 0x1 for info in infos):
+                # 没有密码无法校验加密成员，不能据此判定损坏
+                return None
+            try:
+                return zf.testzip() is None
+            except NotImplementedError as e:
+                raise BackendUnavailable(str(e))
+
+
+class SevenZipPyBackend:
+    """基于 py7zr 的 7Z 后端"""
+    name = 'py7zr'
+
+    @staticmethod
+    def _open(path: str):
+        try:
+            import py7zr
+        except ImportError as e:
+            raise BackendUnavailable(str(e))
+        return py7zr.SevenZipFile(path, mode='r')
+
+    def list(self, path: str) -> List[ArchiveMember]:
+        with self._open(path) as archive:
+            return [
+                ArchiveMember(
+                    name=info.filename.replace('\\', '/'),
+                    size=info.uncompressed or 0,
+                    packed_size=info.compressed or 0,
+                    crc=info.crc32,
+                    is_dir=info.is_directory,
+                    mtime=info.creationtime.strftime('%Y-%m-%d %H:%M:%S') if info.creationtime else None,
+                    raw_name=info.filename,
+                )
+                for info in archive.list()
+            ]
+
+    def iter(self, path: str, members: List[ArchiveMember]) -> Iterator[Tuple[ArchiveMember, bytes]]:
+        if not members:
+            return
+        by_name = {member.raw_name or member.name: member for member in members}
+        try:
+            with self._open(path) as archive:
+                if hasattr(archive, 'read'):
+                    # py7zr 0.x 可以直接读到内存
+                    contents = {name: bio.read() for name, bio in archive.read(list(by_name)).items()}
+                else:
+                    # py7zr 1.x 移除了 read，解压到临时目录后读取
+                    contents = self._extract_to_memory(archive, list(by_name))
+        except Exception as e:
+            if type(e).__name__ == 'UnsupportedCompressionMethodError':
+                raise BackendUnavailable(str(e))
+            raise
+        for raw_name, data in contents.items():
+            if raw_name in by_name:
+                yield by_name[raw_name], data
+
+    @staticmethod
+    def _extract_to_memory(archive, names: List[str]) -> dict:
+        contents = {}
+        with tempfile.TemporaryDirectory(prefix='archive_access_') as temp_dir:
+            archive.extract(path=temp_dir, targets=names)
+            for name in names:
+                member_path = os.path.join(temp_dir, *name.replace('\\', '/').split('/'))
+                if os.path.isfile(member_path):
+                    with open(member_path, 'rb') as f:
+                        contents[name] = f.read()
+        return contents
+
+    def test(self, path: str) -> Optional[bool]:
+        try:
+            with self._open(path) as archive:
+                if archive.needs_password():
+                    return None
+                return archive.testzip() is None
+        except Exception as e:
+            if type(e).__name__ == 'UnsupportedCompressionMethodError':
+                raise BackendUnavailable(str(e))
+            if type(e).__name__ == 'PasswordRequired':
+                # 文件名也加密的 7z 在打开时就需要密码
+                return None
+            raise
+
+
+class RarBackend:
+    """基于 rarfile 的 RAR/CBR 后端（读取内容需要系统中的 unrar/7z）"""
+    name = 'rarfile'
+
+    @staticmethod
+    def _open(path: str):
+        try:
+            import rarfile
+        except ImportError as e:
+            raise BackendUnavailable(str(e))
+        return rarfile.RarFile(path)
+
+    @staticmethod
+    def _wrap_exec_error(e: Exception):
+        if type(e).__name__ in ('RarCannotExec', 'RarExecError'):
+            raise BackendUnavailable(str(e))
+        raise e
+
+    def list(self, path: str) -> List[ArchiveMember]:
+        with self._open(path) as archive:
+            return [
+                ArchiveMember(
+                    name=info.filename.replace('\\', '/'),
+                    size=info.file_size,
+                    packed_size=info.compress_size,
+                    crc=None if info.is_dir() else info.CRC,
+                    is_dir=info.is_dir(),
+                    mtime=_format_mtime(info.date_time),
+                    raw_name=info.filename,
+                )
+                for info in archive.infolist()
+            ]
+
+    def iter(self, path: str, members: List[ArchiveMember]) -> Iterator[Tuple[ArchiveMember, bytes]]:
+        try:
+            with self._open(path) as archive:
+                for member in members:
+                    yield member, archive.read(member.raw_name or member.name)
+        except Exception as e:
+            self._wrap_exec_error(e)
+
+    def test(self, path: str) -> Optional[bool]:
+        try:
+            with self._open(path) as archive:
+                if archive.needs_password():
+                    return None
+                archive.testrar()
+            return True
+        except Exception as e:
+            if type(e).__name__ in ('RarCannotExec',):
+                raise BackendUnavailable(str(e))
+            if type(e).__name__ in ('PasswordRequired', 'RarWrongPassword'):
+                return None
+            return False
+
+
+class SevenZipCliBackend:
+    """7z 命令行后端，作为所有格式的最后回退"""
+    name = '7z'
+
+    def __init__(self, executable: Optional[str] = None):
+        self.executable = executable or shutil.which('7z') or shutil.which('7z.exe') or '7z'
+
+    def _run(self, args: List[str], text_output: bool = True, timeout: float = SEVEN_ZIP_TIMEOUT):
+        try:
+            # 不继承标准输入，遇到加密压缩包时 7z 不会停下来等待输入密码
+            result = subprocess.run([self.executable] + args, capture_output=True,
+                                    stdin=subprocess.DEVNULL, timeout=timeout)
+        except FileNotFoundError as e:
+            raise ArchiveError(f"找不到7z: {e}")
+        except subprocess.TimeoutExpired:
+            raise ArchiveTimeout(f"7z执行超时: {args[-1]}")
+        if not text_output:
+            return result
+        return result, self._decode_output(result.stdout)
+
+    @staticmethod
+    def _decode_output(data: bytes) -> str:
+        # 7z 控制台输出使用系统代码页，依次尝试 UTF-8、日文、中文
+        for encoding in ('utf-8', 'cp932', 'gbk'):
+            try:
+                return data.decode(encoding)
+            except UnicodeDecodeError:
+                continue
+        return data.decode('utf-8', errors='replace')
+
+    def list(self, path: str) -> List[ArchiveMember]:
+        result, output = self._run(['l', '-slt', '-sccUTF-8', path])
+        listing = parse_slt(output)
+        if result.returncode != 0 and not listing.members:
+            raise ArchiveError(f"7z列出失败: {path} {'; '.join(listing.errors)}")
+        return listing.members
+
+    def iter(self, path: str, members: List[ArchiveMember]) -> Iterator[Tuple[ArchiveMember, bytes]]:
+        if not members:
+            return
+        with tempfile.TemporaryDirectory(prefix='archive_access_') as temp_dir:
+            list_file = os.path.join(temp_dir, '@files.txt')
+            with open(list_file, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(member.raw_name or member.name for member in members))
+            out_dir = os.path.join(temp_dir, 'out')
+            result = self._run(['x', path, f'-o{out_dir}', '-scsUTF-8', f'@{list_file}', '-y'],
+                               text_output=False)
+            if result.returncode != 0:
+                raise ArchiveError(f"7z解压失败: {path}")
+            for member in members:
+                member_path = os.path.join(out_dir, *(member.raw_name or member.name).replace('\\', '/').split('/'))
+                if os.path.isfile(member_path):
+                    with open(member_path, 'rb') as f:
+                        yield member, f.read()
+
+    def test(self, path: str) -> Optional[bool]:
+        """
+        完整测试压缩包，返回 None 表示无法判断
+
+        超时按文件大小放宽，仍超时（或遇到加密压缩包）时返回 None，不把大文件和加密文件当成损坏
+        """
+        try:
+            timeout = SEVEN_ZIP_TIMEOUT + os.path.getsize(path) / SEVEN_ZIP_TEST_RATE
+        except OSError:
+            timeout = SEVEN_ZIP_TIMEOUT
+        try:
+            # 用一个占位密码：未加密的压缩包会忽略它，加密的会报 Wrong password 而不是等待输入
+            result, output = self._run(['t', '-p-', path], timeout=timeout)
+        except ArchiveTimeout as e:
+            logger.debug(f"{e}，无法判断是否损坏")
+            return None
+        if result.returncode == 0:
+            return True
+        if 'wrong password' in (output + self._decode_output(result.stderr)).lower():
+            return None
+        return False
+
+
+class ArchiveAccess:
+    """压缩包访问入口，按格式选择后端并在后端不可用时回退到 7z"""
+
+    use_cache = True  # 设为 False 可关闭磁盘列表缓存
+    zip_backend = ZipBackend()
+    seven_zip_backend = SevenZipPyBackend()
+    rar_backend = RarBackend()
+    cli_backend = SevenZipCliBackend()
+
+    @classmethod
+    def _backends(cls, path: str) -> list:
+        ext = os.path.splitext(path)[1].lower()
+        if ext in ('.zip', '.cbz') or (ext not in ('.7z', '.rar', '.cbr') and zipfile.is_zipfile(path)):
+            primary = cls.zip_backend
+        elif ext == '.7z':
+            primary = cls.seven_zip_backend
+        elif ext in ('.rar', '.cbr'):
+            primary = cls.rar_backend
+        else:
+            return [cls.cli_backend]
+        return [primary, cls.cli_backend]
+
+    @classmethod
+    def list_members(cls, path: str, include_dirs: bool = False) -> List[ArchiveMember]:
+        """
+        列出压缩包成员
+
+        Args:
+            path: 压缩包路径
+            include_dirs: 是否包含目录项
+
+        Raises:
+            ArchiveError: 所有后端都无法读取时
+        """
+        path = str(path)
+        members = cls._list_cached(path)
+        return members if include_dirs else [m for m in members if not m.is_dir]
+
+    @classmethod
+    def _list_cached(cls, path: str) -> List[ArchiveMember]:
+        cache = ArchiveListingCache.default() if cls.use_cache else None
+        stat = None
+        if cache is not None:
+            try:
+                stat = os.stat(path)
+            except OSError as e:
+                raise ArchiveError(f"无法访问压缩包 {path}: {e}")
+            members = cache.get(path, stat)
+            if members is not None:
+                return members
+        last_error = None
+        for backend in cls._backends(path):
+            try:
+                members = backend.list(path)
+            except Exception as e:
+                logger.debug(f"{backend.name} 列出失败 {path}: {e}")
+                last_error = e
+                continue
+            if cache is not None:
+                cache.put(path, members, stat)
+            return members
+        raise ArchiveError(f"无法列出压缩包内容 {path}: {last_error}")
+
+    @classmethod
+    def list_images(cls, path: str) -> List[ArchiveMember]:
+        """列出压缩包中的图片成员"""
+        return [m for m in cls.list_members(path) if m.is_image]
+
+    @classmethod
+    def count_images(cls, path: str) -> int:
+        """统计压缩包中的图片数量"""
+        return len(cls.list_images(path))
+
+    @classmethod
+    def iter_members(cls, path: str,
+                     predicate: Optional[Callable[[ArchiveMember], bool]] = None,
+                     members: Optional[List[ArchiveMember]] = None) -> Iterator[Tuple[ArchiveMember, bytes]]:
+        """
+        逐个读取成员内容
+
+        Args:
+            path: 压缩包路径
+            predicate: 成员过滤函数，为 None 时读取全部文件
+            members: 已经列出的成员，避免重复列出
+
+        Yields:
+            (成员信息, 成员内容)
+        """
+        path = str(path)
+        if members is None:
+            members = cls.list_members(path)
+        if predicate is not None:
+            members = [m for m in members if predicate(m)]
+        backends = cls._backends(path)
+        for index, backend in enumerate(backends):
+            yielded = 0
+            try:
+                for item in backend.iter(path, members):
+                    yielded += 1
+                    yield item
+                return
+            except BackendUnavailable as e:
+                # 已经产出部分成员时不能回退，否则会重复产出
+                if yielded or index == len(backends) - 1:
+                    raise ArchiveError(str(e))
+                logger.debug(f"{backend.name} 不可用，回退: {e}")
+            except ArchiveError:
+                raise
+            except Exception as e:
+                # 各后端库自己的异常（CRC 错误、需要密码等）统一为 ArchiveError
+                raise ArchiveError(f"{backend.name} 读取失败 {path}: {e}") from e
+
+    @classmethod
+    def read_member(cls, path: str, name: str) -> bytes:
+        """读取单个成员的内容"""
+        member = next((m for m in cls.list_members(path) if m.name == name or m.raw_name == name), None)
+        if member is None:
+            raise ArchiveError(f"压缩包中不存在 {name}: {path}")
+        for _, data in cls.iter_members(path, members=[member]):
+            return data
+        raise ArchiveError(f"读取失败 {name}: {path}")
+
+    @classmethod
+    def test_archive(cls, path: str) -> Optional[bool]:
+        """
+        测试压缩包完整性（校验所有成员的 CRC）
+
+        Returns:
+            True 完好，False 损坏，None 无法判断（加密压缩包、7z 超时）。
+            调用方判断损坏时应使用 `is False`
+        """
+        path = str(path)
+        for backend in cls._backends(path):
+            try:
+                return backend.test(path)
+            except BackendUnavailable as e:
+                logger.debug(f"{backend.name} 不可用，回退: {e}")
+            except Exception as e:
+                logger.debug(f"{backend.name} 测试失败 {path}: {e}")
+                return False
+        return False
@@ -0,0 +1,153 @@
+"""
+压缩包成员记录与 7z 列表解析
+
+ArchiveMember 是所有后端（zipfile / py7zr / rarfile / 7z 命令行）统一的成员记录，
+parse_slt 把 `7z l -slt` 的输出解析为这些记录，取代各脚本里按空白切分
+`7z l` 文本或在整段输出里查找扩展名的做法。
+
+`7z l -slt` 输出结构：
+
+    Listing archive: a.rar
+    --
+    Path = a.rar            <- 压缩包自身的属性块
+    Type = Rar5
+    ----------
+    Path = 第1话\\001.jpg     <- 每个成员一个块，块之间以空行分隔
+    Folder = -
+    Size = 123
+    ...
+"""
+
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.avif', '.jxl', '.gif', '.bmp')
+
+
+@dataclass
+class ArchiveMember:
+    """压缩包成员信息"""
+    name: str                       # 解码后的成员路径（统一使用 / 分隔）
+    size: int = 0                   # 解压后大小
+    packed_size: int = 0            # 压缩后大小（部分格式无法获得时为 0）
+    crc: Optional[int] = None       # CRC32，目录或格式不提供时为 None
+    is_dir: bool = False
+    mtime: Optional[str] = None     # 修改时间，格式 'YYYY-MM-DD HH:MM:SS'
+    raw_name: Optional[str] = None  # 后端内部使用的原始名称
+    encrypted: bool = False
+    method: Optional[str] = None    # 压缩方法，如 Deflate、LZMA2:24、Store
+
+    @property
+    def suffix(self) -> str:
+        return os.path.splitext(self.name)[1].lower()
+
+    @property
+    def is_image(self) -> bool:
+        return not self.is_dir and self.suffix in IMAGE_EXTENSIONS
+
+    def to_row(self) -> list:
+        """转换为紧凑的列表，用于持久化"""
+        return [self.name, self.size, self.packed_size, self.crc, self.is_dir,
+                self.mtime, self.raw_name, self.encrypted, self.method]
+
+    @classmethod
+    def from_row(cls, row: list) -> 'ArchiveMember':
+        return cls(*row)
+
+
+@dataclass
+class SltListing:
+    """一次 `7z l -slt` 的解析结果"""
+    archive_type: Optional[str] = None
+    physical_size: int = 0
+    members: List[ArchiveMember] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)  # ERROR/WARNING 行
+
+
+def _to_int(value: Optional[str]) -> int:
+    try:
+        return int(value) if value else 0
+    except ValueError:
+        return 0
+
+
+def _parse_block(lines: List[str]) -> Dict[str, str]:
+    fields = {}
+    for line in lines:
+        key, eq, value = line.partition(' = ')
+        if eq:
+            fields[key.strip()] = value
+        elif line.endswith(' ='):  # 空值，如 "Comment ="
+            fields[line[:-2].strip()] = ''
+    return fields
+
+
+def _member_from_fields(fields: Dict[str, str]) -> ArchiveMember:
+    path = fields['Path']
+    crc = fields.get('CRC', '').strip()
+    attributes = fields.get('Attributes', '')
+    try:
+        crc_value = int(crc, 16) if crc else None
+    except ValueError:
+        crc_value = None
+    return ArchiveMember(
+        name=path.replace('\\', '/'),
+        size=_to_int(fields.get('Size')),
+        packed_size=_to_int(fields.get('Packed Size')),
+        crc=crc_value,
+        is_dir=fields.get('Folder') == '+' or attributes.startswith('D'),
+        mtime=fields.get('Modified', '')[:19] or None,
+        raw_name=path,
+        encrypted=fields.get('Encrypted') == '+',
+        method=fields.get('Method') or None,
+    )
+
+
+def parse_slt(output: str) -> SltListing:
+    """
+    解析 `7z l -slt` 输出
+
+    Args:
+        output: 已解码的 7z 标准输出
+
+    Returns:
+        SltListing: 压缩包类型、物理大小、成员记录以及输出中的错误行
+    """
+    listing = SltListing()
+    lines = output.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+
+    in_members = False
+    block: List[str] = []
+
+    def flush_block():
+        if not block:
+            return
+        fields = _parse_block(block)
+        block.clear()
+        if 'Path' not in fields:
+            return
+        if in_members:
+            listing.members.append(_member_from_fields(fields))
+        elif 'Type' in fields:
+            listing.archive_type = fields['Type']
+            listing.physical_size = _to_int(fields.get('Physical Size'))
+
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith(('ERROR:', 'WARNING:', 'Open ERROR', 'Open WARNING')):
+            listing.errors.append(stripped)
+            continue
+        if stripped == '----------':
+            flush_block()
+            in_members = True
+            continue
+        if stripped == '--':
+            flush_block()
+            continue
+        if not stripped:
+            flush_block()
+            continue
+        block.append(line)
+    flush_block()
+    return listing
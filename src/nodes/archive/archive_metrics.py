@@ -0,0 +1,110 @@
+"""
+压缩包指标缓存
+
+宽度、页数、清晰度这类指标要抽样读取压缩包里的图片，重复运行时每次都重新计算。
+而且 no_translate_find 等脚本会把指标写进文件名（{1.2k@WD,120@PX}），文件改名后按路径
+缓存就失效了。ArchiveMetricCache 按压缩包内容的指纹保存指标：
+
+    cache = ArchiveMetricCache.default()
+    metrics = cache.get_or_compute(path, compute)    # compute(path) -> dict
+
+指纹为 文件大小 + 文件头尾各 64KB 的 blake2b 摘要：改名、移动、复制后不变，压缩包被重新
+打包或追加内容后改变（ZIP 的中央目录在文件末尾，增删改成员都会反映在尾部）。
+
+指标保存在 ~/.glowtoolbox/cache/archive_metrics.db（RecordStore），带版本号，计算方式
+变化时调用方提高 version 即可让旧结果失效。结果还依赖调用参数（如抽样数）时传入 variant，
+不同参数的结果分开保存：
+
+    cache.get_or_compute(path, compute, variant='samples=5')
+"""
+
+import os
+import hashlib
+import logging
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from ..record.record_store import RecordStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_FILE = "~/.glowtoolbox/cache/archive_metrics.db"
+NAMESPACE = "archive_metrics"
+FINGERPRINT_BLOCK = 64 * 1024
+
+
+def archive_fingerprint(path: str, stat: Optional[os.stat_result] = None) -> str:
+    """压缩包内容指纹：大小 + 头尾块摘要"""
+    stat = stat or os.stat(path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        digest.update(f.read(FINGERPRINT_BLOCK))
+        if stat.st_size > FINGERPRINT_BLOCK:
+            f.seek(max(FINGERPRINT_BLOCK, stat.st_size - FINGERPRINT_BLOCK))
+            digest.update(f.read(FINGERPRINT_BLOCK))
+    return f"{stat.st_size:x}-{digest.hexdigest()}"
+
+
+class ArchiveMetricCache:
+    """
+    按压缩包指纹缓存的指标
+
+    Args:
+        store: 使用的 RecordStore，默认打开 DEFAULT_DB_FILE
+        version: 指标版本，与缓存中的版本不同时视为未命中
+        namespace: RecordStore 命名空间，不同脚本的指标可以分开保存
+    """
+
+    _default: Optional['ArchiveMetricCache'] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, store: Optional[RecordStore] = None, version: int = 1, namespace: str = NAMESPACE):
+        self.store = store or RecordStore.open(DEFAULT_DB_FILE)
+        self.version = version
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def default(cls) -> 'ArchiveMetricCache':
+        """进程内共享的默认缓存"""
+        if cls._default is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    cls._default = cls()
+        return cls._default
+
+    @staticmethod
+    def _key(fingerprint: str, variant: str) -> str:
+        return f"{fingerprint}|{variant}" if variant else fingerprint
+
+    def get(self, path: str, variant: str = '') -> Tuple[Optional[str], Optional[Dict]]:
+        """
+        返回 (指纹, 缓存的指标)
+
+        文件无法读取时指纹为 None；没有缓存或版本不同时指标为 None
+        """
+        try:
+            fingerprint = archive_fingerprint(path)
+        except OSError as e:
+            logger.debug(f"计算指纹失败 {path}: {e}")
+            return None, None
+        record = self.store.get(self.namespace, self._key(fingerprint, variant))
+        if isinstance(record, dict) and record.get('version') == self.version:
+            self.hits += 1
+            return fingerprint, record.get('metrics')
+        self.misses += 1
+        return fingerprint, None
+
+    def put(self, fingerprint: str, metrics: Dict, variant: str = ''):
+        self.store.put(self.namespace, self._key(fingerprint, variant), {'version': self.version, 'metrics': metrics})
+
+    def get_or_compute(self, path: str, compute: Callable[[str], Dict], variant: str = '') -> Dict:
+        """有缓存时直接返回，否则调用 compute(path) 计算并保存"""
+        fingerprint, metrics = self.get(path, variant)
+        if metrics is not None:
+            return metrics
+        metrics = compute(path)
+        if fingerprint is not None:
+            self.put(fingerprint, metrics, variant)
+        return metrics
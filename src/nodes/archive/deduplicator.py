@@ -1,5 +1,3 @@
-import PIL
-from PIL import Image
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from io import BytesIO
@@ -8,10 +6,7 @@ from threading import Lock
 from tqdm import tqdm
 import argparse
 import logging
-import numpy as np
 import os
-import pillow_avif
-import pillow_jxl
 import pyperclip
 import shutil
 import subprocess
@@ -22,12 +17,20 @@ import yaml
 import zipfile
 import json
 from pathlib import Path
-import questionary  # 需要先安装: pip install questionary
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from pics.calculate_hash_custom import ImageHashCalculator, PathURIGenerator
-from pics.grayscale_detector import GrayscaleDetector
-from tui.textual_logger import TextualLoggerManager
+# 图像处理、TUI 等重量级模块延迟到第一次使用时导入
+from config.lazy_import import lazy_module, lazy_from, load_image_plugins
+PIL = lazy_module('PIL', after_load=load_image_plugins)
+Image = lazy_module('PIL.Image', after_load=load_image_plugins)
+np = lazy_module('numpy')
+questionary = lazy_module('questionary')  # 需要先安装: pip install questionary
+ImageHashCalculator = lazy_from('pics.calculate_hash_custom', 'ImageHashCalculator')
+PathURIGenerator = lazy_from('pics.calculate_hash_custom', 'PathURIGenerator')
+GrayscaleDetector = lazy_from('pics.grayscale_detector', 'GrayscaleDetector')
+TextualLoggerManager = lazy_from('tui.textual_logger', 'TextualLoggerManager')
+from archive.archive_access import ArchiveAccess, ArchiveError
+from utils.thread_manager import ThreadManager
 
 # 初始化 TextualLoggerManager
 # 在全局配置部分添加以下内容
@@ -196,11 +199,14 @@ class ImageProcessor:
             duplicate_files = set()
             lock = threading.Lock()
             existing_file_names = set()
-            with ThreadPoolExecutor(max_workers=params['max_workers']) as executor:
+            # 线程数向共享的 ThreadManager 申请，内存紧张时自动暂停新任务
+            with ThreadManager.shared().lease('deduplicator', params['max_workers']) as lease, \
+                    ThreadPoolExecutor(max_workers=lease.workers) as executor:
                 futures = []
                 for file_path in image_files:
                     rel_path = os.path.relpath(file_path, os.path.dirname(file_path))
-                    future = executor.submit(self.process_single_image, file_path, rel_path, existing_file_names, params, lock)
+                    task = lease.wrap(self.process_single_image, nbytes=os.path.getsize(file_path))
+                    future = executor.submit(task, file_path, rel_path, existing_file_names, params, lock)
                     futures.append((future, file_path))
                 image_hashes = []
                 for future, file_path in futures:
@@ -737,18 +743,14 @@ class ArchiveProcessor:
                 logging.info( f"❌ 文件不存在: {file_path}")
                 return []
                 
-            cmd = ['7z', 'l', file_path]
-            result = subprocess.run(cmd, capture_output=True, encoding='utf-8', errors='ignore')
-            if result.returncode != 0:
+            try:
+                members = ArchiveAccess.list_members(file_path)
+            except ArchiveError:
                 logging.info( f"❌ 压缩包可能损坏: {file_path}")
                 return []
                 
-            if result.stdout is None:
-                logging.info( f"❌ 无法读取压缩包内容: {file_path}")
-                return []
-                
-            has_images = any((line.lower().endswith(('.jpg', '.jpeg', '.png', '.webp', '.jxl', '.avif', '.jxl')) 
-                            for line in result.stdout.splitlines()))
+            has_images = any(member.suffix in ('.jpg', '.jpeg', '.png', '.webp', '.jxl', '.avif')
+                             for member in members)
             if not has_images:
                 logging.info( f"⚠️ 跳过无图片的压缩包: {file_path}")
                 return []
@@ -923,7 +925,8 @@ class ArchiveProcessor:
             params['zip_path'] = file_path
             
             # 在处理图片时显示进度
-            with ThreadPoolExecutor(max_workers=params['max_workers']) as executor:
+            with ThreadManager.shared().lease('deduplicator', params['max_workers']) as lease, \
+                    ThreadPoolExecutor(max_workers=lease.workers) as executor:
                 futures = []
                 total_files = len(image_files)
                 processed_files = 0
@@ -931,7 +934,7 @@ class ArchiveProcessor:
                 for img_path in image_files:
                     rel_path = os.path.relpath(img_path, temp_dir)
                     future = executor.submit(
-                        image_processor.process_single_image, 
+                        lease.wrap(image_processor.process_single_image, nbytes=os.path.getsize(img_path)), 
                         img_path, 
                         rel_path, 
                         existing_file_names, 
@@ -1203,14 +1206,14 @@ class ProcessedLogHandler:
     """
     @staticmethod
     def has_processed_log(zip_path):
-        command = ['7z', 'l', zip_path]
-        result = subprocess.run(command, capture_output=True, text=True)
-        if result.returncode == 0:
-            if 'processed.log' in result.stdout:
-                ProcessedLogHandler.save_processed_file(zip_path)
-                return True
-        else:
-            logging.info( f"❌ Failed to list contents of {zip_path}: {result.stderr}")
+        try:
+            members = ArchiveAccess.list_members(zip_path)
+        except ArchiveError as e:
+            logging.info( f"❌ Failed to list contents of {zip_path}: {e}")
+            return False
+        if any(os.path.basename(member.name) == 'processed.log' for member in members):
+            ProcessedLogHandler.save_processed_file(zip_path)
+            return True
         return False
 
     @staticmethod
@@ -1589,6 +1592,8 @@ class ProcessManager:
             )
         
         ProcessManager.generate_summary_report(processed_archives)
+        for line in ThreadManager.shared().summary_lines():
+            logging.info(f"[#cur_stats]📊 {line}")
         logging.info( "所有目录处理完成")
         return processed_archives
 
@@ -1656,18 +1661,14 @@ class ProcessManager:
                 logging.info( f"❌ 文件不存在: {file_path}")
                 return []
                 
-            cmd = ['7z', 'l', file_path]
-            result = subprocess.run(cmd, capture_output=True, encoding='utf-8', errors='ignore')
-            if result.returncode != 0:
+            try:
+                members = ArchiveAccess.list_members(file_path)
+            except ArchiveError:
                 logging.info( f"❌ 压缩包可能损坏: {file_path}")
                 return []
                 
-            if result.stdout is None:
-                logging.info( f"❌ 无法读取压缩包内容: {file_path}")
-                return []
-                
-            has_images = any((line.lower().endswith(('.jpg', '.jpeg', '.png', '.webp', '.jxl', '.avif', '.jxl')) 
-                            for line in result.stdout.splitlines()))
+            has_images = any(member.suffix in ('.jpg', '.jpeg', '.png', '.webp', '.jxl', '.avif')
+                             for member in members)
             if not has_images:
                 logging.info( f"⚠️ 跳过无图片的压缩包: {file_path}")
                 return []
@@ -0,0 +1,120 @@
+"""
+压缩包成员列表的磁盘缓存
+
+以 (路径, 大小, 修改时间) 为键保存 ArchiveMember 列表，分类、宽度过滤、部分解压等脚本
+处理同一个漫画库时，每个压缩包只需要真正列出一次。压缩包被修改（大小或修改时间变化）
+后缓存自动失效。
+
+缓存是 ~/.glowtoolbox/cache/archive_listing.db 下的 SQLite 数据库，多个线程、
+多个脚本进程可以同时读写。
+"""
+
+import os
+import json
+import sqlite3
+import logging
+import threading
+from typing import List, Optional
+
+from .archive_listing import ArchiveMember
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_FILE = os.path.expanduser("~/.glowtoolbox/cache/archive_listing.db")
+
+
+class ArchiveListingCache:
+    """压缩包成员列表缓存"""
+
+    _default: Optional['ArchiveListingCache'] = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or DEFAULT_CACHE_FILE
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS listings ("
+            " path TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " members TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def default(cls) -> 'ArchiveListingCache':
+        """进程内共享的默认缓存"""
+        if cls._default is None:
+            with cls._default_lock:
+                if cls._default is None:
+                    cls._default = cls()
+        return cls._default
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.normcase(os.path.abspath(path))
+
+    def get(self, path: str, stat: Optional[os.stat_result] = None) -> Optional[List[ArchiveMember]]:
+        """
+        获取缓存的成员列表，文件已变化或不存在缓存时返回 None
+
+        Args:
+            path: 压缩包路径
+            stat: 已经取得的 os.stat 结果，避免重复 stat
+        """
+        try:
+            stat = stat or os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, members FROM listings WHERE path = ?",
+                (self._key(path),)).fetchone()
+        if row is None or row[0] != stat.st_size or row[1] != stat.st_mtime_ns:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [ArchiveMember.from_row(item) for item in json.loads(row[2])]
+
+    def put(self, path: str, members: List[ArchiveMember], stat: Optional[os.stat_result] = None):
+        """保存成员列表（应传入列出之前取得的 stat，避免列出期间文件被修改）"""
+        try:
+            stat = stat or os.stat(path)
+        except OSError:
+            return
+        data = json.dumps([member.to_row() for member in members], ensure_ascii=False)
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO listings (path, size, mtime_ns, members) VALUES (?, ?, ?, ?)",
+                    (self._key(path), stat.st_size, stat.st_mtime_ns, data))
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.debug(f"写入列表缓存失败 {path}: {e}")
+
+    def invalidate(self, path: str):
+        """删除某个压缩包的缓存"""
+        with self._lock:
+            self._conn.execute("DELETE FROM listings WHERE path = ?", (self._key(path),))
+            self._conn.commit()
+
+    def prune(self) -> int:
+        """清理已不存在的压缩包的缓存，返回清理条数"""
+        with self._lock:
+            paths = [row[0] for row in self._conn.execute("SELECT path FROM listings")]
+        missing = [(path,) for path in paths if not os.path.exists(path)]
+        if missing:
+            with self._lock:
+                self._conn.executemany("DELETE FROM listings WHERE path = ?", missing)
+                self._conn.commit()
+        return len(missing)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
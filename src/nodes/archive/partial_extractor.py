@@ -3,6 +3,7 @@ import subprocess
 from typing import List, Set, Dict, Any
 import shutil
 from nodes.pics.range_control import RangeControl
+from nodes.archive.archive_access import ArchiveAccess
 
 class PartialExtractor:
     """处理压缩包部分解压的类"""
@@ -19,21 +20,10 @@ class PartialExtractor:
             List[str]: 压缩包中的文件列表
         """
         try:
-            cmd = ['7z', 'l', archive_path]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode != 0:
-                raise Exception(f"列出压缩包内容失败: {result.stderr}")
-                
-            # 解析7z输出
-            files = []
-            for line in result.stdout.splitlines():
-                if line.strip() and any(line.lower().endswith(ext) for ext in 
-                    ('.jpg', '.jpeg', '.png', '.webp', '.jxl', '.avif')):
-                    # 提取文件名
-                    parts = line.split()
-                    if len(parts) >= 6:  # 7z输出格式：日期 时间 属性 大小 压缩后大小 文件名
-                        files.append(parts[-1])
-            
+            # 按成员记录过滤，文件名含空格时也能完整保留
+            files = [member.name
+                     for member in ArchiveAccess.list_members(archive_path)
+                     if member.suffix in ('.jpg', '.jpeg', '.png', '.webp', '.jxl', '.avif')]
             return sorted(files)  # 返回排序后的文件列表
             
         except Exception as e:
@@ -0,0 +1,102 @@
+"""
+压缩包列表吞吐基准
+
+在临时目录生成 --archives 个 ZIP（每个 --members 张小图），分别用两种方式列出全部成员：
+- 进程内: ArchiveAccess.list_members（zipfile 直接读取中央目录），分别测试
+  不使用缓存、首次写入列表缓存、再次命中列表缓存三种情况
+- 子进程: 每个压缩包启动一次 `7z l -slt`（旧实现的方式）
+
+7z 不在 PATH 中时只运行进程内部分。子进程部分可用 --spawn-sample 只跑前 N 个再按比例估算。
+
+用法:
+    python nodes/archive/tests/bench_archive_listing.py --archives 5000 --members 40
+"""
+
+import os
+import sys
+import time
+import shutil
+import zipfile
+import argparse
+import tempfile
+import subprocess
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+from nodes.archive.archive_access import ArchiveAccess
+from nodes.archive.listing_cache import ArchiveListingCache
+
+
+def make_archives(root: str, count: int, members: int):
+    """生成测试压缩包，文件名包含空格和中文，模拟真实漫画库"""
+    paths = []
+    payload = os.urandom(2048)
+    for i in range(count):
+        path = os.path.join(root, f"[作者{i % 200}] 作品 {i:05d}.zip")
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED) as zf:
+            for j in range(members):
+                zf.writestr(f"第{i % 7}话/page {j:03d}.jpg", payload)
+            zf.writestr("info.yaml", "title: test\n")
+        paths.append(path)
+    return paths
+
+
+def bench_in_process(paths):
+    start = time.perf_counter()
+    total = 0
+    for path in paths:
+        total += len(ArchiveAccess.list_members(path))
+    return time.perf_counter() - start, total
+
+
+def bench_spawn(paths, executable):
+    start = time.perf_counter()
+    total = 0
+    for path in paths:
+        result = subprocess.run([executable, 'l', '-slt', path], capture_output=True)
+        total += result.stdout.count(b'\nPath = ') - 1  # 第一个 Path 是压缩包本身
+    return time.perf_counter() - start, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='压缩包列表吞吐基准')
+    parser.add_argument('--archives', type=int, default=5000, help='压缩包数量')
+    parser.add_argument('--members', type=int, default=40, help='每个压缩包的图片数')
+    parser.add_argument('--spawn-sample', type=int, default=0, help='子进程方式只测试前 N 个（0 为全部）')
+    parser.add_argument('--keep', action='store_true', help='保留生成的测试目录')
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='bench_archive_listing_')
+    try:
+        print(f"生成 {args.archives} 个压缩包到 {root} ...")
+        paths = make_archives(root, args.archives, args.members)
+
+        ArchiveAccess.use_cache = False
+        elapsed, total = bench_in_process(paths)
+        in_process_rate = len(paths) / elapsed
+        print(f"进程内: {elapsed:.2f}s | {in_process_rate:.0f} 个/秒 | 成员 {total}")
+
+        # 使用测试目录内的缓存库，不影响用户目录下的缓存
+        ArchiveAccess.use_cache = True
+        ArchiveListingCache._default = ArchiveListingCache(os.path.join(root, 'listing_cache.db'))
+        for label in ("缓存写入", "缓存命中"):
+            elapsed, total = bench_in_process(paths)
+            print(f"{label}: {elapsed:.2f}s | {len(paths) / elapsed:.0f} 个/秒 | 成员 {total}")
+        ArchiveListingCache._default.close()
+
+        executable = shutil.which('7z') or shutil.which('7z.exe')
+        if not executable:
+            print("未找到 7z，跳过子进程对比")
+            return
+        sample = paths[:args.spawn_sample] if args.spawn_sample else paths
+        elapsed, total = bench_spawn(sample, executable)
+        spawn_rate = len(sample) / elapsed
+        estimate = len(paths) / spawn_rate
+        print(f"子进程: {elapsed:.2f}s ({len(sample)} 个) | {spawn_rate:.0f} 个/秒 | "
+              f"全部预计 {estimate:.1f}s | 成员 {total}")
+        print(f"加速: {in_process_rate / spawn_rate:.1f}x")
+    finally:
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
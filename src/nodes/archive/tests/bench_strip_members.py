@@ -0,0 +1,123 @@
+"""
+压缩包元数据清理基准
+
+在临时目录生成 --archives 个压缩包（--pages 张随机内容的 .jpg，开头一个旧的 .yaml，末尾一个
+{uuid}.json 和 meta.json），删除 YAML 和 meta.json 以外的 JSON，对比：
+- 旧实现: clean_archive_metadata 原来的流程，对每个要删除的文件执行一次 bz d / 7z d，每次都
+  重写整个压缩包（这里用 zipfile 把其余成员复制到新压缩包来模拟，不含进程启动开销，偏保守）
+- 新实现: strip_members 一次读出中央目录，保留的成员按原始字节复制，只重写一次
+
+输出吞吐量（个/秒、MB/s）和写入的数据量，并校验图片数据未被改动。
+
+用法:
+    python nodes/archive/tests/bench_strip_members.py --archives 100 --pages 40 --page-kb 300
+"""
+
+import os
+import sys
+import time
+import shutil
+import zipfile
+import argparse
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+from nodes.archive.zip_sidecar import strip_members
+
+
+def is_metadata(name: str) -> bool:
+    return name.endswith('.yaml') or (name.endswith('.json') and not name.endswith('meta.json'))
+
+
+def make_archives(root: str, count: int, pages: int, page_kb: int):
+    paths = []
+    for i in range(count):
+        path = os.path.join(root, f"作品{i:04d}.zip")
+        with zipfile.ZipFile(path, 'w') as zf:
+            zf.writestr(f"{i:016d}.yaml", "- UUID: old\n" * 20, zipfile.ZIP_DEFLATED)
+            for p in range(pages):
+                zf.writestr(f"{p:03d}.jpg", os.urandom(page_kb * 1024))
+            zf.writestr(f"{i:016d}.json", '{"uuid": "x", "timestamps": {}}', zipfile.ZIP_DEFLATED)
+            zf.writestr("meta.json", '{}', zipfile.ZIP_DEFLATED)
+        paths.append(path)
+    return paths
+
+
+def legacy_strip(path: str) -> int:
+    """每个文件一次全量重写，返回写入的字节数"""
+    written = 0
+    with zipfile.ZipFile(path) as zf:
+        names = [name for name in zf.namelist() if is_metadata(name)]
+    for name in names:
+        temp_path = path + '.tmp'
+        with zipfile.ZipFile(path) as src, zipfile.ZipFile(temp_path, 'w') as dst:
+            for info in src.infolist():
+                if info.filename != name:
+                    dst.writestr(info, src.read(info))
+        written += os.path.getsize(temp_path)
+        os.replace(temp_path, path)
+    return written
+
+
+def image_crcs(paths):
+    result = {}
+    for path in paths:
+        with zipfile.ZipFile(path) as zf:
+            result[path] = [(info.filename, info.CRC) for info in zf.infolist() if info.filename.endswith('.jpg')]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='压缩包元数据清理基准')
+    parser.add_argument('--archives', type=int, default=100, help='压缩包数量')
+    parser.add_argument('--pages', type=int, default=40, help='每个压缩包的图片数')
+    parser.add_argument('--page-kb', type=int, default=300, help='每张图片大小 (KB)')
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='strip_')
+    try:
+        legacy_dir = os.path.join(root, 'legacy')
+        new_dir = os.path.join(root, 'new')
+        os.makedirs(legacy_dir)
+        os.makedirs(new_dir)
+        legacy_paths = make_archives(legacy_dir, args.archives, args.pages, args.page_kb)
+        new_paths = make_archives(new_dir, args.archives, args.pages, args.page_kb)
+        total_mb = sum(os.path.getsize(p) for p in new_paths) / 2**20
+        print(f"{args.archives} 个压缩包，共 {total_mb:.0f}MB")
+        before = image_crcs(new_paths)
+
+        start = time.perf_counter()
+        legacy_written = sum(legacy_strip(path) for path in legacy_paths)
+        legacy_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        preview = [strip_members(path, is_metadata, dry_run=True) for path in new_paths]
+        dry_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = [strip_members(path, is_metadata) for path in new_paths]
+        new_seconds = time.perf_counter() - start
+        new_written = sum(r.rewritten_bytes for r in results)
+
+        print(f"旧实现: {legacy_seconds:.2f}s，{args.archives / legacy_seconds:.1f} 个/秒，"
+              f"写入 {legacy_written / 2**20:.0f}MB")
+        print(f"新实现: {new_seconds:.2f}s，{args.archives / new_seconds:.1f} 个/秒"
+              f"（{legacy_seconds / new_seconds:.1f}x），写入 {new_written / 2**20:.0f}MB，"
+              f"{total_mb / new_seconds:.0f} MB/s")
+        print(f"试运行: {dry_seconds:.2f}s，预计删除 {sum(len(r.removed) for r in preview)} 个文件")
+
+        after = image_crcs(new_paths)
+        broken = [p for p in new_paths if before[p] != after[p]]
+        for path in new_paths:
+            with zipfile.ZipFile(path) as zf:
+                names = zf.namelist()
+                if zf.testzip() is not None or any(is_metadata(name) for name in names) or 'meta.json' not in names:
+                    broken.append(path)
+        print(f"校验: 图片数据变化、损坏或清理不完整 {len(broken)} 个")
+        if broken:
+            sys.exit(1)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
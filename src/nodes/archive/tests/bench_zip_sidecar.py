@@ -0,0 +1,129 @@
+"""
+ZIP 附属文件更新基准
+
+在临时目录生成 --archives 个压缩包（每个 --pages 张随机内容的 .jpg，末尾带一个 {uuid}.json），
+模拟 auto_uuid 的一轮处理：读出 JSON、追加一条时间戳记录、写回压缩包。对比：
+- 旧实现: 有 7z 时按原流程调用 7z u 写回（每个压缩包一次进程启动，7z 重写整个压缩包）；
+  没有 7z 时用 zipfile 把全部成员复制到新压缩包来模拟全量重写（不含进程启动开销，偏保守）
+- 新实现: read_sidecars 读取 + update_sidecars 截断末尾的 JSON 后追加
+
+输出每个压缩包的平均耗时、写入的数据量，并校验图片数据未被改动。
+
+用法:
+    python nodes/archive/tests/bench_zip_sidecar.py --archives 200 --pages 40 --page-kb 300
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import zipfile
+import argparse
+import tempfile
+import subprocess
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+from nodes.archive.zip_sidecar import read_sidecars, update_sidecars
+
+
+def make_archives(root: str, count: int, pages: int, page_kb: int):
+    paths = []
+    for i in range(count):
+        path = os.path.join(root, f"[画师{i % 20}] 作品{i:04d}.zip")
+        with zipfile.ZipFile(path, 'w') as zf:
+            for p in range(pages):
+                zf.writestr(f"{p:03d}.jpg", os.urandom(page_kb * 1024))
+            uuid = f"{i:016d}"
+            zf.writestr(f"{uuid}.json", json.dumps({"uuid": uuid, "timestamps": {}}), zipfile.ZIP_DEFLATED)
+        paths.append(path)
+    return paths
+
+
+def next_record(data: bytes, round_index: int) -> bytes:
+    record = json.loads(data)
+    record["timestamps"][f"2024-01-{round_index + 1:02d} 00:00:00"] = {"archive_name": "作品.zip"}
+    return json.dumps(record, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def legacy_update(path: str, name: str, data: bytes, executable):
+    if executable:
+        with tempfile.TemporaryDirectory() as work:
+            with open(os.path.join(work, name), 'wb') as f:
+                f.write(data)
+            subprocess.run([executable, 'u', path, os.path.join(work, name)],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        return
+    temp_path = path + '.tmp'
+    with zipfile.ZipFile(path) as src, zipfile.ZipFile(temp_path, 'w') as dst:
+        for info in src.infolist():
+            if info.filename != name:
+                dst.writestr(info, src.read(info))
+        dst.writestr(name, data, zipfile.ZIP_DEFLATED)
+    os.replace(temp_path, path)
+
+
+def run_round(paths, round_index: int, update):
+    for path in paths:
+        name, data = next((n, d) for n, d in read_sidecars(path, ('.json',)).items())
+        update(path, name, next_record(data, round_index))
+
+
+def image_digest(paths):
+    result = {}
+    for path in paths:
+        with zipfile.ZipFile(path) as zf:
+            result[path] = [(info.filename, info.CRC) for info in zf.infolist() if info.filename.endswith('.jpg')]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ZIP 附属文件更新基准')
+    parser.add_argument('--archives', type=int, default=200, help='压缩包数量')
+    parser.add_argument('--pages', type=int, default=40, help='每个压缩包的图片数')
+    parser.add_argument('--page-kb', type=int, default=300, help='每张图片大小 (KB)')
+    args = parser.parse_args()
+
+    executable = shutil.which('7z') or shutil.which('7za') or shutil.which('7zz')
+    root = tempfile.mkdtemp(prefix='sidecar_')
+    try:
+        legacy_dir = os.path.join(root, 'legacy')
+        new_dir = os.path.join(root, 'new')
+        os.makedirs(legacy_dir)
+        os.makedirs(new_dir)
+        legacy_paths = make_archives(legacy_dir, args.archives, args.pages, args.page_kb)
+        new_paths = make_archives(new_dir, args.archives, args.pages, args.page_kb)
+        total_mb = sum(os.path.getsize(p) for p in new_paths) / 2**20
+        print(f"{args.archives} 个压缩包，共 {total_mb:.0f}MB，旧实现: {executable or 'zipfile 全量重写（未找到 7z）'}")
+        before = image_digest(new_paths)
+
+        start = time.perf_counter()
+        run_round(legacy_paths, 0, lambda path, name, data: legacy_update(path, name, data, executable))
+        legacy_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        run_round(new_paths, 0, lambda path, name, data: update_sidecars(path, {name: data}))
+        new_seconds = time.perf_counter() - start
+        size_after_first = sum(os.path.getsize(p) for p in new_paths)
+        run_round(new_paths, 1, lambda path, name, data: update_sidecars(path, {name: data}))
+        growth = sum(os.path.getsize(p) for p in new_paths) - size_after_first
+
+        print(f"旧实现: {legacy_seconds:.2f}s，{legacy_seconds / args.archives * 1000:.1f}ms/个，"
+              f"重写约 {total_mb:.0f}MB")
+        print(f"新实现: {new_seconds:.2f}s，{new_seconds / args.archives * 1000:.2f}ms/个"
+              f"（{legacy_seconds / new_seconds:.0f}x），第二轮后总大小变化 {growth} 字节")
+
+        after = image_digest(new_paths)
+        broken = [p for p in new_paths if before[p] != after[p]]
+        for path in new_paths:
+            with zipfile.ZipFile(path) as zf:
+                if zf.testzip() is not None:
+                    broken.append(path)
+        print(f"校验: 图片数据变化或损坏 {len(broken)} 个")
+        if broken:
+            sys.exit(1)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
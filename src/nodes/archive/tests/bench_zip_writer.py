@@ -0,0 +1,113 @@
+"""
+图片文件夹打包吞吐基准
+
+在临时目录生成 --folders 个文件夹（每个 --pages 张随机内容的 .jpg/.webp，模拟已压缩图片），
+对比三种打包方式：
+- 复制+DEFLATE: 旧实现 zip_folder_with_7zip 的流程，先把图片复制为临时目录下的 img_001 等名称，
+  再全部 DEFLATE 压缩（有 7z 时调用 7z，否则用 zipfile 模拟）
+- 直接 DEFLATE: pack_files 不复制，但强制所有文件 DEFLATE
+- 直接打包: pack_files 默认策略（已压缩格式 STORE，其余 DEFLATE）
+
+输出每种方式的 MB/s 和压缩包总大小。
+
+用法:
+    python nodes/archive/tests/bench_zip_writer.py --folders 20 --pages 60 --page-kb 400
+"""
+
+import os
+import sys
+import time
+import shutil
+import zipfile
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+from nodes.archive import zip_writer
+from nodes.archive.zip_writer import pack_files
+
+
+def make_folders(root: Path, folders: int, pages: int, page_kb: int):
+    result = []
+    for i in range(folders):
+        folder = root / f"作品 {i:03d}"
+        folder.mkdir()
+        for p in range(pages):
+            ext = '.webp' if p % 4 == 0 else '.jpg'
+            (folder / f"{p:03d}{ext}").write_bytes(os.urandom(page_kb * 1024))
+        (folder / "info.yaml").write_text("title: test\n" * 20, encoding='utf-8')
+        result.append(folder)
+    return result
+
+
+def entries_for(folder: Path):
+    files = sorted(f for f in folder.iterdir() if f.is_file())
+    return [(f, f"img_{idx:03d}{f.suffix}") for idx, f in enumerate(files, 1)]
+
+
+def pack_copy_then_deflate(folder: Path, target: Path, executable):
+    with tempfile.TemporaryDirectory(prefix="zip_") as temp_base:
+        work = Path(temp_base) / "work"
+        work.mkdir()
+        for source, arcname in entries_for(folder):
+            shutil.copyfile(source, work / arcname)
+        if executable:
+            subprocess.run([executable, 'a', '-tzip', '-mx=5', str(target), str(work / '*')],
+                           capture_output=True, check=True)
+        else:
+            with zipfile.ZipFile(target, 'w', zipfile.ZIP_DEFLATED, compresslevel=5) as zf:
+                for path in sorted(work.iterdir()):
+                    zf.write(path, path.name)
+
+
+def run(label, folders, out_dir: Path, pack):
+    out_dir.mkdir()
+    total_in = sum(f.stat().st_size for folder in folders for f in folder.iterdir())
+    start = time.perf_counter()
+    for folder in folders:
+        pack(folder, out_dir / f"{folder.name}.zip")
+    elapsed = time.perf_counter() - start
+    total_out = sum(f.stat().st_size for f in out_dir.iterdir())
+    print(f"{label}: {elapsed:.2f}s | {total_in / 1024 / 1024 / elapsed:.1f} MB/s | "
+          f"{total_in / 1024 / 1024:.1f}MB -> {total_out / 1024 / 1024:.1f}MB")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='图片文件夹打包吞吐基准')
+    parser.add_argument('--folders', type=int, default=20, help='文件夹数量')
+    parser.add_argument('--pages', type=int, default=60, help='每个文件夹的图片数')
+    parser.add_argument('--page-kb', type=int, default=400, help='每张图片大小（KB）')
+    parser.add_argument('--keep', action='store_true', help='保留生成的测试目录')
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix='bench_zip_writer_'))
+    try:
+        print(f"生成测试文件夹到 {root} ...")
+        (root / "src").mkdir()
+        folders = make_folders(root / "src", args.folders, args.pages, args.page_kb)
+        executable = shutil.which('7z') or shutil.which('7z.exe')
+        print("复制+DEFLATE 使用: " + ("7z" if executable else "zipfile（未找到 7z）"))
+
+        legacy = run("复制+DEFLATE", folders, root / "legacy",
+                     lambda folder, target: pack_copy_then_deflate(folder, target, executable))
+
+        stored = zip_writer.STORED_EXTENSIONS
+        zip_writer.STORED_EXTENSIONS = frozenset()
+        try:
+            run("直接 DEFLATE", folders, root / "deflate",
+                lambda folder, target: pack_files(entries_for(folder), target))
+        finally:
+            zip_writer.STORED_EXTENSIONS = stored
+
+        native = run("直接打包", folders, root / "native",
+                     lambda folder, target: pack_files(entries_for(folder), target))
+        print(f"加速: {legacy / native:.1f}x")
+    finally:
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
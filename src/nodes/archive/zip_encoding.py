@@ -0,0 +1,494 @@
+"""
+压缩包级别的 ZIP 文件名编码检测与批量修复
+
+没有设置 UTF-8 标志位的 ZIP，文件名是按打包时系统的代码页写入的。同一个压缩包里的
+文件名几乎总是同一种编码，所以检测一次整个压缩包，而不是对每个文件名逐个尝试：
+
+    from nodes.archive.zip_encoding import detect_zip_encoding, decode_member_names
+    with zipfile.ZipFile(path) as zf:
+        verdict = detect_zip_encoding(zf.infolist())
+        names = decode_member_names(zf.infolist(), verdict)
+
+    from nodes.archive.zip_encoding import repair_zip_names, repair_folder
+    result = repair_zip_names(path)           # 把文件名改写为 UTF-8
+    for result in repair_folder(paths): ...   # 批量，按磁盘并行
+
+检测：把所有文件名按每种候选编码解码，按字符所在的编码区（常用汉字、假名、谚文、
+扩展区、半角片假名等）打分，取平均分最高的编码；平均分相同时按候选顺序（中文环境优先）。
+结果按文件名原始字节的指纹缓存在 ~/.glowtoolbox/cache/zip_encoding.db，内容相同的
+压缩包（复制、改名、移动后）不再重复检测。
+
+修复：文件名同时存在于本地文件头和中央目录中，zipfile 等读取器会校验两者一致，
+只改中央目录会导致读取失败。因此修复时按原样复制压缩数据（不解压、不重新压缩），
+只重写两处文件头中的文件名并设置 UTF-8 标志位，写入临时文件后原子替换，保留修改时间。
+分卷、ZIP64 和带前置数据的自解压文件不改写（UnsupportedLayout，repair_zip_names 记为跳过）。
+"""
+
+import os
+import time
+import struct
+import hashlib
+import logging
+import zipfile
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .zip_filename_decoder import decode_zip_filename
+
+logger = logging.getLogger(__name__)
+
+# 候选编码，顺序即平分时的优先级（中文环境优先）
+CANDIDATE_ENCODINGS = ('gbk', 'cp932', 'big5', 'cp949', 'cp437')
+
+UTF8_FLAG = 0x800
+MIN_RELIABLE_SCORE = 0.5     # 平均分低于该值时不用于修复
+KOREAN_MIN_CHARS = 20        # GBK/韩文无法区分时，判断为韩文所需的最少谚文字符数
+CACHE_FILE = os.path.expanduser("~/.glowtoolbox/cache/zip_encoding.db")
+CACHE_NAMESPACE = "zip_encoding"
+COPY_BUFFER_SIZE = 1024 * 1024
+
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_CENTRAL_HEADER = struct.Struct("<4s4B4HL2L5H2L")
+_END_RECORD = struct.Struct("<4s4H2LH")
+_LOCAL_SIGNATURE = b"PK\003\004"
+_CENTRAL_SIGNATURE = b"PK\001\002"
+_END_SIGNATURE = b"PK\005\006"
+_DESCRIPTOR_SIGNATURE = b"PK\007\010"
+
+
+@dataclass
+class EncodingVerdict:
+    """一个压缩包的文件名编码检测结果"""
+    encoding: Optional[str]            # 'ascii'、'utf-8'、候选编码之一，或 None（无法确定）
+    score: float = 0.0                 # 非 ASCII 字符的平均分
+    names: int = 0                     # 需要检测的文件名数量（未设置 UTF-8 标志位）
+    scores: Dict[str, float] = field(default_factory=dict)
+    cached: bool = False
+
+    @property
+    def needs_repair(self) -> bool:
+        """文件名不是 ASCII/UTF-8，且检测结果足够可靠"""
+        return self.encoding not in (None, 'ascii', 'utf-8') and self.score >= MIN_RELIABLE_SCORE
+
+
+# ========== 打分模型 ==========
+
+def _gbk_score(b: bytes) -> float:
+    lead, trail = b[0], b[1]
+    if trail >= 0xA1:
+        if 0xB0 <= lead <= 0xD7:
+            return 1.0       # GB2312 一级汉字（常用字）
+        if 0xD8 <= lead <= 0xF7:
+            return 0.3       # GB2312 二级汉字
+        if 0xA1 <= lead <= 0xA9:
+            return 0.2       # 全角符号
+    return -1.0              # GBK 扩展区，正常文件名中很少出现
+
+
+def _cp932_score(b: bytes) -> float:
+    if len(b) == 1:
+        return -0.5          # 半角片假名，GBK 文件名按日文解码时会大量出现
+    lead = b[0]
+    if lead in (0x82, 0x83):
+        return 1.5           # 平假名、片假名
+    if lead == 0x81:
+        return 0.2           # 全角符号
+    if 0x88 <= lead <= 0x98:
+        return 1.0           # JIS 第一水准汉字
+    if 0x99 <= lead <= 0x9F or 0xE0 <= lead <= 0xEA:
+        return 0.3           # JIS 第二水准汉字
+    return -1.0              # 希腊/西里尔字母、NEC/IBM 扩展字符
+
+
+def _big5_score(b: bytes) -> float:
+    lead, trail = b[0], b[1]
+    if 0xA4 <= lead <= 0xC6:
+        return 0.8           # 常用字
+    if 0xC9 <= lead <= 0xF9:
+        return 0.2           # 次常用字
+    if 0xA1 <= lead <= 0xA3 and trail >= 0x40:
+        return 0.1           # 符号
+    return -1.0
+
+
+def _cp949_score(b: bytes) -> float:
+    lead, trail = b[0], b[1]
+    if trail >= 0xA1:
+        if 0xB0 <= lead <= 0xC8:
+            return 1.0       # KS X 1001 谚文音节
+        if 0xCA <= lead <= 0xFD:
+            return 0.2       # 汉字
+        if 0xA1 <= lead <= 0xAC:
+            return 0.1       # 符号
+    return -0.5              # CP949 扩展谚文
+
+
+_SCORERS = {
+    'gbk': _gbk_score,
+    'cp932': _cp932_score,
+    'big5': _big5_score,
+    'cp949': _cp949_score,
+}
+
+
+def score_names(raw_names: Sequence[bytes], encoding: str) -> Optional[float]:
+    """按 encoding 解码所有文件名，返回非 ASCII 字符的平均分；有文件名无法解码时返回 None"""
+    scorer = _SCORERS.get(encoding)
+    total = 0.0
+    count = 0
+    for raw in raw_names:
+        try:
+            text = raw.decode(encoding)
+        except UnicodeDecodeError:
+            return None
+        if scorer is None:
+            count += sum(1 for ch in text if ord(ch) >= 0x80)
+            continue
+        for ch in text:
+            if ord(ch) < 0x80:
+                continue
+            count += 1
+            try:
+                total += scorer(ch.encode(encoding))
+            except UnicodeEncodeError:
+                total -= 1.0
+    return total / count if count else 0.0
+
+
+def _looks_korean(raw_names: Sequence[bytes]) -> bool:
+    """
+    GB2312 一级汉字的前 25 行与 KS X 1001 谚文音节的字节范围完全重合，两者得分相同。
+    中文文件名较长时几乎不可能只用到这 25 行，足够多的字符全部落在其中时判断为韩文
+    """
+    count = 0
+    for raw in raw_names:
+        text = raw.decode('cp949')
+        for ch in text:
+            if ord(ch) < 0x80:
+                continue
+            b = ch.encode('cp949')
+            if len(b) != 2 or not (0xB0 <= b[0] <= 0xC8 and b[1] >= 0xA1):
+                return False
+            count += 1
+    return count >= KOREAN_MIN_CHARS
+
+
+def _is_utf8(raw_names: Sequence[bytes]) -> bool:
+    try:
+        for raw in raw_names:
+            raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+# ========== 检测与缓存 ==========
+
+def raw_member_name(info: zipfile.ZipInfo) -> bytes:
+    """还原文件名的原始字节（zipfile 对未设置 UTF-8 标志位的文件名按 cp437 解码）"""
+    if info.flag_bits & UTF8_FLAG:
+        return info.filename.encode('utf-8')
+    try:
+        return info.filename.encode('cp437')
+    except UnicodeEncodeError:
+        return info.filename.encode('utf-8')
+
+
+def archive_fingerprint(raw_names: Sequence[bytes]) -> str:
+    """文件名原始字节的指纹，与压缩包路径和修改时间无关"""
+    digest = hashlib.blake2b(digest_size=16)
+    for raw in raw_names:
+        digest.update(raw)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+_cache_store = None
+
+
+def _cache():
+    global _cache_store
+    if _cache_store is None:
+        try:
+            from ..record.record_store import RecordStore
+            _cache_store = RecordStore.open(CACHE_FILE, flush_interval=2.0)
+        except Exception as e:
+            logger.debug(f"编码检测缓存不可用: {e}")
+            _cache_store = False
+    return _cache_store or None
+
+
+def detect_encoding(raw_names: Sequence[bytes], use_cache: bool = True) -> EncodingVerdict:
+    """由一个压缩包中所有（未设置 UTF-8 标志位的）文件名的原始字节判断编码"""
+    non_ascii = [raw for raw in raw_names if any(b >= 0x80 for b in raw)]
+    if not non_ascii:
+        return EncodingVerdict('ascii', names=len(raw_names))
+    if _is_utf8(non_ascii):
+        return EncodingVerdict('utf-8', score=1.0, names=len(raw_names))
+
+    store = _cache() if use_cache else None
+    key = archive_fingerprint(non_ascii)
+    if store is not None:
+        cached = store.get(CACHE_NAMESPACE, key)
+        if cached is not None:
+            return EncodingVerdict(cached['encoding'], cached['score'], len(raw_names), cached['scores'], cached=True)
+
+    scores = {}
+    for encoding in CANDIDATE_ENCODINGS:
+        score = score_names(non_ascii, encoding)
+        if score is not None:
+            scores[encoding] = score
+    if scores:
+        # max 在分数相同时保留先出现的，即候选顺序靠前的编码
+        best = max(scores, key=scores.get)
+        if best == 'gbk' and scores.get('cp949') == scores['gbk'] and _looks_korean(non_ascii):
+            best = 'cp949'
+        verdict = EncodingVerdict(best, scores[best], len(raw_names), scores)
+    else:
+        verdict = EncodingVerdict(None, names=len(raw_names))
+
+    if store is not None:
+        store.put(CACHE_NAMESPACE, key, {'encoding': verdict.encoding, 'score': verdict.score, 'scores': scores})
+    return verdict
+
+
+def detect_zip_encoding(infos: Iterable[zipfile.ZipInfo], use_cache: bool = True) -> EncodingVerdict:
+    """检测 ZipFile.infolist() 中文件名的编码"""
+    raw_names = [raw_member_name(info) for info in infos if not info.flag_bits & UTF8_FLAG]
+    return detect_encoding(raw_names, use_cache=use_cache)
+
+
+def decode_member_name(info: zipfile.ZipInfo, verdict: EncodingVerdict) -> str:
+    """按压缩包的检测结果解码一个文件名，失败时回退到逐个尝试"""
+    if info.flag_bits & UTF8_FLAG:
+        return info.filename
+    raw = raw_member_name(info)
+    if verdict.encoding and verdict.encoding != 'ascii':
+        try:
+            return raw.decode(verdict.encoding)
+        except UnicodeDecodeError:
+            pass
+    return decode_zip_filename(raw, info.flag_bits)
+
+
+def decode_member_names(infos: Sequence[zipfile.ZipInfo],
+                        verdict: Optional[EncodingVerdict] = None) -> List[str]:
+    """解码压缩包中的所有文件名（顺序与 infos 相同）"""
+    if verdict is None:
+        verdict = detect_zip_encoding(infos)
+    return [decode_member_name(info, verdict) for info in infos]
+
+
+# ========== 批量修复 ==========
+
+class UnsupportedLayout(Exception):
+    """ZIP 结构不支持原地改写（分卷、ZIP64、带前置数据的自解压文件），调用方可跳过或退回 7z"""
+
+
+@dataclass
+class RepairResult:
+    """一个压缩包的修复结果"""
+    path: str
+    verdict: Optional[EncodingVerdict] = None
+    renamed: int = 0
+    repaired: bool = False
+    skipped: str = ""                  # 跳过原因
+    error: str = ""
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        encoding = self.verdict.encoding if self.verdict else '-'
+        if self.error:
+            return f"❌ {self.path}: {self.error}"
+        if self.skipped:
+            return f"⏭️ {self.path}: {self.skipped} ({encoding})"
+        action = "已修复" if self.repaired else "需要修复"
+        return f"✅ {self.path}: {action} {self.renamed} 个文件名 ({encoding}, {self.seconds:.2f}s)"
+
+
+def _find_end_record(f, file_size: int):
+    """返回 (结束记录偏移, 结束记录字段, 注释)；ZIP64 或结构异常时返回 None"""
+    tail_size = min(file_size, _END_RECORD.size + 0xFFFF)
+    f.seek(file_size - tail_size)
+    tail = f.read(tail_size)
+    pos = tail.rfind(_END_SIGNATURE)
+    if pos < 0 or pos + _END_RECORD.size > len(tail):
+        return None
+    fields = _END_RECORD.unpack_from(tail, pos)
+    comment = tail[pos + _END_RECORD.size:pos + _END_RECORD.size + fields[7]]
+    return file_size - tail_size + pos, fields, comment
+
+
+def _read_central_directory(f, offset: int, size: int, count: int) -> Optional[list]:
+    f.seek(offset)
+    data = f.read(size)
+    entries = []
+    pos = 0
+    for _ in range(count):
+        if data[pos:pos + 4] != _CENTRAL_SIGNATURE:
+            return None
+        header = list(_CENTRAL_HEADER.unpack_from(data, pos))
+        pos += _CENTRAL_HEADER.size
+        name_len, extra_len, comment_len = header[12], header[13], header[14]
+        name = data[pos:pos + name_len]
+        extra = data[pos + name_len:pos + name_len + extra_len]
+        comment = data[pos + name_len + extra_len:pos + name_len + extra_len + comment_len]
+        pos += name_len + extra_len + comment_len
+        entries.append((header, name, extra, comment))
+    return entries
+
+
+def _copy_bytes(src, dst, length: int):
+    while length > 0:
+        chunk = src.read(min(COPY_BUFFER_SIZE, length))
+        if not chunk:
+            raise zipfile.BadZipFile("压缩数据不完整")
+        dst.write(chunk)
+        length -= len(chunk)
+
+
+def _rewrite_names(path: str, encoding: str, temp_path: str) -> int:
+    """按 encoding 把文件名改写为 UTF-8，写入 temp_path，返回改写的文件名数量"""
+    renamed = 0
+    with open(path, 'rb') as src:
+        file_size = os.fstat(src.fileno()).st_size
+        end = _find_end_record(src, file_size)
+        if end is None:
+            raise zipfile.BadZipFile("找不到中央目录结束记录")
+        end_offset, end_fields, archive_comment = end
+        _, disk, cd_disk, _, count, cd_size, cd_offset, _ = end_fields
+        if disk or cd_disk or count == 0xFFFF or cd_offset == 0xFFFFFFFF or cd_size == 0xFFFFFFFF:
+            raise UnsupportedLayout("不支持分卷或 ZIP64 压缩包")
+        if cd_offset + cd_size != end_offset:
+            raise UnsupportedLayout("中央目录位置异常（可能是自解压文件）")
+        entries = _read_central_directory(src, cd_offset, cd_size, count)
+        if entries is None:
+            raise zipfile.BadZipFile("中央目录已损坏")
+
+        with open(temp_path, 'wb') as dst:
+            central = []
+            for header, name, extra, comment in entries:
+                flags = header[5]
+                new_name = name
+                if not flags & UTF8_FLAG:
+                    new_name = name.decode(encoding).encode('utf-8')
+                    if new_name != name:
+                        renamed += 1
+                    flags |= UTF8_FLAG
+
+                # 本地文件头：只替换文件名和标志位，扩展字段、压缩数据、数据描述符原样复制
+                local_offset = header[18]
+                src.seek(local_offset)
+                local = list(_LOCAL_HEADER.unpack(src.read(_LOCAL_HEADER.size)))
+                if local[0] != _LOCAL_SIGNATURE:
+                    raise zipfile.BadZipFile(f"本地文件头已损坏: {name!r}")
+                src.seek(local[10], os.SEEK_CUR)
+                local_extra = src.read(local[11])
+                local_flags = local[3]
+                local[3] = local_flags | UTF8_FLAG if not local_flags & UTF8_FLAG else local_flags
+                local[10] = len(new_name)
+
+                header[5] = flags
+                header[12] = len(new_name)
+                header[18] = dst.tell()
+                dst.write(_LOCAL_HEADER.pack(*local))
+                dst.write(new_name)
+                dst.write(local_extra)
+                _copy_bytes(src, dst, header[10])
+                if local_flags & 0x8:
+                    signature = src.read(4)
+                    descriptor_size = 12 if signature == _DESCRIPTOR_SIGNATURE else 8
+                    dst.write(signature)
+                    _copy_bytes(src, dst, descriptor_size)
+                central.append(_CENTRAL_HEADER.pack(*header) + new_name + extra + comment)
+
+            new_cd_offset = dst.tell()
+            for record in central:
+                dst.write(record)
+            new_cd_size = dst.tell() - new_cd_offset
+            dst.write(_END_RECORD.pack(_END_SIGNATURE, 0, 0, count, count,
+                                       new_cd_size, new_cd_offset, len(archive_comment)))
+            dst.write(archive_comment)
+            dst.flush()
+            os.fsync(dst.fileno())
+    return renamed
+
+
+def repair_zip_names(path: str, encoding: Optional[str] = None, dry_run: bool = False) -> RepairResult:
+    """
+    把压缩包中未设置 UTF-8 标志位的文件名改写为 UTF-8
+
+    Args:
+        path: 压缩包路径
+        encoding: 指定原始编码，None 为自动检测
+        dry_run: 只检测，不写入
+    """
+    result = RepairResult(path)
+    start = time.perf_counter()
+    try:
+        with zipfile.ZipFile(path) as zf:
+            infos = zf.infolist()
+            if encoding:
+                result.verdict = EncodingVerdict(encoding, score=1.0, names=len(infos))
+            else:
+                result.verdict = detect_zip_encoding(infos)
+            legacy = [info for info in infos if not info.flag_bits & UTF8_FLAG]
+            result.renamed = sum(1 for info in legacy if any(b >= 0x80 for b in raw_member_name(info)))
+
+        if result.renamed == 0:
+            result.skipped = "文件名无需修复"
+            return result
+        if not encoding and not result.verdict.needs_repair:
+            result.skipped = f"编码无法可靠判断 (得分 {result.verdict.score:.2f})"
+            return result
+        if dry_run:
+            return result
+
+        stat = os.stat(path)
+        temp_path = f"{path}.fixing"
+        try:
+            result.renamed = _rewrite_names(path, result.verdict.encoding, temp_path)
+            # 写入后校验：能正常打开且成员数量不变
+            with zipfile.ZipFile(temp_path) as zf:
+                if len(zf.infolist()) != len(infos):
+                    raise zipfile.BadZipFile("修复后成员数量不一致")
+            os.replace(temp_path, path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            result.repaired = True
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    except UnsupportedLayout as e:
+        result.skipped = str(e)
+    except (zipfile.BadZipFile, OSError, UnicodeError, struct.error) as e:
+        result.error = str(e)
+    finally:
+        result.seconds = time.perf_counter() - start
+    return result
+
+
+def iter_zip_files(paths: Iterable[str], extensions=('.zip', '.cbz')) -> Iterator[str]:
+    """展开文件和目录，返回其中的 ZIP 文件"""
+    for path in paths:
+        if os.path.isfile(path):
+            if path.lower().endswith(extensions):
+                yield path
+            continue
+        for root, _, files in os.walk(path):
+            for name in files:
+                if name.lower().endswith(extensions):
+                    yield os.path.join(root, name)
+
+
+def repair_folder(paths: Iterable[str], encoding: Optional[str] = None, dry_run: bool = False,
+                  per_volume: Optional[int] = None) -> Iterator[RepairResult]:
+    """并行修复文件夹中的所有 ZIP（按磁盘限制并发），按完成顺序返回结果"""
+    from ..file.io_scheduler import IOScheduler
+
+    scheduler = IOScheduler(per_volume=per_volume)
+    for task in scheduler.run(list(iter_zip_files(paths)),
+                              lambda path: repair_zip_names(path, encoding=encoding, dry_run=dry_run)):
+        if task.error:
+            yield RepairResult(task.path, error=str(task.error), seconds=task.seconds)
+        else:
+            yield task.result
@@ -0,0 +1,320 @@
+"""
+ZIP 压缩包内附属文件（UUID JSON / YAML 等小文件）的读取与原地更新
+
+auto_uuid 对每个压缩包都要读出附属的 {uuid}.json，再把更新后的 JSON 写回去。以前写回时
+调用 7z u（zipfile 没有 remove，'a' 模式替换同名文件总是失败后退回 7z），删除文件时对
+每个文件调用一次 bz d，两万个压缩包就是几万次进程启动，7z 还会把整个压缩包重写一遍。
+
+    from nodes.archive.zip_sidecar import read_sidecars, update_sidecars
+    sidecars = read_sidecars(path)                     # {文件名: 内容}，只读中央目录和这几个小文件
+    update_sidecars(path, {"abc.json": data}, remove=["abc.yaml"])
+    result = strip_members(path, lambda name: name.endswith('.yaml'), dry_run=True)   # 批量清理
+
+update_sidecars / strip_members 直接改写 ZIP 结构，不解压、不重新压缩图片数据：
+
+- 被替换或删除的成员都位于压缩包末尾时（本模块写入的附属文件总在末尾），从最前一个被删除
+  成员的位置截断，写入新成员、新的中央目录和结束记录
+- 没有要删除的成员时，从原中央目录的位置写入（与 zipfile 的 'a' 模式相同）
+- 原地写入不会在中途损坏压缩包：先把完整的新尾部追加到原文件末尾之后并 fsync（此时文件末尾
+  已是新的结束记录），再写到目标位置、截断；任何时刻中断，文件末尾都有一份完整的中央目录
+- 被删除的成员在中间时，按原样复制其余成员的字节到临时文件（偏移量重新计算），原子替换，
+  避免流式读取器从残留的本地文件头中读到已删除的文件
+
+原有成员的中央目录记录按原始字节保留，文件名编码、扩展字段、数据描述符都不受影响。
+不支持分卷、ZIP64 和带前置数据的自解压文件（抛出 UnsupportedLayout，调用方可退回 7z）。
+"""
+
+import os
+import time
+import zlib
+import logging
+import zipfile
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .zip_encoding import (
+    UTF8_FLAG,
+    UnsupportedLayout,
+    _CENTRAL_HEADER,
+    _CENTRAL_SIGNATURE,
+    _END_RECORD,
+    _END_SIGNATURE,
+    _LOCAL_HEADER,
+    _LOCAL_SIGNATURE,
+    _copy_bytes,
+    _find_end_record,
+    _read_central_directory,
+)
+
+logger = logging.getLogger(__name__)
+
+SIDECAR_SUFFIXES = ('.json', '.yaml')
+ZIP64_LIMIT = 0xFFFFFFFF
+
+
+def read_sidecars(path: str, suffixes: Sequence[str] = SIDECAR_SUFFIXES) -> Dict[str, bytes]:
+    """
+    读取扩展名在 suffixes 中的成员，按压缩包中的顺序返回 {文件名: 内容}
+
+    不是 ZIP 时抛出 zipfile.BadZipFile
+    """
+    suffixes = tuple(suffixes)
+    with zipfile.ZipFile(path) as zf:
+        return {info.filename: zf.read(info) for info in zf.infolist()
+                if not info.is_dir() and info.filename.endswith(suffixes)}
+
+
+def _decode_name(raw: bytes, flags: int) -> str:
+    # 与 zipfile 的解码方式一致，read_sidecars 返回的文件名可以直接用来删除
+    return raw.decode('utf-8' if flags & UTF8_FLAG else 'cp437')
+
+
+def _dos_datetime(timestamp: float) -> Tuple[int, int]:
+    t = time.localtime(timestamp)
+    dos_time = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+    dos_date = (max(t.tm_year, 1980) - 1980) << 9 | (t.tm_mon << 5) | t.tm_mday
+    return dos_time, dos_date
+
+
+def _build_member(name: str, data: bytes, offset: int, timestamp: float) -> Tuple[bytes, bytes]:
+    """返回 (本地文件头 + 数据, 中央目录记录)；压缩后不变小时按 STORE 保存"""
+    raw_name = name.encode('utf-8')
+    flags = 0 if raw_name.isascii() else UTF8_FLAG
+    compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+    packed = compressor.compress(data) + compressor.flush()
+    if len(packed) < len(data):
+        method, version = zipfile.ZIP_DEFLATED, 20
+    else:
+        packed, method, version = data, zipfile.ZIP_STORED, 10
+    crc = zlib.crc32(data)
+    dos_time, dos_date = _dos_datetime(timestamp)
+    local = _LOCAL_HEADER.pack(_LOCAL_SIGNATURE, version, 0, flags, method, dos_time, dos_date,
+                               crc, len(packed), len(data), len(raw_name), 0)
+    central = _CENTRAL_HEADER.pack(_CENTRAL_SIGNATURE, version, 0, version, 0, flags, method,
+                                   dos_time, dos_date, crc, len(packed), len(data),
+                                   len(raw_name), 0, 0, 0, 0, 0, offset)
+    return local + raw_name + packed, central + raw_name
+
+
+def _pack_central(entry) -> bytes:
+    header, name, extra, comment = entry
+    return _CENTRAL_HEADER.pack(*header) + name + extra + comment
+
+
+def _build_tail(position: int, kept: List, add: Dict[str, bytes], archive_comment: bytes,
+                timestamp: float) -> bytes:
+    """拼出从 position 开始的新成员、中央目录和结束记录（附属文件和中央目录都很小，在内存中完成）"""
+    members, central = [], [_pack_central(entry) for entry in kept]
+    offset = position
+    for name, data in add.items():
+        record, central_record = _build_member(name, data, offset, timestamp)
+        members.append(record)
+        central.append(central_record)
+        offset += len(record)
+    cd_offset = offset
+    cd_size = sum(len(record) for record in central)
+    if cd_offset + cd_size > ZIP64_LIMIT or len(central) >= 0xFFFF:
+        raise UnsupportedLayout("更新后需要 ZIP64 结构")
+    end_record = _END_RECORD.pack(_END_SIGNATURE, 0, 0, len(central), len(central),
+                                  cd_size, cd_offset, len(archive_comment))
+    return b''.join(members + central) + end_record + archive_comment
+
+
+def _sync(f):
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def _write_tail(f, position: int, kept: List, add: Dict[str, bytes], archive_comment: bytes, timestamp: float):
+    """
+    原地把新成员、中央目录和结束记录写到 position，并截断文件
+
+    1. 在不与目标区域重叠的位置（原文件末尾之后）追加一份完整的新尾部并 fsync，
+       此后文件末尾就是新的结束记录，原有字节一个都没有改动
+    2. 把以 position 为基准的尾部写到 position 并 fsync（覆盖的只是已失效的旧成员和旧中央目录）
+    3. 截断到新尾部结束处
+    """
+    final = _build_tail(position, kept, add, archive_comment, timestamp)
+    file_size = os.fstat(f.fileno()).st_size
+    staging = max(file_size, position + len(final))
+    staged = _build_tail(staging, kept, add, archive_comment, timestamp)
+    try:
+        f.seek(staging)
+        f.write(staged)
+        _sync(f)
+    except BaseException:
+        # 追加失败时恢复原长度，原文件内容没有变化
+        f.truncate(file_size)
+        raise
+    f.seek(position)
+    f.write(final)
+    _sync(f)
+    f.truncate(position + len(final))
+    _sync(f)
+
+
+def _load_layout(f) -> Tuple[List, int, bytes]:
+    """读取中央目录，返回 (成员记录列表, 中央目录偏移, 压缩包注释)"""
+    file_size = os.fstat(f.fileno()).st_size
+    end = _find_end_record(f, file_size)
+    if end is None:
+        raise zipfile.BadZipFile("找不到中央目录结束记录")
+    end_offset, end_fields, archive_comment = end
+    _, disk, cd_disk, _, count, cd_size, cd_offset, _ = end_fields
+    if disk or cd_disk or count == 0xFFFF or cd_offset == ZIP64_LIMIT or cd_size == ZIP64_LIMIT:
+        raise UnsupportedLayout("不支持分卷或 ZIP64 压缩包")
+    if cd_offset + cd_size != end_offset:
+        raise UnsupportedLayout("中央目录位置异常（可能是自解压文件）")
+    entries = _read_central_directory(f, cd_offset, cd_size, count)
+    if entries is None:
+        raise zipfile.BadZipFile("中央目录已损坏")
+    if any(header[18] == ZIP64_LIMIT for header, *_ in entries):
+        raise UnsupportedLayout("不支持 ZIP64 成员")
+    return entries, cd_offset, archive_comment
+
+
+def _extents(entries: List, cd_offset: int) -> Dict[int, int]:
+    """每个成员占用的字节范围：从它的本地文件头到下一个成员（或中央目录）为止，包含数据描述符"""
+    offsets = sorted({entry[0][18] for entry in entries} | {cd_offset})
+    return dict(zip(offsets, offsets[1:]))
+
+
+def _at_tail(kept: List, dropped: List) -> bool:
+    """被删除的成员是否都在保留成员之后（可以直接截断）"""
+    return not kept or max(entry[0][18] for entry in kept) < min(entry[0][18] for entry in dropped)
+
+
+def _split(entries: List, select: Callable[[str], bool]) -> Tuple[List, List]:
+    kept, dropped = [], []
+    for entry in entries:
+        header, name = entry[0], entry[1]
+        (dropped if select(_decode_name(name, header[5])) else kept).append(entry)
+    return kept, dropped
+
+
+def update_sidecars(path: str, add: Optional[Dict[str, bytes]] = None,
+                    remove: Iterable[str] = ()) -> List[str]:
+    """
+    删除 remove 中的成员并写入 add 中的成员（同名成员被替换），图片数据不解压不重压
+
+    Args:
+        path: ZIP 压缩包路径
+        add: {文件名: 内容}
+        remove: 要删除的文件名（与 zipfile / read_sidecars 的文件名一致）
+
+    Returns:
+        实际删除（含被替换）的文件名列表
+    """
+    add = dict(add or {})
+    drop_names = set(remove) | set(add)
+    timestamp = time.time()
+
+    with open(path, 'r+b') as f:
+        entries, cd_offset, archive_comment = _load_layout(f)
+        kept, dropped = _split(entries, drop_names.__contains__)
+        removed = [_decode_name(entry[1], entry[0][5]) for entry in dropped]
+
+        if not dropped:
+            _write_tail(f, cd_offset, kept, add, archive_comment, timestamp)
+            return removed
+        if _at_tail(kept, dropped):
+            # 被删除的成员都在末尾：截断后写入
+            _write_tail(f, min(entry[0][18] for entry in dropped), kept, add, archive_comment, timestamp)
+            return removed
+
+    _compact(path, entries, kept, add, cd_offset, archive_comment, timestamp)
+    return removed
+
+
+@dataclass
+class StripResult:
+    """一个压缩包的成员清理结果"""
+    path: str
+    removed: List[str] = field(default_factory=list)
+    freed_bytes: int = 0            # 被删除成员占用的字节
+    rewritten_bytes: int = 0        # 需要写入的字节：截断时只有中央目录，重写时为整个压缩包
+    compacted: bool = False         # 是否需要重写整个压缩包
+    stripped: bool = False          # 是否已实际写入
+    skipped: str = ""               # 跳过原因
+    error: str = ""
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        if self.error:
+            return f"❌ {self.path}: {self.error}"
+        if self.skipped:
+            return f"⏭️ {self.path}: {self.skipped}"
+        action = "已删除" if self.stripped else "将删除"
+        mode = "重写" if self.compacted else "截断"
+        return (f"✅ {self.path}: {action} {len(self.removed)} 个文件，释放 {self.freed_bytes / 1024:.1f}KB"
+                f"（{mode}，写入 {self.rewritten_bytes / 1024 / 1024:.2f}MB，{self.seconds:.2f}s）")
+
+
+def strip_members(path: str, select: Callable[[str], bool], dry_run: bool = False) -> StripResult:
+    """
+    一次删除所有 select(文件名) 为真的成员，保留的成员按原始字节复制，不重新压缩
+
+    被删除的成员都在末尾时原地截断，否则重写到临时文件后原子替换；dry_run 时只统计。
+    不是 ZIP 时抛出 zipfile.BadZipFile，不支持的结构抛出 UnsupportedLayout。
+    """
+    result = StripResult(path)
+    start = time.perf_counter()
+    try:
+        with open(path, 'rb' if dry_run else 'r+b') as f:
+            entries, cd_offset, archive_comment = _load_layout(f)
+            kept, dropped = _split(entries, select)
+            if not dropped:
+                result.skipped = "没有需要删除的文件"
+                return result
+            extent_end = _extents(entries, cd_offset)
+            result.removed = [_decode_name(entry[1], entry[0][5]) for entry in dropped]
+            result.freed_bytes = sum(extent_end[start] - start for start in {entry[0][18] for entry in dropped})
+            central_bytes = sum(len(_pack_central(entry)) for entry in kept)
+            result.compacted = not _at_tail(kept, dropped)
+            if result.compacted:
+                kept_bytes = sum(extent_end[start] - start for start in {entry[0][18] for entry in kept})
+                result.rewritten_bytes = min(extent_end) + kept_bytes + central_bytes
+            else:
+                result.rewritten_bytes = central_bytes
+            if dry_run:
+                return result
+            if not result.compacted:
+                _write_tail(f, min(entry[0][18] for entry in dropped), kept, {}, archive_comment, time.time())
+        if result.compacted:
+            _compact(path, entries, kept, {}, cd_offset, archive_comment, time.time())
+        result.stripped = True
+        return result
+    finally:
+        result.seconds = time.perf_counter() - start
+
+
+def _compact(path: str, entries: List, kept: List, add: Dict[str, bytes],
+             cd_offset: int, archive_comment: bytes, timestamp: float):
+    """按原样复制保留的成员到临时文件，写入新成员后原子替换"""
+    extent_end = _extents(entries, cd_offset)
+    offsets = sorted(extent_end)
+    temp_path = f"{path}.sidecar"
+    try:
+        with open(path, 'rb') as src, open(temp_path, 'w+b') as dst:
+            # 第一个成员之前的字节（通常为空）
+            _copy_bytes(src, dst, offsets[0])
+            new_offsets = {}
+            for start in sorted({entry[0][18] for entry in kept}):
+                src.seek(start)
+                if src.read(4) != _LOCAL_SIGNATURE:
+                    raise zipfile.BadZipFile(f"本地文件头已损坏: offset {start}")
+                src.seek(start)
+                new_offsets[start] = dst.tell()
+                _copy_bytes(src, dst, extent_end[start] - start)
+            relocated = []
+            for header, name, extra, comment in kept:
+                header = list(header)
+                header[18] = new_offsets[header[18]]
+                relocated.append((header, name, extra, comment))
+            # 临时文件替换前不可见，直接写入尾部即可
+            dst.write(_build_tail(dst.tell(), relocated, add, archive_comment, timestamp))
+            _sync(dst)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
@@ -0,0 +1,162 @@
+"""
+进程内 ZIP 打包
+
+直接从原始路径流式写入 ZIP，不再先把图片复制到临时工作目录再调用 7z：
+
+    from nodes.archive.zip_writer import pack_files, zip_manifest
+    result = pack_files([(path, "img_001.jpg"), ...], target_zip)
+    if result.success:
+        print(result.summary())
+
+- JPEG/PNG/WebP/AVIF/JXL 等已压缩格式使用 STORE，deflate 对它们几乎没有收益
+- 其他文件使用 DEFLATE
+- arcname 可以任意重映射，无需复制或重命名源文件
+- 写入的同时生成内容清单 {成员名: (大小, CRC32)}，用于与已存在压缩包比较
+- 先写入目标目录下的临时文件，完成后原子替换，避免跨盘移动
+"""
+
+import os
+import time
+import shutil
+import logging
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 已经压缩过的格式，deflate 只会浪费 CPU
+STORED_EXTENSIONS = frozenset({
+    '.jpg', '.jpeg', '.png', '.webp', '.avif', '.jxl', '.gif', '.heic', '.heif',
+    '.zip', '.rar', '.7z', '.cbz', '.cbr',
+    '.mp4', '.mkv', '.webm', '.avi', '.mov', '.mp3', '.flac', '.ogg', '.m4a',
+})
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+Manifest = Dict[str, Tuple[int, int]]
+
+
+@dataclass
+class PackResult:
+    """一次打包的结果"""
+    success: bool
+    zip_path: Optional[Path] = None
+    files: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    stored: int = 0           # 使用 STORE 的文件数
+    deflated: int = 0         # 使用 DEFLATE 的文件数
+    seconds: float = 0.0
+    manifest: Manifest = field(default_factory=dict)
+    error_message: str = ""
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes_in / 1024 / 1024 / self.seconds if self.seconds > 0 else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.files} 个文件 (STORE {self.stored} / DEFLATE {self.deflated}) | "
+                f"{self.bytes_in / 1024 / 1024:.2f}MB -> {self.bytes_out / 1024 / 1024:.2f}MB | "
+                f"{self.seconds:.2f}s | {self.mb_per_second:.1f} MB/s")
+
+
+def _zip_info(source: Path, arcname: str, st: os.stat_result, compress_level: int) -> zipfile.ZipInfo:
+    mtime = time.localtime(st.st_mtime)
+    date_time = mtime[:6] if mtime.tm_year >= 1980 else (1980, 1, 1, 0, 0, 0)
+    info = zipfile.ZipInfo(arcname, date_time=date_time)
+    info.external_attr = (st.st_mode & 0xFFFF) << 16
+    if os.path.splitext(arcname)[1].lower() in STORED_EXTENSIONS:
+        info.compress_type = zipfile.ZIP_STORED
+    else:
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info._compresslevel = compress_level
+    info.file_size = st.st_size
+    return info
+
+
+def pack_files(entries: Iterable[Tuple[Path, str]], target_zip: Path,
+               compress_level: int = 5) -> PackResult:
+    """
+    把文件写入 ZIP
+
+    Args:
+        entries: (源文件路径, 压缩包内名称) 列表
+        target_zip: 目标压缩包路径，已存在时会被覆盖
+        compress_level: DEFLATE 压缩级别 1-9
+
+    Returns:
+        PackResult: 失败时目标文件不会被创建或修改
+    """
+    target_zip = Path(target_zip)
+    temp_zip = target_zip.with_name(target_zip.name + '.packing')
+    result = PackResult(success=False, zip_path=target_zip)
+    start = time.perf_counter()
+    try:
+        with zipfile.ZipFile(temp_zip, 'w', allowZip64=True) as zf:
+            for source, arcname in entries:
+                source = Path(source)
+                arcname = arcname.replace('\\', '/')
+                st = source.stat()
+                info = _zip_info(source, arcname, st, compress_level)
+                with open(source, 'rb') as src, \
+                        zf.open(info, 'w', force_zip64=st.st_size >= zipfile.ZIP64_LIMIT) as dst:
+                    shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+                result.files += 1
+                result.bytes_in += st.st_size
+                if info.compress_type == zipfile.ZIP_STORED:
+                    result.stored += 1
+                else:
+                    result.deflated += 1
+                result.manifest[arcname] = (info.file_size, info.CRC)
+        os.replace(temp_zip, target_zip)
+        result.bytes_out = target_zip.stat().st_size
+        result.success = True
+    except Exception as e:
+        result.error_message = str(e)
+        logger.debug(f"打包失败 {target_zip}: {e}")
+        try:
+            if temp_zip.exists():
+                temp_zip.unlink()
+        except OSError:
+            pass
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def folder_entries(folder: Path, extensions: Optional[Iterable[str]] = None) -> List[Tuple[Path, str]]:
+    """
+    列出文件夹内（递归）需要打包的文件，压缩包内名称为相对路径
+
+    Args:
+        folder: 源文件夹
+        extensions: 只包含这些扩展名，为 None 时包含全部文件
+    """
+    folder = Path(folder)
+    allowed = frozenset(extensions) if extensions is not None else None
+    entries = []
+    for root, dirs, files in os.walk(folder):
+        dirs.sort()
+        for name in sorted(files):
+            if allowed is not None and os.path.splitext(name)[1].lower() not in allowed:
+                continue
+            path = Path(root) / name
+            entries.append((path, path.relative_to(folder).as_posix()))
+    return entries
+
+
+def zip_manifest(zip_path) -> Manifest:
+    """读取压缩包中央目录，返回 {成员名: (大小, CRC32)}（不含目录项）"""
+    with zipfile.ZipFile(zip_path) as zf:
+        return {info.filename: (info.file_size, info.CRC)
+                for info in zf.infolist() if not info.is_dir()}
+
+
+def same_manifest(manifest: Manifest, zip_path) -> bool:
+    """比较清单与已存在压缩包的内容（成员名、大小、CRC 全部一致）"""
+    try:
+        return manifest == zip_manifest(zip_path)
+    except Exception as e:
+        logger.debug(f"读取压缩包清单失败 {zip_path}: {e}")
+        return False
@@ -0,0 +1,150 @@
+"""
+画师名索引
+
+画师分类配置中有两张表：
+
+- user_defined: {"别名1 别名2": 文件夹}，别名以空白分隔
+- auto_detected: {文件夹: [画师名, 社团名, ...]}，由画师文件夹名解析得到
+
+以前每个文件名的每个候选画师名都要遍历两张表（user_defined 每次还要 split），几千个画师、
+几万个文件时这就是分类的主要耗时。ArtistIndex 从配置构建一次 名称 → 文件夹 的字典：
+
+    index = ArtistIndex(config['artists']['user_defined'], config['artists']['auto_detected'])
+    index.lookup(['画师A', '社团B'])     # ('画师A', '[社团B (画师A)]', 'user') 或 None
+    index.add_folder('[新画师]', ['新画师'])   # 增量更新
+    index.remove_folder('[旧画师]')
+
+查找顺序与原来相同：先查 user_defined 再查 auto_detected，同一张表中按候选名顺序、
+同名时取配置中靠前的文件夹。精确匹配不到时再按归一化名称（忽略大小写、繁体转简体）匹配。
+"""
+
+import logging
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+USER = 'user'
+AUTO = 'auto'
+
+_converter = None
+
+
+def _t2s(text: str) -> str:
+    """繁体转简体，没有安装 opencc 时原样返回"""
+    global _converter
+    if _converter is None:
+        try:
+            from opencc import OpenCC
+            _converter = OpenCC('t2s').convert
+        except Exception:
+            _converter = str
+    return _converter(text)
+
+
+@lru_cache(maxsize=65536)
+def fold_name(name: str) -> str:
+    """归一化画师名：去首尾空白、忽略大小写、繁体转简体（OpenCC 转换较慢，结果缓存）"""
+    return _t2s(name.strip()).casefold()
+
+
+def split_artist_names(content: str) -> List[str]:
+    """
+    拆分方括号中的画师信息
+
+    "社团(画师1、画师2)" 返回 [画师1, 画师2, 社团]（画师在前），没有括号时整体作为画师名
+    """
+    if '(' not in content:
+        return [content]
+    circle_part = content.split('(')[0].strip()
+    artist_part = content.split('(')[1].rstrip(')').strip()
+    names = [n.strip() for n in artist_part.split('、')]
+    names.extend(n.strip() for n in circle_part.split('、'))
+    return names
+
+
+class _AliasTable:
+    """名称 → 文件夹列表（按加入顺序），同时维护精确和归一化两份"""
+
+    def __init__(self):
+        self.exact: Dict[str, List[str]] = defaultdict(list)
+        self.folded: Dict[str, List[str]] = defaultdict(list)
+        self.names: Dict[str, List[str]] = {}
+
+    def add(self, folder: str, names: Iterable[str]):
+        names = list(dict.fromkeys(n for n in names if n))
+        self.names[folder] = names
+        for name in names:
+            self.exact[name].append(folder)
+            key = fold_name(name)
+            if folder not in self.folded[key]:
+                self.folded[key].append(folder)
+
+    def remove(self, folder: str):
+        for name in self.names.pop(folder, ()):
+            for table, key in ((self.exact, name), (self.folded, fold_name(name))):
+                folders = table.get(key)
+                if folders and folder in folders:
+                    folders.remove(folder)
+                    if not folders:
+                        del table[key]
+
+    def clear(self):
+        self.exact.clear()
+        self.folded.clear()
+        self.names.clear()
+
+
+class ArtistIndex:
+    """
+    画师名 → 文件夹索引
+
+    Args:
+        user_defined: {"别名1 别名2": 文件夹}
+        auto_detected: {文件夹: [名称, ...]}
+    """
+
+    def __init__(self, user_defined: Optional[Dict[str, str]] = None,
+                 auto_detected: Optional[Dict[str, List[str]]] = None):
+        self._user = _AliasTable()
+        self._auto = _AliasTable()
+        self.set_user_defined(user_defined or {})
+        for folder, names in (auto_detected or {}).items():
+            self.add_folder(folder, names)
+
+    def __len__(self) -> int:
+        return len(self._user.names) + len(self._auto.names)
+
+    def set_user_defined(self, user_defined: Dict[str, str]):
+        """重建 user_defined 部分"""
+        self._user.clear()
+        for position, (aliases, folder) in enumerate(user_defined.items()):
+            # 同一个文件夹可能出现在多条配置中，按配置条目区分
+            self._user.add((position, folder), aliases.split())
+
+    def add_folder(self, folder: str, names: Iterable[str]):
+        """添加或替换一个自动检测的画师文件夹"""
+        if folder in self._auto.names:
+            self._auto.remove(folder)
+        self._auto.add(folder, names)
+
+    def remove_folder(self, folder: str):
+        self._auto.remove(folder)
+
+    def lookup(self, names: Iterable[str]) -> Optional[Tuple[str, str, str]]:
+        """
+        按候选名顺序查找画师文件夹
+
+        Returns:
+            (命中的名称, 文件夹, USER/AUTO)，未找到返回 None
+        """
+        names = [name for name in names if name]
+        for table, source in ((self._user, USER), (self._auto, AUTO)):
+            for folders_of, key_of in ((table.exact, str), (table.folded, fold_name)):
+                for name in names:
+                    folders = folders_of.get(key_of(name))
+                    if folders:
+                        folder = folders[0][1] if source == USER else folders[0]
+                        return name, folder, source
+        return None
@@ -0,0 +1,445 @@
+"""
+漫画压缩包系列分组
+
+manga_archive_classifier 的 find_series_groups 使用三阶段匹配：
+
+1. 关键词匹配：两两比较文件名的关键词序列，取最长公共连续关键词作为系列名
+2. 已有系列匹配：文件名包含已有系列名（本次找到的或目录中的 [#s] 文件夹）
+3. 公共子串匹配：difflib 相似度最高的两个文件，以最长公共子串作为系列名
+
+旧实现每找到一组都重新比较所有剩余文件对，几百个文件就要很久。SeriesGrouper 的结果
+与旧实现相同（相同得分时按输入顺序选择，旧实现取决于集合的遍历顺序），但：
+
+- 文件名预处理、关键词、基础名只计算一次
+- 第一阶段通过关键词 n-gram 倒排索引生成候选文件对，只有共享关键词的文件对才会比较，
+  每对只比较一次；按片段长度从长到短逐层处理，每个文件找到第一个有效候选即停止，
+  已分组的文件不再参与后面的比较
+- 第三阶段先用 rapidfuzz 批量计算相似度上界（LCS 相似度不小于 difflib 的相似度），
+  只对上界足够高的文件对按上界从高到低计算 difflib 相似度
+- 扩展分组时通过倒排索引查找包含系列名的文件
+
+    grouper = SeriesGrouper(filenames)
+    groups = grouper.group()        # {系列名: [文件, ...]}
+"""
+
+import os
+import re
+import heapq
+import difflib
+import logging
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 系列文件夹前缀
+SERIES_PREFIXES = {
+    '[#s]',  # 标准系列标记
+    '#',     # 简单系列标记
+}
+
+KEYWORD_RATIO_MIN = 0.6      # 第三阶段的最低相似度
+CDIST_CHUNK = 512            # 批量计算相似度上界时每批的行数
+
+
+def _identity(text: str) -> str:
+    return text
+
+
+def preprocess_filename(filename):
+    """预处理文件名"""
+    # 获取文件名（不含路径）
+    name = os.path.basename(filename)
+    # 去除扩展名
+    name = name.rsplit('.', 1)[0]
+
+    # 检查是否有系列标记前缀，如果有则去除
+    for prefix in SERIES_PREFIXES:
+        if name.startswith(prefix):
+            name = name[len(prefix):]
+            break
+
+    # 去除方括号内容
+    name = re.sub(r'\[.*?\]', '', name)
+    # 去除圆括号内容
+    name = re.sub(r'\(.*?\)', '', name)
+    # 去除多余空格
+    name = ' '.join(name.split())
+    return name
+
+
+def get_keywords(name):
+    """将文件名分割为关键词列表"""
+    return name.strip().split()
+
+
+def get_base_filename(filename, normalize: Callable[[str], str] = _identity):
+    """获取去除所有标签后的基本文件名"""
+    # 去掉扩展名
+    name = os.path.splitext(filename)[0]
+
+    # 去除所有方括号及其内容
+    name = re.sub(r'\[[^\]]*\]', '', name)
+    # 去除所有圆括号及其内容
+    name = re.sub(r'\([^)]*\)', '', name)
+    # 去除所有空格和标点
+    name = re.sub(r'[\s!！?？_~～]+', '', name)
+    # 标准化中文（转换为简体）
+    name = normalize(name)
+
+    return name
+
+
+def validate_series_name(name, normalize: Callable[[str], str] = _identity):
+    """验证和清理系列名称
+
+    Args:
+        name: 原始系列名称
+        normalize: 中文标准化函数
+
+    Returns:
+        清理后的有效系列名称，如果无效则返回None
+    """
+    if not name or len(name) <= 1:
+        return None
+
+    # 标准化中文（转换为简体）
+    name = normalize(name)
+
+    # 去除末尾的特殊字符、数字和单字
+    name = re.sub(r'[\s.．。·・+＋\-－—_＿\d]+$', '', name)  # 去除末尾的特殊符号和数字
+    name = re.sub(r'[第章话集卷期篇季部册上中下前后完全][篇话集卷期章节部册全]*$', '', name)  # 去除末尾特殊词
+    name = re.sub(r'(?i)vol\.?\s*\d*$', '', name)  # 去除末尾的vol.xxx
+    name = re.sub(r'(?i)volume\s*\d*$', '', name)  # 去除末尾的volume xxx
+    name = re.sub(r'(?i)part\s*\d*$', '', name)  # 去除末尾的part xxx
+    name = name.strip()
+
+    # 检查是否包含comic关键词
+    if re.search(r'(?i)comic', name):
+        return None
+
+    # 检查是否只包含3个或更少的单字母
+    words = name.split()
+    if all(len(word) <= 1 for word in words) and len(''.join(words)) <= 3:
+        return None
+
+    # 最终检查：结果必须长度大于1且不能以单字结尾
+    if not name or len(name) <= 1 or (len(name) > 0 and len(name.split()[-1]) <= 1):
+        return None
+
+    return name
+
+
+def longest_common_run(a: Sequence, b: Sequence) -> Sequence:
+    """最长公共连续片段（与 difflib.SequenceMatcher.find_longest_match 相同的选择规则）"""
+    matcher = difflib.SequenceMatcher(None, a, b)
+    match = matcher.find_longest_match(0, len(a), 0, len(b))
+    return a[match.a:match.a + match.size]
+
+
+def _ratio_upper_bounds(names: List[str], cutoff: float) -> Iterable[Tuple[float, int, int]]:
+    """
+    返回 LCS 相似度超过 cutoff 的文件对 (上界, i, j)，i < j
+
+    difflib 的匹配块是公共子序列，相似度不会超过按最长公共子序列计算的 rapidfuzz 相似度
+    """
+    try:
+        from rapidfuzz import fuzz, process
+    except ImportError:
+        # 没有 rapidfuzz 时不剪枝
+        for i in range(len(names)):
+            for j in range(i + 1, len(names)):
+                yield 1.0, i, j
+        return
+    import numpy as np
+
+    for start in range(0, len(names), CDIST_CHUNK):
+        block = process.cdist(names[start:start + CDIST_CHUNK], names, scorer=fuzz.ratio,
+                              score_cutoff=cutoff * 100, workers=-1)
+        rows, cols = np.nonzero(block)
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            i = start + row
+            if i < col:
+                yield float(block[row, col]) / 100, i, col
+
+
+class SeriesGrouper:
+    """
+    三阶段系列分组
+
+    Args:
+        filenames: 文件路径列表（重复项会被忽略）
+        normalize: 中文标准化函数（如繁简转换）
+        existing_dir: 第二阶段读取已有系列文件夹的目录，默认为第一个未分组文件所在目录
+    """
+
+    def __init__(self, filenames: Iterable[str], normalize: Callable[[str], str] = _identity,
+                 existing_dir: Optional[str] = None):
+        self.files: List[str] = list(dict.fromkeys(filenames))
+        self.normalize = normalize
+        self.existing_dir = existing_dir
+
+        self.processed = [preprocess_filename(f) for f in self.files]
+        self.simplified = [normalize(name) for name in self.processed]
+        self.keywords = [tuple(normalize(k) for k in get_keywords(name)) for name in self.processed]
+        self.lower = [name.lower() for name in self.simplified]
+        self.base = [get_base_filename(os.path.basename(f), normalize) for f in self.files]
+
+        self.alive = [True] * len(self.files)
+        self.groups: Dict[str, List[int]] = defaultdict(list)
+        self.pairs_compared = 0
+
+    # ========== 工具 ==========
+
+    def _remaining(self) -> List[int]:
+        return [i for i, alive in enumerate(self.alive) if alive]
+
+    def _assign(self, series_name: str, members: Iterable[int]):
+        for i in members:
+            self.alive[i] = False
+            self.groups[series_name].append(i)
+
+    def _log_group(self, phase: str, series_name: str, members: Iterable[int]):
+        logger.info(f"[#process] ✨ {phase}：找到系列 '{series_name}'")
+        for i in members:
+            logger.info(f"[#process]   └─ {os.path.basename(self.files[i])}")
+
+    # ========== 预处理阶段 ==========
+
+    def _marked_series(self):
+        logger.info("[#process] 🔍 预处理阶段：检查已标记的系列")
+        for i, file_path in enumerate(self.files):
+            file_name = os.path.basename(file_path)
+            for prefix in SERIES_PREFIXES:
+                if file_name.startswith(prefix):
+                    # 提取系列名，去除可能的其他标记
+                    series_name = re.sub(r'\[.*?\]|\(.*?\)', '', file_name[len(prefix):]).strip()
+                    if series_name:
+                        self._assign(series_name, [i])
+                        logger.info(f"[#process] ✨ 预处理阶段：文件 '{file_name}' 已标记为系列 '{series_name}'")
+                    break
+
+    # ========== 第一阶段：关键词匹配 ==========
+
+    def _keyword_phase(self):
+        logger.info("[#process] 🔍 第一阶段：风格匹配（关键词匹配）")
+        remaining = self._remaining()
+        if len(remaining) < 2:
+            return
+
+        # 关键词 n-gram 倒排索引。公共片段只有一个关键词时，该关键词本身必须是有效的系列名
+        valid_single: Dict[str, bool] = {}
+        postings: Dict[Tuple[str, ...], List[int]] = defaultdict(list)
+        for i in remaining:
+            keywords = self.keywords[i]
+            grams: Set[Tuple[str, ...]] = set()
+            for start in range(len(keywords)):
+                token = keywords[start]
+                if token not in valid_single:
+                    valid_single[token] = validate_series_name(token, self.normalize) is not None
+                if valid_single[token]:
+                    grams.add((token,))
+                for end in range(start + 2, len(keywords) + 1):
+                    grams.add(keywords[start:end])
+            for gram in grams:
+                postings[gram].append(i)
+
+        # 共享长度为 L 的片段的文件对，最长公共片段至少为 L。按长度从长到短逐层处理；
+        # 每层按顺序取每个未分组文件，与共享该层片段的未分组文件按顺序比较，第一个有效的
+        # 文件对即为该层 (文件1, 文件2) 最小的候选对。结果与先比较全部文件对再排序相同，
+        # 但已分组的文件不再参与比较
+        levels: Dict[int, Dict[int, List[Tuple[str, ...]]]] = defaultdict(lambda: defaultdict(list))
+        for gram, members in postings.items():
+            if len(members) >= 2:
+                for i in members:
+                    levels[len(gram)][i].append(gram)
+
+        commons: Dict[Tuple[int, int], Tuple[str, ...]] = {}
+        series_names: Dict[Tuple[str, ...], Optional[str]] = {}
+
+        def common_of(a: int, b: int) -> Tuple[str, ...]:
+            common = commons.get((a, b))
+            if common is None:
+                if self.base[a] == self.base[b]:
+                    common = ()
+                else:
+                    common = tuple(longest_common_run(self.keywords[a], self.keywords[b]))
+                    self.pairs_compared += 1
+                commons[(a, b)] = common
+            return common
+
+        for length in sorted(levels, reverse=True):
+            grams_of = levels[length]
+            for first in sorted(grams_of):
+                if not self.alive[first]:
+                    continue
+                partners: Set[int] = set()
+                for gram in grams_of[first]:
+                    # 顺便清理倒排表中已分组的文件
+                    members = postings[gram] = [i for i in postings[gram] if self.alive[i]]
+                    partners.update(members)
+                partners.discard(first)
+
+                for second in sorted(partners):
+                    best_common = common_of(first, second)
+                    if len(best_common) != length:
+                        continue
+                    if best_common not in series_names:
+                        series_names[best_common] = validate_series_name(' '.join(best_common), self.normalize)
+                    series_name = series_names[best_common]
+                    if not series_name:
+                        continue
+
+                    members = [first, second]
+                    for other in postings.get(best_common, ()):
+                        if (other in (first, second) or not self.alive[other]
+                                or self.base[other] == self.base[first]):
+                            continue
+                        if common_of(first, other) == best_common:
+                            members.append(other)
+                    members.sort()
+                    self._assign(series_name, members)
+                    self._log_group("第一阶段：通过关键词匹配", series_name, members)
+                    break
+
+    # ========== 第二阶段：已有系列匹配 ==========
+
+    def _existing_series_phase(self):
+        remaining = self._remaining()
+        if not remaining:
+            return
+        logger.info("[#process] 🔍 第二阶段：完全基础名匹配")
+
+        existing_series = list(self.groups.keys())
+        dir_path = self.existing_dir
+        if dir_path is None:
+            dir_path = os.path.dirname(self.files[remaining[0]])
+        try:
+            for folder_name in os.listdir(dir_path):
+                if os.path.isdir(os.path.join(dir_path, folder_name)):
+                    for prefix in SERIES_PREFIXES:
+                        if folder_name.startswith(prefix):
+                            series_name = folder_name[len(prefix):]
+                            if series_name not in existing_series:
+                                existing_series.append(series_name)
+                                logger.info(f"[#process] 📁 第二阶段：从目录中找到已有系列 '{series_name}'")
+                            break
+        except Exception:
+            pass  # 如果读取目录失败，仅使用已有的系列名
+
+        series_keys = [(name, re.sub(r'\s+', '', self.normalize(name))) for name in existing_series]
+        matched: Dict[str, List[int]] = defaultdict(list)
+        matched_bases: Dict[str, Set[str]] = defaultdict(set)
+        for i in remaining:
+            name_no_space = re.sub(r'\s+', '', self.simplified[i])
+            for series_name, series_key in series_keys:
+                if series_key in name_no_space:
+                    # 同一系列中已有基础名相同的文件时不再加入
+                    if self.base[i] not in matched_bases[series_name]:
+                        matched[series_name].append(i)
+                        matched_bases[series_name].add(self.base[i])
+                        self.alive[i] = False
+                        logger.info(f"[#process] ✨ 第二阶段：文件 '{os.path.basename(self.files[i])}' "
+                                    f"匹配到已有系列 '{series_name}'（包含系列名）")
+                    break
+
+        for series_name, members in matched.items():
+            self.groups[series_name].extend(members)
+            logger.info(f"[#process] ✨ 第二阶段：将 {len(members)} 个文件添加到系列 '{series_name}'")
+
+    # ========== 第三阶段：公共子串匹配 ==========
+
+    def _substring_phase(self):
+        remaining = self._remaining()
+        if not remaining:
+            return
+        logger.info("[#process] 🔍 第三阶段：最长公共子串匹配")
+        if len(remaining) < 2:
+            return
+
+        # 字符二元组倒排索引，用于查找包含公共子串的文件
+        bigrams: Dict[str, Set[int]] = defaultdict(set)
+        for i in remaining:
+            text = self.lower[i]
+            for k in range(len(text) - 1):
+                bigrams[text[k:k + 2]].add(i)
+
+        # 按相似度上界从高到低排列的文件对，惰性计算 difflib 相似度
+        names = [self.lower[i] for i in remaining]
+        bounds = sorted(((bound, remaining[a], remaining[b])
+                         for bound, a, b in _ratio_upper_bounds(names, KEYWORD_RATIO_MIN)),
+                        key=lambda item: (-item[0], item[1], item[2]))
+        cursor = 0
+        scored = []   # 堆：(-相似度, 文件1, 文件2)
+
+        def score(first: int, second: int):
+            self.pairs_compared += 1
+            ratio = difflib.SequenceMatcher(None, self.lower[first], self.lower[second]).ratio()
+            if ratio > KEYWORD_RATIO_MIN:
+                heapq.heappush(scored, (-ratio, first, second))
+
+        while True:
+            # 计算所有上界不低于当前最高相似度的文件对，保证相同得分时选中顺序最靠前的一对
+            while cursor < len(bounds):
+                while scored and not (self.alive[scored[0][1]] and self.alive[scored[0][2]]):
+                    heapq.heappop(scored)
+                bound, a, b = bounds[cursor]
+                if scored and bound + 1e-9 < -scored[0][0]:
+                    break
+                cursor += 1
+                if self.alive[a] and self.alive[b] and self.base[a] != self.base[b]:
+                    score(a, b)
+                    score(b, a)
+            while scored and not (self.alive[scored[0][1]] and self.alive[scored[0][2]]):
+                heapq.heappop(scored)
+            if not scored:
+                break
+
+            neg_ratio, first, second = scored[0]
+            lower1 = self.lower[first]
+            matcher = difflib.SequenceMatcher(None, lower1, self.lower[second])
+            match = matcher.find_longest_match(0, len(lower1), 0, len(self.lower[second]))
+            best_common = lower1[match.a:match.a + match.size]
+            original_form = self.processed[first][match.a:match.a + match.size]
+            if not best_common or len(best_common.strip()) <= 1:
+                break
+
+            members = {first, second}
+            if len(best_common) >= 2:
+                candidates = min((bigrams.get(best_common[k:k + 2], set())
+                                  for k in range(len(best_common) - 1)), key=len)
+            else:
+                candidates = range(len(self.files))
+            for other in candidates:
+                if (other not in members and self.alive[other] and self.base[other] != self.base[first]
+                        and best_common in self.lower[other]):
+                    members.add(other)
+
+            series_name = validate_series_name(original_form, self.normalize)
+            if series_name:
+                members = sorted(members)
+                self._assign(series_name, members)
+                logger.info(f"[#process]   └─ 公共子串：'{best_common}' (相似度: {-neg_ratio:.2%})")
+                self._log_group("第三阶段：通过公共子串匹配", series_name, members)
+            else:
+                # 系列名无效时放弃第一个文件
+                self.alive[first] = False
+
+    # ========== 入口 ==========
+
+    def group(self) -> Dict[str, List[str]]:
+        """执行三阶段分组，返回 {系列名: [文件路径, ...]}"""
+        self._marked_series()
+        self._keyword_phase()
+        self._existing_series_phase()
+        self._substring_phase()
+
+        unmatched = sum(self.alive)
+        if unmatched:
+            logger.warning(f"[#process] ⚠️ 还有 {unmatched} 个文件未能匹配到任何系列")
+        return {name: [self.files[i] for i in members] for name, members in self.groups.items()}
+
+
+def find_series_groups(filenames: Iterable[str], normalize: Callable[[str], str] = _identity) -> Dict[str, List[str]]:
+    """查找属于同一系列的文件组"""
+    return SeriesGrouper(filenames, normalize=normalize).group()
@@ -0,0 +1,138 @@
+"""
+画师索引查找基准
+
+生成 --artists 个画师的分类配置（auto_detected 画师文件夹 + 少量 user_defined 别名）和
+--files 个待分类文件名，对比两种查找方式：
+- 旧实现: ArtistClassifier._find_artist_info 原来的双重循环（每个候选名遍历 user_defined
+  并 split，再遍历 auto_detected 的名称列表）
+- 新实现: ArtistIndex 字典查找
+
+旧实现找到画师的文件，新实现必须返回相同的画师和文件夹；旧实现找不到时，新实现可能通过
+繁简/大小写归一化找到（生成的文件名中有一部分使用繁体写法），单独统计。
+
+用法:
+    python nodes/comic/tests/bench_artist_index.py --artists 8000 --files 50000
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+from nodes.comic.artist_index import ArtistIndex, USER, split_artist_names
+
+SYLLABLES = ['ka', 'mi', 'to', 'ra', 'shi', 'no', 'yu', 'ki', 'ha', 'ru', 'se', 'na']
+CHINESE = ['东', '风', '云', '龙', '书', '画', '乐', '马', '鸟', '门', '长', '广']
+TRADITIONAL = {'东': '東', '风': '風', '云': '雲', '龙': '龍', '书': '書', '画': '畫', '乐': '樂', '马': '馬',
+               '鸟': '鳥', '门': '門', '长': '長', '广': '廣'}
+EXCLUDE_KEYWORDS = ['汉化', '中国翻訳', 'DL版', '無修正']
+
+
+def make_config(count: int, rng: random.Random):
+    auto_detected = {}
+    artists = []
+    for i in range(count):
+        if i % 4 == 0:
+            artist = ''.join(rng.sample(CHINESE, 3)) + str(i)
+        else:
+            artist = ''.join(rng.sample(SYLLABLES, 3)).capitalize() + str(i)
+        if i % 3 == 0:
+            circle = f"Circle{i}"
+            folder = f"[{circle} ({artist})]"
+            names = [artist, circle]
+        else:
+            folder = f"[{artist}]"
+            names = [artist]
+        auto_detected[folder] = names
+        artists.append((artist, names))
+    user_defined = {}
+    for i in range(0, count, 40):
+        artist, names = artists[i]
+        user_defined[f"{artist} alias{i}"] = f"[{artist}]"
+    return {'user_defined': user_defined, 'auto_detected': auto_detected}, artists
+
+
+def make_filenames(count: int, artists, rng: random.Random):
+    names = []
+    for i in range(count):
+        roll = rng.random()
+        if roll < 0.75:
+            artist, artist_names = rng.choice(artists)
+            if len(artist_names) > 1 and rng.random() < 0.5:
+                tag = f"[{artist_names[1]} ({artist})]"
+            elif rng.random() < 0.1:
+                tag = f"[{''.join(TRADITIONAL.get(ch, ch) for ch in artist)}]"
+            else:
+                tag = f"[{artist}]"
+        else:
+            tag = f"[Unknown{i}]"
+        names.append(f"(C{rng.randint(90, 104)}) {tag} 作品{i} [{rng.choice(EXCLUDE_KEYWORDS)}].zip")
+    return names
+
+
+def extract_names(filename):
+    name_str = filename
+    for keyword in EXCLUDE_KEYWORDS:
+        name_str = name_str.replace(keyword, "")
+    names = []
+    for match in re.finditer(r'\[([^\[\]]+)\]', name_str):
+        names.extend(split_artist_names(match.group(1).strip()))
+    return [n for n in names if n and not any(k in n for k in EXCLUDE_KEYWORDS)]
+
+
+def legacy_lookup(config, artist_names):
+    for artist_name in artist_names:
+        for names, folder in config['user_defined'].items():
+            if artist_name in names.split():
+                return artist_name, folder, USER
+    for artist_name in artist_names:
+        for folder, names in config['auto_detected'].items():
+            if artist_name in names:
+                return artist_name, folder, 'auto'
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='画师索引查找基准')
+    parser.add_argument('--artists', type=int, default=8000, help='画师数量')
+    parser.add_argument('--files', type=int, default=50000, help='文件名数量')
+    parser.add_argument('--legacy-files', type=int, default=5000, help='旧实现测试的文件数（按比例推算总耗时）')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    config, artists = make_config(args.artists, rng)
+    filenames = make_filenames(args.files, artists, rng)
+    candidates = [extract_names(name) for name in filenames]
+    print(f"{args.artists} 个画师，{len(filenames)} 个文件名")
+
+    start = time.perf_counter()
+    index = ArtistIndex(config['user_defined'], config['auto_detected'])
+    build_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    new = [index.lookup(names) for names in candidates]
+    new_seconds = time.perf_counter() - start
+    print(f"新实现: 构建索引 {build_seconds:.2f}s，查找 {new_seconds:.2f}s")
+
+    sample = min(args.legacy_files, len(candidates))
+    start = time.perf_counter()
+    old = [legacy_lookup(config, names) for names in candidates[:sample]]
+    old_seconds = time.perf_counter() - start
+    estimated = old_seconds * len(candidates) / max(sample, 1)
+    print(f"旧实现: {sample} 个文件 {old_seconds:.2f}s，全部约 {estimated:.1f}s，"
+          f"加速约 {estimated / max(new_seconds + build_seconds, 1e-9):.0f}x")
+
+    mismatches = [(filenames[i], a, b) for i, (a, b) in enumerate(zip(old, new)) if a is not None and a != b]
+    folded = sum(1 for a, b in zip(old, new) if a is None and b is not None)
+    print(f"旧实现找到 {sum(a is not None for a in old)}/{sample}，其中结果不同 {len(mismatches)} 个；"
+          f"归一化后额外找到 {folded} 个")
+    for name, a, b in mismatches[:10]:
+        print(f"  {name}\n    旧: {a}\n    新: {b}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
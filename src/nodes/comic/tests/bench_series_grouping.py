@@ -0,0 +1,207 @@
+"""
+系列分组扩展性基准
+
+生成一个画师目录风格的合成文件名列表（英文/中文标题、卷号、标签、单本、已标记系列），
+对比两种实现：
+- 旧实现: manga_archive_classifier 原 find_series_groups 的逐对比较拷贝，每找到一组都
+  重新比较所有剩余文件对（集合改为按输入顺序遍历，使相同得分时的选择确定）
+- 新实现: SeriesGrouper（倒排索引生成候选对、每对只比较一次、rapidfuzz 相似度上界剪枝）
+
+默认在 100 / 1000 / 10000 个文件上测试新实现，旧实现只在不超过 --legacy-max 个文件时运行
+（它的耗时随文件数近似立方增长），并校验两者分组完全一致。
+
+用法:
+    python nodes/comic/tests/bench_series_grouping.py
+    python nodes/comic/tests/bench_series_grouping.py --sizes 100 300 --legacy-max 300
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import difflib
+import logging
+import argparse
+from collections import defaultdict
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+from nodes.comic.series_grouping import (
+    SERIES_PREFIXES, SeriesGrouper, get_base_filename, get_keywords, preprocess_filename, validate_series_name,
+)
+
+ENGLISH_WORDS = ['Magic', 'Girl', 'Summer', 'Night', 'Sister', 'Academy', 'Dream', 'Love', 'Secret', 'Garden',
+                 'Holiday', 'Maid', 'Princess', 'Knight', 'Star', 'Ocean', 'Winter', 'Festival', 'Memory', 'Angel']
+CHINESE_WORDS = ['魔法少女', '夏日', '秘密', '花园', '学园', '天使', '星空', '假期', '女仆', '公主',
+                 '骑士', '海洋', '冬天', '祭典', '回忆', '恋爱', '姐姐', '梦境', '午后', '约定']
+TAGS = ['[中国翻訳]', '[DL版]', '(C99)', '(COMIC快楽天)', '[無修正]', '[汉化]', '(オリジナル)']
+
+
+def make_filenames(count: int, seed: int = 0):
+    """按 系列（多卷）+ 单本 + 已标记系列 生成文件名"""
+    rng = random.Random(seed)
+    names = []
+    serial = 0
+    while len(names) < count:
+        serial += 1
+        kind = rng.random()
+        if kind < 0.45:
+            title = ' '.join(rng.sample(ENGLISH_WORDS, rng.randint(2, 3))) + f' {serial}'
+            for vol in range(1, rng.randint(2, 6)):
+                names.append(f"[Artist] {title} Vol.{vol} {rng.choice(TAGS)}.zip")
+        elif kind < 0.8:
+            title = ''.join(rng.sample(CHINESE_WORDS, 2)) + f'{serial}'
+            for vol in range(1, rng.randint(2, 5)):
+                names.append(f"[作者] {title} 第{vol}卷 {rng.choice(TAGS)}.zip")
+        elif kind < 0.97:
+            words = rng.sample(ENGLISH_WORDS + CHINESE_WORDS, 3)
+            names.append(f"[Artist] {' '.join(words)} {serial} {rng.choice(TAGS)}.zip")
+        else:
+            names.append(f"[#s]{rng.choice(CHINESE_WORDS)}{serial}.zip")
+    return [os.path.join('artist', name) for name in names[:count]]
+
+
+def legacy_find_series_groups(filenames, existing_dir=None):
+    """旧实现的拷贝（去掉日志）"""
+    files = list(dict.fromkeys(filenames))
+    processed = {f: preprocess_filename(f) for f in files}
+    keywords = {f: get_keywords(processed[f]) for f in files}
+    groups = defaultdict(list)
+    remaining = list(files)
+
+    def base(f):
+        return get_base_filename(os.path.basename(f))
+
+    def common_run(a, b):
+        match = difflib.SequenceMatcher(None, a, b).find_longest_match(0, len(a), 0, len(b))
+        return a[match.a:match.a + match.size]
+
+    # 预处理阶段
+    for f in list(remaining):
+        name = os.path.basename(f)
+        for prefix in SERIES_PREFIXES:
+            if name.startswith(prefix):
+                series = re.sub(r'\[.*?\]|\(.*?\)', '', name[len(prefix):]).strip()
+                if series:
+                    groups[series].append(f)
+                    remaining.remove(f)
+                break
+
+    # 第一阶段
+    while remaining:
+        best_length, best = 0, None
+        for f1 in remaining:
+            b1 = base(f1)
+            for f2 in remaining:
+                if f2 == f1 or b1 == base(f2):
+                    continue
+                common = common_run(keywords[f1], keywords[f2])
+                if common and len(common) > best_length:
+                    series = validate_series_name(' '.join(common))
+                    if series:
+                        best_length, best = len(common), (f1, f2, common, series)
+        if not best:
+            break
+        f1, f2, common, series = best
+        b1 = base(f1)
+        members = [f for f in remaining
+                   if f in (f1, f2) or (base(f) != b1 and common_run(keywords[f1], keywords[f]) == common)]
+        groups[series].extend(members)
+        remaining = [f for f in remaining if f not in members]
+
+    # 第二阶段
+    if remaining:
+        existing = list(groups)
+        dir_path = existing_dir if existing_dir is not None else os.path.dirname(remaining[0])
+        try:
+            for folder in os.listdir(dir_path):
+                if os.path.isdir(os.path.join(dir_path, folder)):
+                    for prefix in SERIES_PREFIXES:
+                        if folder.startswith(prefix):
+                            if folder[len(prefix):] not in existing:
+                                existing.append(folder[len(prefix):])
+                            break
+        except Exception:
+            pass
+        matched = defaultdict(list)
+        for f in list(remaining):
+            name_no_space = re.sub(r'\s+', '', processed[f])
+            for series in existing:
+                if re.sub(r'\s+', '', series) in name_no_space:
+                    if not any(base(e) == base(f) for e in matched[series]):
+                        matched[series].append(f)
+                        remaining.remove(f)
+                    break
+        for series, members in matched.items():
+            groups[series].extend(members)
+
+    # 第三阶段
+    while remaining:
+        best_ratio, best = 0, None
+        for f1 in remaining:
+            l1 = processed[f1].lower()
+            b1 = base(f1)
+            for f2 in remaining:
+                if f2 == f1 or b1 == base(f2):
+                    continue
+                l2 = processed[f2].lower()
+                matcher = difflib.SequenceMatcher(None, l1, l2)
+                ratio = matcher.ratio()
+                if ratio > best_ratio and ratio > 0.6:
+                    match = matcher.find_longest_match(0, len(l1), 0, len(l2))
+                    best_ratio = ratio
+                    best = (f1, f2, l1[match.a:match.a + match.size],
+                            processed[f1][match.a:match.a + match.size])
+        if not best or len(best[2].strip()) <= 1:
+            break
+        f1, f2, common, original = best
+        b1 = base(f1)
+        members = [f for f in remaining
+                   if f in (f1, f2) or (base(f) != b1 and common in processed[f].lower())]
+        series = validate_series_name(original)
+        if series:
+            groups[series].extend(members)
+            remaining = [f for f in remaining if f not in members]
+        else:
+            remaining.remove(f1)
+
+    return dict(groups)
+
+
+def normalized(groups):
+    return {name: sorted(files) for name, files in groups.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='系列分组扩展性基准')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000], help='文件名数量')
+    parser.add_argument('--legacy-max', type=int, default=300, help='运行旧实现的最大文件数')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    for size in args.sizes:
+        names = make_filenames(size, args.seed)
+        start = time.perf_counter()
+        grouper = SeriesGrouper(names, existing_dir='')
+        groups = grouper.group()
+        new_seconds = time.perf_counter() - start
+        grouped = sum(len(files) for files in groups.values())
+        print(f"{size:>6} 个文件: 新实现 {new_seconds:8.3f}s | {len(groups)} 个系列, {grouped} 个文件已分组, "
+              f"比较 {grouper.pairs_compared} 对")
+
+        if size <= args.legacy_max:
+            start = time.perf_counter()
+            legacy = legacy_find_series_groups(names, existing_dir='')
+            legacy_seconds = time.perf_counter() - start
+            same = normalized(legacy) == normalized(groups)
+            print(f"{'':>13} 旧实现 {legacy_seconds:8.3f}s | 加速 {legacy_seconds / max(new_seconds, 1e-9):.1f}x | "
+                  f"结果{'一致' if same else '不一致'}")
+            if not same:
+                for name in sorted(set(legacy) | set(groups)):
+                    if sorted(legacy.get(name, [])) != sorted(groups.get(name, [])):
+                        print(f"  {name}: 旧 {len(legacy.get(name, []))} / 新 {len(groups.get(name, []))}")
+                sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -22,14 +22,18 @@ import time
 # ========== 压缩文件处理 ==========
 import zipfile
 
+# ========== 延迟导入 ==========
+# 下面的重量级模块在第一次使用时才导入，--help、参数解析和 TUI 配置界面不再等待它们
+from nodes.config.lazy_import import lazy_module, lazy_from, load_image_plugins
+
 # ========== 图像处理核心 ==========
-import PIL
-from PIL import Image
-import numpy as np
+PIL = lazy_module('PIL', after_load=load_image_plugins)
+Image = lazy_module('PIL.Image', after_load=load_image_plugins)  # 加载时同时注册 AVIF/JXL 插件
+np = lazy_module('numpy')
 
 # 图像格式扩展
-import pillow_avif  # AVIF支持
-import pillow_jxl   # JXL支持
+pillow_avif = lazy_module('pillow_avif')  # AVIF支持
+pillow_jxl = lazy_module('pillow_jxl')    # JXL支持
 
 # ========== 配置管理 ==========
 import argparse
@@ -44,10 +48,12 @@ from tqdm import tqdm
 
 # ========== 个人模块 ==========
 
-from nodes.pics.calculate_hash_custom import ImageHashCalculator, PathURIGenerator , ImgUtils
-from nodes.pics.grayscale_detector import GrayscaleDetector
-from nodes.tui.textual_logger import TextualLoggerManager
-from nodes.tui.textual_preset import create_config_app
+ImageHashCalculator = lazy_from('nodes.pics.calculate_hash_custom', 'ImageHashCalculator')
+PathURIGenerator = lazy_from('nodes.pics.calculate_hash_custom', 'PathURIGenerator')
+ImgUtils = lazy_from('nodes.pics.calculate_hash_custom', 'ImgUtils')
+GrayscaleDetector = lazy_from('nodes.pics.grayscale_detector', 'GrayscaleDetector')
+TextualLoggerManager = lazy_from('nodes.tui.textual_logger', 'TextualLoggerManager')
+create_config_app = lazy_from('nodes.tui.textual_preset', 'create_config_app')
 
 
 # ========== 数据转换 ==========
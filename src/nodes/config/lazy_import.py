@@ -0,0 +1,119 @@
+"""
+延迟导入
+
+PIL 插件、numpy、cv2、textual、pyvips 这类模块导入一次就要几百毫秒到数秒，
+脚本在解析参数、显示 --help 之前就全部导入的话，启动会非常慢。这里的代理对象在
+第一次访问属性或被调用时才真正导入：
+
+    from nodes.config.lazy_import import lazy_module, lazy_from, LazyObject
+    np = lazy_module('numpy')
+    Image = lazy_module('PIL.Image', after_load=load_image_plugins)
+    TextualLoggerManager = lazy_from('nodes.tui.textual_logger', 'TextualLoggerManager')
+    runtime = LazyObject(lambda: VipsRuntime.get())
+
+限制：代理不能作为基类，也不能用在 isinstance 的第二个参数上（应使用 Image.Image
+这样通过代理取得的真实类）。需要这两种用法的名称请直接导入。
+"""
+
+import sys
+import types
+import logging
+import importlib
+import threading
+from typing import Any, Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.RLock()
+
+# PIL 的格式插件：导入后才能打开 AVIF/JXL
+IMAGE_PLUGINS = ('pillow_avif', 'pillow_jxl')
+
+
+def load_image_plugins(_module=None, plugins: Iterable[str] = IMAGE_PLUGINS):
+    """导入 PIL.Image 和格式插件，缺少的插件只记录日志"""
+    importlib.import_module('PIL.Image')
+    for plugin in plugins:
+        if plugin in sys.modules:
+            continue
+        try:
+            importlib.import_module(plugin)
+        except ImportError as e:
+            logger.debug(f"图片插件 {plugin} 不可用: {e}")
+
+
+class LazyModule(types.ModuleType):
+    """首次访问属性时才导入的模块代理"""
+
+    def __init__(self, name: str, after_load: Optional[Callable[[types.ModuleType], Any]] = None):
+        super().__init__(name)
+        self.__dict__['_lazy_after_load'] = after_load
+        self.__dict__['_lazy_module'] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            with _lock:
+                module = self.__dict__['_lazy_module']
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    after_load = self.__dict__['_lazy_after_load']
+                    if after_load is not None:
+                        after_load(module)
+                    self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, item):
+        return getattr(self._load(), item)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "已加载" if self.__dict__['_lazy_module'] is not None else "未加载"
+        return f"<LazyModule {self.__name__} ({state})>"
+
+
+class LazyObject:
+    """首次访问属性或调用时才由 factory 创建的对象代理"""
+
+    __slots__ = ('_factory', '_target', '_name')
+
+    def __init__(self, factory: Callable[[], Any], name: str = ""):
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_target', None)
+        object.__setattr__(self, '_name', name or getattr(factory, '__name__', 'object'))
+
+    def _resolve(self) -> Any:
+        target = object.__getattribute__(self, '_target')
+        if target is None:
+            with _lock:
+                target = object.__getattribute__(self, '_target')
+                if target is None:
+                    target = object.__getattribute__(self, '_factory')()
+                    object.__setattr__(self, '_target', target)
+        return target
+
+    def __getattr__(self, item):
+        return getattr(self._resolve(), item)
+
+    def __setattr__(self, key, value):
+        setattr(self._resolve(), key, value)
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        if object.__getattribute__(self, '_target') is None:
+            return f"<LazyObject {object.__getattribute__(self, '_name')} (未加载)>"
+        return repr(self._resolve())
+
+
+def lazy_module(name: str, after_load: Optional[Callable[[types.ModuleType], Any]] = None) -> LazyModule:
+    """返回模块代理，相当于延迟执行的 `import name`"""
+    return LazyModule(name, after_load)
+
+
+def lazy_from(module: str, attr: str) -> LazyObject:
+    """返回属性代理，相当于延迟执行的 `from module import attr`"""
+    return LazyObject(lambda: getattr(importlib.import_module(module), attr), name=f"{module}.{attr}")
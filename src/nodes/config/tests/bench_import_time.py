@@ -0,0 +1,164 @@
+"""
+脚本启动导入耗时基准
+
+对 src/scripts 下的每个入口脚本（含 `if __name__ == "__main__"` 的 .py），在子进程中用
+`python -X importtime` 导入一次（不执行 main），统计：
+- 导入总耗时（importtime 顶层条目的累计耗时之和，包含脚本自身模块体）
+- 最重的几个模块
+
+脚本导入时的副作用（如在脚本目录下创建 logs/ 日志文件）会落到临时目录：导入的是脚本在
+临时目录中的副本，工作目录同样是该临时目录，用完即删。
+
+与基线文件比较，任一脚本超出 基线 × (1 + --tolerance) + --slack-ms，或超过 --budget-ms
+时以退出码 1 结束，可直接用作 CI 检查。
+
+用法:
+    python nodes/config/tests/bench_import_time.py                  # 对比基线
+    python nodes/config/tests/bench_import_time.py --update         # 重新生成基线
+    python nodes/config/tests/bench_import_time.py --only comic     # 只测路径包含 comic 的脚本
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import shutil
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+SRC_DIR = Path(__file__).resolve().parents[3]
+SCRIPTS_DIR = SRC_DIR / 'scripts'
+DEFAULT_BASELINE = Path(__file__).with_name('import_time_baseline.json')
+
+MAIN_GUARD = re.compile(r"""^if\s+__name__\s*==\s*['"]__main__['"]""", re.M)
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S.*)$")
+
+# 在子进程中导入脚本副本：__name__ 不是 __main__，不会进入主流程；
+# 副本所在临时目录排在最前，同目录的兄弟模块仍从原目录导入
+IMPORT_SNIPPET = (
+    "import sys, importlib;"
+    "sys.path[:0] = [{sandbox!r}, {src!r}, {folder!r}];"
+    "sys.argv = [{path!r}, '--help'];"
+    "importlib.import_module({name!r})"
+)
+
+
+def find_entry_points(only: Optional[str] = None) -> List[Path]:
+    entries = []
+    for path in sorted(SCRIPTS_DIR.rglob('*.py')):
+        if '__pycache__' in path.parts:
+            continue
+        if only and only not in path.relative_to(SCRIPTS_DIR).as_posix():
+            continue
+        try:
+            text = path.read_text(encoding='utf-8', errors='ignore')
+        except OSError:
+            continue
+        if MAIN_GUARD.search(text):
+            entries.append(path)
+    return entries
+
+
+def parse_importtime(stderr: str) -> Tuple[int, List[Tuple[int, str]]]:
+    """返回 (顶层累计耗时 us, [(累计耗时 us, 模块名)])"""
+    total = 0
+    modules = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        modules.append((cumulative, name.strip()))
+        if indent <= 1:  # 顶层条目（importtime 在名称前固定有一个空格）
+            total += cumulative
+    return total, modules
+
+
+def measure(path: Path, timeout: float) -> Dict:
+    sandbox = tempfile.mkdtemp(prefix='import_time_')
+    try:
+        shutil.copy2(path, os.path.join(sandbox, path.name))
+        snippet = IMPORT_SNIPPET.format(sandbox=sandbox, src=str(SRC_DIR), folder=str(path.parent),
+                                        path=str(path), name=path.stem)
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', snippet],
+                              stdin=subprocess.DEVNULL, capture_output=True, text=True,
+                              encoding='utf-8', errors='ignore', timeout=timeout, cwd=sandbox)
+    except subprocess.TimeoutExpired:
+        return {'ok': False, 'ms': None, 'error': f'超时 {timeout:.0f}s', 'top': []}
+    finally:
+        shutil.rmtree(sandbox, ignore_errors=True)
+    total_us, modules = parse_importtime(proc.stderr)
+    error = ''
+    if proc.returncode != 0:
+        lines = [line for line in proc.stderr.splitlines() if line and not line.startswith('import time:')]
+        error = lines[-1] if lines else f'退出码 {proc.returncode}'
+    top = [f"{name} {us / 1000:.0f}ms" for us, name in sorted(modules, reverse=True)
+           if name != path.stem][:3]
+    return {'ok': proc.returncode == 0, 'ms': round(total_us / 1000, 1), 'error': error, 'top': top}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='脚本启动导入耗时基准')
+    parser.add_argument('--only', help='只测试相对路径包含该字符串的脚本')
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE, help='基线文件')
+    parser.add_argument('--update', action='store_true', help='用本次结果覆盖基线')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='允许超出基线的比例')
+    parser.add_argument('--slack-ms', type=float, default=50, help='允许超出基线的固定毫秒数')
+    parser.add_argument('--budget-ms', type=float, default=0, help='任一脚本导入耗时上限（0 为不限制）')
+    parser.add_argument('--timeout', type=float, default=60, help='单个脚本的超时时间（秒）')
+    parser.add_argument('--strict', action='store_true', help='脚本导入失败也视为不通过')
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+
+    entries = find_entry_points(args.only)
+    print(f"共 {len(entries)} 个入口脚本")
+    results = {}
+    failures = []
+    for path in entries:
+        key = path.relative_to(SCRIPTS_DIR).as_posix()
+        result = measure(path, args.timeout)
+        results[key] = result
+        ms = result['ms']
+        line = f"{key}: {ms:.0f}ms" if ms is not None else f"{key}: -"
+        if key in baseline and ms is not None and baseline[key] is not None:
+            limit = baseline[key] * (1 + args.tolerance) + args.slack_ms
+            line += f" (基线 {baseline[key]:.0f}ms)"
+            if ms > limit:
+                failures.append(f"{key}: {ms:.0f}ms > 基线允许 {limit:.0f}ms")
+        if args.budget_ms and ms is not None and ms > args.budget_ms:
+            failures.append(f"{key}: {ms:.0f}ms > 预算 {args.budget_ms:.0f}ms")
+        if not result['ok']:
+            line += f" | 导入失败: {result['error']}"
+            if args.strict:
+                failures.append(f"{key}: 导入失败")
+        if result['top']:
+            line += f" | 最重: {', '.join(result['top'])}"
+        print(line)
+
+    measured = [r['ms'] for r in results.values() if r['ok'] and r['ms'] is not None]
+    if measured:
+        print(f"成功导入 {len(measured)} 个 | 合计 {sum(measured):.0f}ms | 最慢 {max(measured):.0f}ms")
+
+    if args.update:
+        data = {key: r['ms'] for key, r in results.items() if r['ok']}
+        args.baseline.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f"已更新基线: {args.baseline}")
+        return 0
+
+    if failures:
+        print("\n超出预算:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("全部在预算内")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
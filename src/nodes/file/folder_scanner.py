@@ -0,0 +1,187 @@
+"""
+单次遍历的打包文件夹扫描
+
+自底向上用 os.scandir 遍历目录树，每个目录只列出一次，同时得到：
+- 每个文件夹直接包含的图片数、是否含 zip/其他文件
+- 每个文件夹整个子树的文件大小
+- 该文件夹下应当打包的"最小图片文件夹"
+
+选择规则与 auto_repack 原先的 find_min_folder_with_images 一致：
+- 空文件夹、含 zip 的文件夹本身不选，也不向上提供候选
+- 子文件夹中有候选时，取直接图片数最多的一个
+- 否则若本文件夹只含图片和可忽略文件，选本文件夹
+"""
+
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+@dataclass
+class FolderInfo:
+    """单个文件夹的扫描结果"""
+    path: Path
+    image_count: int = 0      # 直接包含的图片数量
+    file_count: int = 0       # 直接包含的文件数量
+    total_size: int = 0       # 整个子树的文件大小合计（字节）
+    has_zip: bool = False
+    has_other: bool = False   # 含图片和可忽略文件以外的文件
+    is_empty: bool = True
+    unreadable: bool = False  # 无法列出内容
+    best: Optional['FolderInfo'] = None  # 本文件夹下应当打包的文件夹
+    pruned: List[Path] = field(default_factory=list)  # 子树中被跳过、未计入大小的文件夹
+
+
+def folder_size(path) -> int:
+    """用 os.scandir 递归计算文件夹大小，不跟随符号链接"""
+    total = 0
+    stack = [str(path)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return total
+
+
+class FolderScanner:
+    """
+    一次遍历扫描需要打包的文件夹
+
+    Args:
+        image_extensions: 视为图片的扩展名（小写，含点）
+        ignored_extensions: 不影响"只含图片"判断的扩展名
+        skip_keywords: 路径中包含任一关键词的文件夹及其子树不参与选择
+        skip_folder_names: 路径中任一层名称属于该集合时不参与选择（如媒体分类文件夹）
+    """
+
+    def __init__(self, image_extensions: Iterable[str], ignored_extensions: Iterable[str] = (),
+                 skip_keywords: Iterable[str] = (), skip_folder_names: Iterable[str] = ()):
+        self.image_extensions = frozenset(image_extensions)
+        self.ignored_extensions = frozenset(ignored_extensions)
+        self.skip_keywords = [keyword for keyword in skip_keywords if keyword]
+        self.skip_folder_names = frozenset(skip_folder_names)
+        self.folders: Dict[Path, FolderInfo] = {}
+        self.skipped: List[Path] = []
+        self.dirs_scanned = 0
+        self.files_seen = 0
+
+    def _is_skipped(self, path: Path) -> bool:
+        path_str = str(path)
+        if any(keyword in path_str for keyword in self.skip_keywords):
+            return True
+        return any(part in self.skip_folder_names for part in path.parts)
+
+    def scan(self, base_path) -> List[FolderInfo]:
+        """
+        扫描 base_path 下的所有文件夹
+
+        Returns:
+            List[FolderInfo]: 去重后的打包目标，按自顶向下的发现顺序排列，
+                total_size 已包含被跳过子文件夹的大小
+        """
+        base_path = Path(base_path)
+        order: List[FolderInfo] = []
+        if self._is_skipped(base_path):
+            self.skipped.append(base_path)
+            return []
+        self._scan_tree(base_path, order)
+
+        targets = []
+        seen = set()
+        for info in order:
+            best = info.best
+            if best is not None and best.path not in seen:
+                seen.add(best.path)
+                targets.append(best)
+        for target in targets:
+            # 被跳过的子文件夹在打包时同样会进入压缩包，只对最终目标补算它们的大小
+            target.total_size += sum(folder_size(path) for path in target.pruned)
+            target.pruned = []
+        return targets
+
+    def best_in(self, base_path) -> Optional[FolderInfo]:
+        """返回 base_path 下应当打包的文件夹（find_min_folder_with_images 的语义）"""
+        base_path = Path(base_path)
+        if self._is_skipped(base_path) or not base_path.is_dir():
+            return None
+        return self._scan_tree(base_path, []).best
+
+    def _scan_tree(self, base_path: Path, order: List[FolderInfo]) -> FolderInfo:
+        """用显式栈做后序遍历，子文件夹全部完成后再汇总父文件夹"""
+        root = FolderInfo(base_path)
+        stack = [(root, None)]  # (文件夹, 子文件夹列表；None 表示尚未列出)
+        while stack:
+            info, children = stack.pop()
+            if children is None:
+                order.append(info)
+                self.folders[info.path] = info
+                children = self._list(info)
+                stack.append((info, children))
+                for child in reversed(children):
+                    stack.append((child, None))
+                continue
+            candidates = []
+            for child in children:
+                info.total_size += child.total_size
+                info.pruned.extend(child.pruned)
+                if child.best is not None:
+                    candidates.append(child.best)
+            info.best = self._select(info, candidates)
+        return root
+
+    def _list(self, info: FolderInfo) -> List[FolderInfo]:
+        """列出一个文件夹，统计直接文件并返回需要继续扫描的子文件夹"""
+        children = []
+        try:
+            entries = list(os.scandir(info.path))
+        except OSError:
+            info.unreadable = True
+            return children
+        self.dirs_scanned += 1
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    info.is_empty = False
+                    child_path = info.path / entry.name
+                    if self._is_skipped(child_path):
+                        self.skipped.append(child_path)
+                        info.pruned.append(child_path)
+                    else:
+                        children.append(FolderInfo(child_path))
+                elif entry.is_file(follow_symlinks=False):
+                    info.is_empty = False
+                    info.file_count += 1
+                    info.total_size += entry.stat(follow_symlinks=False).st_size
+                    suffix = os.path.splitext(entry.name)[1].lower()
+                    if suffix in self.image_extensions:
+                        info.image_count += 1
+                    elif suffix == '.zip':
+                        info.has_zip = True
+                    elif suffix not in self.ignored_extensions:
+                        info.has_other = True
+            except OSError:
+                continue
+        self.files_seen += info.file_count
+        return children
+
+    @staticmethod
+    def _select(info: FolderInfo, candidates: List[FolderInfo]) -> Optional[FolderInfo]:
+        if info.is_empty or info.unreadable or info.has_zip:
+            return None
+        if candidates:
+            # 与 max() 相同：图片数相同时取先出现的
+            return max(candidates, key=lambda candidate: candidate.image_count)
+        if info.image_count and not info.has_other:
+            return info
+        return None
@@ -0,0 +1,148 @@
+"""
+打包文件夹扫描基准
+
+生成约 --files 个文件的合成漫画目录树（作者/作品/话 三层，混有视频、zip、黑名单文件夹），
+对比两种查找方式：
+- 旧实现: os.walk 的每个目录都调用递归的 find_min_folder_with_images，
+  再对每个目标 rglob 统计大小
+- 新实现: FolderScanner 一次 os.scandir 遍历
+
+输出耗时、目录被列出的次数，并校验两者找到的目标文件夹和大小一致。
+
+用法:
+    python nodes/file/tests/bench_folder_scanner.py --files 100000
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+from nodes.file.folder_scanner import FolderScanner
+
+IMAGE_EXTENSIONS = {'.webp', '.avif', '.jxl', '.jpg', '.jpeg', '.png', '.gif', '.yaml', '.log', '.bmp'}
+UNWANTED_EXTENSIONS = {'.url', '.txt', '.db', '.mp4'}
+BLACKLIST_KEYWORDS = ['_temp', '画集']
+MEDIA_TYPES = {'[01视频]', '[04cbz]'}
+
+
+def make_tree(root: Path, total_files: int, pages: int):
+    """按 作者/作品/第N话 生成目录树"""
+    works = max(1, total_files // pages)
+    created = 0
+    for w in range(works):
+        artist = root / f"[作者{w % 50:02d}]"
+        work = artist / f"作品 {w:05d}"
+        if w % 3 == 0:
+            chapters = [work / f"第{c}话" for c in range(2)]  # 多话作品
+        else:
+            chapters = [work]
+        if w % 17 == 0:
+            chapters.append(work / "[01视频]")
+        if w % 23 == 0:
+            chapters.append(work / "画集")
+        for chapter in chapters:
+            chapter.mkdir(parents=True, exist_ok=True)
+            count = pages // len(chapters)
+            for p in range(count):
+                ext = '.mp4' if chapter.name == "[01视频]" else '.jpg'
+                (chapter / f"{p:03d}{ext}").write_bytes(b'x' * (p % 7 + 1))
+                created += 1
+        if w % 29 == 0:
+            (work / "旧版.zip").write_bytes(b'PK')
+            created += 1
+        if w % 31 == 0:
+            (work / "说明.docx").write_bytes(b'doc')
+            created += 1
+    return created
+
+
+class LegacyFinder:
+    """旧实现（auto_repack 原 find_min_folder_with_images + os.walk）的简化拷贝，统计列目录次数"""
+
+    def __init__(self):
+        self.listings = 0
+
+    def skipped(self, path: Path) -> bool:
+        return (any(k in str(path) for k in BLACKLIST_KEYWORDS)
+                or any(part in MEDIA_TYPES for part in path.parts))
+
+    def find(self, base: Path):
+        if self.skipped(base) or not base.is_dir():
+            return None
+        self.listings += 1
+        contents = list(base.iterdir())
+        files = [f for f in contents if f.is_file()]
+        subdirs = [d for d in contents if d.is_dir()]
+        if not files and not subdirs:
+            return None
+        images = [f for f in files if f.suffix.lower() in IMAGE_EXTENSIONS]
+        zips = [f for f in files if f.suffix.lower() == '.zip']
+        others = [f for f in files if f.suffix.lower() not in IMAGE_EXTENSIONS
+                  and f.suffix.lower() not in UNWANTED_EXTENSIONS and f.suffix.lower() != '.zip']
+        if zips:
+            return None
+        found = [r for r in (self.find(d) for d in subdirs) if r]
+        if found:
+            return max(found, key=lambda x: x[1])
+        if images and not others:
+            return base, len(images)
+        return None
+
+    def run(self, root: Path):
+        targets = []
+        for current, dirs, _ in os.walk(root):
+            current = Path(current)
+            if any(k in str(current) for k in BLACKLIST_KEYWORDS) or current.name in MEDIA_TYPES:
+                dirs.clear()
+                continue
+            result = self.find(current)
+            if result:
+                targets.append(result[0])
+        sizes = {}
+        for target in targets:
+            self.listings += 1
+            sizes[target] = sum(f.stat().st_size for f in target.rglob('*') if f.is_file())
+        return targets, sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='打包文件夹扫描基准')
+    parser.add_argument('--files', type=int, default=100000, help='生成的文件数（约）')
+    parser.add_argument('--pages', type=int, default=40, help='每个作品的页数')
+    parser.add_argument('--keep', action='store_true', help='保留生成的测试目录')
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix='bench_folder_scanner_'))
+    try:
+        print(f"生成测试目录 {root} ...")
+        created = make_tree(root, args.files, args.pages)
+        print(f"已生成 {created} 个文件")
+
+        legacy = LegacyFinder()
+        start = time.perf_counter()
+        legacy_targets, legacy_sizes = legacy.run(root)
+        legacy_time = time.perf_counter() - start
+        print(f"旧实现: {legacy_time:.2f}s | 列目录 {legacy.listings} 次 | "
+              f"目标 {len(legacy_targets)}（去重后 {len(set(legacy_targets))}）")
+
+        scanner = FolderScanner(IMAGE_EXTENSIONS, UNWANTED_EXTENSIONS, BLACKLIST_KEYWORDS, MEDIA_TYPES)
+        start = time.perf_counter()
+        targets = scanner.scan(root)
+        scan_time = time.perf_counter() - start
+        print(f"新实现: {scan_time:.2f}s | 列目录 {scanner.dirs_scanned} 次 | 目标 {len(targets)}")
+
+        same_targets = [info.path for info in targets] == list(dict.fromkeys(legacy_targets))
+        same_sizes = all(info.total_size == legacy_sizes[info.path] for info in targets)
+        print(f"结果一致: 目标 {'是' if same_targets else '否'} | 大小 {'是' if same_sizes else '否'}")
+        print(f"加速: {legacy_time / scan_time:.1f}x")
+    finally:
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
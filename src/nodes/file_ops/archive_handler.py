@@ -4,6 +4,7 @@ import subprocess
 import logging
 import time
 from typing import List, Set, Dict, Optional, Tuple
+from nodes.archive.archive_access import ArchiveAccess
 
 logger = logging.getLogger(__name__)
 
@@ -22,26 +23,12 @@ class ArchiveHandler:
         Returns:
             List[str]: 文件路径列表
         """
-        files = []
         try:
-            cmd = ['7z', 'l', '-slt', archive_path]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                logger.error(f"读取压缩包内容失败: {result.stderr}")
-                return files
-                
-            for line in result.stdout.split('\n'):
-                line = line.strip()
-                if line.startswith('Path = '):
-                    file_path = line[7:]
-                    if any(file_path.lower().endswith(ext) for ext in file_types):
-                        files.append(file_path)
-                        
+            return [member.name for member in ArchiveAccess.list_members(archive_path)
+                    if member.suffix in file_types]
         except Exception as e:
             logger.error(f"列出压缩包内容时出错: {e}")
-            
-        return files
+            return []
     
     @staticmethod
     def extract_files(
@@ -25,6 +25,7 @@ from typing import Dict, Tuple, Union, List, Optional
 import re
 from functools import lru_cache
 import time
+from nodes.pics.clarity import default_engine
 
 # 全局配置
 GLOBAL_HASH_FILES = [
@@ -819,23 +820,17 @@ class ImageClarityEvaluator:
     """图像清晰度评估类"""
     
     @staticmethod
-    def batch_evaluate(image_paths: List[Union[str, Path]]) -> Dict[str, float]:
+    def batch_evaluate(image_paths: List[Union[str, Path]], workers: Optional[int] = None) -> Dict[str, float]:
         """
-        批量评估图像清晰度
+        批量评估图像清晰度（线程池解码和计算）
         Args:
             image_paths: 图片路径列表
+            workers: 线程数，默认按 CPU 数
         Returns:
-            字典{文件路径: 清晰度评分}
+            字典{文件路径: 清晰度评分}，失败的图片为 0.0
         """
-        scores = {}
-        for path in image_paths:
-            try:
-                score = ImageClarityEvaluator.calculate_definition(path)
-                scores[str(path)] = score
-            except Exception as e:
-                logging.warning(f"清晰度评估失败 {path}: {str(e)}")
-                scores[str(path)] = 0.0
-        return scores
+        scores = default_engine().score_many(image_paths, workers=workers)
+        return {str(path): float(round(score)) for path, score in zip(image_paths, scores)}
 
     @staticmethod
     def get_image_size(image_path: Union[str, Path]) -> Tuple[int, int]:
@@ -849,37 +844,12 @@ class ImageClarityEvaluator:
 
     @staticmethod
     def calculate_definition(image_path_or_data):
-        """计算图像清晰度评分（基于Sobel梯度能量）"""
-        try:
-            # 统一转换为OpenCV格式
-            if isinstance(image_path_or_data, (str, Path)):
-                img = cv2.imread(str(image_path_or_data))
-            elif isinstance(image_path_or_data, BytesIO):
-                img = cv2.imdecode(np.frombuffer(image_path_or_data.getvalue(), np.uint8), cv2.IMREAD_COLOR)
-            elif isinstance(image_path_or_data, bytes):
-                img = cv2.imdecode(np.frombuffer(image_path_or_data, np.uint8), cv2.IMREAD_COLOR)
-            elif isinstance(image_path_or_data, Image.Image):
-                img = cv2.cvtColor(np.array(image_path_or_data), cv2.COLOR_RGB2BGR)
-            else:
-                raise ValueError("不支持的输入类型")
-
-            if img is None:
-                raise ValueError("无法解码图像数据")
-
-            # 转换为灰度图
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            
-            # 计算Sobel梯度能量
-            sobelx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
-            sobely = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
-            energy = sobelx**2 + sobely**2
-            
-            # 返回取整后的清晰度评分
-            return round(np.mean(energy))  # 新增round取整
+        """
+        计算图像清晰度评分（基于Sobel梯度能量）
 
-        except Exception as e:
-            logging.error(f"清晰度计算失败: {str(e)}")
-            return 0
+        在长边不超过 1536 的灰度平面上计算，分数按校准映射到原图分数的量级，见 nodes.pics.clarity
+        """
+        return round(default_engine().score(image_path_or_data))
 
 if __name__ == "__main__":
     # 执行缓存测试
@@ -0,0 +1,315 @@
+"""
+图像清晰度评分（Sobel 梯度能量）
+
+原来的 ImageClarityEvaluator.calculate_definition 按原图分辨率彩色解码，再分配两张 float64
+的 Sobel 平面和一张能量平面（每像素约 24 字节 + 3 字节彩色图），一张 4000 像素长边的扫描图
+就要几百 MB；no_translate_find 和 MultiAnalyzer 对每个压缩包都抽样评分，而且是逐张串行的。
+ClarityEngine 的做法：
+
+- 直接按灰度解码；JPEG 先读图片头，按 1/2、1/4、1/8 缩小解码（libjpeg 在 DCT 阶段缩小，
+  不需要先解出全图），再用区域插值缩到长边不超过 max_side
+- 在这张固定大小的 uint8 平面上用 float32 计算 Sobel 梯度能量，原地平方相加，均值用
+  cv2.mean（double 累加）
+- score_many 在线程池中解码和计算（cv2 的解码和滤波会释放 GIL）
+
+缩小后的梯度能量和原图上的数值不在一个量级（缩小 s 倍时线稿边缘的像素占比约放大 s 倍，网点、
+噪点等高频内容则被滤掉），文件名里的 @DE 和已有的阈值都是按原图分数来的，所以提供校准：
+
+    engine = ClarityEngine()                      # 原始分数：缩小后平面上的梯度能量
+    engine = ClarityEngine(calibration=ClarityCalibration.load())   # 映射到原图分数
+    engine.calibrate(sample_images)               # 用样本拟合映射（会在原图上算一遍旧分数）
+
+映射模型为 log(原图分数) = slope·log(缩小后分数) + scale_exponent·log(缩小倍数) + intercept，
+未拟合时取 slope=1、scale_exponent=-1、intercept=0（即除以缩小倍数）；拟合结果保存在
+~/.glowtoolbox/cache/clarity_calibration.json。max_side=None 时按原图计算，与旧实现的分数一致。
+
+未拟合的默认映射只是量级上的近似：不同内容的图片缩小后分数的漂移并不一致（线稿和网点图可以差到
+2 倍），会改变图片之间的排序，进而改变 @DE 标记和最佳版本的选择。所以 default_engine() 只在
+校准文件存在时才缩小计算，否则按原图计算，分数和排序都与旧实现一致。
+
+生成校准文件（样本应覆盖线稿、网点、彩图等常见内容，至少 MIN_CALIBRATION_SAMPLES 张）：
+
+    python -m nodes.pics.clarity D:/samples a.jpg b.png    # 图片文件或目录（递归）
+    python no_translate_find.py -p D:/library --calibrate  # 从压缩包中抽样后校准，再照常处理
+
+校准成功后当前进程的 default_engine() 也会切换到缩小计算。
+"""
+
+import os
+import math
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from io import BytesIO
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIDE = 1536
+MIN_CALIBRATION_SAMPLES = 20  # 少于此数的有效样本不写入校准文件
+CALIBRATION_SUFFIXES = ('.jpg', '.jpeg', '.png', '.webp', '.bmp', '.tif', '.tiff')
+CALIBRATION_FILE = os.path.expanduser("~/.glowtoolbox/cache/clarity_calibration.json")
+
+ImageInput = Union[str, Path, bytes, bytearray, BytesIO, "Image.Image"]
+
+_REDUCED_FLAGS = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+
+def _peek_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """只读图片头获取 (宽, 高)，读不出时返回 None"""
+    try:
+        from PIL import Image
+        with Image.open(BytesIO(data)) as img:
+            return img.size
+    except Exception:
+        return None
+
+
+def _read_bytes(image: ImageInput) -> Optional[bytes]:
+    if isinstance(image, (str, Path)):
+        # np.fromfile + imdecode 可以处理 cv2.imread 在 Windows 上读不了的中文路径
+        return np.fromfile(str(image), dtype=np.uint8).tobytes()
+    if isinstance(image, BytesIO):
+        return image.getvalue()
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        return bytes(image)
+    return None
+
+
+def decode_gray(image: ImageInput, max_side: Optional[int] = DEFAULT_MAX_SIDE) -> Tuple[np.ndarray, float]:
+    """
+    解码为长边不超过 max_side 的灰度平面
+
+    Returns:
+        (uint8 灰度平面, 缩小倍数)，缩小倍数为原图长边 / 平面长边
+    """
+    data = _read_bytes(image)
+    if data is not None:
+        size = _peek_size(data) if max_side else None
+        factor = 1
+        if size:
+            while factor < 8 and max(size) // (factor * 2) >= max_side:
+                factor *= 2
+        gray = cv2.imdecode(np.frombuffer(data, np.uint8), _REDUCED_FLAGS[factor])
+        if gray is None:
+            raise ValueError("无法解码图像数据")
+        original_side = max(size) if size else max(gray.shape)
+    elif hasattr(image, 'convert'):
+        gray = np.asarray(image.convert('L'))
+        original_side = max(gray.shape)
+    else:
+        raise ValueError(f"不支持的输入类型: {type(image).__name__}")
+
+    side = max(gray.shape)
+    if max_side and side > max_side:
+        ratio = max_side / side
+        width = max(1, round(gray.shape[1] * ratio))
+        height = max(1, round(gray.shape[0] * ratio))
+        gray = cv2.resize(gray, (width, height), interpolation=cv2.INTER_AREA)
+        side = max(gray.shape)
+    return gray, original_side / side
+
+
+def gradient_energy(gray: np.ndarray) -> float:
+    """灰度平面上 Sobel 梯度平方和的均值（float32 计算，两张工作平面）"""
+    gx = cv2.Sobel(gray, cv2.CV_32F, 1, 0, ksize=3)
+    gy = cv2.Sobel(gray, cv2.CV_32F, 0, 1, ksize=3)
+    cv2.multiply(gx, gx, dst=gx)
+    cv2.multiply(gy, gy, dst=gy)
+    cv2.add(gx, gy, dst=gx)
+    return float(cv2.mean(gx)[0])
+
+
+@dataclass
+class ClarityCalibration:
+    """缩小后分数 → 原图分数的对数线性映射"""
+    slope: float = 1.0
+    scale_exponent: float = -1.0
+    intercept: float = 0.0
+    samples: int = 0
+
+    def apply(self, energy: float, scale: float) -> float:
+        if energy <= 0:
+            return 0.0
+        if scale <= 1:
+            # 没有缩小时就是原图分数
+            return energy
+        return math.exp(self.slope * math.log(energy) + self.scale_exponent * math.log(scale) + self.intercept)
+
+    @classmethod
+    def fit(cls, samples: Iterable[Tuple[float, float, float]]) -> 'ClarityCalibration':
+        """
+        用 (缩小后分数, 缩小倍数, 原图分数) 样本做最小二乘拟合
+
+        只用缩小过的有效样本；样本不足 3 个时返回默认映射，缩小倍数都相同时固定 scale_exponent
+        """
+        rows = [(e, s, o) for e, s, o in samples if e > 0 and o > 0 and s > 1]
+        if len(rows) < 3:
+            return cls(samples=len(rows))
+        log_e, log_s, log_o = (np.log(np.array(column, dtype=np.float64)) for column in zip(*rows))
+        if np.ptp(log_s) < 1e-6:
+            design = np.column_stack([log_e, np.ones_like(log_e)])
+            exponent = cls.scale_exponent
+            (slope, intercept), *_ = np.linalg.lstsq(design, log_o - exponent * log_s, rcond=None)
+            return cls(float(slope), exponent, float(intercept), len(rows))
+        design = np.column_stack([log_e, log_s, np.ones_like(log_e)])
+        (slope, exponent, intercept), *_ = np.linalg.lstsq(design, log_o, rcond=None)
+        return cls(float(slope), float(exponent), float(intercept), len(rows))
+
+    @classmethod
+    def load(cls, path: str = CALIBRATION_FILE) -> 'ClarityCalibration':
+        """读取保存的映射，没有或损坏时返回默认映射"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls(**json.load(f))
+        except FileNotFoundError:
+            return cls()
+        except Exception as e:
+            logger.warning(f"清晰度校准文件无效 {path}: {e}")
+            return cls()
+
+    def save(self, path: str = CALIBRATION_FILE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(asdict(self), f, ensure_ascii=False, indent=2)
+
+
+class ClarityEngine:
+    """
+    清晰度评分引擎
+
+    Args:
+        max_side: 计算平面的最大长边，None 为按原图计算
+        calibration: 给定时把分数映射到原图分数的量级
+        workers: score_many 默认线程数
+    """
+
+    def __init__(self, max_side: Optional[int] = DEFAULT_MAX_SIDE,
+                 calibration: Optional[ClarityCalibration] = None, workers: Optional[int] = None):
+        self.max_side = max_side
+        self.calibration = calibration
+        self.workers = workers or min(8, os.cpu_count() or 1)
+
+    def measure(self, image: ImageInput) -> Tuple[float, float]:
+        """返回 (计算平面上的梯度能量, 缩小倍数)，解码失败时抛出异常"""
+        gray, scale = decode_gray(image, self.max_side)
+        return gradient_energy(gray), scale
+
+    def score(self, image: ImageInput) -> float:
+        """单张图片的清晰度评分，失败返回 0.0"""
+        try:
+            energy, scale = self.measure(image)
+        except Exception as e:
+            logger.error(f"清晰度计算失败: {e}")
+            return 0.0
+        return self.calibration.apply(energy, scale) if self.calibration else energy
+
+    def score_many(self, images: Sequence[ImageInput], workers: Optional[int] = None) -> List[float]:
+        """批量评分，结果与输入顺序一致"""
+        workers = min(workers or self.workers, len(images))
+        if workers <= 1:
+            return [self.score(image) for image in images]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.score, images))
+
+    def calibrate(self, images: Sequence[ImageInput], workers: Optional[int] = None,
+                  save: bool = False) -> ClarityCalibration:
+        """在原图上计算旧分数并拟合映射，结果设为当前引擎的校准（save 时写入校准文件）"""
+        full = ClarityEngine(max_side=None)
+
+        def pair(image):
+            try:
+                energy, scale = self.measure(image)
+                return energy, scale, full.measure(image)[0]
+            except Exception as e:
+                logger.warning(f"校准样本无效: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=max(1, min(workers or self.workers, len(images)))) as executor:
+            samples = [item for item in executor.map(pair, images) if item]
+        self.calibration = ClarityCalibration.fit(samples)
+        logger.info(f"清晰度校准: {self.calibration}")
+        if save:
+            self.calibration.save()
+        return self.calibration
+
+
+_default_engine: Optional[ClarityEngine] = None
+_default_lock = threading.Lock()
+
+
+def build_default_engine(calibration_file: str = CALIBRATION_FILE) -> ClarityEngine:
+    """有校准文件时缩小到 DEFAULT_MAX_SIDE 计算并映射到原图分数，否则按原图计算"""
+    if os.path.exists(calibration_file):
+        return ClarityEngine(calibration=ClarityCalibration.load(calibration_file))
+    return ClarityEngine(max_side=None)
+
+
+def default_engine() -> ClarityEngine:
+    """全局共享的引擎，见 build_default_engine"""
+    global _default_engine
+    if _default_engine is None:
+        with _default_lock:
+            if _default_engine is None:
+                _default_engine = build_default_engine()
+    return _default_engine
+
+
+def calibrate_default_engine(images: Sequence[ImageInput], workers: Optional[int] = None,
+                             calibration_file: str = CALIBRATION_FILE) -> Optional[ClarityCalibration]:
+    """
+    用样本拟合校准并写入校准文件，之后 default_engine() 缩小到 DEFAULT_MAX_SIDE 计算
+
+    有效样本（缩小过且分数大于 0）不足 MIN_CALIBRATION_SAMPLES 时不保存，返回 None
+    """
+    global _default_engine
+    engine = ClarityEngine(workers=workers)
+    calibration = engine.calibrate(images, workers)
+    if calibration.samples < MIN_CALIBRATION_SAMPLES:
+        logger.warning(f"清晰度校准样本不足（有效 {calibration.samples} 张，至少 {MIN_CALIBRATION_SAMPLES} 张），未保存")
+        return None
+    calibration.save(calibration_file)
+    logger.info(f"清晰度校准已保存: {calibration_file}")
+    if calibration_file == CALIBRATION_FILE:
+        with _default_lock:
+            _default_engine = engine
+    return calibration
+
+
+def _collect_images(paths: Iterable[str]) -> List[str]:
+    images = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                images.extend(os.path.join(root, name) for name in sorted(files)
+                              if name.lower().endswith(CALIBRATION_SUFFIXES))
+        elif path.lower().endswith(CALIBRATION_SUFFIXES):
+            images.append(path)
+    return images
+
+
+if __name__ == "__main__":
+    import argparse
+    import random
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    parser = argparse.ArgumentParser(description='用样本图片拟合清晰度校准（缩小计算的分数映射到原图分数）')
+    parser.add_argument('paths', nargs='+', help='图片文件或目录（递归查找图片）')
+    parser.add_argument('-n', '--limit', type=int, default=200, help='最多使用的样本数（默认200，随机抽取）')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='并发线程数')
+    args = parser.parse_args()
+    sample_images = _collect_images(args.paths)
+    if len(sample_images) > args.limit:
+        sample_images = random.sample(sample_images, args.limit)
+    raise SystemExit(0 if calibrate_default_engine(sample_images, args.workers) else 1)
@@ -18,7 +18,7 @@ import numpy as np
 from io import BytesIO
 import random
 from concurrent.futures import ThreadPoolExecutor
-from nodes.pics.calculate_hash_custom import ImageClarityEvaluator
+from nodes.pics.clarity import default_engine
 from nodes.utils.number_shortener import shorten_number_cn
 import re
 from nodes.pics.group_analyzer import GroupAnalyzer
@@ -211,23 +211,15 @@ class MultiAnalyzer:
                     if sample not in samples:
                         samples.append(sample)
 
-            # 计算样本的清晰度评分
-            scores = []
+            # 先顺序读出样本数据，再在线程池中批量解码评分
+            sample_data = []
             with zipfile.ZipFile(archive_path, 'r') as zf:
                 for sample in samples:
                     try:
-                        with zf.open(sample) as f:
-                            img_data = f.read()
-                            # 直接传递二进制数据给清晰度计算函数
-                            try:
-                                score = ImageClarityEvaluator.calculate_definition(img_data)
-                                if score and score > 0:  # 确保得到有效的分数
-                                    scores.append(score)
-                            except Exception as e:
-                                logger.debug(f"清晰度计算失败 {sample}: {str(e)}")
+                        sample_data.append(zf.read(sample))
                     except Exception as e:
                         logger.debug(f"处理图像失败 {sample}: {str(e)}")
-                        continue
+            scores = [score for score in default_engine().score_many(sample_data) if score > 0]
 
             # 返回平均清晰度评分
             return float(sum(scores) / len(scores)) if scores else 0.0
@@ -0,0 +1,145 @@
+"""
+清晰度评分基准
+
+生成 --count 张漫画页风格的合成图片（线稿 + 网点 + 不同程度的模糊，长边 --min-side ~ --max-side），
+编码为 JPEG 后对比：
+- 旧实现: 彩色全图解码 + float64 Sobel（ImageClarityEvaluator.calculate_definition 原来的实现）
+- 新实现: ClarityEngine，灰度缩小解码 + float32 Sobel，串行和 score_many 线程池两种方式
+
+输出吞吐量、单张图片的内存峰值（tracemalloc，numpy/cv2 数组都经过 numpy 分配器），以及
+用一半样本拟合校准后，另一半样本上新分数相对旧分数的误差和排序一致性。
+--save-calibration 用给定的图片目录拟合映射并写入 ~/.glowtoolbox/cache/clarity_calibration.json。
+
+用法:
+    python nodes/pics/tests/bench_clarity.py --count 40
+    python nodes/pics/tests/bench_clarity.py --images D:/samples --save-calibration
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+import cv2
+import numpy as np
+from nodes.pics.clarity import ClarityEngine, DEFAULT_MAX_SIDE
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+
+def make_page(rng: np.random.Generator, min_side: int, max_side: int) -> bytes:
+    height = int(rng.integers(min_side, max_side))
+    width = int(height * rng.uniform(0.6, 0.75))
+    page = np.full((height, width), 255, np.uint8)
+    for _ in range(300):
+        start = tuple(int(v) for v in rng.integers(0, [width, height]))
+        end = tuple(int(v) for v in rng.integers(0, [width, height]))
+        cv2.line(page, start, end, 0, int(rng.integers(1, 6)), cv2.LINE_AA)
+    # 网点区域
+    top, bottom = sorted(int(v) for v in rng.integers(0, height, 2))
+    yy, xx = np.mgrid[top:bottom, 0:width]
+    tone = (((xx // 5 + yy // 5) % 2) * 90 + 150).astype(np.uint8)
+    page[top:bottom] = np.minimum(page[top:bottom], tone)
+    blur = float(rng.choice([0, 0, 0.7, 1.5, 3.0]))
+    if blur:
+        page = cv2.GaussianBlur(page, (0, 0), blur)
+    ok, encoded = cv2.imencode('.jpg', cv2.cvtColor(page, cv2.COLOR_GRAY2BGR), [cv2.IMWRITE_JPEG_QUALITY, 90])
+    return encoded.tobytes()
+
+
+def load_images(directory: str, limit: int):
+    images = []
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                with open(os.path.join(root, name), 'rb') as f:
+                    images.append(f.read())
+                if len(images) >= limit:
+                    return images
+    return images
+
+
+def legacy_definition(data: bytes) -> float:
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    sobelx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
+    sobely = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
+    energy = sobelx**2 + sobely**2
+    return round(np.mean(energy))
+
+
+def peak_memory(func, data) -> int:
+    tracemalloc.start()
+    func(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def ranks(values):
+    order = np.argsort(values)
+    result = np.empty(len(values))
+    result[order] = np.arange(len(values))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='清晰度评分基准')
+    parser.add_argument('--count', type=int, default=40, help='合成图片数量')
+    parser.add_argument('--min-side', type=int, default=2000, help='合成图片最小长边')
+    parser.add_argument('--max-side', type=int, default=4500, help='合成图片最大长边')
+    parser.add_argument('--images', help='改用此目录下的真实图片')
+    parser.add_argument('--max-plane', type=int, default=DEFAULT_MAX_SIDE, help='新实现计算平面的最大长边')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='score_many 线程数')
+    parser.add_argument('--save-calibration', action='store_true', help='用全部图片拟合校准并保存')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    args = parser.parse_args()
+
+    if args.images:
+        images = load_images(args.images, args.count)
+    else:
+        rng = np.random.default_rng(args.seed)
+        images = [make_page(rng, args.min_side, args.max_side) for _ in range(args.count)]
+    print(f"{len(images)} 张图片，CPU {os.cpu_count()} 个，计算平面长边 ≤ {args.max_plane}")
+
+    start = time.perf_counter()
+    old = [legacy_definition(data) for data in images]
+    old_seconds = time.perf_counter() - start
+    print(f"旧实现: {old_seconds:.2f}s，{len(images) / old_seconds:.1f} 张/秒")
+
+    engine = ClarityEngine(max_side=args.max_plane)
+    start = time.perf_counter()
+    raw = [engine.measure(data) for data in images]
+    serial_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    engine.score_many(images, workers=args.workers)
+    pool_seconds = time.perf_counter() - start
+    print(f"新实现: 串行 {serial_seconds:.2f}s（{old_seconds / serial_seconds:.1f}x），"
+          f"线程池({args.workers}) {pool_seconds:.2f}s（{old_seconds / pool_seconds:.1f}x）")
+
+    largest = max(images, key=lambda data: max(cv2.imdecode(np.frombuffer(data, np.uint8),
+                                                             cv2.IMREAD_REDUCED_GRAYSCALE_8).shape))
+    old_peak = peak_memory(legacy_definition, largest)
+    new_peak = peak_memory(engine.measure, largest)
+    print(f"内存峰值（最大的一张）: 旧 {old_peak / 2**20:.1f}MB，新 {new_peak / 2**20:.1f}MB")
+
+    if args.save_calibration:
+        calibration = engine.calibrate(images, save=True)
+        print(f"已保存校准: {calibration}")
+        return
+
+    half = len(images) // 2
+    engine.calibrate(images[:half])
+    print(f"校准（前 {half} 张）: {engine.calibration}")
+    test_old = np.array(old[half:], dtype=np.float64)
+    test_new = np.array([engine.calibration.apply(*item) for item in raw[half:]])
+    if len(test_old) > 1:
+        error = np.abs(test_new - test_old) / np.maximum(test_old, 1)
+        rank_corr = np.corrcoef(ranks(test_old), ranks(test_new))[0, 1]
+        print(f"其余 {len(test_old)} 张: 相对误差中位数 {np.median(error):.1%}，"
+              f"最大 {np.max(error):.1%}，排序相关系数 {rank_corr:.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+"""libvips 运行时统一配置
+
+所有 pyvips 调用点（pics_convert、psd_convert 以及后续的转换器）都应通过本模块
+获取 pyvips，而不是各自 import：
+
+    from nodes.pics.vips_runtime import VipsRuntime
+    runtime = VipsRuntime.get()
+    runtime.configure(python_threads=8)
+    image = runtime.open_buffer(data)
+
+主要解决的问题：
+- N 个 Python 线程 × M 个 libvips 内部线程导致 CPU 超额订阅
+- 操作缓存（operation cache）在处理上千页后无限增长
+- 默认随机访问模式会把整张图解码进内存
+- 无法得知每个压缩包处理期间 libvips 的内存峰值
+"""
+import os
+import sys
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
+
+# 默认运行时配置
+DEFAULT_VIPS_CONFIG = {
+    'cache_max': 100,                     # 操作缓存最多保留的操作数
+    'cache_max_mem': 64 * 1024 * 1024,    # 操作缓存最大内存（字节）
+    'cache_max_files': 16,                # 操作缓存最多持有的文件句柄
+    'memory_ceiling': 1024 * 1024 * 1024, # 超过该值时暂停新的解码并清空缓存（字节）
+    'access': 'sequential',               # 解码访问模式提示
+}
+
+
+def _format_mb(value: int) -> str:
+    return f"{value / 1024 / 1024:.1f}MB"
+
+
+@dataclass
+class VipsMemoryStats:
+    """单个作用域（通常是一个压缩包）内的 libvips 内存统计"""
+    label: str
+    start_mem: int = 0
+    peak_mem: int = 0
+    end_mem: int = 0
+    start_time: float = field(default_factory=time.time)
+    duration: float = 0.0
+    images: int = 0
+    throttled: int = 0
+
+    def summary(self) -> str:
+        return (f"{self.label}: 峰值 {_format_mb(self.peak_mem)} | "
+                f"起始 {_format_mb(self.start_mem)} -> 结束 {_format_mb(self.end_mem)} | "
+                f"图片 {self.images} | 限流 {self.throttled} 次 | 耗时 {self.duration:.1f}s")
+
+
+class VipsRuntime:
+    """进程内唯一的 libvips 运行时"""
+
+    _instance: Optional['VipsRuntime'] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, vipshome: Optional[str] = None):
+        self.config = dict(DEFAULT_VIPS_CONFIG)
+        self.concurrency = 0
+        self._lock = threading.Lock()
+        self._scopes: Dict[int, VipsMemoryStats] = {}
+        self.pyvips = self._load_pyvips(vipshome)
+
+    @classmethod
+    def get(cls, vipshome: Optional[str] = None) -> 'VipsRuntime':
+        """获取全局运行时实例，首次调用时加载 pyvips"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls(vipshome)
+        return cls._instance
+
+    @staticmethod
+    def _load_pyvips(vipshome: Optional[str]):
+        """设置 libvips 动态库搜索路径后导入 pyvips"""
+        if 'pyvips' not in sys.modules:
+            vipshome = vipshome or os.path.join(
+                BASE_DIR, os.getenv('VIPSHOME_PATH', 'src/packages/vips/bin'))
+            if os.path.isdir(vipshome):
+                if hasattr(os, 'add_dll_directory'):
+                    os.add_dll_directory(str(vipshome))
+                os.environ['PATH'] = str(vipshome) + os.pathsep + os.environ.get('PATH', '')
+        import pyvips
+        return pyvips
+
+    def _call(self, name: str, *args):
+        """调用 pyvips 的辅助函数，旧版本 pyvips 缺少封装时回退到 vips_lib"""
+        func = getattr(self.pyvips, name, None)
+        if func is None:
+            func = getattr(self.pyvips.vips_lib, f'vips_{name}', None)
+        if func is None:
+            return None
+        return func(*args)
+
+    def configure(self, python_threads: int = 1, **overrides) -> 'VipsRuntime':
+        """
+        应用并发与缓存配置
+
+        Args:
+            python_threads: 同时调用 libvips 的 Python 线程数，
+                libvips 内部线程数按 CPU 核数 / python_threads 分配
+            **overrides: 覆盖 DEFAULT_VIPS_CONFIG 中的任意项
+        """
+        with self._lock:
+            self.config.update(overrides)
+            cpu_count = os.cpu_count() or 4
+            self.concurrency = max(1, cpu_count // max(1, python_threads))
+            self._call('concurrency_set', self.concurrency)
+            self._call('cache_set_max', self.config['cache_max'])
+            self._call('cache_set_max_mem', self.config['cache_max_mem'])
+            self._call('cache_set_max_files', self.config['cache_max_files'])
+        logger.info(f"[#performance]libvips 并发 {self.concurrency} | "
+                    f"缓存 {self.config['cache_max']} 项/{_format_mb(self.config['cache_max_mem'])} | "
+                    f"内存上限 {_format_mb(self.config['memory_ceiling'])}")
+        return self
+
+    # ---------- 解码入口 ----------
+
+    def open_buffer(self, data: bytes, **kwargs):
+        """从内存解码图片，默认使用顺序访问"""
+        self._wait_for_memory()
+        kwargs.setdefault('access', self.config['access'])
+        image = self.pyvips.Image.new_from_buffer(data, '', **kwargs)
+        self._record_image()
+        return image
+
+    def open_file(self, path: str, **kwargs):
+        """从文件解码图片，默认使用顺序访问"""
+        self._wait_for_memory()
+        kwargs.setdefault('access', self.config['access'])
+        image = self.pyvips.Image.new_from_file(str(path), **kwargs)
+        self._record_image()
+        return image
+
+    # ---------- 内存统计 ----------
+
+    def tracked_mem(self) -> int:
+        """libvips 当前跟踪的内存（字节）"""
+        return self._call('tracked_get_mem') or 0
+
+    def tracked_highwater(self) -> int:
+        """libvips 进程级内存峰值（字节）"""
+        return self._call('tracked_get_mem_highwater') or 0
+
+    def sample(self) -> int:
+        """采样当前内存并更新所有活动作用域的峰值"""
+        mem = self.tracked_mem()
+        with self._lock:
+            for stats in self._scopes.values():
+                if mem > stats.peak_mem:
+                    stats.peak_mem = mem
+        return mem
+
+    def _record_image(self):
+        self.sample()
+        with self._lock:
+            for stats in self._scopes.values():
+                stats.images += 1
+
+    def _wait_for_memory(self, timeout: float = 30.0):
+        """内存超过上限时清空操作缓存并等待其他线程释放"""
+        ceiling = self.config['memory_ceiling']
+        if not ceiling or self.sample() < ceiling:
+            return
+        with self._lock:
+            for stats in self._scopes.values():
+                stats.throttled += 1
+        self.drop_cache()
+        deadline = time.time() + timeout
+        while self.sample() >= ceiling and time.time() < deadline:
+            time.sleep(0.05)
+
+    def drop_cache(self):
+        """清空操作缓存后恢复原缓存上限"""
+        self._call('cache_set_max', 0)
+        self._call('cache_set_max', self.config['cache_max'])
+
+    @contextmanager
+    def track(self, label: str, report: bool = True):
+        """
+        统计作用域内（如一个压缩包）的 libvips 内存峰值
+
+        libvips 的 highwater 无法重置，因此峰值由作用域内每次解码时的采样取得，
+        结束时再与进程级 highwater 的增量比较取较大者。
+
+        Args:
+            label: 作用域名称，通常为压缩包文件名
+            report: 结束时是否输出到 [#performance] 面板
+        """
+        highwater_before = self.tracked_highwater()
+        stats = VipsMemoryStats(label=label, start_mem=self.tracked_mem())
+        stats.peak_mem = stats.start_mem
+        key = id(stats)
+        with self._lock:
+            self._scopes[key] = stats
+        try:
+            yield stats
+        finally:
+            with self._lock:
+                self._scopes.pop(key, None)
+            highwater_after = self.tracked_highwater()
+            if highwater_after > highwater_before:
+                stats.peak_mem = max(stats.peak_mem, highwater_after)
+            stats.end_mem = self.tracked_mem()
+            stats.duration = time.time() - stats.start_time
+            if report:
+                logger.info(f"[#performance]libvips内存 {stats.summary()}")
@@ -1,12 +1,19 @@
 import os
 import json
-import time
 from datetime import datetime
 from typing import Dict, List, Any, Optional
-from pathlib import Path
+
+from nodes.record.record_store import MIGRATED_NAMESPACE, RecordStore
+
+NAMESPACE = "path_history"
+
 
 class PathHistoryManager:
-    """路径历史记录管理器"""
+    """路径历史记录管理器
+
+    每条记录追加写入 SQLite 数据库（与历史记录文件同名的 .db），不再每次重写整个 JSON 文件；
+    已有的 JSON 历史在第一次打开时自动迁移。
+    """
     
     def __init__(self, history_file: str = "path_history.json"):
         """
@@ -21,26 +28,40 @@ class PathHistoryManager:
         
         # 设置历史记录文件路径
         self.history_file = os.path.join(self.history_dir, history_file)
-        
-        # 初始化或加载历史记录
-        self.history: Dict[str, Dict[str, List[Dict[str, Any]]]] = self._load_history()
-        
-    def _load_history(self) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
-        """加载历史记录文件"""
+        self.db_file = os.path.splitext(self.history_file)[0] + ".db"
+        self._store = RecordStore.open(self.db_file)
+        self._load_history()
+
+    @property
+    def history(self) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        """与旧版 JSON 结构相同的全部历史记录（只读快照）"""
+        return {script: {"records": self._store.entries(NAMESPACE, script)}
+                for script in self._store.log_keys(NAMESPACE)}
+        
+    def _load_history(self) -> None:
+        """从旧的历史记录文件迁移（只迁移一次，clear_script_history 之后不会重新导入）"""
+        if self._store.get(MIGRATED_NAMESPACE, NAMESPACE) is not None or not os.path.exists(self.history_file):
+            return
+        if self._store.log_keys(NAMESPACE):
+            # 已经迁移过但还没有迁移标记的数据库：补上标记
+            self._store.put(MIGRATED_NAMESPACE, NAMESPACE, self.history_file)
+            self._store.flush()
+            return
         try:
-            if os.path.exists(self.history_file):
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return {}
+            with open(self.history_file, 'r', encoding='utf-8') as f:
+                history = json.load(f)
+            for script_name, data in history.items():
+                for record in data.get("records", []):
+                    self._store.append(NAMESPACE, script_name, record)
+            self._store.put(MIGRATED_NAMESPACE, NAMESPACE, self.history_file)
+            self._store.flush()
         except Exception as e:
             print(f"加载历史记录文件失败: {e}")
-            return {}
             
     def _save_history(self) -> None:
-        """保存历史记录到文件"""
+        """立即写入尚在缓冲中的记录"""
         try:
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.history, f, ensure_ascii=False, indent=2)
+            self._store.flush()
         except Exception as e:
             print(f"保存历史记录文件失败: {e}")
             
@@ -55,10 +76,6 @@ class PathHistoryManager:
         """
         # 获取当前时间戳（人类可读格式）
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # 确保脚本的历史记录存在
-        if script_name not in self.history:
-            self.history[script_name] = {"records": []}
             
         # 创建新的记录
         record = {
@@ -67,11 +84,8 @@ class PathHistoryManager:
             "status": status
         }
         
-        # 添加记录
-        self.history[script_name]["records"].append(record)
-        
-        # 保存历史记录
-        self._save_history()
+        # 追加记录（批量写入）
+        self._store.append(NAMESPACE, script_name, record)
         
     def get_script_history(self, script_name: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
@@ -84,13 +98,7 @@ class PathHistoryManager:
         Returns:
             List[Dict[str, Any]]: 历史记录列表
         """
-        if script_name not in self.history:
-            return []
-            
-        records = self.history[script_name]["records"]
-        if limit is not None:
-            return records[-limit:]
-        return records
+        return self._store.entries(NAMESPACE, script_name, limit=limit)
         
     def clear_script_history(self, script_name: str) -> bool:
         """
@@ -102,11 +110,7 @@ class PathHistoryManager:
         Returns:
             bool: 是否成功清除
         """
-        if script_name in self.history:
-            del self.history[script_name]
-            self._save_history()
-            return True
-        return False
+        return self._store.clear_log(NAMESPACE, script_name) > 0
         
     def get_all_scripts(self) -> List[str]:
         """
@@ -115,7 +119,7 @@ class PathHistoryManager:
         Returns:
             List[str]: 脚本名称列表
         """
-        return list(self.history.keys())
+        return self._store.log_keys(NAMESPACE)
         
     def get_latest_record(self, script_name: str) -> Optional[Dict[str, Any]]:
         """
@@ -127,7 +131,7 @@ class PathHistoryManager:
         Returns:
             Optional[Dict[str, Any]]: 最新记录，如果没有则返回None
         """
-        records = self.get_script_history(script_name)
+        records = self.get_script_history(script_name, limit=1)
         return records[-1] if records else None
 
 # 使用示例
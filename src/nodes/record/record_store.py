@@ -0,0 +1,237 @@
+"""
+小记录持久化存储
+
+时间戳、路径历史这类"很多条小记录、频繁单条更新"的数据，以前每次更新都把整个 JSON
+重写一遍，几万条时每次保存要几百毫秒。RecordStore 改用 SQLite（WAL 模式）：
+
+    store = RecordStore.open("~/.glowtoolbox/history/records.db")
+    store.put("timestamps", path, mtime)         # 单条更新，O(1)
+    store.get("timestamps", path)
+    store.append("path_history", script, record) # 追加日志
+    store.entries("path_history", script, limit=10)
+
+- 写入先进入内存缓冲，flush_interval 秒后或累计 max_batch 条时在一个事务中批量写入
+- 读取优先返回缓冲中的值，写入后立即可读
+- 每次 flush 是一个事务，进程崩溃时数据库要么包含整批，要么完全不包含
+- 进程正常退出时自动 flush；崩溃时最多丢失最近 flush_interval 秒内的写入
+- 从旧 JSON 迁移过的命名空间在 MIGRATED_NAMESPACE 中登记（键为命名空间），
+  清空记录后不会再从旧文件重新导入
+"""
+
+import os
+import json
+import time
+import atexit
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MIGRATED_NAMESPACE = "_migrated"
+
+_DELETED = object()
+_MISSING = object()
+
+
+class RecordStore:
+    """
+    SQLite 小记录存储（键值表 + 追加日志表）
+
+    Args:
+        db_path: 数据库文件路径
+        flush_interval: 缓冲写入的最长延迟（秒）
+        max_batch: 缓冲达到该条数时立即写入
+    """
+
+    _instances: Dict[str, 'RecordStore'] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, db_path: str, flush_interval: float = 1.0, max_batch: int = 500):
+        self.db_path = os.path.abspath(os.path.expanduser(db_path))
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._lock = threading.RLock()
+        self._pending_kv: Dict[Tuple[str, str], Any] = {}
+        self._pending_log: List[Tuple[str, str, str, float]] = []
+        self._timer: Optional[threading.Timer] = None
+        self._closed = False
+        self.flushes = 0
+
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " updated REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key)) WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS log ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " created REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS log_key ON log (namespace, key, id)")
+        self._conn.commit()
+        atexit.register(self.close)
+
+    @classmethod
+    def open(cls, db_path: str, **kwargs) -> 'RecordStore':
+        """按路径共享实例，同一进程内多个管理器使用同一个文件时共用缓冲和连接"""
+        key = os.path.normcase(os.path.abspath(os.path.expanduser(db_path)))
+        with cls._instances_lock:
+            store = cls._instances.get(key)
+            if store is None or store._closed:
+                store = cls._instances[key] = cls(db_path, **kwargs)
+            return store
+
+    # ========== 缓冲与写入 ==========
+
+    def _schedule(self):
+        """有新的缓冲写入：达到批量时立即写入，否则确保定时器在运行（需持有锁）"""
+        if len(self._pending_kv) + len(self._pending_log) >= self.max_batch:
+            self._flush_locked()
+        elif self._timer is None and not self._closed:
+            self._timer = threading.Timer(self.flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending_kv and not self._pending_log:
+            return
+        now = time.time()
+        upserts = []
+        deletes = []
+        for (namespace, key), value in self._pending_kv.items():
+            if value is _DELETED:
+                deletes.append((namespace, key))
+            else:
+                upserts.append((namespace, key, json.dumps(value, ensure_ascii=False), now))
+        try:
+            with self._conn:  # 一个事务：全部成功或全部回滚
+                if upserts:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO kv (namespace, key, value, updated) VALUES (?, ?, ?, ?)", upserts)
+                if deletes:
+                    self._conn.executemany("DELETE FROM kv WHERE namespace = ? AND key = ?", deletes)
+                if self._pending_log:
+                    self._conn.executemany(
+                        "INSERT INTO log (namespace, key, value, created) VALUES (?, ?, ?, ?)", self._pending_log)
+        except sqlite3.Error as e:
+            # 保留缓冲，下次 flush 重试
+            logger.error(f"写入记录失败 {self.db_path}: {e}")
+            return
+        self._pending_kv.clear()
+        self._pending_log.clear()
+        self.flushes += 1
+
+    def flush(self):
+        """立即把缓冲写入数据库"""
+        with self._lock:
+            if not self._closed:
+                self._flush_locked()
+
+    def close(self):
+        """写入缓冲并关闭连接"""
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_locked()
+            self._closed = True
+            self._conn.close()
+
+    # ========== 键值 ==========
+
+    def put(self, namespace: str, key: str, value: Any):
+        with self._lock:
+            self._pending_kv[(namespace, key)] = value
+            self._schedule()
+
+    def put_many(self, namespace: str, items: Dict[str, Any]):
+        with self._lock:
+            for key, value in items.items():
+                self._pending_kv[(namespace, key)] = value
+            self._schedule()
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            self._pending_kv[(namespace, key)] = _DELETED
+            self._schedule()
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        with self._lock:
+            value = self._pending_kv.get((namespace, key), _MISSING)
+            if value is _DELETED:
+                return default
+            if value is not _MISSING:
+                return value
+            row = self._conn.execute(
+                "SELECT value FROM kv WHERE namespace = ? AND key = ?", (namespace, key)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def items(self, namespace: str) -> Dict[str, Any]:
+        with self._lock:
+            self._flush_locked()
+            rows = self._conn.execute("SELECT key, value FROM kv WHERE namespace = ?", (namespace,)).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def count(self, namespace: str) -> int:
+        with self._lock:
+            self._flush_locked()
+            return self._conn.execute("SELECT COUNT(*) FROM kv WHERE namespace = ?", (namespace,)).fetchone()[0]
+
+    def clear(self, namespace: str):
+        with self._lock:
+            self._flush_locked()
+            with self._conn:
+                self._conn.execute("DELETE FROM kv WHERE namespace = ?", (namespace,))
+
+    # ========== 追加日志 ==========
+
+    def append(self, namespace: str, key: str, value: Any):
+        with self._lock:
+            self._pending_log.append((namespace, key, json.dumps(value, ensure_ascii=False), time.time()))
+            self._schedule()
+
+    def entries(self, namespace: str, key: str, limit: Optional[int] = None) -> List[Any]:
+        """按追加顺序返回日志，limit 为只取最新的若干条"""
+        with self._lock:
+            self._flush_locked()
+            if limit is None:
+                rows = self._conn.execute(
+                    "SELECT value FROM log WHERE namespace = ? AND key = ? ORDER BY id",
+                    (namespace, key)).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT value FROM log WHERE namespace = ? AND key = ? ORDER BY id DESC LIMIT ?",
+                    (namespace, key, limit)).fetchall()[::-1]
+        return [json.loads(row[0]) for row in rows]
+
+    def log_keys(self, namespace: str) -> List[str]:
+        with self._lock:
+            self._flush_locked()
+            rows = self._conn.execute(
+                "SELECT key FROM log WHERE namespace = ? GROUP BY key ORDER BY MIN(id)", (namespace,)).fetchall()
+        return [row[0] for row in rows]
+
+    def clear_log(self, namespace: str, key: Optional[str] = None) -> int:
+        """删除日志，key 为 None 时删除整个命名空间，返回删除条数"""
+        with self._lock:
+            self._flush_locked()
+            with self._conn:
+                if key is None:
+                    cursor = self._conn.execute("DELETE FROM log WHERE namespace = ?", (namespace,))
+                else:
+                    cursor = self._conn.execute("DELETE FROM log WHERE namespace = ? AND key = ?", (namespace, key))
+            return cursor.rowcount
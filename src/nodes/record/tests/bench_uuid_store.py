@@ -0,0 +1,132 @@
+"""
+UUID 记录存储基准
+
+生成 --records 条 uuid_records.json 格式的记录（{"record": {uuid: {"timestamps": {...}}}}），对比：
+- 旧实现: 每次生成 UUID 都读入整个 uuid_records.json 取 key 集合查重；批量更新时读入、合并、
+  整个文件重写（ArchiveProcessor._batch_update_records 原来的做法）
+- 新实现: UuidRecordStore（SQLite 主键索引）查重、generate 登记、add_many 批量合并
+
+同时给出从 uuid_records.json 迁移的耗时。旧实现每次查重的耗时与记录数成正比，只测 --legacy-rounds 次。
+
+用法:
+    python nodes/record/tests/bench_uuid_store.py --records 500000
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import string
+import shutil
+import argparse
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+from nodes.record.record_store import RecordStore
+from nodes.record.uuid_store import UuidRecordStore
+
+ALPHABET = string.ascii_letters + string.digits + '_-'
+
+
+def make_uuid(rng: random.Random) -> str:
+    return ''.join(rng.choices(ALPHABET, k=16))
+
+
+def make_record(rng: random.Random, index: int) -> dict:
+    return {"timestamps": {f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 12:00:00": {
+        "archive_name": f"[画师{index % 5000}] 作品{index}.zip",
+        "artist_name": f"画师{index % 5000}",
+        "relative_path": f"画师{index % 5000}",
+    }}}
+
+
+def legacy_load_uuids(path: str) -> set:
+    with open(path, 'r', encoding='utf-8') as f:
+        return set(json.load(f).get("record", {}).keys())
+
+
+def legacy_batch_update(path: str, cache: dict):
+    with open(path, 'r', encoding='utf-8') as f:
+        existing = json.load(f)
+    for uuid, data in cache.items():
+        if uuid not in existing["record"]:
+            existing["record"][uuid] = data
+        else:
+            existing["record"][uuid]["timestamps"].update(data["timestamps"])
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(existing, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='UUID 记录存储基准')
+    parser.add_argument('--records', type=int, default=500000, help='记录数量')
+    parser.add_argument('--lookups', type=int, default=100000, help='新实现查重次数')
+    parser.add_argument('--legacy-rounds', type=int, default=3, help='旧实现测试次数（每次都读入整个JSON）')
+    parser.add_argument('--batch', type=int, default=100, help='批量更新的记录数')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    tmp = tempfile.mkdtemp()
+    try:
+        records = {make_uuid(rng): make_record(rng, i) for i in range(args.records)}
+        uuids = list(records)
+        json_path = os.path.join(tmp, 'uuid_records.json')
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({"record": records}, f, ensure_ascii=False, indent=2)
+        print(f"{len(records)} 条记录，uuid_records.json {os.path.getsize(json_path) / 2**20:.1f}MB")
+
+        store = UuidRecordStore(RecordStore(os.path.join(tmp, 'uuid_records.db')))
+        start = time.perf_counter()
+        store.import_json_records(json_path)
+        print(f"迁移: {time.perf_counter() - start:.2f}s，"
+              f"索引库 {os.path.getsize(os.path.join(tmp, 'uuid_records.db')) / 2**20:.1f}MB")
+
+        # 查重
+        start = time.perf_counter()
+        for _ in range(args.legacy_rounds):
+            existing = legacy_load_uuids(json_path)
+            make_uuid(rng) in existing
+        legacy_lookup = (time.perf_counter() - start) / args.legacy_rounds
+        probes = [rng.choice(uuids) if i % 2 else make_uuid(rng) for i in range(args.lookups)]
+        start = time.perf_counter()
+        hits = sum(1 for uuid in probes if uuid in store)
+        store_lookup = (time.perf_counter() - start) / len(probes)
+        print(f"查重: 旧 {legacy_lookup * 1000:.0f}ms/次，新 {store_lookup * 1e6:.1f}µs/次"
+              f"（{legacy_lookup / store_lookup:.0f}x），命中 {hits}/{len(probes)}")
+
+        start = time.perf_counter()
+        for _ in range(1000):
+            store.generate(lambda: make_uuid(rng))
+        store.flush()
+        print(f"生成并登记: {(time.perf_counter() - start):.3f}s/1000 个")
+
+        # 批量更新：一半已有 UUID 追加时间戳，一半新 UUID
+        cache = {}
+        for i in range(args.batch):
+            uuid = rng.choice(uuids) if i % 2 else make_uuid(rng)
+            cache[uuid] = make_record(rng, i)
+        start = time.perf_counter()
+        legacy_batch_update(json_path, cache)
+        legacy_update = time.perf_counter() - start
+        start = time.perf_counter()
+        store.add_many(cache)
+        store.flush()
+        store_update = time.perf_counter() - start
+        print(f"批量更新 {args.batch} 条: 旧 {legacy_update:.2f}s，新 {store_update * 1000:.1f}ms"
+              f"（{legacy_update / store_update:.0f}x）")
+
+        expected = legacy_load_uuids(json_path)
+        missing = [uuid for uuid in expected if uuid not in store]
+        print(f"一致性: 旧记录 {len(expected)} 个 UUID，索引库缺失 {len(missing)} 个")
+        store.store.close()
+        if missing:
+            sys.exit(1)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,62 +2,76 @@ import os
 import json
 import logging
 from datetime import datetime
-from threading import Lock
 from typing import Dict, Optional
 
+from nodes.record.record_store import MIGRATED_NAMESPACE, RecordStore
+
+NAMESPACE = "timestamps"
+
+
 class TimestampManager:
-    """线程安全的时间戳管理器类"""
+    """线程安全的时间戳管理器类
+
+    记录保存在 json_file 旁边的 SQLite 数据库（同名 .db）中，单条记录的更新只写这一条，
+    并由 RecordStore 批量、延迟写入。已有的 JSON 文件在第一次打开时自动迁移。
+    """
     
-    def __init__(self, json_file: str):
+    def __init__(self, json_file: str, flush_interval: float = 1.0):
         """
         初始化时间戳管理器
         
         Args:
-            json_file (str): JSON文件路径
+            json_file (str): JSON文件路径（数据库为同名 .db 文件）
+            flush_interval (float): 批量写入的最长延迟（秒）
         """
         self.json_file = json_file
-        self._lock = Lock()
-        self._timestamps: Dict[str, float] = {}
+        self.db_file = os.path.splitext(json_file)[0] + ".db"
+        self._store = RecordStore.open(self.db_file, flush_interval=flush_interval)
         self._load_json()
     
     def _load_json(self) -> None:
-        """加载JSON文件，添加错误处理"""
+        """从旧的JSON文件迁移记录（只迁移一次，clear_timestamps 之后不会重新导入）"""
+        if self._store.get(MIGRATED_NAMESPACE, NAMESPACE) is not None or not os.path.exists(self.json_file):
+            return
+        if self._store.count(NAMESPACE) > 0:
+            # 已经迁移过但还没有迁移标记的数据库：补上标记
+            self._store.put(MIGRATED_NAMESPACE, NAMESPACE, self.json_file)
+            self._store.flush()
+            return
         try:
-            if os.path.exists(self.json_file):
-                with self._lock:
-                    with open(self.json_file, 'r', encoding='utf-8') as file:
-                        self._timestamps = json.load(file)
-                logging.info(f"[#process]✅ 成功加载时间戳文件: {self.json_file}")
+            with open(self.json_file, 'r', encoding='utf-8') as file:
+                timestamps: Dict[str, float] = json.load(file)
+            self._store.put_many(NAMESPACE, timestamps)
+            self._store.put(MIGRATED_NAMESPACE, NAMESPACE, self.json_file)
+            self._store.flush()
+            logging.info(f"[#process]✅ 已从 {self.json_file} 迁移 {len(timestamps)} 条时间戳")
         except json.JSONDecodeError as e:
             logging.error(f"[#update]❌ JSON解析错误: {str(e)}")
-            self._timestamps = {}
         except Exception as e:
             logging.error(f"[#update]❌ 读取时间戳文件失败: {str(e)}")
-            self._timestamps = {}
     
     def save_json(self) -> None:
-        """保存JSON文件，添加错误处理和线程安全"""
+        """立即写入尚在缓冲中的记录（平时由后台批量写入，无需手动调用）"""
+        try:
+            self._store.flush()
+        except Exception as e:
+            logging.error(f"[#update]❌ 保存时间戳失败: {str(e)}")
+
+    def export_json(self, json_file: Optional[str] = None) -> None:
+        """把全部记录导出为JSON文件（默认为 json_file）"""
+        target = json_file or self.json_file
+        temp_file = f"{target}.tmp"
         try:
-            with self._lock:
-                # 创建临时文件
-                temp_file = f"{self.json_file}.tmp"
-                with open(temp_file, 'w', encoding='utf-8') as file:
-                    json.dump(self._timestamps, file, ensure_ascii=False, indent=2)
-                
-                # 安全地替换原文件
-                if os.path.exists(self.json_file):
-                    os.replace(temp_file, self.json_file)
-                else:
-                    os.rename(temp_file, self.json_file)
-                    
-                logging.info(f"[#process]✅ 成功保存时间戳文件: {self.json_file}")
+            with open(temp_file, 'w', encoding='utf-8') as file:
+                json.dump(self._store.items(NAMESPACE), file, ensure_ascii=False, indent=2)
+            os.replace(temp_file, target)
+            logging.info(f"[#process]✅ 成功导出时间戳文件: {target}")
         except Exception as e:
-            logging.error(f"[#update]❌ 保存时间戳文件失败: {str(e)}")
-            # 清理临时文件
+            logging.error(f"[#update]❌ 导出时间戳文件失败: {str(e)}")
             if os.path.exists(temp_file):
                 try:
                     os.remove(temp_file)
-                except:
+                except OSError:
                     pass
     
     def record_timestamp(self, file_path: str) -> None:
@@ -68,10 +82,9 @@ class TimestampManager:
             file_path (str): 文件路径
         """
         try:
-            with self._lock:
-                self._timestamps[file_path] = os.path.getmtime(file_path)
-                self.save_json()
-                logging.info(f"[#process]✅ 已记录时间戳: {file_path} -> {datetime.fromtimestamp(self._timestamps[file_path])}")
+            timestamp = os.path.getmtime(file_path)
+            self._store.put(NAMESPACE, file_path, timestamp)
+            logging.info(f"[#process]✅ 已记录时间戳: {file_path} -> {datetime.fromtimestamp(timestamp)}")
         except Exception as e:
             logging.error(f"[#update]❌ 记录时间戳失败: {str(e)}")
     
@@ -83,13 +96,12 @@ class TimestampManager:
             file_path (str): 文件路径
         """
         try:
-            with self._lock:
-                if file_path in self._timestamps:
-                    timestamp = self._timestamps[file_path]
-                    os.utime(file_path, (timestamp, timestamp))
-                    logging.info(f"[#process]✅ 已恢复时间戳: {file_path} -> {datetime.fromtimestamp(timestamp)}")
-                else:
-                    logging.warning(f"[#update]⚠️ 未找到时间戳记录: {file_path}")
+            timestamp = self._store.get(NAMESPACE, file_path)
+            if timestamp is not None:
+                os.utime(file_path, (timestamp, timestamp))
+                logging.info(f"[#process]✅ 已恢复时间戳: {file_path} -> {datetime.fromtimestamp(timestamp)}")
+            else:
+                logging.warning(f"[#update]⚠️ 未找到时间戳记录: {file_path}")
         except Exception as e:
             logging.error(f"[#update]❌ 恢复时间戳失败: {str(e)}")
     
@@ -103,12 +115,9 @@ class TimestampManager:
         Returns:
             Optional[float]: 时间戳，如果不存在则返回None
         """
-        with self._lock:
-            return self._timestamps.get(file_path)
+        return self._store.get(NAMESPACE, file_path)
     
     def clear_timestamps(self) -> None:
         """清除所有时间戳记录"""
-        with self._lock:
-            self._timestamps.clear()
-            self.save_json()
-            logging.info("[#process]✅ 已清除所有时间戳记录") 
\ No newline at end of file
+        self._store.clear(NAMESPACE)
+        logging.info("[#process]✅ 已清除所有时间戳记录") 
@@ -0,0 +1,225 @@
+"""
+压缩包 UUID 记录存储
+
+auto_uuid 以前把全部 UUID 记录放在 uuid_records.json / uuid_records.yaml 里：每生成一个
+UUID 都要把整个 JSON 读进来做查重，每次批量更新都要整个文件重写一遍，几十万条记录时
+单次查重就要几秒。UuidRecordStore 把记录放进 RecordStore（SQLite，主键索引）：
+
+    store = UuidRecordStore.open(r"E:\\1BACKUP\\ehv\\uuid\\uuid_records.db")
+    uuid = store.generate(lambda: nanoid.generate(size=16))   # 查重并在内存中预留
+    store.add(uuid, "2024-01-01 12:00:00", "作品.zip", "画师", "画师")   # 写入压缩包成功后登记
+    store.release(uuid)                                       # 写入失败时释放预留
+    uuid in store                                             # 主键查询
+    store.get(uuid)          # {"timestamps": {时间戳: {archive_name, artist_name, relative_path}}}
+    store.add_many(records)  # 批量合并，一个事务写入
+
+合并只追加新的时间戳，已有时间戳的记录保持不变（与旧版 update_json_records 一致）。
+记录格式与 uuid_records.json 的 "record" 下每一项相同。旧数据用 import_* 迁移：
+
+    store.import_json_records("uuid_records.json")   # {"record": {uuid: {...}}} 或 {uuid: {...}}
+    store.import_yaml_records("uuid_records.yaml")   # [{UUID, ArchiveName, ArtistName, LastPath, ...}]
+    store.import_json_dir(uuid_directory)            # 按日期分层的 {uuid}.json
+"""
+
+import os
+import json
+import logging
+import threading
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from .record_store import RecordStore
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = "uuid_records"
+RECORDS_FILE_NAMES = ('uuid_records.json', 'uuid_records.yaml')
+
+
+def _load_json(path: str):
+    try:
+        import orjson
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    except ImportError:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+
+def merge_timestamps(target: Dict, timestamps: Dict) -> bool:
+    """把 timestamps 中新的时间戳追加到记录（已有的时间戳不覆盖），返回是否有变化"""
+    existing = target.setdefault("timestamps", {})
+    changed = False
+    for timestamp, entry in timestamps.items():
+        if timestamp not in existing:
+            existing[timestamp] = entry
+            changed = True
+    return changed
+
+
+class UuidRecordStore:
+    """
+    UUID → 记录 的持久化索引
+
+    Args:
+        store: 底层 RecordStore
+        namespace: RecordStore 命名空间
+    """
+
+    def __init__(self, store: RecordStore, namespace: str = NAMESPACE):
+        self.store = store
+        self.namespace = namespace
+        self._generate_lock = threading.Lock()
+        self._reserved: set = set()  # 已生成、尚未登记的 UUID
+
+    @classmethod
+    def open(cls, db_path: str, **kwargs) -> 'UuidRecordStore':
+        """打开（同一进程内共享）指定路径的记录库"""
+        return cls(RecordStore.open(db_path, **kwargs))
+
+    def __contains__(self, uuid: str) -> bool:
+        return self.store.get(self.namespace, uuid) is not None
+
+    def __len__(self) -> int:
+        return self.store.count(self.namespace)
+
+    def get(self, uuid: str) -> Optional[Dict]:
+        return self.store.get(self.namespace, uuid)
+
+    def latest(self, uuid: str) -> Optional[Tuple[str, Dict]]:
+        """最新的 (时间戳, 记录)，没有记录时返回 None"""
+        record = self.get(uuid)
+        timestamps = (record or {}).get("timestamps") or {}
+        if not timestamps:
+            return None
+        timestamp = max(timestamps)
+        return timestamp, timestamps[timestamp]
+
+    def items(self) -> Iterator[Tuple[str, Dict]]:
+        return iter(self.store.items(self.namespace).items())
+
+    def uuids(self) -> set:
+        return set(self.store.items(self.namespace))
+
+    def generate(self, generator: Callable[[], str]) -> str:
+        """
+        生成不在库中的 UUID，并在内存中预留（多个线程同时生成也不会重复）
+
+        预留的 UUID 不写入库，add/add_many 登记后预留解除；写入压缩包失败时调用 release，
+        避免库里留下没有对应压缩包的空记录
+        """
+        with self._generate_lock:
+            while True:
+                uuid = generator()
+                if uuid not in self._reserved and uuid not in self:
+                    self._reserved.add(uuid)
+                    return uuid
+
+    def release(self, uuid: str):
+        """释放 generate 预留但未使用的 UUID"""
+        with self._generate_lock:
+            self._reserved.discard(uuid)
+
+    def add(self, uuid: str, timestamp: str, archive_name: str, artist_name: str, relative_path: str):
+        """为 UUID 添加一条时间戳记录（已存在的时间戳保持不变）"""
+        self.add_many({uuid: {"timestamps": {timestamp: {
+            "archive_name": archive_name,
+            "artist_name": artist_name,
+            "relative_path": relative_path,
+        }}}})
+
+    def add_many(self, records: Dict[str, Dict]) -> int:
+        """
+        批量合并记录 {uuid: {"timestamps": {...}}}
+
+        Returns:
+            新增或有变化的 UUID 数量
+        """
+        changed = {}
+        for uuid, data in records.items():
+            if not uuid:
+                continue
+            record = self.get(uuid)
+            is_new = record is None
+            record = record or {"timestamps": {}}
+            if merge_timestamps(record, (data or {}).get("timestamps") or {}) or is_new:
+                changed[uuid] = record
+        if changed:
+            self.store.put_many(self.namespace, changed)
+        if self._reserved:
+            with self._generate_lock:
+                self._reserved.difference_update(records)
+        return len(changed)
+
+    def flush(self):
+        self.store.flush()
+
+    # ========== 迁移 ==========
+
+    def import_json_records(self, path: str) -> int:
+        """导入 uuid_records.json，返回新增或有变化的 UUID 数量"""
+        data = _load_json(path)
+        if isinstance(data, dict) and isinstance(data.get("record"), dict):
+            data = data["record"]
+        if not isinstance(data, dict):
+            raise ValueError(f"无效的记录文件格式: {path}")
+        count = self.add_many({uuid: record for uuid, record in data.items() if isinstance(record, dict)})
+        self.flush()
+        return count
+
+    def import_yaml_records(self, path: str) -> int:
+        """导入旧版 uuid_records.yaml（记录列表），返回新增或有变化的 UUID 数量"""
+        import yaml
+        with open(path, 'rb') as f:
+            loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+            data = yaml.load(f, Loader=loader) or []
+        records: Dict[str, Dict] = {}
+        for item in data:
+            uuid = (item or {}).get('UUID')
+            if not uuid:
+                continue
+            record = records.setdefault(uuid, {"timestamps": {}})
+            timestamp = item.get('LastModified') or item.get('CreatedAt')
+            if timestamp:
+                record["timestamps"][str(timestamp)] = {
+                    "archive_name": item.get('ArchiveName', ''),
+                    "artist_name": item.get('ArtistName', ''),
+                    "relative_path": item.get('LastPath', ''),
+                }
+        count = self.add_many(records)
+        self.flush()
+        return count
+
+    def import_json_dir(self, directory: str, batch_size: int = 5000) -> int:
+        """导入目录下按日期分层的 {uuid}.json，返回新增或有变化的 UUID 数量"""
+        count = 0
+        batch: Dict[str, Dict] = {}
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if not name.endswith('.json') or name in RECORDS_FILE_NAMES:
+                    continue
+                try:
+                    data = _load_json(os.path.join(root, name))
+                except Exception as e:
+                    logger.warning(f"跳过无效的记录文件 {name}: {e}")
+                    continue
+                if isinstance(data, dict):
+                    uuid = data.get("uuid") or os.path.splitext(name)[0]
+                    batch[uuid] = data
+                if len(batch) >= batch_size:
+                    count += self.add_many(batch)
+                    batch = {}
+        count += self.add_many(batch)
+        self.flush()
+        return count
+
+    def migrate(self, uuid_directory: str) -> int:
+        """从 uuid_directory 下的全部旧格式记录迁移，返回新增或有变化的 UUID 数量"""
+        count = 0
+        yaml_path = os.path.join(uuid_directory, 'uuid_records.yaml')
+        json_path = os.path.join(uuid_directory, 'uuid_records.json')
+        if os.path.exists(yaml_path):
+            count += self.import_yaml_records(yaml_path)
+        if os.path.exists(json_path):
+            count += self.import_json_records(json_path)
+        count += self.import_json_dir(uuid_directory)
+        return count
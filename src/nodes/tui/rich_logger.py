@@ -270,6 +270,102 @@ class LogManager:
             handler.update_display()
             self.last_refresh = time.time()
 
+class PanelBuffer:
+    """面板内容的环形缓冲区
+    
+    按行保存追加的内容，行数和字节数都有上限，超出时丢弃最旧的行，
+    长时间运行时面板内存保持恒定。
+    
+    缓冲区本身是 Rich 可渲染对象：放进 Panel 后，后续的追加/替换不需要
+    重建面板和布局，Live 刷新时只按区域高度渲染最后几行。
+    """
+    DEFAULT_MAX_LINES = 200
+    DEFAULT_MAX_BYTES = 64 * 1024
+    
+    def __init__(self, max_lines=None, max_bytes=None):
+        self.max_lines = max_lines or self.DEFAULT_MAX_LINES
+        self.max_bytes = max_bytes or self.DEFAULT_MAX_BYTES
+        self._lines = deque()
+        self._sizes = deque()
+        self.total_bytes = 0
+        self.version = 0
+        self._cache_key = None
+        self._cached_text = None
+    
+    def __len__(self):
+        return len(self._lines)
+    
+    def append(self, line):
+        """追加一行，超出行数或字节上限时丢弃最旧的行"""
+        size = len(str(line).encode('utf-8'))
+        self._lines.append(line)
+        self._sizes.append(size)
+        self.total_bytes += size
+        while len(self._lines) > self.max_lines or (
+                self.total_bytes > self.max_bytes and len(self._lines) > 1):
+            self._lines.popleft()
+            self.total_bytes -= self._sizes.popleft()
+        self.version += 1
+    
+    def set(self, content):
+        """替换全部内容"""
+        self._lines.clear()
+        self._sizes.clear()
+        self.total_bytes = 0
+        self.append(content)
+    
+    def clear(self):
+        """清空内容"""
+        self._lines.clear()
+        self._sizes.clear()
+        self.total_bytes = 0
+        self.version += 1
+    
+    def to_text(self, max_lines=None) -> Text:
+        """合并最后 max_lines 行为一个 Text，内容未变化时直接返回缓存"""
+        key = (self.version, max_lines)
+        if key == self._cache_key:
+            return self._cached_text
+        lines = list(self._lines)  # 先取快照，避免渲染线程迭代时被修改
+        if max_lines:
+            lines = lines[-max_lines:]
+        if len(lines) == 1 and isinstance(lines[0], Text):
+            text = lines[0]
+        else:
+            text = Text()
+            for i, line in enumerate(lines):
+                if i > 0:
+                    text.append("\n")
+                text.append(line if isinstance(line, Text) else str(line))
+        self._cache_key = key
+        self._cached_text = text
+        return text
+    
+    def __rich_console__(self, console, options):
+        yield self.to_text(options.height or options.max_height)
+
+
+def _render_progress(progress, width):
+    """将 Progress 对象渲染为静态 Text"""
+    temp_console = Console(force_terminal=True, width=width)
+    with temp_console.capture() as capture:
+        with progress:
+            progress.refresh()
+    return Text.from_ansi(capture.get())
+
+
+def _new_panel_state(title, config, old_state=None):
+    """创建面板状态，重建布局时保留已有的缓冲内容"""
+    buffer = old_state["buffer"] if old_state else PanelBuffer(
+        config.get("max_lines"), config.get("max_bytes"))
+    return {
+        "title": title,
+        "buffer": buffer,
+        "progress": None,
+        "placed": False,  # 缓冲区是否已作为面板内容放入布局
+    }
+
+
 class StaticRichHandler:
     """静态Panel布局处理器"""
     def __init__(self, layout_config=None, style_config=None):
@@ -307,10 +403,7 @@ class StaticRichHandler:
         """设置固定布局"""
         layouts = []
         for name, config in self.layout_config.items():
-            self.panels[name] = {
-                "title": config["title"],
-                "content": Text(""),
-            }
+            self.panels[name] = _new_panel_state(config["title"], config, self.panels.get(name))
             
             # 同时支持size和ratio配置
             if "ratio" in config:
@@ -327,22 +420,20 @@ class StaticRichHandler:
         if name not in self.panels:
             return
             
-        if append and isinstance(content, (str, Text)):
-            old_content = self.panels[name]["content"]
-            if isinstance(old_content, Text):
-                old_content.append("\n" + str(content))
-            else:
-                self.panels[name]["content"] = Text(str(old_content) + "\n" + str(content))
+        panel = self.panels[name]
+        if isinstance(content, Progress):
+            # 如果是Progress对象，直接保存，每次刷新都重新渲染
+            panel["progress"] = content
         else:
-            # 如果是Progress对象，直接保存
-            if isinstance(content, Progress):
-                self.panels[name]["content"] = content
+            panel["progress"] = None
+            if append and isinstance(content, (str, Text)):
+                panel["buffer"].append(content)
             else:
                 # 根据auto_wrap决定是否进行预处理
-                if self.auto_wrap and isinstance(content, str):
+                if getattr(self, "auto_wrap", False) and isinstance(content, str):
                     messages = self._preprocess_message(content)
                     content = "\n".join(messages)
-                self.panels[name]["content"] = content if isinstance(content, Text) else Text(str(content))
+                panel["buffer"].set(content if isinstance(content, Text) else Text(str(content)))
         
         # 记录到日志文件
         if not isinstance(content, Progress):
@@ -351,23 +442,19 @@ class StaticRichHandler:
         self._update_display()
     
     def _update_display(self):
-        """更新显示"""
+        """更新显示，只重建内容发生变化的面板"""
         for name, config in self.panels.items():
             try:
-                # 获取面板内容
-                content = config["content"]
-                
-                # 如果内容是Progress对象，需要特殊处理
-                if isinstance(content, Progress):
-                    # 创建一个临时的控制台来捕获进度条的渲染输出
-                    temp_console = Console(force_terminal=True, width=self.console.width - 4)
-                    with temp_console.capture() as capture:
-                        with content:
-                            content.refresh()
-                    # 使用捕获的输出作为面板内容
-                    content = Text.from_ansi(capture.get())
-                elif not isinstance(content, Text):
-                    content = Text(str(content))
+                if config["progress"] is not None:
+                    # 进度条每次都需要重新渲染，之后切回文本时需要重新放置缓冲区
+                    content = _render_progress(config["progress"], self.console.width - 4)
+                    config["placed"] = False
+                elif config["placed"]:
+                    # 缓冲区已在布局中，内容变化会在下次刷新时自动体现
+                    continue
+                else:
+                    content = config["buffer"]
+                    config["placed"] = True
                 
                 # 获取标题样式
                 title_style = self.style_config.get("title_style", "white")
@@ -390,7 +477,7 @@ class StaticRichHandler:
             except Exception as e:
                 # 使用update面板显示错误，而不是print
                 if "update" in self.panels:
-                    self.panels["update"]["content"] = Text(f"❌ 更新面板 {name} 时出错: {str(e)}", style="red")
+                    self.panels["update"]["buffer"].set(Text(f"❌ 更新面板 {name} 时出错: {str(e)}", style="red"))
                 
     def update_display(self):
         """更新显示内容的公共接口"""
@@ -466,6 +553,10 @@ class RichProgressHandler(StaticRichHandler):
         self.process_log_lines = deque(maxlen=1)
         self.update_log_lines = deque(maxlen=100)
         self.status_log_lines = deque(maxlen=1)
+        # 日志队列变化计数，update_display 据此跳过未变化的面板
+        self._log_version = 0
+        self._rendered_log_version = -1
+        self._pending_update_logs = 0  # 尚未追加到 update 面板的日志条数
         
         # 初始化统计信息
         self.stats = {
@@ -501,12 +592,9 @@ class RichProgressHandler(StaticRichHandler):
         
         # 处理每个面板配置
         for name, config in self.layout_config.items():
-            # 创建面板配置
-            self.panels[name] = {
-                "title": config.get("title", name),
-                "content": Text(""),
-                "style": config.get("style", "blue")
-            }
+            # 创建面板配置（重建布局时保留已有内容）
+            self.panels[name] = _new_panel_state(config.get("title", name), config, self.panels.get(name))
+            self.panels[name]["style"] = config.get("style", "blue")
             
             # 创建布局配置
             if "ratio" in config:
@@ -530,14 +618,15 @@ class RichProgressHandler(StaticRichHandler):
             self._setup_layout()  # 重新设置布局
         
         if name in self.panels:
-            if append and isinstance(content, (str, Text)):
-                old_content = self.panels[name]["content"]
-                if isinstance(old_content, Text):
-                    old_content.append("\n" + str(content))
-                else:
-                    self.panels[name]["content"] = Text(str(old_content) + "\n" + str(content))
+            panel = self.panels[name]
+            if isinstance(content, Progress):
+                panel["progress"] = content
             else:
-                self.panels[name]["content"] = content if isinstance(content, Text) else Text(str(content))
+                panel["progress"] = None
+                if append and isinstance(content, (str, Text)):
+                    panel["buffer"].append(content)
+                else:
+                    panel["buffer"].set(content if isinstance(content, Text) else Text(str(content)))
             
             # 记录到日志文件
             if not isinstance(content, Progress):
@@ -546,20 +635,19 @@ class RichProgressHandler(StaticRichHandler):
             self._update_display()
 
     def _update_display(self):
-        """更新显示"""
+        """更新显示，只重建内容发生变化的面板"""
         for name, config in self.panels.items():
             try:
-                content = config["content"]
-                
-                # 处理进度条内容
-                if isinstance(content, Progress):
-                    temp_console = Console(force_terminal=True, width=self.console.width - 4)
-                    with temp_console.capture() as capture:
-                        with content:
-                            content.refresh()
-                    content = Text.from_ansi(capture.get())
-                elif not isinstance(content, Text):
-                    content = Text(str(content))
+                if config["progress"] is not None:
+                    # 进度条每次都需要重新渲染，之后切回文本时需要重新放置缓冲区
+                    content = _render_progress(config["progress"], self.console.width - 4)
+                    config["placed"] = False
+                elif config["placed"]:
+                    # 缓冲区已在布局中，内容变化会在下次刷新时自动体现
+                    continue
+                else:
+                    content = config["buffer"]
+                    config["placed"] = True
                 
                 # 获取面板样式
                 panel_style = self.panels[name].get("style", "blue")
@@ -577,7 +665,7 @@ class RichProgressHandler(StaticRichHandler):
             except Exception as e:
                 # 使用update面板显示错误，而不是print
                 if "update" in self.panels:
-                    self.panels["update"]["content"] = Text(f"❌ 更新面板 {name} 时出错: {str(e)}", style="red")
+                    self.panels["update"]["buffer"].set(Text(f"❌ 更新面板 {name} 时出错: {str(e)}", style="red"))
                 
     def _setup_progress(self, format_config=None):
         """设置进度条格式"""
@@ -672,21 +760,25 @@ class RichProgressHandler(StaticRichHandler):
         
         self.update_panel("current_progress", progress_text)
         
+        if self._rendered_log_version == self._log_version:
+            return
+        self._rendered_log_version = self._log_version
+        
         # 更新处理状态
         combined_logs = list(self.status_log_lines) + list(self.process_log_lines)
         if combined_logs:
-            process_log_content = Text(combined_logs[-1])
+            last_log = combined_logs[-1]
+            process_log_content = last_log if isinstance(last_log, Text) else Text(str(last_log))
         else:
             process_log_content = Text("")
         self.update_panel("process", process_log_content)
         
-        # 更新日志区域
-        update_log_text = Text()
-        for i, log in enumerate(self.update_log_lines):
-            if i > 0:
-                update_log_text.append("\n")
-            update_log_text.append(log)
-        self.update_panel("update", update_log_text)
+        # 更新日志区域：只追加新增的日志，不再每次重建全部内容
+        pending = min(self._pending_update_logs, len(self.update_log_lines))
+        self._pending_update_logs = 0
+        if pending:
+            for log in list(self.update_log_lines)[-pending:]:
+                self.update_panel("update", log, append=True)
 
     def add_log(self, message, log_type="process"):
         """根据消息类型添加日志到相应区域"""
@@ -719,15 +811,19 @@ class RichProgressHandler(StaticRichHandler):
         elif "❌" in str(message) or log_type == "error":
             self.stats["error"] += 1
             self.update_log_lines.append(formatted_message)
+            self._pending_update_logs += 1
         elif "⚠️" in str(message) or log_type == "warning":
             self.stats["warning"] += 1
             self.update_log_lines.append(formatted_message)
+            self._pending_update_logs += 1
         else:
             self.update_log_lines.append(formatted_message)
+            self._pending_update_logs += 1
             
         if log_type != "system":
             self.stats["processed"] += 1
         
+        self._log_version += 1
         self.update_display()
 
     def _preprocess_message(self, message):
@@ -776,8 +872,7 @@ class DynamicRichHandler:
     def add_panel(self, name: str, title: str = None, ratio: int = 1):
         """添加新panel"""
         self.panels[name] = {
-            "title": title or name,
-            "content": Text(""),
+            **_new_panel_state(title or name, {}, self.panels.get(name)),
             "ratio": ratio,
             "style": "blue",  # 默认样式
             "input_buffer": "",
@@ -797,9 +892,10 @@ class DynamicRichHandler:
         if name not in self.panels:
             return
             
-        # 处理样式
+        # 处理样式（边框样式变化时需要重新放置面板）
         if style:
             self.panels[name]["style"] = style
+            self.panels[name]["placed"] = False
             
         # 创建带样式的Text对象
         if isinstance(content, str):
@@ -807,14 +903,15 @@ class DynamicRichHandler:
         elif isinstance(content, Text) and style:
             content.style = style
             
-        if append and isinstance(content, (str, Text)):
-            old_content = self.panels[name]["content"]
-            if isinstance(old_content, Text):
-                old_content.append("\n" + str(content))
-            else:
-                self.panels[name]["content"] = Text(str(old_content) + "\n" + str(content))
+        panel = self.panels[name]
+        if isinstance(content, Progress):
+            panel["progress"] = content
         else:
-            self.panels[name]["content"] = content
+            panel["progress"] = None
+            if append and isinstance(content, (str, Text)):
+                panel["buffer"].append(content)
+            else:
+                panel["buffer"].set(content)
         
         # 记录到日志文件
         if not isinstance(content, Progress):
@@ -885,20 +982,32 @@ class DynamicRichHandler:
         layouts = []
         for name, config in self.panels.items():
             layouts.append(Layout(name=name, ratio=config["ratio"]))
+            config["placed"] = False  # 新布局需要重新填充所有面板
             
         self.layout.split(*layouts)
         self._update_display()
     
     def _update_display(self):
-        """更新显示"""
+        """更新显示，只重建内容发生变化的面板"""
         for name, config in self.panels.items():
             try:
+                if config["progress"] is not None:
+                    # 进度条每次都需要重新渲染，之后切回文本时需要重新放置缓冲区
+                    content = _render_progress(config["progress"], self.console.width - 4)
+                    config["placed"] = False
+                elif config["placed"]:
+                    # 缓冲区已在布局中，内容变化会在下次刷新时自动体现
+                    continue
+                else:
+                    content = config["buffer"]
+                    config["placed"] = True
+                
                 # 获取标题样式
                 title = f"[white bold]{config['title']}[/]"
                 
                 self.layout[name].update(
                     Panel(
-                        config["content"],
+                        content,
                         title=title,
                         border_style=config.get("style", "blue"),
                         box=box.ROUNDED,
@@ -907,7 +1016,7 @@ class DynamicRichHandler:
                 )
             except Exception as e:
                 if "update" in self.panels:
-                    self.panels["update"]["content"] = Text(f"❌ 更新面板 {name} 时出错: {str(e)}", style="red")
+                    self.panels["update"]["buffer"].set(Text(f"❌ 更新面板 {name} 时出错: {str(e)}", style="red"))
     
     def __enter__(self):
         """进入上下文管理器"""
@@ -0,0 +1,94 @@
+"""
+RichLogger 长时间运行内存/延迟基准
+
+用合成日志流模拟 --hours 小时的运行（按 --rate 条/秒 计算总条数，不实际等待），
+覆盖去重脚本的典型用法：追加日志、整块替换、add_log 分类日志和进度任务。
+每模拟一小时输出一次：
+- tracemalloc 统计的 Python 堆内存（当前/峰值）
+- 各面板缓冲的行数与字节数
+- update_panel / add_log 调用延迟的平均值和 P99（含每 --render-every 条一次的整屏渲染）
+
+面板内存应在缓冲填满后保持平稳，不随运行时间增长。
+
+用法:
+    python nodes/tui/tests/bench_rich_logger_memory.py --hours 12 --rate 20
+"""
+
+import io
+import os
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+from rich.console import Console
+from nodes.tui.rich_logger import RichProgressHandler
+
+LAYOUT = {
+    "current_stats": {"size": 2, "title": "📊 总体进度", "style": "blue"},
+    "current_progress": {"size": 2, "title": "🔄 当前进度", "style": "green"},
+    "process": {"size": 3, "title": "📝 处理日志", "style": "cyan"},
+    "update": {"size": 3, "title": "ℹ️ 更新日志", "style": "magenta"},
+    "hash_calc": {"size": 3, "title": "🔢 哈希计算", "style": "yellow"},
+}
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RichLogger 长时间运行内存/延迟基准')
+    parser.add_argument('--hours', type=float, default=12, help='模拟运行小时数')
+    parser.add_argument('--rate', type=float, default=20, help='每秒日志条数')
+    parser.add_argument('--render-every', type=int, default=50, help='每多少条日志渲染一次整屏')
+    parser.add_argument('--log-dir', default=os.path.join(os.getcwd(), 'logs'), help='文件日志目录')
+    args = parser.parse_args()
+
+    handler = RichProgressHandler(layout_config=dict(LAYOUT), log_dir=args.log_dir)
+    # 渲染到内存中的控制台，不占用终端
+    handler.console = Console(file=io.StringIO(), width=160, force_terminal=True)
+    task_id = handler.create_progress_task(1000, "处理压缩包")
+
+    per_hour = int(args.rate * 3600)
+    tracemalloc.start()
+    rng = random.Random(0)
+    print(f"{'小时':>4} | {'当前堆':>10} | {'峰值堆':>10} | {'缓冲字节':>10} | {'平均延迟':>10} | {'P99延迟':>10}")
+    for hour in range(1, int(args.hours) + 1):
+        latencies = []
+        for i in range(per_hour):
+            n = hour * per_hour + i
+            path = f"E:\\1EHV\\[作者{n % 500}] 作品标题 第{n % 37}卷\\page_{n % 300:04d}.jpg"
+            start = time.perf_counter()
+            kind = rng.random()
+            if kind < 0.5:
+                handler.update_panel("hash_calc", f"计算哈希 {path}", append=True)
+            elif kind < 0.8:
+                handler.add_log(f"✅ 处理完成 {path}" if kind < 0.7 else f"⚠️ 跳过 {path}")
+            elif kind < 0.95:
+                handler.update_panel("current_stats", f"已处理 {n} 个文件")
+            else:
+                handler.progress.update(task_id, completed=n % 1000)
+                handler.update_display()
+            if i % args.render_every == 0:
+                # 模拟 Live 刷新，把渲染成本计入延迟
+                handler.console.print(handler.layout)
+                handler.console.file.seek(0)
+                handler.console.file.truncate()
+            latencies.append(time.perf_counter() - start)
+
+        current, peak = tracemalloc.get_traced_memory()
+        buffered = sum(panel["buffer"].total_bytes for panel in handler.panels.values())
+        mean = sum(latencies) / len(latencies)
+        print(f"{hour:>4} | {current / 1024 / 1024:>8.1f}MB | {peak / 1024 / 1024:>8.1f}MB | "
+              f"{buffered / 1024:>8.1f}KB | {mean * 1e6:>8.1f}µs | {percentile(latencies, 99) * 1e6:>8.1f}µs")
+
+    tracemalloc.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+TextualLogHandler 生产者侧开销微基准
+
+对比两种方式下，产生日志的工作线程每条记录花费的时间：
+- 同步: 在调用线程中完成格式化、标签解析、截断并更新面板（旧实现的路径）
+- 入队: 新的 emit 快速路径，只做前缀判断后入队
+
+用法:
+    python nodes/tui/tests/bench_textual_log_handler.py --records 200000
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+from nodes.tui.textual_logger import TextualLogHandler
+
+
+class FakeApp:
+    """只统计更新次数的假应用，避免把 Textual 渲染算进生产者开销"""
+    console = None
+
+    def __init__(self):
+        self.updates = 0
+
+    def update_panel(self, name, content):
+        self.updates += 1
+
+
+def make_records(count: int):
+    """构造与去重脚本相近的日志：每张图片数条 [#...] 消息加进度条"""
+    long_path = "E:\\1EHV\\[作者名] 很长的作品标题 (C100) [中国翻訳] [DL版]\\page_0001.jpg"
+    templates = [
+        ("[#hash_calc]计算哈希: %s" % long_path, logging.INFO),
+        ("[#process]✅ 处理完成: page_0001.avif", logging.INFO),
+        ("[@current_progress]处理图片 (%d/%d) %.1f%%", logging.INFO),
+        ("[#update]⚠️ 跳过重复图片: %s" % long_path, logging.WARNING),
+        ("普通调试消息不进入面板", logging.DEBUG),
+    ]
+    records = []
+    for i in range(count):
+        msg, level = templates[i % len(templates)]
+        if '%d' in msg:
+            msg = msg % (i, count, i * 100.0 / count)
+        records.append(logging.makeLogRecord({'msg': msg, 'levelno': level, 'args': None}))
+    return records
+
+
+def bench_sync(handler: TextualLogHandler, records) -> float:
+    start = time.perf_counter()
+    for record in records:
+        parsed = handler._parse_record(record)
+        if parsed:
+            handler.app.update_panel(parsed[0], parsed[1])
+    return time.perf_counter() - start
+
+
+def bench_queued(handler: TextualLogHandler, records) -> float:
+    start = time.perf_counter()
+    for record in records:
+        handler.emit(record)
+    elapsed = time.perf_counter() - start
+    handler.flush(timeout=30)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='TextualLogHandler 生产者侧开销基准')
+    parser.add_argument('--records', type=int, default=200000, help='日志记录数')
+    parser.add_argument('--truncate', action='store_true', help='启用路径截断')
+    args = parser.parse_args()
+
+    records = make_records(args.records)
+    results = {}
+    for name, func in (("同步", bench_sync), ("入队", bench_queued)):
+        app = FakeApp()
+        handler = TextualLogHandler(app)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        handler.set_truncate(args.truncate)
+        elapsed = func(handler, records)
+        handler.close()
+        results[name] = elapsed
+        print(f"{name}: 总计 {elapsed:.3f}s | 每条 {elapsed / len(records) * 1e6:.2f}µs | "
+              f"面板更新 {app.updates} 次")
+
+    print(f"生产者侧加速: {results['同步'] / results['入队']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Textual 日志界面压力测试
+
+多个生产者线程以合计 --rate 条/秒 的速度向 12 个面板写日志（含进度条），
+持续 --duration 秒后退出界面并输出：
+- 生产者实际达到的速率（日志调用是否被界面反压）
+- 渲染循环的帧数、面板重绘次数、应用的更新数和丢弃数
+
+用法:
+    python nodes/tui/tests/stress_textual_render.py --rate 50000 --duration 20
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+from nodes.tui.textual_logger import TextualLoggerManager, TextualLogHandler
+
+PANELS = [f"panel{i:02d}" for i in range(12)]
+LAYOUT = {name: {"ratio": 1, "title": name, "style": "lightblue"} for name in PANELS}
+
+
+def producer(index: int, rate: float, duration: float, counter: list):
+    """按固定速率发送日志，每 10ms 一批"""
+    logger = logging.getLogger()
+    batch = max(1, int(rate / 100))
+    sent = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        for _ in range(batch):
+            panel = PANELS[(index + sent) % len(PANELS)]
+            if sent % 5 == 0:
+                logger.info(f"[@{panel}]任务{index} ({sent % 100}/100) {sent % 100}%")
+            else:
+                logger.info(f"[#{panel}]线程{index} 处理第 {sent} 条消息 E:\\data\\archive_{sent}.zip")
+            sent += 1
+        target = start + sent / rate
+        delay = target - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    counter[index] = sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Textual 日志界面压力测试')
+    parser.add_argument('--rate', type=int, default=50000, help='合计每秒日志条数')
+    parser.add_argument('--duration', type=float, default=20, help='持续秒数')
+    parser.add_argument('--threads', type=int, default=8, help='生产者线程数')
+    args = parser.parse_args()
+
+    app = TextualLoggerManager.set_layout(LAYOUT)
+    counter = [0] * args.threads
+    threads = [
+        threading.Thread(target=producer, args=(i, args.rate / args.threads, args.duration, counter))
+        for i in range(args.threads)
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    produce_time = time.perf_counter() - start
+
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, TextualLogHandler):
+            handler.flush(timeout=10)
+    time.sleep(0.5)  # 等待最后一帧
+    stats = dict(app.render_stats)
+    app.call_from_thread(app.exit)
+    time.sleep(0.5)
+
+    total = sum(counter)
+    print(f"生产: {total} 条 / {produce_time:.1f}s = {total / produce_time:.0f} 条/秒 (目标 {args.rate})")
+    print(f"渲染: {stats['frames']} 帧 ({stats['frames'] / produce_time:.1f} fps) | "
+          f"面板重绘 {stats['panel_renders']} 次 | 应用更新 {stats['updates']} | 丢弃 {stats['dropped']}")
+
+
+if __name__ == '__main__':
+    main()
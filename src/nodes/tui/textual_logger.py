@@ -71,8 +71,22 @@ import sys
 import signal
 import psutil
 import re
+import queue
+from collections import deque
+from itertools import islice
 from dataclasses import dataclass, field
 
+# 预编译的日志解析正则，避免每条记录重复查找缓存
+_PANEL_TAG_PREFIXES = ('[#', '[@')
+_PANEL_TAG_PATTERN = re.compile(r'^\[([#@])(\w{2,})\](.*)$')
+_PATH_PATTERN = re.compile(r'([A-Za-z]:\\[^\s]+|/([^\s/]+/){2,}[^\s/]+|\S+\.[a-zA-Z0-9]+)')
+_BRACKET_PATTERN = re.compile(r'(.*?)(\[.*?\])(.*?)$')
+_NUMBER_TAIL_PATTERN = re.compile(r'(\d+\.?\d*%?|\(\d+/\d+\))[^\d]*$')
+# 去掉进度条尾部的分数和百分比，得到用于合并同一进度条的键
+_PROGRESS_TAIL_PATTERN = re.compile(r'[\s\d/.%()\[\]]*$')
+# 普通消息合并时去掉开头的图标/标记
+_LEADING_TOKEN_PATTERN = re.compile(r'^(\S+\s+)')
+
 @dataclass
 class CPUInfo:
     usage: float = 0.0  # 仅保留CPU使用率
@@ -164,13 +178,19 @@ class TextualLogHandler(logging.Handler):
     def __init__(self, app, log_file=None):
         super().__init__()
         self.app = app
-        self.path_regex = re.compile(r'([A-Za-z]:\\[^\s]+|/([^\s/]+/){2,}[^\s/]+|\S+\.[a-zA-Z0-9]+)')
+        self.path_regex = _PATH_PATTERN
         self.max_msg_length = 80
         self.max_filename_length = 40
         self.enable_truncate = False
         self.log_file = log_file
         self.last_position = 0
         self._file_check_timer = None
+        self.frame_interval = 0.05  # 同一帧内的更新合并后再下发
+        self._queue = queue.SimpleQueue()
+        self._stop_event = threading.Event()
+        self._dispatching = False
+        self._consumer = threading.Thread(target=self._consume, name="TextualLogConsumer", daemon=True)
+        self._consumer.start()
 
     def _check_log_file(self):
         """检查日志文件更新"""
@@ -253,7 +273,7 @@ class TextualLogHandler(logging.Handler):
             base_length = max_length - ext_len - 3  # 3是...的长度
             if base_length > 0:
                 # 如果基础名称包含方括号，尝试保留方括号内的内容
-                bracket_match = re.match(r'(.*?)(\[.*?\])(.*?)$', base)
+                bracket_match = _BRACKET_PATTERN.match(base)
                 if bracket_match:
                     prefix, brackets, suffix = bracket_match.groups()
                     if len(brackets) + ext_len + 6 <= max_length:  # 包括...和可能的连接符
@@ -271,139 +291,168 @@ class TextualLogHandler(logging.Handler):
         return f"{path[:max_length-3]}..."
 
     def emit(self, record):
-        """处理日志记录"""
-        try:
-            msg = self.format(record)
-            
-            # 检查是否包含面板标识符
-            if not (msg.startswith('[#') or msg.startswith('[@')):
-                return  # 如果没有面板标识符，直接返回不处理
-            
-            # 检查是否是真正的进度条（同时包含@和%）
-            is_real_progress = '@' in msg and '%' in msg
-            
-            # 提取面板标签
-            progress_match = re.match(r'^\[@(\w{2,})\](.*)$', msg)
-            normal_match = re.match(r'^\[#(\w{2,})\](.*)$', msg)
-            
-            # 获取标签和内容
-            panel_name = None
-            content = msg
-            tag = ""
-            
-            if progress_match:
-                panel_name = progress_match.group(1)
-                content = progress_match.group(2).strip()
-                tag = f"[@{panel_name}]"
-            elif normal_match:
-                panel_name = normal_match.group(1)
-                content = normal_match.group(2).strip()
-                tag = f"[#{panel_name}]"
+        """生产者侧快速路径
+        
+        只做一次前缀判断就入队，格式化、标签解析和截断都放到消费线程中，
+        不再占用产生日志的工作线程。
+        """
+        msg = record.msg
+        if isinstance(msg, str):
+            if not msg.startswith(_PANEL_TAG_PREFIXES):
+                return  # 没有面板标识符的消息不处理
+            if record.args:
+                # 参数可能在之后被修改，入队前先固化消息
+                record.msg = record.getMessage()
+                record.args = None
+        self._queue.put(record)
+
+    def _consume(self):
+        """消费线程：按帧收集日志记录，合并后统一更新面板"""
+        while not (self._stop_event.is_set() and self._queue.empty()):
+            try:
+                record = self._queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            self._dispatching = True
+            try:
+                batch = [record]
+                deadline = time.monotonic() + self.frame_interval
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                self._dispatch(batch)
+            finally:
+                self._dispatching = False
+
+    def _dispatch(self, batch):
+        """解析一帧内的记录，同一面板同一进度条的多次更新只保留最后一次"""
+        updates = {}
+        for index, record in enumerate(batch):
+            try:
+                parsed = self._parse_record(record)
+            except Exception:
+                self.handleError(record)
+                continue
+            if parsed is None:
+                continue
+            panel_name, content, is_progress = parsed
+            if is_progress:
+                # 字典保持首次出现的位置，值更新为最新进度
+                key = (panel_name, _PROGRESS_TAIL_PATTERN.sub('', content))
             else:
-                return  # 如果无法匹配面板标识符，直接返回不处理
-            
-            # 只在启用截断时进行处理
-            if self.enable_truncate:
-                # 获取终端宽度
-                try:
-                    terminal_width = self.app.console.width if self.app and self.app.console else 80
-                except:
-                    terminal_width = 80
-                    
-                # 调整最大消息长度为终端宽度
-                self.max_msg_length = max(terminal_width - 2, 40)  # 预留2个字符的边距
-                
-                # 处理消息截断
-                if len(content) > self.max_msg_length - len(tag):
-                    # 查找所有需要截断的路径
-                    matches = list(self.path_regex.finditer(content))
-                    if not matches:
-                        # 如果没有找到文件名或路径，保留开头和结尾的重要信息
-                        available_length = self.max_msg_length - len(tag) - 5  # 5是...和空格的长度
-                        if available_length > 20:  # 确保有足够空间显示
-                            # 分配60%给前部分，40%给后部分
-                            front_length = int(available_length * 0.6)
-                            back_length = available_length - front_length
-                            content = f"{content[:front_length]}...{content[-back_length:]}"
-                        else:
-                            # 空间不足时只显示开头部分
-                            content = f"{content[:self.max_msg_length-len(tag)-3]}..."
-                    else:
-                        truncated_content = content
-                        offset = 0
-                        
-                        # 处理所有匹配项
-                        for match in matches:
-                            start = match.start() - offset
-                            end = match.end() - offset
-                            original = match.group()
-                            
-                            # 计算当前位置的可用长度
-                            remaining_space = self.max_msg_length - len(tag)
-                            if remaining_space < 10:  # 空间不足
-                                remaining_space = self.max_msg_length  # 忽略标签长度以确保显示内容
-                                
-                            # 为文件名保留合理空间
-                            file_space = min(remaining_space // 2, self.max_filename_length)
-                            truncated = self._truncate_path(original, file_space)
-                            
-                            # 确保截断后的内容不会完全消失
-                            if not truncated or len(truncated) < 5:  # 如果截断后太短
-                                truncated = f"...{original[-10:]}"  # 至少保留最后10个字符
-                                
-                            if truncated != original:
-                                truncated_content = truncated_content[:start] + truncated + truncated_content[end:]
-                                offset += len(original) - len(truncated)
-                        
-                        content = truncated_content
-                        
-                        # 如果内容仍然太长，保留重要信息
-                        if len(content) > self.max_msg_length - len(tag):
-                            # 查找最后的数字信息（如：89.5）
-                            number_match = re.search(r'(\d+\.?\d*%?|\(\d+/\d+\))[^\d]*$', content)
-                            if number_match:
-                                # 保留开头部分和结尾的数字信息
-                                end_part = content[number_match.start():]
-                                available_length = self.max_msg_length - len(tag) - len(end_part) - 3
-                                if available_length > 10:
-                                    content = f"{content[:available_length]}...{end_part}"
-                                else:
-                                    # 空间实在不足时
-                                    content = f"{content[:self.max_msg_length-len(tag)-10]}...{end_part[-7:]}"
-                            else:
-                                # 如果没有数字信息，保留开头部分
-                                content = f"{content[:self.max_msg_length-len(tag)-3]}..."
-            
-            # 重新组合消息
-            final_msg = f"{tag}{content}" if tag else content
-            
-            # 根据消息类型更新面板
-            if progress_match and is_real_progress:
-                # 真正的进度条
-                self.app.update_panel(panel_name, content)
-            elif progress_match and not is_real_progress:
-                # 错误使用@的面板，转为普通面板处理
-                if record.levelno >= logging.ERROR:
-                    content = f"❌ {content}"
-                elif record.levelno >= logging.WARNING:
-                    content = f"⚠️ {content}"
-                self.app.update_panel(panel_name, content)
-            elif normal_match:
-                if record.levelno >= logging.ERROR:
-                    content = f"❌ {content}"
-                elif record.levelno >= logging.WARNING:
-                    content = f"⚠️ {content}"
+                key = index
+            updates[key] = (panel_name, content)
+        
+        for panel_name, content in updates.values():
+            try:
                 self.app.update_panel(panel_name, content)
-            else:
-                if record.levelno >= logging.ERROR:
-                    self.app.update_panel("update", f"❌ {final_msg}")
-                elif record.levelno >= logging.WARNING:
-                    self.app.update_panel("update", f"⚠️ {final_msg}")
+            except Exception as e:
+                print(f"Error updating panel: {e}")
+
+    def _parse_record(self, record):
+        """解析日志记录，返回 (面板名, 内容, 是否进度条)，无法识别时返回 None"""
+        msg = self.format(record)
+        match = _PANEL_TAG_PATTERN.match(msg)
+        if not match:
+            return None  # 如果无法匹配面板标识符，直接返回不处理
+        
+        marker, panel_name, content = match.groups()
+        content = content.strip()
+        # 检查是否是真正的进度条（同时包含@和%）
+        is_progress = marker == '@' and '%' in content
+        
+        # 只在启用截断时进行处理
+        if self.enable_truncate:
+            content = self._truncate_content(f"[{marker}{panel_name}]", content)
+        
+        if not is_progress:
+            if record.levelno >= logging.ERROR:
+                content = f"❌ {content}"
+            elif record.levelno >= logging.WARNING:
+                content = f"⚠️ {content}"
+        return panel_name, content, is_progress
+
+    def _truncate_content(self, tag: str, content: str) -> str:
+        """按终端宽度截断消息，优先截断其中的路径"""
+        # 获取终端宽度
+        try:
+            terminal_width = self.app.console.width if self.app and self.app.console else 80
+        except:
+            terminal_width = 80
+            
+        # 调整最大消息长度为终端宽度
+        self.max_msg_length = max(terminal_width - 2, 40)  # 预留2个字符的边距
+        limit = self.max_msg_length - len(tag)
+        if len(content) <= limit:
+            return content
+        
+        # 查找所有需要截断的路径
+        matches = list(self.path_regex.finditer(content))
+        if not matches:
+            # 如果没有找到文件名或路径，保留开头和结尾的重要信息
+            available_length = limit - 5  # 5是...和空格的长度
+            if available_length > 20:  # 确保有足够空间显示
+                # 分配60%给前部分，40%给后部分
+                front_length = int(available_length * 0.6)
+                back_length = available_length - front_length
+                return f"{content[:front_length]}...{content[-back_length:]}"
+            # 空间不足时只显示开头部分
+            return f"{content[:limit-3]}..."
+        
+        # 为文件名保留合理空间
+        remaining_space = limit if limit >= 10 else self.max_msg_length
+        file_space = min(remaining_space // 2, self.max_filename_length)
+        
+        # 一次拼接所有片段，避免每个匹配都重新切片整条消息
+        parts = []
+        last_end = 0
+        for match in matches:
+            original = match.group()
+            truncated = self._truncate_path(original, file_space)
+            # 确保截断后的内容不会完全消失
+            if not truncated or len(truncated) < 5:
+                truncated = f"...{original[-10:]}"  # 至少保留最后10个字符
+            parts.append(content[last_end:match.start()])
+            parts.append(truncated)
+            last_end = match.end()
+        parts.append(content[last_end:])
+        content = ''.join(parts)
+        
+        # 如果内容仍然太长，保留重要信息
+        if len(content) > limit:
+            # 查找最后的数字信息（如：89.5）
+            number_match = _NUMBER_TAIL_PATTERN.search(content)
+            if number_match:
+                # 保留开头部分和结尾的数字信息
+                end_part = content[number_match.start():]
+                available_length = limit - len(end_part) - 3
+                if available_length > 10:
+                    content = f"{content[:available_length]}...{end_part}"
                 else:
-                    self.app.update_panel("update", final_msg)
-                
-        except Exception as e:
-            self.handleError(record)
+                    # 空间实在不足时
+                    content = f"{content[:limit-10]}...{end_part[-7:]}"
+            else:
+                # 如果没有数字信息，保留开头部分
+                content = f"{content[:limit-3]}..."
+        return content
+
+    def flush(self, timeout: float = 1.0):
+        """等待队列中的记录全部下发"""
+        deadline = time.monotonic() + timeout
+        while (not self._queue.empty() or self._dispatching) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def close(self):
+        """停止消费线程，剩余记录会在退出前处理完"""
+        self._stop_event.set()
+        if self._consumer.is_alive() and self._consumer is not threading.current_thread():
+            self._consumer.join(timeout=1.0)
+        super().close()
 
     def _handle_progress_message(self, panel_name: str, content: str):
         """专用进度条处理（无图标添加）"""
@@ -427,9 +476,11 @@ class TextualLogHandler(logging.Handler):
             self.app.update_panel("update", msg)
 
 class LogPanel(Static):
-    """自定义日志面板组件，支持固定行数显示和进度条"""
+    """自定义日志面板组件，支持固定行数显示和进度条
     
-    content = reactive(list)
+    面板本身不再持有刷新定时器，append 只更新环形缓冲并标记为脏，
+    由 TextualLogger 的统一渲染循环按帧重绘。
+    """
     
     def __init__(self, name: str, title: str, style: str = "white", ratio: int = 1, **kwargs):
         super().__init__(**kwargs)
@@ -437,8 +488,10 @@ class LogPanel(Static):
         self.title = title
         self.base_style = style
         self.ratio = ratio
-        self.content = []
         self.max_lines = 100  # 设置最大缓存行数
+        # 不能命名为 content：会走 Textual Static.content 的属性 setter 而报错
+        self._lines = deque(maxlen=self.max_lines)  # 环形缓冲，O(1) 追加并自动丢弃最旧行
+        self.dirty = False
         self._cached_size = None
         self._cached_visible_lines = None
         self._cached_panel_height = None
@@ -471,31 +524,22 @@ class LogPanel(Static):
         return self._escape_markup(f"{progress_bar} {percentage:.1f}%")
 
     def append(self, text: str) -> None:
-        """追加内容并保持在最大行数限制内"""
+        """追加内容并标记面板需要重绘（实际渲染由统一渲染循环完成）"""
         # 检查是否是进度条更新
         if self._is_progress_message(text):
             self._handle_progress_message(text)
         else:
             self._handle_normal_message(text)
-            
-        # 更新显示
-        self._update_display()
-        
-        # 无论是否有进度条，都确保面板定期刷新
-        if not hasattr(self, '_refresh_timer'):
-            self._refresh_timer = self.set_interval(0.1, self._periodic_refresh)
-            
-        self.scroll_end()
+        self.dirty = True
 
-    def _periodic_refresh(self) -> None:
-        """定期刷新面板内容"""
+    def render_if_dirty(self) -> bool:
+        """仅在内容变化时重绘，返回是否重绘"""
+        if not self.dirty:
+            return False
+        self.dirty = False
         self._update_display()
-        self.refresh()
-
-    def on_unmount(self) -> None:
-        """组件卸载时清理定时器"""
-        if hasattr(self, '_refresh_timer'):
-            self._refresh_timer.stop()
+        self.scroll_end()
+        return True
 
     def _is_progress_message(self, text: str) -> bool:
         """检查是否为进度条消息"""
@@ -596,24 +640,20 @@ class LogPanel(Static):
 
     def _handle_normal_message(self, text: str) -> None:
         """处理普通消息"""
-        cleaned_msg = re.sub(r'^(\S+\s+)', '', text)
+        cleaned_msg = _LEADING_TOKEN_PATTERN.sub('', text)
         start_part = cleaned_msg[:4]
 
-        if self.content and len(start_part) >= 4:
-            last_msg = self.content[-1]
-            last_cleaned = re.sub(r'^(\S+\s+)', '', last_msg)
+        if self._lines and len(start_part) >= 4:
+            last_msg = self._lines[-1]
+            last_cleaned = _LEADING_TOKEN_PATTERN.sub('', last_msg)
             last_start = last_cleaned[:4]
 
             if start_part == last_start:
-                self.content[-1] = text  # 合并相似消息
+                self._lines[-1] = text  # 合并相似消息
             else:
-                self.content.append(text)
+                self._lines.append(text)
         else:
-            self.content.append(text)
-
-        # 保持内容在最大行数限制内
-        if len(self.content) > self.max_lines:
-            self.content = self.content[-self.max_lines:]
+            self._lines.append(text)
 
     def _update_display(self) -> None:
         """更新显示内容"""
@@ -664,7 +704,8 @@ class LogPanel(Static):
         remaining_lines = max(0, (self._cached_visible_lines or 1) - len(self.progress_positions))
         
         if remaining_lines > 0:
-            messages = list(reversed(self.content[-remaining_lines:]))
+            start = max(0, len(self._lines) - remaining_lines)
+            messages = list(reversed(list(islice(self._lines, start, None))))
             for msg in messages:
                 if self.app and self.app.console.width > 4:
                     content.append(f"- {self._escape_markup(msg)}")
@@ -712,11 +753,6 @@ class LogPanel(Static):
         self.border_subtitle = f"{self.panel_name}"
         super().update(content)
 
-    def on_mount(self) -> None:
-        """当组件被挂载时调用"""
-        # 设置定时刷新，用于进度条动画
-        self.set_interval(0.1, self.refresh)
-
 class SystemStatusFooter(Footer):
     """自定义底部状态栏"""
     
@@ -833,11 +869,16 @@ class TextualLogger(App):
         ("q", "quit", "退出")
     ]
     
+    MAX_FPS = 10  # 所有面板合计的最大重绘帧率
+    MAX_PENDING_UPDATES = 20000  # 待渲染更新的上限，超出时丢弃最旧的更新
+    
     def __init__(self, layout_config: Dict):
         super().__init__()
         self.layout_config = layout_config
         self.panels: Dict[str, LogPanel] = {}
-        self._pending_updates = []
+        # 任意线程写入、渲染循环读取；deque 的 append/popleft 是线程安全的
+        self._pending_updates = deque(maxlen=self.MAX_PENDING_UPDATES)
+        self.render_stats = {'frames': 0, 'panel_renders': 0, 'updates': 0, 'dropped': 0}
         self.theme = "tokyo-night"
         self.script_name = os.path.basename(sys.argv[0])
         self.start_time = datetime.now()
@@ -893,10 +934,8 @@ class TextualLogger(App):
         self.title = self.script_name
         self.set_interval(1, self.update_timer)
         
-        # 处理待处理的更新
-        for name, content in self._pending_updates:
-            self._do_update(name, content)
-        self._pending_updates.clear()
+        # 统一渲染循环，处理挂载前积压的更新
+        self.set_interval(1 / self.MAX_FPS, self._render_frame)
         
         # 初始化所有处理器的文件监控
         for handler in self._handlers:
@@ -928,30 +967,53 @@ class TextualLogger(App):
         return self.panels[name]
 
     def update_panel(self, name: str, content: str) -> None:
-        """更新或创建面板内容"""
-        if not self.is_mounted:
-            self._pending_updates.append((name, content))
-            return
-            
-        # 如果面板不存在，创建新面板
-        if name not in self.panels:
-            self.create_panel(name, {
-                "title": name,
-                "style": "cyan",  # 新面板默认使用青色
-                "ratio": 1  # 默认ratio为1
-            })
+        """更新或创建面板内容（可从任意线程调用，只入队不渲染）"""
+        if len(self._pending_updates) == self.MAX_PENDING_UPDATES:
+            self.render_stats['dropped'] += 1
+        self._pending_updates.append((name, content))
+
+    def _render_frame(self) -> None:
+        """渲染循环：应用本帧积压的更新，只重绘内容有变化的面板"""
+        pending = self._pending_updates
+        for _ in range(len(pending)):
+            name, content = pending.popleft()
+            # 如果面板不存在，创建新面板
+            if name not in self.panels:
+                self.create_panel(name, {
+                    "title": name,
+                    "style": "cyan",  # 新面板默认使用青色
+                    "ratio": 1  # 默认ratio为1
+                })
+                # 新面板会改变其余面板的高度
+                for panel in self.panels.values():
+                    panel.dirty = True
+            self._do_update(name, content)
         
-        self._do_update(name, content)
+        rendered = 0
+        for panel in self.panels.values():
+            try:
+                if panel.render_if_dirty():
+                    rendered += 1
+            except Exception as e:
+                print(f"Error rendering panel: {e}")
+        if rendered:
+            self.render_stats['frames'] += 1
+            self.render_stats['panel_renders'] += rendered
     
     def _do_update(self, name: str, content: str) -> None:
         """执行实际的更新操作"""
         try:
             if name in self.panels:
                 self.panels[name].append(content)
-                self.panels[name].scroll_end()
+                self.render_stats['updates'] += 1
         except Exception as e:
             print(f"Error updating panel: {e}")
 
+    def on_resize(self, event) -> None:
+        """终端尺寸变化时所有面板都需要按新尺寸重绘"""
+        for panel in self.panels.values():
+            panel.dirty = True
+
     def update_timer(self) -> None:
         """更新运行时间显示"""
         elapsed = datetime.now() - self.start_time
@@ -1,4 +1,5 @@
 import os
+import json
 import yaml
 import shutil
 import time
@@ -8,7 +9,7 @@ from typing import Dict, List, Optional, Union
 from dataclasses import dataclass, asdict
 from contextlib import contextmanager
 import threading
-from queue import Queue
+from queue import Empty, Queue
 import logging
 import sys
 import atexit
@@ -28,6 +29,8 @@ logging.basicConfig(
 
 logger = logging.getLogger('FileMonitor')
 
+_FLUSH = object()  # 队列中的刷新请求：后台线程收到后立即写入当前批次，不再等待攒批
+
 @dataclass
 class FileOperation:
     """文件操作记录类"""
@@ -97,9 +100,18 @@ class FileSystemChangeHandler(FileSystemEventHandler):
         pass
 
 class FileOperationMonitor:
-    """文件操作监控类"""
+    """文件操作监控类
+
+    操作记录追加写入日志文件（每行一个 JSON），后台线程批量写入并每批 fsync 一次，
+    需要读取历史时发送刷新请求立即写入，不等攒批间隔；撤销时追加一条撤销标记而不是重写整个历史。内存中只保留 操作ID -> 日志偏移 的索引
+    （全部与按脚本分组），按需从日志读取具体记录。
+    """
     _instance = None
     _lock = threading.Lock()
+
+    JOURNAL_BATCH = 500          # 每批最多写入的记录数
+    JOURNAL_BATCH_DELAY = 0.2    # 每批最多等待的时间（秒），即 fsync 的最小间隔
+    COMPACT_MIN_DEAD = 1000      # 启动时撤销标记超过该数量且多于有效记录时压缩日志
     
     def __new__(cls):
         """单例模式实现"""
@@ -112,14 +124,20 @@ class FileOperationMonitor:
     def __init__(self):
         """初始化监控器"""
         if not hasattr(self, 'initialized'):
-            self.operations: List[FileOperation] = []
             self.backup_dir = Path('file_operations_backup')
             self.history_file = Path('file_operations_history.yaml')
+            self.journal_file = Path('file_operations_journal.jsonl')
             self.operation_queue = Queue()
             self.backup_dir.mkdir(exist_ok=True)
             self.observer = None
             self.event_handler = None
+            self._index_lock = threading.RLock()
+            self._live: Dict[str, int] = {}                  # 操作ID -> 日志偏移（按记录顺序）
+            self._by_script: Dict[str, Dict[str, int]] = {}  # 脚本名 -> {操作ID: 日志偏移}
+            self._sequence = 0
+            self._reader = None
             self._load_history()
+            self._journal = open(self.journal_file, 'ab')
             self.initialized = True
             
             # 启动异步保存线程
@@ -135,46 +153,158 @@ class FileOperationMonitor:
             self.observer.stop()
             self.observer.join()
         self._save_history()  # 确保保存最新的操作历史
+
+    # ========== 操作日志 ==========
+
+    def _index_add(self, operation_id: str, script_name: Optional[str], offset: int):
+        self._live[operation_id] = offset
+        self._by_script.setdefault(script_name or '', {})[operation_id] = offset
+
+    def _index_remove(self, operation_id: str, script_name: Optional[str]):
+        self._live.pop(operation_id, None)
+        script_ops = self._by_script.get(script_name or '')
+        if script_ops is not None:
+            script_ops.pop(operation_id, None)
+            if not script_ops:
+                del self._by_script[script_name or '']
+
+    def _scan_journal(self):
+        """从日志重建索引，返回撤销标记数量"""
+        dead = 0
+        truncate_at = None
+        scripts: Dict[str, Optional[str]] = {}
+        with open(self.journal_file, 'rb') as f:
+            offset = 0
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # 崩溃时最后一行可能只写了一半，截掉后再继续追加
+                    logger.warning(f"截断未写完的日志记录 (偏移 {offset})")
+                    truncate_at = offset
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    logger.warning(f"跳过损坏的日志记录 (偏移 {offset})")
+                    offset += len(line)
+                    continue
+                if 'undo' in entry:
+                    op_id = entry['undo']
+                    if op_id in scripts:
+                        self._index_remove(op_id, scripts.pop(op_id))
+                    dead += 1
+                else:
+                    op = entry['op']
+                    scripts[op['operation_id']] = op.get('script_name')
+                    self._index_add(op['operation_id'], op.get('script_name'), offset)
+                offset += len(line)
+        if truncate_at is not None:
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(truncate_at)
+        return dead
+
+    def _compact_journal(self):
+        """只保留有效记录重写日志"""
+        temp_file = self.journal_file.with_suffix('.jsonl.tmp')
+        operations = [self._read_operation(offset) for offset in self._live.values()]
+        self._close_reader()
+        with open(temp_file, 'wb') as f:
+            for op in operations:
+                f.write(self._encode({'op': op.to_dict()}))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.journal_file)
+        self._live.clear()
+        self._by_script.clear()
+        self._scan_journal()
     
     def _load_history(self):
-        """加载操作历史"""
+        """加载操作历史（首次运行时从旧的 YAML 历史迁移）"""
         try:
-            if self.history_file.exists():
+            if not self.journal_file.exists() and self.history_file.exists():
                 with open(self.history_file, 'r', encoding='utf-8') as f:
                     data = yaml.safe_load(f) or []
-                    self.operations = [FileOperation.from_dict(op) for op in data]
-                logger.info(f"已加载 {len(self.operations)} 条操作记录")
+                with open(self.journal_file, 'wb') as f:
+                    for op in data:
+                        f.write(self._encode({'op': op}))
+                logger.info(f"已从 {self.history_file} 迁移 {len(data)} 条操作记录")
+            if self.journal_file.exists():
+                dead = self._scan_journal()
+                if dead >= self.COMPACT_MIN_DEAD and dead > len(self._live):
+                    self._compact_journal()
+                logger.info(f"已加载 {len(self._live)} 条操作记录")
         except Exception as e:
             logger.error(f"加载操作历史失败: {e}")
-    
+
+    @staticmethod
+    def _encode(entry: dict) -> bytes:
+        return (json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8')
+
+    def _write_batch(self, batch: list):
+        """写入一批日志并 fsync，然后更新索引"""
+        written = []
+        for item in batch:
+            if isinstance(item, FileOperation):
+                offset = self._journal.tell()
+                self._journal.write(self._encode({'op': item.to_dict()}))
+                written.append((item, offset))
+            else:
+                self._journal.write(self._encode({'undo': item}))
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        with self._index_lock:
+            for op, offset in written:
+                self._index_add(op.operation_id, op.script_name, offset)
+
     def _save_history(self):
-        """保存操作历史"""
+        """立即写入队列中的记录并等待完成"""
         try:
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                yaml.safe_dump(
-                    [op.to_dict() for op in self.operations],
-                    f,
-                    allow_unicode=True,
-                    sort_keys=False,
-                    indent=2
-                )
+            self.operation_queue.put(_FLUSH)
+            self.operation_queue.join()
             logger.debug("操作历史已保存")
         except Exception as e:
             logger.error(f"保存操作历史失败: {e}")
     
     def _async_save_worker(self):
-        """异步保存工作线程"""
+        """异步保存工作线程：攒够一批、等待 JOURNAL_BATCH_DELAY 或收到刷新请求后写入"""
         while True:
+            received = [self.operation_queue.get()]
+            deadline = time.monotonic() + self.JOURNAL_BATCH_DELAY
+            while received[-1] is not _FLUSH and len(received) < self.JOURNAL_BATCH:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    received.append(self.operation_queue.get(timeout=remaining))
+                except Empty:
+                    break
+            batch = [item for item in received if item is not _FLUSH]
             try:
-                # 等待新的操作
-                operation = self.operation_queue.get()
-                if operation:
-                    self.operations.append(operation)
-                    self._save_history()
+                if batch:
+                    self._write_batch(batch)
             except Exception as e:
                 logger.error(f"异步保存操作失败: {e}")
             finally:
-                time.sleep(0.1)  # 避免过于频繁的保存
+                for _ in received:
+                    self.operation_queue.task_done()
+
+    def _read_operation(self, offset: int) -> FileOperation:
+        with self._index_lock:
+            if self._reader is None:
+                self._reader = open(self.journal_file, 'rb')
+            self._reader.seek(offset)
+            return FileOperation.from_dict(json.loads(self._reader.readline())['op'])
+
+    def _close_reader(self):
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    @property
+    def operations(self) -> List[FileOperation]:
+        """全部有效操作记录（从日志读取，记录很多时请使用 get_operation_history 分页）"""
+        self._save_history()
+        with self._index_lock:
+            return [self._read_operation(offset) for offset in list(self._live.values())]
     
     def start_monitoring(self, paths: Union[str, List[str]] = None):
         """开始监控文件系统变化"""
@@ -208,9 +338,18 @@ class FileOperationMonitor:
             self.observer = None
             self.event_handler = None
             logger.info("已停止文件监控")
+
+    @staticmethod
+    def _link_or_copy(source: str, target: str) -> str:
+        """优先创建硬链接（同一文件系统上不复制数据），失败时复制"""
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copy2(source, target)
+        return target
     
     def _create_backup(self, source_path: Union[str, Path]) -> Optional[str]:
-        """创建文件备份"""
+        """创建文件备份（硬链接，跨文件系统或不支持时复制）"""
         try:
             source_path = Path(source_path)
             if not source_path.exists():
@@ -226,11 +365,11 @@ class FileOperationMonitor:
                 counter += 1
                 backup_path = self.backup_dir / f"{source_path.name}_{timestamp}_{counter}"
             
-            # 创建备份
+            # 创建备份：删除操作之后源文件不再修改，硬链接即可保留原内容
             if source_path.is_file():
-                shutil.copy2(source_path, backup_path)
+                self._link_or_copy(str(source_path), str(backup_path))
             else:
-                shutil.copytree(source_path, backup_path)
+                shutil.copytree(source_path, backup_path, copy_function=self._link_or_copy)
             
             return str(backup_path)
         except Exception as e:
@@ -255,6 +394,10 @@ class FileOperationMonitor:
             backup_path = None
             if operation_type == 'DELETE':
                 backup_path = self._create_backup(source_path)
+
+            with self._index_lock:
+                self._sequence += 1
+                sequence = self._sequence
             
             # 创建操作记录
             operation = FileOperation(
@@ -263,7 +406,7 @@ class FileOperationMonitor:
                 source_path=str(source_path),
                 target_path=str(target_path) if target_path else None,
                 backup_path=backup_path,
-                operation_id=f"{operation_type}_{int(time.time()*1000)}",
+                operation_id=f"{operation_type}_{int(time.time()*1000)}_{sequence}",
                 script_name=script_name
             )
             
@@ -273,20 +416,26 @@ class FileOperationMonitor:
             
         except Exception as e:
             logger.error(f"记录操作失败: {e}")
+
+    def _mark_undone(self, operation: FileOperation):
+        """从索引移除并追加撤销标记"""
+        with self._index_lock:
+            self._index_remove(operation.operation_id, operation.script_name)
+        self.operation_queue.put(operation.operation_id)
     
     def undo_last_operation(self) -> bool:
         """撤销最后一次操作"""
         try:
-            if not self.operations:
-                logger.warning("没有可撤销的操作")
-                return False
-            
-            last_op = self.operations[-1]
+            self._save_history()
+            with self._index_lock:
+                if not self._live:
+                    logger.warning("没有可撤销的操作")
+                    return False
+                last_op = self._read_operation(next(reversed(self._live.values())))
             success = self._undo_operation(last_op)
             
             if success:
-                self.operations.pop()
-                self._save_history()
+                self._mark_undone(last_op)
                 logger.info(f"已撤销操作: {last_op.operation_type}")
                 return True
             return False
@@ -338,34 +487,52 @@ class FileOperationMonitor:
             return False
     
     def undo_all_operations(self) -> bool:
-        """撤销所有操作"""
-        success = True
-        while self.operations and success:
-            success = self.undo_last_operation()
-        return success
+        """撤销所有操作（从最新的开始，撤销标记全部入队后只等待一次写入）"""
+        try:
+            self._save_history()
+            with self._index_lock:
+                offsets = list(self._live.values())
+            
+            success = True
+            for offset in reversed(offsets):
+                op = self._read_operation(offset)
+                if self._undo_operation(op):
+                    self._mark_undone(op)
+                else:
+                    success = False
+                    break
+            
+            self._save_history()
+            return success
+            
+        except Exception as e:
+            logger.error(f"撤销操作失败: {e}")
+            return False
     
     def undo_script_operations(self, script_name: str) -> bool:
         """撤销指定脚本的所有操作"""
         try:
-            # 找出指定脚本的所有操作
-            script_ops = [op for op in reversed(self.operations) 
-                         if op.script_name == script_name]
+            # 按脚本索引找出该脚本的所有操作，无需扫描全部历史
+            self._save_history()
+            with self._index_lock:
+                offsets = list(self._by_script.get(script_name, {}).values())
             
-            if not script_ops:
+            if not offsets:
                 logger.warning(f"没有找到脚本 {script_name} 的操作记录")
                 return False
             
-            # 逐个撤销操作
+            # 从最新的开始逐个撤销操作
             success = True
-            for op in script_ops:
+            for offset in reversed(offsets):
+                op = self._read_operation(offset)
                 if self._undo_operation(op):
-                    self.operations.remove(op)
+                    self._mark_undone(op)
                 else:
                     success = False
                     break
             
+            self._save_history()
             if success:
-                self._save_history()
                 logger.info(f"已撤销脚本 {script_name} 的所有操作")
             
             return success
@@ -374,13 +541,27 @@ class FileOperationMonitor:
             logger.error(f"撤销脚本操作失败: {e}")
             return False
     
-    def get_operation_history(self, script_name: Optional[str] = None) -> List[dict]:
-        """获取操作历史"""
+    def get_operation_history(self, script_name: Optional[str] = None,
+                              offset: int = 0, limit: Optional[int] = None,
+                              newest_first: bool = False) -> List[dict]:
+        """
+        获取操作历史
+
+        Args:
+            script_name: 只返回该脚本的操作
+            offset: 跳过的记录数
+            limit: 返回的记录数，None 为全部
+            newest_first: 是否从最新的记录开始
+        """
         try:
-            if script_name:
-                return [op.to_dict() for op in self.operations 
-                        if op.script_name == script_name]
-            return [op.to_dict() for op in self.operations]
+            self._save_history()
+            with self._index_lock:
+                index = self._by_script.get(script_name, {}) if script_name else self._live
+                offsets = list(index.values())
+                if newest_first:
+                    offsets.reverse()
+                end = None if limit is None else offset + limit
+                return [self._read_operation(o).to_dict() for o in offsets[offset:end]]
         except Exception as e:
             logger.error(f"获取操作历史失败: {e}")
             return []
@@ -0,0 +1,207 @@
+"""
+文件名规则多模式匹配
+
+分类、黑名单、汉化/原版判断都是"文件名里有没有这组关键词/正则中的任意一个"。以前每条规则
+各自循环 `re.search` 或 `any(keyword in name for keyword in ...)`，几百个关键词、几十个正则
+对每个文件都要跑一遍。RuleMatcher 把所有规则编译一次，扫描一遍文件名返回命中的全部规则 ID：
+
+    matcher = RuleMatcher()
+    matcher.add_keywords('chinese', {'汉化', '翻訳', 'chinese'})
+    matcher.add_patterns('doujin', [r'\\(C\\d+\\)', r'コミケ\\d+'])
+    matcher.match('(C99) [作者] 标题 [中国翻訳].zip')    # {'chinese', 'doujin'}
+
+- 关键词（以及不含正则元字符的"正则"）编译成 Aho–Corasick 自动机，一次扫描找出所有关键词；
+  安装了 pyahocorasick 时使用其 C 实现，否则使用纯 Python 实现（状态转移按需缓存）
+- 真正的正则按规则合并成一个分支表达式 `(?:p1)|(?:p2)|...`，内容相同的规则共用一个表达式，
+  每个表达式 search 一次（规则之间的匹配可以重叠，所以不能合并成一个表达式用 finditer；
+  用可选前瞻把所有规则放进一个表达式也试过，比分别 search 慢）
+"""
+
+import re
+import logging
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+_REGEX_META = re.compile(r'[.^$*+?{}\[\]\\|()]')
+_INLINE_IGNORECASE = re.compile(r'^\(\?i\)')
+
+
+def is_literal(pattern: str) -> bool:
+    """pattern 是否不含正则元字符（可以当作关键词匹配）"""
+    return not _REGEX_META.search(pattern)
+
+
+class KeywordAutomaton:
+    """
+    Aho–Corasick 多关键词自动机
+
+    每个关键词可以属于多个规则，scan 返回文本中出现的关键词所属的全部规则 ID
+    """
+
+    def __init__(self):
+        self._keywords: Dict[str, Set[str]] = {}
+        self._native = None
+        # 纯 Python 实现：goto 为 trie 边，delta 为带失败跳转的完整转移（按需填充）
+        self._goto: List[Dict[str, int]] = []
+        self._fail: List[int] = []
+        self._delta: List[Dict[str, int]] = []
+        self._output: List[FrozenSet[str]] = []
+        self._built = False
+
+    def __len__(self) -> int:
+        return len(self._keywords)
+
+    def add(self, keyword: str, rule_id: str):
+        if not keyword:
+            return
+        self._keywords.setdefault(keyword, set()).add(rule_id)
+        self._built = False
+
+    def build(self):
+        try:
+            import ahocorasick
+        except ImportError:
+            ahocorasick = None
+        if ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for keyword, rule_ids in self._keywords.items():
+                automaton.add_word(keyword, frozenset(rule_ids))
+            if self._keywords:
+                automaton.make_automaton()
+            self._native = automaton
+        else:
+            self._native = None
+            self._build_python()
+        self._built = True
+
+    def _build_python(self):
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[Set[str]] = [set()]
+        for keyword, rule_ids in self._keywords.items():
+            state = 0
+            for ch in keyword:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    goto.append({})
+                    outputs.append(set())
+                    nxt = goto[state][ch] = len(goto) - 1
+                state = nxt
+            outputs[state] |= rule_ids
+
+        # 广度优先计算失败指针，输出沿失败链合并
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                back = fail[state]
+                while back and ch not in goto[back]:
+                    back = fail[back]
+                target = goto[back].get(ch, 0)
+                fail[nxt] = target if target != nxt else 0
+                outputs[nxt] |= outputs[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._delta = [dict(edges) for edges in goto]
+        self._output = [frozenset(output) for output in outputs]
+
+    def _step(self, state: int, ch: str) -> int:
+        """沿失败链求转移并缓存"""
+        back = state
+        while back and ch not in self._goto[back]:
+            back = self._fail[back]
+        nxt = self._goto[back].get(ch, 0)
+        self._delta[state][ch] = nxt
+        return nxt
+
+    def scan(self, text: str) -> Set[str]:
+        """返回 text 中出现的关键词所属的全部规则 ID"""
+        if not self._built:
+            self.build()
+        found: Set[str] = set()
+        if not self._keywords:
+            return found
+        if self._native is not None:
+            for _, rule_ids in self._native.iter(text):
+                found |= rule_ids
+            return found
+
+        delta = self._delta
+        output = self._output
+        state = 0
+        for ch in text:
+            nxt = delta[state].get(ch)
+            if nxt is None:
+                nxt = self._step(state, ch)
+            state = nxt
+            if output[state]:
+                found |= output[state]
+        return found
+
+
+class RuleMatcher:
+    """
+    关键词 + 正则规则匹配器
+
+    Args:
+        ignore_case: 是否忽略大小写（关键词按小写匹配，正则使用 re.IGNORECASE）
+    """
+
+    def __init__(self, ignore_case: bool = True):
+        self.ignore_case = ignore_case
+        self._automaton = KeywordAutomaton()
+        self._patterns: Dict[str, List[str]] = {}
+        self._regexes: List[Tuple[re.Pattern, FrozenSet[str]]] = []
+        self._compiled = False
+
+    def add_keywords(self, rule_id: str, keywords: Iterable[str]) -> 'RuleMatcher':
+        """添加一组关键词，文件名包含其中任意一个即命中 rule_id"""
+        for keyword in keywords:
+            self._automaton.add(keyword.lower() if self.ignore_case else keyword, rule_id)
+        self._compiled = False
+        return self
+
+    def add_patterns(self, rule_id: str, patterns: Iterable[str]) -> 'RuleMatcher':
+        """添加一组正则，匹配其中任意一个即命中 rule_id；不含元字符的按关键词处理"""
+        for pattern in patterns:
+            if self.ignore_case:
+                # 整体忽略大小写时，行首的 (?i) 是多余的，且不能出现在组合表达式中间
+                pattern = _INLINE_IGNORECASE.sub('', pattern)
+            if is_literal(pattern):
+                self._automaton.add(pattern.lower() if self.ignore_case else pattern, rule_id)
+            elif pattern not in self._patterns.setdefault(rule_id, []):
+                self._patterns[rule_id].append(pattern)
+        self._compiled = False
+        return self
+
+    def compile(self) -> 'RuleMatcher':
+        self._automaton.build()
+        # 正则完全相同的规则共用一个表达式
+        alternations: Dict[str, Set[str]] = {}
+        for rule_id, patterns in self._patterns.items():
+            alternation = '|'.join(f'(?:{pattern})' for pattern in patterns)
+            alternations.setdefault(alternation, set()).add(rule_id)
+        flags = re.DOTALL | (re.IGNORECASE if self.ignore_case else 0)
+        self._regexes = [(re.compile(alternation, flags), frozenset(rule_ids))
+                         for alternation, rule_ids in alternations.items()]
+        self._compiled = True
+        return self
+
+    def match(self, text: str) -> Set[str]:
+        """返回 text 命中的全部规则 ID"""
+        if not self._compiled:
+            self.compile()
+        found = self._automaton.scan(text.lower() if self.ignore_case else text)
+        for regex, rule_ids in self._regexes:
+            if not rule_ids <= found and regex.search(text):
+                found |= rule_ids
+        return found
+
+    def matches(self, text: str, rule_id: Optional[str] = None) -> bool:
+        """text 是否命中 rule_id（为 None 时为任意规则）"""
+        found = self.match(text)
+        return bool(found) if rule_id is None else rule_id in found
@@ -0,0 +1,187 @@
+"""
+文件名规则匹配基准
+
+生成 --count 个 E-Hentai 风格的文件名（展会编号、社团/作者、标题、汉化组/版本标签、卷号），
+对比两种匹配方式：
+- 旧实现: 每条分类规则循环 re.search；汉化/原版/黑名单三组关键词各自 any(keyword in name)
+- 新实现: RuleMatcher，关键词走 Aho–Corasick 自动机，正则合并成一个表达式，一次得到全部命中规则
+
+规则是 manga_archive_classifier.CATEGORY_RULES / SERIES_BLACKLIST_PATTERNS 和
+no_translate_find 三组关键词的拷贝（脚本本身导入时会初始化日志和界面，不能直接导入）。
+输出耗时并逐个文件校验两者结果一致。
+
+用法:
+    python nodes/utils/tests/bench_rule_matcher.py --count 100000
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+from nodes.utils.rule_matcher import KeywordAutomaton, RuleMatcher
+
+CATEGORY_RULES = {
+    "1. 同人志": {
+        "patterns": [r'\[C\d+\]', r'\(C\d+\)', r'コミケ\d+', r'COMIC\s*MARKET', r'COMIC1', r'同人誌', r'同人志',
+                     r'コミケ', r'コミックマーケット', r'例大祭', r'サンクリ', r'(?i)doujin', r'COMIC1☆\d+'],
+        "exclude_patterns": [r'画集', r'artbook', r'art\s*works', r'01视频', r'02动图', r'art\s*works'],
+    },
+    "2. 商业志": {
+        "patterns": [r'(?i)magazine', r'(?i)COMIC', r'雑誌', r'杂志', r'商业', r'週刊', r'月刊', r'月号',
+                     r'COMIC\s*REX', r'コミック', r'ヤングマガジン', r'\d{4}年\d{1,2}月号'],
+        "exclude_patterns": [r'同人', r'(?i)doujin', r'単行本', r'画集'],
+    },
+    "3. 单行本": {
+        "patterns": [r'単行本', r'单行本', r'(?i)tankoubon', r'第\d+巻', r'vol\.?\d+', r'volume\s*\d+'],
+        "exclude_patterns": [r'画集', r'artbook', r'art\s*works'],
+    },
+    "4. 画集": {
+        "patterns": [r'画集', r'(?i)art\s*book', r'(?i)art\s*works', r'イラスト集', r'杂图合集', r'作品集',
+                     r'illustrations?', r'(?i)illust\s*collection'],
+        "exclude_patterns": [],
+    },
+    "5. 同人CG": {"patterns": [r'同人CG'], "exclude_patterns": []},
+}
+
+SERIES_BLACKLIST_PATTERNS = [r'画集', r'fanbox', r'pixiv', r'・', r'杂图合集', r'01视频', r'02动图', r'作品集',
+                             r'损坏压缩包']
+
+CHINESE_VERSION_KEYWORDS = {
+    '汉化', '漢化', '翻译', '翻訳', '翻譯', '中国翻译', '中国翻訳', '中国語', 'chinese', '中文', '中国', '嵌字',
+    '掃圖', '掃', '制作', '製作', '重嵌', '个人', '去码', '日语社', '机翻', '赞助', '汉', '漢', '数位', '未来数位',
+    '新视界', '出版', '青文出版', '脸肿', '无毒', '空気系', '夢之行蹤', '萌幻鴿鄉', '绅士仓库', 'Lolipoi', '靴下',
+    'CE家族社', '不可视', '一匙咖啡豆', '无邪气', '洨五', '白杨', '瑞树', '冊語草堂', '淫书馆', '是小狐狸哦',
+    '工房', '工坊', '基地汉化组', '漢化組', '汉化社', '漢化社', 'CE 家族社', '个人汉化', '個人漢化',
+}
+ORIGINAL_VERSION_KEYWORDS = {
+    'Digital', 'DL版', 'DL', 'デジタル版', '出版', '出版社', '書店版', '通常版', '無修正', '无修正', '无修', '無修',
+    '完全版', '完整版', '全彩', '官方', 'カラー', '彩色', '彩色版',
+}
+BLACKLIST_KEYWORDS = {
+    'trash', '画集', '畫集', 'artbook', 'art book', 'art works', 'illustrations', '图集', '圖集', 'illust',
+    'collection', '杂图', '雜圖', '杂图合集', '雜圖合集', 'pixiv', 'fanbox', 'gumroad', 'twitter', '待分类',
+    '待處理', '待分類', '图包', '圖包', '图片', '圖片', 'cg', 'CG',
+}
+KEYWORD_GROUPS = {
+    'chinese': {k.lower() for k in CHINESE_VERSION_KEYWORDS},
+    'original': {k.lower() for k in ORIGINAL_VERSION_KEYWORDS},
+    'blacklist': {k.lower() for k in BLACKLIST_KEYWORDS},
+}
+
+EVENTS = ['(C{})', '[C{}]', '(COMIC1☆{})', '(例大祭{})', '(サンクリ{})', '', '', '']
+CIRCLES = ['[サークル{} (作者{})]', '[作者{}]', '[Circle{} (Artist{})]', '[團體{} (作家{})]']
+TITLES = ['夏休みの{}', 'お姉さんと{}', 'Magic Girl {}', '秘密の花園 {}', '学園ハーレム{}', 'Summer Night {}',
+          'ひみつのおしごと {}', '放課後{}', 'COMIC 快楽天 {}年{}月号', 'Art Works {}', '画集 {}', 'Vol.{}']
+TAGS = ['[中国翻訳]', '[DL版]', '[無修正]', '[空気系☆漢化]', '[English]', '[Digital]', '[绅士仓库汉化]',
+        '[カラー化]', '[单行本]', '[pixiv]', '(オリジナル)', '(東方Project)', '[雑誌]', '']
+
+
+def make_filenames(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    names = []
+    for i in range(count):
+        event = rng.choice(EVENTS).format(rng.randint(80, 104))
+        circle = rng.choice(CIRCLES).format(i % 997, i % 389)
+        title = rng.choice(TITLES).format(rng.randint(1, 12), rng.randint(1, 12))
+        tags = ' '.join(rng.sample(TAGS, rng.randint(1, 3)))
+        names.append(' '.join(part for part in (event, circle, title, tags) if part) + rng.choice(['.zip', '.rar']))
+    return names
+
+
+# ========== 旧实现 ==========
+
+def legacy_category(filename):
+    for pattern in CATEGORY_RULES["4. 画集"]["patterns"]:
+        if re.search(pattern, filename, re.IGNORECASE):
+            return "4. 画集"
+    for category, rules in CATEGORY_RULES.items():
+        if category == "4. 画集":
+            continue
+        if any(re.search(p, filename, re.IGNORECASE) for p in rules["exclude_patterns"]):
+            continue
+        if any(re.search(p, filename, re.IGNORECASE) for p in rules["patterns"]):
+            return category
+    return None
+
+
+def legacy_series_blacklisted(filename):
+    return any(re.search(pattern, filename, re.IGNORECASE) for pattern in SERIES_BLACKLIST_PATTERNS)
+
+
+def legacy_keyword_groups(filename):
+    lower = filename.lower()
+    return frozenset(group for group, keywords in KEYWORD_GROUPS.items() if any(k in lower for k in keywords))
+
+
+def legacy(filename):
+    return legacy_category(filename), legacy_series_blacklisted(filename), legacy_keyword_groups(filename)
+
+
+# ========== 新实现 ==========
+
+def build_matcher():
+    matcher = RuleMatcher()
+    for category, rules in CATEGORY_RULES.items():
+        matcher.add_patterns(category, rules["patterns"])
+        matcher.add_patterns(f"{category}:exclude", rules["exclude_patterns"])
+    matcher.add_patterns('series_blacklist', SERIES_BLACKLIST_PATTERNS)
+    for group, keywords in KEYWORD_GROUPS.items():
+        matcher.add_keywords(group, keywords)
+    return matcher.compile()
+
+
+def indexed(matcher, filename):
+    matched = matcher.match(filename)
+    category = None
+    if "4. 画集" in matched:
+        category = "4. 画集"
+    else:
+        for name in CATEGORY_RULES:
+            if name != "4. 画集" and f"{name}:exclude" not in matched and name in matched:
+                category = name
+                break
+    return category, 'series_blacklist' in matched, frozenset(matched & KEYWORD_GROUPS.keys())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='文件名规则匹配基准')
+    parser.add_argument('--count', type=int, default=100000, help='文件名数量')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    args = parser.parse_args()
+
+    names = make_filenames(args.count, args.seed)
+    try:
+        import ahocorasick  # noqa: F401
+        backend = 'pyahocorasick'
+    except ImportError:
+        backend = '纯 Python'
+    print(f"{len(names)} 个文件名，自动机实现: {backend}")
+
+    start = time.perf_counter()
+    old = [legacy(name) for name in names]
+    old_seconds = time.perf_counter() - start
+    print(f"旧实现: {old_seconds:.2f}s ({old_seconds / len(names) * 1e6:.1f}µs/个)")
+
+    start = time.perf_counter()
+    matcher = build_matcher()
+    build_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    new = [indexed(matcher, name) for name in names]
+    new_seconds = time.perf_counter() - start
+    print(f"新实现: {new_seconds:.2f}s ({new_seconds / len(names) * 1e6:.1f}µs/个)，编译 {build_seconds * 1000:.1f}ms，"
+          f"加速 {old_seconds / max(new_seconds, 1e-9):.1f}x")
+
+    mismatches = [(name, a, b) for name, a, b in zip(names, old, new) if a != b]
+    if mismatches:
+        print(f"结果不一致: {len(mismatches)} 个")
+        for name, a, b in mismatches[:10]:
+            print(f"  {name}\n    旧: {a}\n    新: {b}")
+        sys.exit(1)
+    print("结果一致")
+
+
+if __name__ == '__main__':
+    main()
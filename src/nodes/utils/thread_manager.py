@@ -1,14 +1,69 @@
+"""
+共享的线程与内存预算
+
+各个重量级流水线（去重、格式转换、哈希预热）不再各自写死线程池大小，而是向进程内
+唯一的 ThreadManager 申请租约（lease）。预算只在同一个进程内共享，同时运行的多个脚本各有
+各的预算：
+
+    manager = ThreadManager.shared()
+    with manager.lease('hash_prepare', requested=16) as lease:
+        with ThreadPoolExecutor(max_workers=lease.workers) as executor:
+            executor.submit(lease.wrap(process, nbytes=size), path)
+    for line in manager.summary_lines():
+        logger.info(line)
+
+- 全局线程预算：所有租约的线程数之和不超过 max_total_threads（超出时每个租约至少 1 个线程）；
+  没有配置文件时使用 DEFAULT_CONFIG 中的预算，配置中把 max_total_threads 设为 0 或 null 可关闭限制
+- 嵌套租约：在另一个租约的任务中申请的租约（如压缩包任务内的图片线程池）按申请数授予，
+  不占全局预算——外层线程在等待内层线程池，外层租约已经计入预算
+- 在途字节预算：lease.track(nbytes) 期间占用 max_inflight_mb，超出时等待其他任务完成
+- 内存限流：系统内存占用超过 memory_limit（百分比）时暂停启动新任务，直到回落或超时；
+  nbytes 为 0 的任务（数据已由外层任务计入）不限流
+- 每个流水线的任务数、数据量、限流次数和线程利用率统计
+- 配置文件（YAML，默认是本模块旁边的 config.yaml）修改后自动重新加载
+"""
+
 import os
+import time
 import logging
+from contextlib import contextmanager
+from dataclasses import dataclass
+from queue import Queue
+from threading import Condition, Event, Lock, local
+from typing import Callable, Dict, List, Optional
+
 import yaml
 import psutil
-from queue import Queue
-from threading import Event, Lock
 import watchdog.events
 import watchdog.observers
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.yaml')
+
+DEFAULT_CONFIG = {
+    'performance_mode': 'normal',
+    'thread_config': {
+        'normal': {
+            'max_threads': 4,
+            'memory_multiplier': 2,
+            'cpu_multiplier': 2,
+            'max_total_threads': 8
+        }
+    },
+    'memory_limit': 75,          # 系统内存占用百分比上限
+    'max_inflight_mb': 0,        # 在途字节上限（MB），0 为物理内存的 1/4
+    'throttle_timeout': 60,      # 内存限流最长等待时间（秒）
+    'queue_size': 100,
+    'batch_size': 10
+}
+
+MEMORY_SAMPLE_INTERVAL = 0.5     # 内存占用采样的缓存时间（秒）
+THROTTLE_POLL_INTERVAL = 0.2
+
+_task_context = local()          # 当前线程正在执行的租约任务，用于识别嵌套租约
+
+
 class ConfigFileHandler(watchdog.events.FileSystemEventHandler):
     def __init__(self, config_path, callback):
         self.config_path = os.path.abspath(config_path)
@@ -18,60 +73,163 @@ class ConfigFileHandler(watchdog.events.FileSystemEventHandler):
         if event.src_path == self.config_path:
             self.callback()
 
+
+@dataclass
+class PipelineStats:
+    """单个流水线的使用统计"""
+    name: str
+    leases: int = 0
+    peak_workers: int = 0
+    tasks: int = 0
+    failed: int = 0
+    bytes: int = 0
+    busy_seconds: float = 0.0        # 任务实际执行时间合计
+    capacity_seconds: float = 0.0    # 租约线程数 × 持有时间合计
+    throttled: int = 0
+    throttled_seconds: float = 0.0
+
+    @property
+    def utilization(self) -> float:
+        return self.busy_seconds / self.capacity_seconds * 100 if self.capacity_seconds > 0 else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.name}: 任务 {self.tasks}{f' (失败 {self.failed})' if self.failed else ''} | "
+                f"线程峰值 {self.peak_workers} | 利用率 {self.utilization:.0f}% | "
+                f"数据 {self.bytes / 1024 / 1024:.1f}MB | "
+                f"限流 {self.throttled} 次 {self.throttled_seconds:.1f}s")
+
+
+class WorkerLease:
+    """从 ThreadManager 获得的线程租约，用 with 语句持有"""
+
+    def __init__(self, manager: 'ThreadManager', pipeline: str, workers: int, counted: bool = True):
+        self.manager = manager
+        self.pipeline = pipeline
+        self.workers = workers
+        self.counted = counted  # 是否占用了全局线程预算（嵌套租约、未配置预算时不占）
+        self.acquired_at = time.perf_counter()
+        self.released = False
+
+    def __enter__(self) -> 'WorkerLease':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.manager._release(self)
+
+    @contextmanager
+    def track(self, nbytes: int = 0):
+        """执行一个任务：等待内存和在途字节预算，结束后记录统计"""
+        self.manager._before_task(self.pipeline, nbytes)
+        start = time.perf_counter()
+        failed = False
+        outer = getattr(_task_context, 'lease', None)
+        _task_context.lease = self
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            _task_context.lease = outer
+            self.manager._after_task(self.pipeline, nbytes, time.perf_counter() - start, failed)
+
+    def wrap(self, func: Callable, nbytes: int = 0) -> Callable:
+        """返回在 track(nbytes) 中执行 func 的函数，用于 executor.submit"""
+        def run(*args, **kwargs):
+            with self.track(nbytes):
+                return func(*args, **kwargs)
+        return run
+
+
 class ThreadManager:
-    def __init__(self, config_path="config.yaml"):
+    _shared: Optional['ThreadManager'] = None
+    _shared_lock = Lock()
+
+    def __init__(self, config_path=DEFAULT_CONFIG_PATH):
         self.config_path = config_path
+        self.config_loaded = False
         self.config = self.load_config()
         self.processing_queue = Queue(maxsize=self.config.get('queue_size', 100))
         self.completion_queue = Queue()
         self.stop_event = Event()
         self.lock = Lock()
-        
-        # 启动配置文件监控
-        self.observer = watchdog.observers.Observer()
-        handler = ConfigFileHandler(config_path, self.reload_config)
-        self.observer.schedule(handler, os.path.dirname(config_path), recursive=False)
-        self.observer.start()
+
+        # 租约与预算状态
+        self._budget = Condition(self.lock)
+        self.workers_in_use = 0
+        self.bytes_in_flight = 0
+        self.pipelines: Dict[str, PipelineStats] = {}
+        self._capped_pipelines = set()
+        self._memory_sample = (0.0, 0.0)  # (采样时间, 内存占用百分比)
+
+        # 启动配置文件监控（配置文件所在目录不存在时跳过）
+        self.observer = None
+        config_dir = os.path.dirname(os.path.abspath(config_path))
+        if os.path.isdir(config_dir):
+            self.observer = watchdog.observers.Observer()
+            handler = ConfigFileHandler(config_path, self.reload_config)
+            self.observer.schedule(handler, config_dir, recursive=False)
+            self.observer.daemon = True
+            self.observer.start()
+
+    @classmethod
+    def shared(cls, config_path: Optional[str] = None) -> 'ThreadManager':
+        """
+        进程内共享的实例（每个进程一份预算，不跨进程协调）
+
+        配置路径依次取 config_path、环境变量 GLOWTOOLBOX_THREAD_CONFIG、本模块旁边的 config.yaml，
+        不受当前工作目录影响
+        """
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    path = config_path or os.getenv('GLOWTOOLBOX_THREAD_CONFIG') or DEFAULT_CONFIG_PATH
+                    cls._shared = cls(path)
+        return cls._shared
 
     def load_config(self):
         try:
             with open(self.config_path, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f)
+                loaded = yaml.safe_load(f) or {}
+        except FileNotFoundError:
+            logger.info(f"未找到线程配置文件 {self.config_path}，使用默认配置")
+            self.config_loaded = False
+            return dict(DEFAULT_CONFIG)
         except Exception as e:
             logger.error(f"加载配置文件失败: {e}")
-            return {
-                'performance_mode': 'normal',
-                'thread_config': {
-                    'normal': {
-                        'max_threads': 4,
-                        'memory_multiplier': 2,
-                        'cpu_multiplier': 2,
-                        'max_total_threads': 8
-                    }
-                },
-                'memory_limit': 75,
-                'queue_size': 100,
-                'batch_size': 10
-            }
+            self.config_loaded = False
+            return dict(DEFAULT_CONFIG)
+        self.config_loaded = True
+        return {**DEFAULT_CONFIG, **loaded}
 
     def reload_config(self):
         with self.lock:
             self.config = self.load_config()
+            self._budget.notify_all()
             logger.info(f"配置已重新加载: 性能模式={self.config['performance_mode']}")
 
+    def _thread_config(self) -> dict:
+        mode = self.config.get('performance_mode', 'normal')
+        thread_configs = self.config.get('thread_config') or DEFAULT_CONFIG['thread_config']
+        return thread_configs.get(mode) or DEFAULT_CONFIG['thread_config']['normal']
+
     def get_optimal_thread_count(self, image_count):
         with self.lock:
             try:
-                mode = self.config['performance_mode']
-                thread_config = self.config['thread_config'][mode]
-                
+                thread_config = self._thread_config()
+
                 cpu_count = os.cpu_count() or 4
                 available_memory = psutil.virtual_memory().available / (1024 * 1024 * 1024)
-                
+
                 # 根据配置计算线程数
                 cpu_based_threads = cpu_count * thread_config['cpu_multiplier']
                 memory_based_threads = int(available_memory * thread_config['memory_multiplier'])
-                
+
                 # 考虑图片数量
                 if image_count <= thread_config['max_threads']:
                     thread_count = image_count
@@ -82,7 +240,7 @@ class ThreadManager:
                         memory_based_threads,
                         thread_config['max_total_threads']
                     )
-                
+
                 return max(1, thread_count)
             except Exception as e:
                 logger.error(f"计算线程数时出错: {e}")
@@ -92,7 +250,110 @@ class ThreadManager:
         with self.lock:
             return self.config.get('batch_size', 10)
 
+    # ========== 租约 ==========
+
+    @property
+    def max_total_threads(self) -> Optional[int]:
+        """全局线程预算，配置为 0 或 null 时为 None（不限制）；没有配置文件时取 DEFAULT_CONFIG"""
+        limit = self._thread_config().get('max_total_threads')
+        return max(1, int(limit)) if limit else None
+
+    @property
+    def max_inflight_bytes(self) -> int:
+        limit_mb = self.config.get('max_inflight_mb') or 0
+        if limit_mb > 0:
+            return int(limit_mb * 1024 * 1024)
+        return psutil.virtual_memory().total // 4
+
+    def lease(self, pipeline: str, requested: int) -> WorkerLease:
+        """
+        申请线程租约
+
+        授予 min(requested, 剩余预算) 个线程，预算用完时仍授予 1 个线程；
+        在另一个租约的任务中申请的嵌套租约按申请数授予，不占预算
+        """
+        requested = max(1, requested)
+        nested = getattr(_task_context, 'lease', None) is not None
+        with self.lock:
+            limit = self.max_total_threads
+            counted = not nested and limit is not None
+            if not counted:
+                workers = requested
+            else:
+                workers = max(1, min(requested, limit - self.workers_in_use))
+                self.workers_in_use += workers
+            stats = self._stats(pipeline)
+            stats.leases += 1
+            stats.peak_workers = max(stats.peak_workers, workers)
+            first_cap = workers < requested and pipeline not in self._capped_pipelines
+            if first_cap:
+                self._capped_pipelines.add(pipeline)
+        if first_cap:
+            source = self.config_path if self.config_loaded else '默认配置'
+            logger.info(f"{pipeline}: 申请 {requested} 个线程，全局预算 max_total_threads={limit} "
+                        f"（{source}）不足，授予 {workers} 个")
+        return WorkerLease(self, pipeline, workers, counted)
+
+    def _stats(self, pipeline: str) -> PipelineStats:
+        stats = self.pipelines.get(pipeline)
+        if stats is None:
+            stats = self.pipelines[pipeline] = PipelineStats(pipeline)
+        return stats
+
+    def _release(self, lease: WorkerLease):
+        with self.lock:
+            if lease.counted:
+                self.workers_in_use = max(0, self.workers_in_use - lease.workers)
+            self._stats(lease.pipeline).capacity_seconds += lease.workers * (time.perf_counter() - lease.acquired_at)
+            self._budget.notify_all()
+
+    def memory_percent(self) -> float:
+        """系统内存占用百分比（短时间内复用采样结果）"""
+        sampled_at, percent = self._memory_sample
+        now = time.monotonic()
+        if now - sampled_at > MEMORY_SAMPLE_INTERVAL:
+            percent = psutil.virtual_memory().percent
+            self._memory_sample = (now, percent)
+        return percent
+
+    def _before_task(self, pipeline: str, nbytes: int):
+        if nbytes <= 0:
+            # 不占内存预算的任务（如外层已计入数据量的嵌套任务）直接放行
+            return
+        waited_since = None
+        deadline = time.monotonic() + float(self.config.get('throttle_timeout', 60))
+        with self.lock:
+            while True:
+                over_memory = self.memory_percent() > self.config.get('memory_limit', 75)
+                # 没有其他在途任务时总是放行，避免单个超大任务永远等待
+                over_bytes = self.bytes_in_flight > 0 and self.bytes_in_flight + nbytes > self.max_inflight_bytes
+                if not (over_memory or over_bytes) or time.monotonic() >= deadline:
+                    break
+                if waited_since is None:
+                    waited_since = time.perf_counter()
+                    self._stats(pipeline).throttled += 1
+                self._budget.wait(THROTTLE_POLL_INTERVAL)
+            self.bytes_in_flight += nbytes
+            if waited_since is not None:
+                self._stats(pipeline).throttled_seconds += time.perf_counter() - waited_since
+
+    def _after_task(self, pipeline: str, nbytes: int, seconds: float, failed: bool):
+        with self.lock:
+            self.bytes_in_flight = max(0, self.bytes_in_flight - nbytes)
+            stats = self._stats(pipeline)
+            stats.tasks += 1
+            stats.failed += failed
+            stats.bytes += nbytes
+            stats.busy_seconds += seconds
+            self._budget.notify_all()
+
+    def summary_lines(self) -> List[str]:
+        """每个流水线一行的使用统计"""
+        with self.lock:
+            return [stats.summary() for stats in self.pipelines.values()]
+
     def cleanup(self):
         self.stop_event.set()
-        self.observer.stop()
-        self.observer.join() 
\ No newline at end of file
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer.join()
@@ -22,12 +22,18 @@ import win32file
 import win32con
 import numpy as np
 from nodes.record.logger_config import setup_logger
+from nodes.record.uuid_store import UuidRecordStore, merge_timestamps
+from nodes.file.io_scheduler import IOScheduler, SSD, UNKNOWN
+from nodes.archive.zip_encoding import UnsupportedLayout
+from nodes.archive.zip_sidecar import read_sidecars, update_sidecars
 from nodes.tui.textual_preset import create_config_app
 from nodes.tui.textual_logger import TextualLoggerManager
 import orjson  # 使用orjson进行更快的JSON处理
 import zipfile
 from typing import Dict, Any, Optional, List
+from dataclasses import dataclass, field
 import mmap
+import fnmatch
 
 # 定义日志布局配置
 TEXTUAL_LAYOUT = {
@@ -79,16 +85,21 @@ class JsonHandler:
             logger.error(f"加载JSON文件失败 {file_path}: {e}")
             return {}
     
+    @staticmethod
+    def dumps(data: Dict[str, Any]) -> bytes:
+        """序列化为JSON字节（与 save 写入的格式相同）"""
+        return orjson.dumps(
+            data,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+    
     @staticmethod
     def save(file_path: str, data: Dict[str, Any]) -> bool:
         """快速保存JSON文件"""
         temp_path = f"{file_path}.tmp"
         try:
             # 使用orjson进行快速序列化
-            json_bytes = orjson.dumps(
-                data,
-                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
-            )
+            json_bytes = JsonHandler.dumps(data)
             
             with open(temp_path, 'wb') as f:
                 f.write(json_bytes)
@@ -222,6 +233,21 @@ class ArchiveHandler:
         logger.info(f"[#process]开始处理压缩包: {archive_name}")
         logger.info(f"[#process]需要删除的文件: {files_to_delete}")
 
+        # ZIP 直接改写中央目录，不调用外部程序
+        try:
+            with zipfile.ZipFile(archive_path, 'r') as zf:
+                names = [name for name in zf.namelist()
+                         if any(fnmatch.fnmatchcase(name, pattern) if '*' in pattern else name == pattern
+                                for pattern in files_to_delete)]
+            removed = update_sidecars(archive_path, remove=names) if names else []
+            if not removed:
+                logger.warning("[#process]未成功删除任何文件")
+                return False
+            logger.info(f"[#process][完成] 成功删除了 {len(removed)} 个文件")
+            return True
+        except (zipfile.BadZipFile, UnsupportedLayout) as e:
+            logger.debug(f"[#process]无法直接改写，使用BandZip: {e}")
+
         # 定义所有可能的临时文件路径
         backup_path = archive_path + ".bak"
         temp_path = archive_path + ".temp"
@@ -411,6 +437,42 @@ class ArchiveHandler:
         return None
 
     @staticmethod
+    def write_json_to_archive(archive_path: str, json_name: str, json_data: Dict[str, Any],
+                              remove: List[str] = ()) -> bool:
+        """把JSON写入压缩包，同时删除 remove 中的文件
+        
+        ZIP 在一次中央目录改写中完成删除和写入；其他格式退回BandZip删除 + 7z添加
+        
+        Args:
+            archive_path: 压缩包路径
+            json_name: 压缩包中的JSON文件名
+            json_data: JSON内容
+            remove: 需要删除的文件名列表
+            
+        Returns:
+            bool: 是否写入成功
+        """
+        try:
+            update_sidecars(archive_path, {json_name: JsonHandler.dumps(json_data)}, remove=remove)
+            logger.info(f"[#process]添加JSON文件: {json_name}")
+            return True
+        except (zipfile.BadZipFile, UnsupportedLayout) as e:
+            logger.debug(f"[#process]无法直接改写，使用外部程序: {e}")
+        except Exception as e:
+            logger.error(f"[#process]写入JSON失败 {os.path.basename(archive_path)}: {e}")
+            return False
+        
+        if remove:
+            ArchiveHandler.delete_files_from_archive(archive_path, list(remove))
+        temp_dir = os.path.join(os.path.dirname(archive_path), '.temp_update')
+        os.makedirs(temp_dir, exist_ok=True)
+        try:
+            temp_json = os.path.join(temp_dir, json_name)
+            return JsonHandler.save(temp_json, json_data) and \
+                ArchiveHandler.add_json_to_archive(archive_path, temp_json, json_name)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
     @staticmethod
     def add_json_to_archive(archive_path: str, json_path: str, json_name: str) -> bool:
         """添加JSON文件到压缩包
@@ -424,16 +486,11 @@ class ArchiveHandler:
             bool: 是否添加成功
         """
         try:
-            # 尝试使用zipfile
-            with zipfile.ZipFile(archive_path, 'a') as zf:
-                # 如果存在同名文件，先删除
-                try:
-                    zf.remove(json_name)
-                except KeyError:
-                    pass
-                zf.write(json_path, json_name)
-                logger.info(f"[#process]添加JSON文件: {json_name}")
-                return True
+            # ZIP 直接追加成员并重写中央目录（同名文件被替换）
+            with open(json_path, 'rb') as f:
+                update_sidecars(archive_path, {json_name: f.read()})
+            logger.info(f"[#process]添加JSON文件: {json_name}")
+            return True
         except Exception:
             # 如果zipfile失败，使用7z
             try:
@@ -451,8 +508,18 @@ class ArchiveHandler:
                 return False
 
     @staticmethod
-    def convert_yaml_archive_to_json(archive_path: str) -> Optional[Dict[str, Any]]:
-        """转换压缩包中的YAML文件为JSON格式"""
+    def convert_yaml_archive_to_json(archive_path: str, uuid_directory: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """转换压缩包中的YAML文件为JSON格式（新UUID在 uuid_directory 的记录索引库中查重和登记）"""
+        try:
+            sidecars = read_sidecars(archive_path)
+        except zipfile.BadZipFile:
+            sidecars = None
+        except Exception as e:
+            logger.error(f"[#process]读取压缩包失败 {os.path.basename(archive_path)}: {e}")
+            return None
+        if sidecars is not None:
+            return ArchiveHandler._convert_yaml_sidecars(archive_path, sidecars, uuid_directory)
+        
         try:
             # 首先检查压缩包完整性
             # if not ArchiveHandler.check_archive_integrity(archive_path):
@@ -502,34 +569,80 @@ class ArchiveHandler:
                         pass
                 
                 # 如果存在JSON文件，删除它们并生成新的UUID
+                new_uuid = None
                 if json_files:
                     logger.info(f"[#process]发现现有JSON文件，将删除并生成新UUID: {os.path.basename(archive_path)}")
                     ArchiveHandler.delete_files_from_archive(archive_path, json_files)
-                    yaml_uuid = UuidHandler.generate_uuid(UuidHandler.load_existing_uuids())
+                    yaml_uuid = new_uuid = UuidHandler.generate_uuid(uuid_directory=uuid_directory)
                 
-                # 4. 转换为JSON格式
+                result = None
+                try:
+                    # 4. 转换为JSON格式
+                    json_data = JsonHandler.convert_yaml_to_json(yaml_data)
+                    json_data["uuid"] = yaml_uuid
+                    
+                    # 5. 保存JSON文件
+                    json_path = os.path.join(temp_dir, f"{yaml_uuid}.json")
+                    if not JsonHandler.save(json_path, json_data):
+                        logger.error(f"[#process]保存JSON文件失败: {os.path.basename(archive_path)}")
+                        return None
+                    
+                    # 6. 添加JSON到压缩包并删除YAML
+                    if ArchiveHandler.add_json_to_archive(archive_path, json_path, f"{yaml_uuid}.json"):
+                        # 删除YAML文件
+                        ArchiveHandler.delete_files_from_archive(archive_path, [f"{yaml_uuid}.yaml"])
+                        logger.info(f"[#process]✅ YAML转换完成: {os.path.basename(archive_path)}")
+                        result = json_data
+                        return json_data
+                    
+                    logger.error(f"[#process]更新压缩包失败: {os.path.basename(archive_path)}")
+                    return None
+                finally:
+                    if new_uuid:
+                        UuidHandler.finish_uuid(new_uuid, result, uuid_directory)
+                
+            finally:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+                
+        except Exception as e:
+            logger.error(f"[#process]转换失败 {os.path.basename(archive_path)}: {str(e)}")
+            return None
+
+    @staticmethod
+    def _convert_yaml_sidecars(archive_path: str, sidecars: Dict[str, bytes],
+                               uuid_directory: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """ZIP压缩包：在内存中转换YAML，一次改写完成删除YAML/旧JSON和写入新JSON"""
+        yaml_names = [name for name in sidecars if name.endswith('.yaml')]
+        if not yaml_names:
+            return None
+        try:
+            yaml_name = yaml_names[0]
+            yaml_uuid = os.path.splitext(yaml_name)[0]
+            yaml_data = yaml.safe_load(sidecars[yaml_name])
+            
+            # 如果存在JSON文件，删除它们并生成新的UUID
+            json_files = [name for name in sidecars if name.endswith('.json')]
+            new_uuid = None
+            if json_files:
+                logger.info(f"[#process]发现现有JSON文件，将删除并生成新UUID: {os.path.basename(archive_path)}")
+                yaml_uuid = new_uuid = UuidHandler.generate_uuid(uuid_directory=uuid_directory)
+            
+            result = None
+            try:
                 json_data = JsonHandler.convert_yaml_to_json(yaml_data)
                 json_data["uuid"] = yaml_uuid
                 
-                # 5. 保存JSON文件
-                json_path = os.path.join(temp_dir, f"{yaml_uuid}.json")
-                if not JsonHandler.save(json_path, json_data):
-                    logger.error(f"[#process]保存JSON文件失败: {os.path.basename(archive_path)}")
-                    return None
-                
-                # 6. 添加JSON到压缩包并删除YAML
-                if ArchiveHandler.add_json_to_archive(archive_path, json_path, f"{yaml_uuid}.json"):
-                    # 删除YAML文件
-                    ArchiveHandler.delete_files_from_archive(archive_path, [f"{yaml_uuid}.yaml"])
+                if ArchiveHandler.write_json_to_archive(archive_path, f"{yaml_uuid}.json", json_data,
+                                                        remove=json_files + [yaml_name]):
                     logger.info(f"[#process]✅ YAML转换完成: {os.path.basename(archive_path)}")
+                    result = json_data
                     return json_data
                 
                 logger.error(f"[#process]更新压缩包失败: {os.path.basename(archive_path)}")
                 return None
-                
             finally:
-                shutil.rmtree(temp_dir, ignore_errors=True)
-                
+                if new_uuid:
+                    UuidHandler.finish_uuid(new_uuid, result, uuid_directory)
         except Exception as e:
             logger.error(f"[#process]转换失败 {os.path.basename(archive_path)}: {str(e)}")
             return None
@@ -538,80 +651,45 @@ class ArchiveHandler:
 # uuid_file_path = r'E:\1BACKUP\ehv\uuid.md'  # 存储唯一 UUID 的 Markdown 文件
 uuid_lock = threading.Lock()  # 用于保护UUID文件操作的线程锁
 
+UUID_DIRECTORY = r'E:\1BACKUP\ehv\uuid'
+UUID_RECORDS_DB = 'uuid_records.db'  # UUID 记录索引库（在 UUID 目录下）
+_uuid_stores: Dict[str, UuidRecordStore] = {}
+
+def get_uuid_store(uuid_directory: Optional[str] = None) -> UuidRecordStore:
+    """获取 UUID 记录索引库（默认在 UUID_DIRECTORY 下），库为空且存在旧的 YAML/JSON 记录时自动迁移"""
+    uuid_directory = uuid_directory or UUID_DIRECTORY
+    with uuid_lock:
+        store = _uuid_stores.get(uuid_directory)
+        if store is None:
+            store = UuidRecordStore.open(os.path.join(uuid_directory, UUID_RECORDS_DB))
+            if len(store) == 0 and any(os.path.exists(os.path.join(uuid_directory, name))
+                                       for name in ('uuid_records.json', 'uuid_records.yaml')):
+                start_time = time.time()
+                logger.info("[#current_stats]📦 首次使用记录索引库，正在迁移旧记录...")
+                count = store.migrate(uuid_directory)
+                logger.info(f"[#current_stats]✅ 迁移完成，共 {count} 个UUID，耗时 {time.time() - start_time:.2f} 秒")
+            _uuid_stores[uuid_directory] = store
+        return store
+
 class FastUUIDLoader:
+    """按 UUID 查询记录（基于 UUID 记录索引库，YAML 记录首次使用时导入）"""
+    
     def __init__(self, yaml_path):
         self.yaml_path = yaml_path
-        self.cache_path = os.path.splitext(yaml_path)[0] + '.cache'
-        self._data = None
-        self._index = {}  # 初始化索引字典
-        self._lock = threading.Lock()
-        
-        # 初始化进度属性
+        self.store = UuidRecordStore.open(os.path.splitext(yaml_path)[0] + '.db')
         self.progress = {
-            'total_steps': 4,
+            'total_steps': 1,
             'current_step': 0,
             'message': '初始化中',
             'percentage': 0.0,
             'timestamp': time.time()
         }
-        
-        # 自动检测并生成优化格式
-        if not self._check_cache_valid():
-            self._build_cache()
-    
-    def _check_cache_valid(self):
-        """校验缓存有效性"""
-        if not os.path.exists(self.cache_path):
-            return False
-        # 校验时间戳和大小
-        yaml_mtime = os.path.getmtime(self.yaml_path)
-        cache_mtime = os.path.getmtime(self.cache_path)
-        return yaml_mtime <= cache_mtime
-    
-    def _build_cache(self):
-        """修复索引初始化问题"""
-        with self._lock:
-            try:
-                # 初始化索引
-                self._index = {}
-                
-                # 增加阶段标识
-                self._update_progress("开始解析YAML文件", 5)
-                
-                # 使用更高效的解析方式
-                with open(self.yaml_path, 'rb') as f:
-                    data = yaml.load(f, Loader=yaml.CSafeLoader)
-                
-                # 添加数据校验
-                if not data or not isinstance(data, list):
-                    raise ValueError("无效的YAML数据格式")
-                
-                self._update_progress("数据校验通过", 20)
-                
-                # 分批次构建索引
-                batch_size = 5000
-                total = len(data)
-                self._update_progress("开始构建索引", 30)
-                
-                for i in range(0, total, batch_size):
-                    batch = data[i:i+batch_size]
-                    for j, record in enumerate(batch):
-                        uuid = record.get('UUID')
-                        if uuid:
-                            self._index[uuid] = i + j
-                    # 实时更新进度
-                    progress = 30 + 60 * (i + batch_size) / total
-                    self._update_progress(f"索引构建中 ({i+batch_size}/{total})", min(90, progress))
-                
-                self._update_progress("写入缓存文件", 95)
-                with open(self.cache_path, 'wb') as f:
-                    np.savez_compressed(f, data=data, index=self._index)
-                
-                self._update_progress("完成", 100)
-                
-            except Exception as e:
-                self._index = None  # 构建失败时重置索引
-                raise
+        if len(self.store) == 0 and os.path.exists(yaml_path):
+            self._update_progress("导入YAML记录", 0)
+            count = self.store.import_yaml_records(yaml_path)
+            self._update_progress(f"导入完成，共 {count} 个UUID", 100)
+        else:
+            self._update_progress("完成", 100)
 
     def _update_progress(self, message, percentage):
         """更新进度信息"""
@@ -626,24 +704,13 @@ class FastUUIDLoader:
         """获取当前加载进度"""
         return self.progress
     
-    def _load_cache(self):
-        """加载优化格式"""
-        with open(self.cache_path, 'rb') as f:
-            cache = np.load(f, allow_pickle=True)
-            self._data = cache['data'].tolist()
-            self._index = cache['index'].item() if 'index' in cache else {}
-    
     def get_uuids(self):
         """获取UUID集合"""
-        if self._index is None:
-            self._load_cache()
-        return set(self._index.keys())
+        return self.store.uuids()
     
     def get_record(self, uuid):
         """快速查询记录"""
-        if self._index is None:
-            self._load_cache()
-        return self._data[self._index[uuid]]
+        return self.store.get(uuid)
 
 def repair_uuid_records(uuid_record_path):
     """修复损坏的UUID记录文件。"""
@@ -721,7 +788,7 @@ def load_existing_uuids():
     return uuids
 
 def add_uuid_to_file(uuid, timestamp, archive_name, artist_name, relative_path=None, cache=None):
-    """将生成的 UUID 添加到缓存"""
+    """将生成的 UUID 添加到缓存（cache 为 None 时直接写入记录索引库）"""
     record = {
         'UUID': uuid,
         'CreatedAt': timestamp,
@@ -743,6 +810,8 @@ def add_uuid_to_file(uuid, timestamp, archive_name, artist_name, relative_path=N
             }
         }
         return
+    
+    get_uuid_store().add(uuid, timestamp, archive_name, artist_name, relative_path)
 
 class PathHandler:
     """路径处理类"""
@@ -849,29 +918,37 @@ class UuidHandler:
     """UUID处理类"""
     
     @staticmethod
-    def generate_uuid(existing_uuids: set) -> str:
-        """生成一个唯一的16位UUID"""
+    def generate_uuid(existing_uuids=None, uuid_directory: Optional[str] = None) -> str:
+        """生成一个唯一的16位UUID
+        
+        Args:
+            existing_uuids: 已有UUID的集合；为 None 时在记录索引库中查重并预留
+            uuid_directory: 记录索引库所在目录，默认 UUID_DIRECTORY；须与之后的 finish_uuid 一致
+        """
+        if existing_uuids is None:
+            return get_uuid_store(uuid_directory).generate(lambda: generate(size=16))
         while True:
             new_uuid = generate(size=16)
             if new_uuid not in existing_uuids:
                 return new_uuid
     
     @staticmethod
-    def load_existing_uuids() -> set:
-        """从JSON记录中加载现有UUID"""
+    def finish_uuid(uuid: str, json_data: Optional[Dict[str, Any]], uuid_directory: Optional[str] = None) -> None:
+        """结束 generate_uuid 的预留：写入压缩包成功时登记记录，失败（json_data 为 None）时释放"""
+        store = get_uuid_store(uuid_directory)
+        if json_data is None:
+            store.release(uuid)
+        else:
+            store.add_many({uuid: {"timestamps": json_data.get("timestamps") or {}}})
+    
+    @staticmethod
+    def load_existing_uuids(uuid_directory: Optional[str] = None) -> set:
+        """从记录索引库中加载现有UUID"""
         logger.info("[#current_stats]🔍 开始加载现有UUID...")
         start_time = time.time()
         
-        json_record_path = r'E:\1BACKUP\ehv\uuid\uuid_records.json'
-        if not os.path.exists(json_record_path):
-            return set()
-            
         try:
-            with open(json_record_path, 'r', encoding='utf-8') as f:
-                records = json.load(f)
-            # 从record键获取数据
-            uuids = set(records.get("record", {}).keys())
-            
+            uuids = get_uuid_store(uuid_directory).uuids()
             elapsed = time.time() - start_time
             logger.info(f"[#current_stats]✅ 加载完成！共加载 {len(uuids)} 个UUID，耗时 {elapsed:.2f} 秒")
             return uuids
@@ -968,46 +1045,132 @@ class YamlHandler:
             logger.error(f"修复YAML文件时出错 {yaml_path}: {e}")
             return []
 
+@dataclass
+class ArchivePlan:
+    """只读探测的结果：压缩包信息和需要执行的写入操作"""
+    archive_path: str
+    archive_name: str
+    artist_name: str
+    relative_path: str
+    action: str  # 'skip' 无需更新 / 'update' 更新唯一的JSON / 'regenerate' 删除现有文件并生成新JSON
+    valid_json_files: List[tuple] = field(default_factory=list)
+    yaml_files: List[str] = field(default_factory=list)
+    all_json_files: List[str] = field(default_factory=list)
+
 class ArchiveProcessor:
-    """压缩文件处理类"""
+    """压缩文件处理类
+    
+    process_archives 分两级流水线：
+    - 探测（只读）：按卷限制并发（IOScheduler），读取中央目录和JSON/YAML，决定是否需要写入
+    - 写入：需要改写的压缩包交给独立的小线程池，每个压缩包只有一个写入任务
+    UUID记录按扫描顺序（--order）提交到记录索引库：已提交的总是扫描顺序上的一个连续前缀，
+    重复UUID的合并结果因此与完成先后无关；探测按卷内扫描顺序进行（keep_order），前缀会持续推进，
+    攒够 batch_size 条写入一次。
+    """
     
     def __init__(self, target_directory: str, uuid_directory: str, 
-                 max_workers: int = 5, order: str = 'mtime'):
+                 max_workers: int = 5, order: str = 'mtime', write_workers: int = 2,
+                 batch_size: int = 500):
         self.target_directory = target_directory
         self.uuid_directory = uuid_directory
-        self.max_workers = max_workers
+        self.max_workers = max_workers  # SSD/未知卷上的探测并发（机械盘按 IOScheduler 默认值）
+        self.write_workers = write_workers
         self.order = order  # 保存排序方式
         self.total_archives = 0  # 总文件数
         self.processed_archives = 0  # 已处理文件数
+        self.uuid_cache: Dict[str, Dict[str, Any]] = {}  # 待提交的UUID记录
+        self.batch_size = batch_size
+    
+    def _collect_archives(self) -> List[str]:
+        """扫描目标目录，按 order 排序（决定探测和处理的顺序）"""
+        archive_files = []
+        for root, _, files in os.walk(self.target_directory):
+            for file in files:
+                if file.endswith(('.zip', '.rar', '.7z')):
+                    archive_files.append(os.path.join(root, file))
+        if self.order == 'path':
+            archive_files.sort()
+        else:
+            mtimes = {}
+            for path in archive_files:
+                try:
+                    mtimes[path] = os.path.getmtime(path)
+                except OSError:
+                    mtimes[path] = 0
+            archive_files.sort(key=lambda path: mtimes[path], reverse=True)
+        return archive_files
     
     def process_archives(self) -> bool:
-        """处理所有压缩文件（SSD优化版）"""
+        """处理所有压缩文件（按 order 顺序并行探测、写入独立、记录按扫描顺序分批提交）"""
         try:
             timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
             logger.info("[#current_stats]🔍 开始扫描压缩文件")
             
-            # 直接快速扫描SSD
-            archive_files = []
-            for root, _, files in os.walk(self.target_directory):
-                for file in files:
-                    if file.endswith(('.zip', '.rar', '.7z')):
-                        archive_files.append(os.path.join(root, file))
-            
+            archive_files = self._collect_archives()
             self.total_archives = len(archive_files)
             self.processed_archives = 0
             logger.info(f"[#current_stats]共发现 {self.total_archives} 个压缩文件")
+            if not archive_files:
+                return True
             
-            # 使用内存缓存处理
-            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-                futures = [executor.submit(self.process_single_archive, path, timestamp) 
-                         for path in archive_files]
-                
-                for future in as_completed(futures):
-                    future.result()
-                    self.processed_archives += 1
-                    progress = (self.processed_archives / self.total_archives) * 100
-                    logger.info(f"[@current_progress]处理进度: ({self.processed_archives}/{self.total_archives}) {progress:.1f}%")
-            
+            index_of = {path: i for i, path in enumerate(archive_files)}
+            finished: Dict[int, Optional[Dict[str, Any]]] = {}  # 序号 -> 待提交的记录
+            next_commit = 0
+            writes = {}
+            write_count = 0
+            start_time = time.perf_counter()
+            
+            def complete(index: int, records: Optional[Dict[str, Any]]):
+                nonlocal next_commit
+                finished[index] = records
+                self.processed_archives += 1
+                # 只提交扫描顺序上连续完成的前缀：同一次运行的重复UUID共用时间戳，
+                # 按固定顺序合并结果才确定
+                while next_commit in finished:
+                    self._queue_records(finished.pop(next_commit))
+                    next_commit += 1
+                self._batch_update_records()
+                elapsed = time.perf_counter() - start_time
+                rate = self.processed_archives / elapsed if elapsed > 0 else 0.0
+                progress = (self.processed_archives / self.total_archives) * 100
+                logger.info(f"[@current_progress]处理进度: ({self.processed_archives}/{self.total_archives}) "
+                            f"{progress:.1f}% | {rate:.1f} 个/秒")
+            
+            def collect_writes(wait: bool):
+                for future in (as_completed(list(writes)) if wait else [f for f in writes if f.done()]):
+                    plan = writes.pop(future)
+                    try:
+                        records = future.result()
+                    except Exception as e:
+                        logger.error(f"[#process]处理压缩包时出错 {plan.archive_path}: {str(e)}")
+                        records = None
+                    complete(index_of[plan.archive_path], records)
+            
+            # keep_order：每个卷内按 --order 的顺序探测，而不是按位置/大小重新排序
+            scheduler = IOScheduler(limits={SSD: self.max_workers, UNKNOWN: self.max_workers}, keep_order=True)
+            with ThreadPoolExecutor(max_workers=self.write_workers) as writer:
+                for task in scheduler.run(archive_files, lambda path: self._probe_archive(path)):
+                    if task.error is not None:
+                        if isinstance(task.error, subprocess.CalledProcessError):
+                            logger.error(f"[#process]发现损坏的压缩包: {task.path}")
+                        else:
+                            logger.error(f"[#process]处理压缩包时出错 {task.path}: {str(task.error)}")
+                        complete(index_of[task.path], None)
+                    elif task.result.action == 'skip':
+                        complete(index_of[task.path], self._skip_records(task.result))
+                    else:
+                        writes[writer.submit(self._apply_plan, task.result, timestamp)] = task.result
+                        write_count += 1
+                    collect_writes(wait=False)
+                collect_writes(wait=True)
+            self._batch_update_records(force=True)
+            get_uuid_store(self.uuid_directory).flush()
+            
+            elapsed = time.perf_counter() - start_time
+            logger.info(f"[#current_stats]📊 {self.total_archives} 个压缩包，写入 {write_count} 个，"
+                        f"耗时 {elapsed:.1f} 秒，{self.total_archives / max(elapsed, 1e-9):.1f} 个/秒")
+            for line in scheduler.summary_lines():
+                logger.info(f"[#current_stats]{line}")
             return True
         finally:
             logger.info("[#current_stats]✨ 所有文件处理完成！")
@@ -1023,38 +1186,11 @@ class ArchiveProcessor:
             bool: 处理是否成功
         """
         try:
-            # 保存原始时间戳
-            # original_mtime = os.path.getmtime(archive_path)
-            # original_atime = os.path.getatime(archive_path)
-            
-            # 获取文件信息
-            artist_name = PathHandler.get_artist_name(self.target_directory, archive_path, args.mode if hasattr(args, 'mode') else 'multi')
-            archive_name = os.path.basename(archive_path)
-            relative_path = PathHandler.get_relative_path(self.target_directory, archive_path)
-            
-            # 检查压缩包中的JSON文件和YAML文件
-            valid_json_files, yaml_files, all_json_files = self._find_valid_json_files(archive_path)
-            
-            # 检查是否存在重名但时间戳不同的JSON文件
-            json_base_names = {}
-            for name, _ in valid_json_files:
-                base_name = os.path.splitext(name)[0]
-                if base_name in json_base_names:
-                    logger.info(f"[#process]发现重名JSON文件，将重新生成: {os.path.basename(archive_path)}")
-                    return self._handle_multiple_json(archive_path, valid_json_files, yaml_files, all_json_files, archive_name, artist_name, relative_path, timestamp)
-                json_base_names[base_name] = True
-            
-            # 如果存在YAML文件，需要删除并重新生成JSON
-            if yaml_files:
-                logger.info(f"[#process]发现YAML文件，将删除并生成新JSON: {os.path.basename(archive_path)}")
-                return self._handle_multiple_json(archive_path, valid_json_files, yaml_files, all_json_files, archive_name, artist_name, relative_path, timestamp)
-            
-            # 根据JSON文件数量决定处理方式
-            if len(valid_json_files) == 1 and len(all_json_files) == 1:
-                return self._handle_single_json(archive_path, valid_json_files[0], archive_name, artist_name, relative_path, timestamp)
-            else:
-                return self._handle_multiple_json(archive_path, valid_json_files, yaml_files, all_json_files, archive_name, artist_name, relative_path, timestamp)
-                
+            plan = self._probe_archive(archive_path)
+            records = self._apply_plan(plan, timestamp)
+            if records:
+                get_uuid_store(self.uuid_directory).add_many(records)
+            return records is not None
         except subprocess.CalledProcessError:
             logger.error(f"[#process]发现损坏的压缩包: {archive_path}")
             return True
@@ -1062,6 +1198,64 @@ class ArchiveProcessor:
             logger.error(f"[#process]处理压缩包时出错 {archive_path}: {str(e)}")
             return True
     
+    def _probe_archive(self, archive_path: str) -> ArchivePlan:
+        """只读探测：读取压缩包中的JSON/YAML文件，决定需要执行的操作"""
+        # 获取文件信息
+        artist_name = PathHandler.get_artist_name(self.target_directory, archive_path, args.mode if hasattr(args, 'mode') else 'multi')
+        archive_name = os.path.basename(archive_path)
+        relative_path = PathHandler.get_relative_path(self.target_directory, archive_path)
+        
+        # 检查压缩包中的JSON文件和YAML文件
+        valid_json_files, yaml_files, all_json_files = self._find_valid_json_files(archive_path)
+        plan = ArchivePlan(archive_path, archive_name, artist_name, relative_path, 'regenerate',
+                           valid_json_files, yaml_files, all_json_files)
+        
+        # 检查是否存在重名但时间戳不同的JSON文件
+        json_base_names = {os.path.splitext(name)[0] for name, _ in valid_json_files}
+        if len(json_base_names) < len(valid_json_files):
+            logger.info(f"[#process]发现重名JSON文件，将重新生成: {archive_name}")
+            return plan
+        
+        # 如果存在YAML文件，需要删除并重新生成JSON
+        if yaml_files:
+            logger.info(f"[#process]发现YAML文件，将删除并生成新JSON: {archive_name}")
+            return plan
+        
+        # 根据JSON文件数量决定处理方式
+        if len(valid_json_files) == 1 and len(all_json_files) == 1:
+            _, json_content = valid_json_files[0]
+            if JsonHandler.check_and_update_record(json_content, archive_name, artist_name, relative_path, None):
+                plan.action = 'update'
+            else:
+                plan.action = 'skip'
+        return plan
+    
+    def _apply_plan(self, plan: ArchivePlan, timestamp: str) -> Optional[Dict[str, Any]]:
+        """执行写入，返回需要提交的UUID记录 {uuid: {"timestamps": {...}}}，失败返回 None"""
+        if plan.action == 'skip':
+            return self._skip_records(plan)
+        if plan.action == 'update':
+            return self._handle_single_json(plan.archive_path, plan.valid_json_files[0], plan.archive_name,
+                                            plan.artist_name, plan.relative_path, timestamp)
+        return self._handle_multiple_json(plan.archive_path, plan.valid_json_files, plan.yaml_files,
+                                          plan.all_json_files, plan.archive_name, plan.artist_name,
+                                          plan.relative_path, timestamp)
+    
+    def _skip_records(self, plan: ArchivePlan) -> Dict[str, Any]:
+        """
+        无需改写的压缩包：UUID 不在记录库中时返回其JSON里的记录以便补登
+        
+        上次运行在写入压缩包之后、提交记录之前中断时，压缩包已是最新，只能在这里补上记录
+        """
+        if not plan.valid_json_files:
+            return {}
+        _, json_content = plan.valid_json_files[0]
+        uuid = json_content.get("uuid")
+        if not uuid or uuid in get_uuid_store(self.uuid_directory):
+            return {}
+        logger.info(f"[#process]补登缺失的UUID记录: {plan.archive_name}")
+        return {uuid: {"timestamps": json_content.get("timestamps") or {}}}
+    
     def _find_valid_json_files(self, archive_path: str) -> tuple[List[tuple], List[str], List[str]]:
         """查找压缩包中的有效JSON文件和YAML文件
         
@@ -1076,20 +1270,18 @@ class ArchiveProcessor:
         all_json_files = []  # 存储所有JSON文件，包括无效的
         
         try:
-            # 尝试使用zipfile
-            with zipfile.ZipFile(archive_path, 'r') as zf:
-                for name in zf.namelist():
-                    if name.endswith('.json'):
-                        all_json_files.append(name)
-                        try:
-                            with zf.open(name) as f:
-                                json_content = orjson.loads(f.read())
-                                if "uuid" in json_content and "timestamps" in json_content:
-                                    valid_json_files.append((name, json_content))
-                        except Exception:
-                            continue
-                    elif name.endswith('.yaml'):
-                        yaml_files.append(name)
+            # ZIP：读一次中央目录，JSON/YAML直接在内存中解压
+            for name, data in read_sidecars(archive_path).items():
+                if name.endswith('.json'):
+                    all_json_files.append(name)
+                    try:
+                        json_content = orjson.loads(data)
+                        if "uuid" in json_content and "timestamps" in json_content:
+                            valid_json_files.append((name, json_content))
+                    except Exception:
+                        continue
+                elif name.endswith('.yaml'):
+                    yaml_files.append(name)
         except zipfile.BadZipFile:
             # 如果不是zip文件，使用7z
             try:
@@ -1124,7 +1316,7 @@ class ArchiveProcessor:
         return valid_json_files, yaml_files, all_json_files
     
     def _handle_single_json(self, archive_path: str, json_file: tuple, archive_name: str, 
-                          artist_name: str, relative_path: str, timestamp: str) -> bool:
+                          artist_name: str, relative_path: str, timestamp: str) -> Optional[Dict[str, Any]]:
         """处理单个JSON文件的情况
         
         Args:
@@ -1136,35 +1328,28 @@ class ArchiveProcessor:
             timestamp: 时间戳
             
         Returns:
-            bool: 处理是否成功
+            Optional[Dict]: 需要提交的UUID记录，失败返回 None
         """
         json_name, json_content = json_file
         
         # 检查是否需要更新
         if not JsonHandler.check_and_update_record(json_content, archive_name, artist_name, relative_path, timestamp):
             # logger.info(f"[#process]记录无需更新: {os.path.basename(archive_path)}")
-            return True
+            return {}
             
         # 更新记录
         logger.info(f"[#process]检测到记录需要更新: {os.path.basename(archive_path)}")
         json_content = JsonHandler.update_record(json_content, archive_name, artist_name, relative_path, timestamp)
         
-        # 创建临时文件并更新压缩包
-        temp_dir = os.path.join(os.path.dirname(archive_path), '.temp_update')
-        os.makedirs(temp_dir, exist_ok=True)
-        try:
-            temp_json = os.path.join(temp_dir, json_name)
-            if JsonHandler.save(temp_json, json_content):
-                if ArchiveHandler.add_json_to_archive(archive_path, temp_json, json_name):
-                    logger.info(f"[#update]✅ 已更新压缩包中的JSON记录: {archive_name}")
-                    return True
-            return False
-        finally:
-            shutil.rmtree(temp_dir, ignore_errors=True)
+        # 更新压缩包中的JSON
+        if ArchiveHandler.write_json_to_archive(archive_path, json_name, json_content):
+            logger.info(f"[#update]✅ 已更新压缩包中的JSON记录: {archive_name}")
+            return {json_content["uuid"]: {"timestamps": {timestamp: json_content["timestamps"][timestamp]}}}
+        return None
     
     def _handle_multiple_json(self, archive_path: str, valid_json_files: List[tuple], yaml_files: List[str], 
                             all_json_files: List[str], archive_name: str, artist_name: str, 
-                            relative_path: str, timestamp: str) -> bool:
+                            relative_path: str, timestamp: str) -> Optional[Dict[str, Any]]:
         """处理多个JSON文件或需要生成新JSON的情况
         
         Args:
@@ -1178,24 +1363,17 @@ class ArchiveProcessor:
             timestamp: 时间戳
             
         Returns:
-            bool: 处理是否成功
+            Optional[Dict]: 需要提交的UUID记录，失败返回 None
         """
-        # 删除所有JSON和YAML文件
+        # 删除所有JSON和YAML文件（与写入新JSON在同一次改写中完成）
         files_to_delete = all_json_files  # 删除所有JSON文件，包括无效的
         files_to_delete.extend(yaml_files)
         
         if files_to_delete:
             logger.info(f"[#process]删除现有文件: {os.path.basename(archive_path)}")
-            # 强力删除：先尝试使用通配符删除
-            try:
-                ArchiveHandler.delete_files_from_archive(archive_path, ['*.json', '*.yaml'])
-            except Exception:
-                pass
-            # 然后再逐个删除具体文件
-            ArchiveHandler.delete_files_from_archive(archive_path, files_to_delete)
         
         # 创建新的UUID记录
-        uuid_value = UuidHandler.generate_uuid(UuidHandler.load_existing_uuids())
+        uuid_value = UuidHandler.generate_uuid(uuid_directory=self.uuid_directory)
         json_filename = f"{uuid_value}.json"
         
         # 获取按年月日分层的目录路径
@@ -1217,47 +1395,38 @@ class ArchiveProcessor:
             }
         }
         
-        # 保存并添加新JSON文件
-        if JsonHandler.save(json_path, json_data):
-            logger.info(f"[#process]创建新JSON: {json_filename}")
-            if ArchiveHandler.add_json_to_archive(archive_path, json_path, json_filename):
-                logger.info(f"[#update]✅ 已添加新JSON到压缩包: {archive_name}")
-                return True
-            else:
+        # 保存并添加新JSON文件；成功时记录随批次登记，失败时释放预留的UUID并删除已保存的JSON
+        committed = False
+        try:
+            if JsonHandler.save(json_path, json_data):
+                logger.info(f"[#process]创建新JSON: {json_filename}")
+                if ArchiveHandler.write_json_to_archive(archive_path, json_filename, json_data, remove=files_to_delete):
+                    logger.info(f"[#update]✅ 已添加新JSON到压缩包: {archive_name}")
+                    committed = True
+                    return {uuid_value: {"timestamps": json_data["timestamps"]}}
                 logger.error(f"[#process]添加JSON到压缩包失败: {archive_name}")
-        else:
-            logger.error(f"[#process]JSON文件保存失败: {archive_name}")
-            
-        return False
+            else:
+                logger.error(f"[#process]JSON文件保存失败: {archive_name}")
+            return None
+        finally:
+            if not committed:
+                UuidHandler.finish_uuid(uuid_value, None, self.uuid_directory)
+                if os.path.exists(json_path):
+                    try:
+                        os.remove(json_path)
+                    except OSError:
+                        pass
+
+    def _queue_records(self, records: Optional[Dict[str, Any]]):
+        """把记录合并到待提交缓存"""
+        for uuid, data in (records or {}).items():
+            merge_timestamps(self.uuid_cache.setdefault(uuid, {"timestamps": {}}), data.get("timestamps") or {})
 
     def _batch_update_records(self, force=False):
-        """批量更新记录到JSON（优化版）"""
-        if len(self.uuid_cache) >= self.batch_size or force:
-            json_record_path = r'E:\1BACKUP\ehv\uuid\uuid_records.json'
-            
-            # 加载现有记录
-            existing_records = JsonHandler.load(json_record_path) or {"record": {}}
-            
-            # 合并到record键下
-            for uuid, data in self.uuid_cache.items():
-                if uuid not in existing_records["record"]:
-                    existing_records["record"][uuid] = data
-                else:
-                    # 合并时间戳记录
-                    existing_records["record"][uuid]["timestamps"].update(data["timestamps"])
-            
-            # 使用原子操作保存
-            temp_path = f"{json_record_path}.tmp"
-            with open(temp_path, 'w', encoding='utf-8') as f:
-                json.dump(existing_records, f, ensure_ascii=False, indent=2)
-            
-            # 文件替换操作
-            if os.path.exists(json_record_path):
-                os.replace(temp_path, json_record_path)
-            else:
-                os.rename(temp_path, json_record_path)
-            
-            logger.info(f"[#process]✅ 批量更新 {len(self.uuid_cache)} 条记录")
+        """批量写入缓存的记录到记录索引库（一个事务）"""
+        if self.uuid_cache and (len(self.uuid_cache) >= self.batch_size or force):
+            count = get_uuid_store(self.uuid_directory).add_many(self.uuid_cache)
+            logger.info(f"[#process]✅ 批量更新 {count} 条记录")
             self.uuid_cache.clear()
 
 def main():
@@ -1273,6 +1442,7 @@ def main():
         ("重组UUID - 按时间重组UUID文件", "reorganize", "-r"),  # 添加重组选项
         ("更新记录 - 更新UUID记录文件", "update_records", "-u"),  # 添加更新记录选项
         ("转换YAML - 转换现有YAML到JSON", "convert_yaml", "--convert"),  # 添加YAML转换选项
+        ("迁移记录 - 导入旧记录到索引库", "migrate_records", "--migrate-records"),
         ("按路径排序 - 按文件路径升序处理", "order_path", "--order path"),
         ("按时间排序 - 按修改时间倒序处理", "order_mtime", "--order mtime", True),  # 默认选中
     ]
@@ -1548,6 +1718,7 @@ class CommandManager:
         parser.add_argument('-r', '--reorganize', action='store_true', help='重新组织 UUID 文件结构')
         parser.add_argument('-u', '--update-records', action='store_true', help='更新 UUID 记录文件')
         parser.add_argument('--convert', action='store_true', help='转换YAML到JSON结构')
+        parser.add_argument('--migrate-records', action='store_true', help='把旧的YAML/JSON记录导入UUID记录索引库')
         parser.add_argument('--order', choices=['path', 'mtime'], default='mtime',
                           help='处理顺序: path(按路径升序) 或 mtime(按修改时间倒序)')
         return parser
@@ -1637,6 +1808,11 @@ class TaskExecutor:
             self._execute_convert_task()
             return
 
+        if self.args.migrate_records:
+            self.uuid_record_manager.migrate_records()
+            if not (self.args.reorganize or self.args.update_records or self.args.auto_sequence):
+                return
+
         if self.args.reorganize:
             self._execute_reorganize_task()
 
@@ -1645,7 +1821,7 @@ class TaskExecutor:
 
         if self.args.auto_sequence:
             self._execute_auto_sequence()
-        elif not self.args.reorganize and not self.args.update_records:
+        elif not self.args.reorganize and not self.args.update_records and not self.args.migrate_records:
             self._execute_normal_process()
 
     def _execute_convert_task(self) -> None:
@@ -1723,18 +1899,13 @@ class TaskExecutor:
                 logger.error(f"[#process]错误输出: {e.output}")
 
     def _validate_json_records(self) -> None:
-        """验证JSON记录文件"""
-        json_record_path = os.path.join(self.uuid_directory, 'uuid_records.json')
-        if os.path.exists(json_record_path):
-            try:
-                with open(json_record_path, 'r', encoding='utf-8') as f:
-                    json.load(f)
-                logger.info("[#current_stats]✅ JSON记录文件验证通过")
-            except json.JSONDecodeError as e:
-                logger.error(f"[#process]❌ JSON记录文件验证失败: {e}")
-                sys.exit(1)
-        else:
-            logger.warning("[#process]⚠️ JSON记录文件不存在")
+        """验证UUID记录索引库"""
+        try:
+            count = len(get_uuid_store(self.uuid_directory))
+            logger.info(f"[#current_stats]✅ UUID记录索引库验证通过，共 {count} 个UUID")
+        except Exception as e:
+            logger.error(f"[#process]❌ UUID记录索引库验证失败: {e}")
+            sys.exit(1)
 
 class UuidRecordManager:
     """UUID记录管理类"""
@@ -1746,15 +1917,20 @@ class UuidRecordManager:
         """根据最后修改时间重新组织UUID文件的目录结构"""
         logger.info("[#current_stats]🔄 开始重新组织UUID文件...")
         
-        json_record_path = os.path.join(self.uuid_directory, 'uuid_records.json')
-        if not os.path.exists(json_record_path):
-            logger.error("[#process]❌ UUID记录文件不存在")
+        store = get_uuid_store(self.uuid_directory)
+        if len(store) == 0:
+            logger.error("[#process]❌ UUID记录为空")
             return
             
         try:
-            with open(json_record_path, 'r', encoding='utf-8') as f:
-                records = json.load(f)
-                
+            # 遍历一次目录，建立 UUID -> 当前JSON路径 的索引
+            current_paths = {}
+            for root, _, files in os.walk(self.uuid_directory):
+                for file in files:
+                    if file.endswith('.json') and file != 'uuid_records.json':
+                        current_paths.setdefault(os.path.splitext(file)[0], os.path.join(root, file))
+            
+            records = dict(store.items())
             total_records = len(records)
             processed = 0
             
@@ -1775,11 +1951,7 @@ class UuidRecordManager:
                     day_dir = os.path.join(month_dir, day)
                     target_path = os.path.join(day_dir, f"{uuid}.json")
                     
-                    current_json_path = None
-                    for root, _, files in os.walk(self.uuid_directory):
-                        if f"{uuid}.json" in files:
-                            current_json_path = os.path.join(root, f"{uuid}.json")
-                            break
+                    current_json_path = current_paths.get(uuid)
                     
                     if current_json_path and current_json_path != target_path:
                         os.makedirs(day_dir, exist_ok=True)
@@ -1798,131 +1970,39 @@ class UuidRecordManager:
         logger.info("[#current_stats]✨ UUID文件重组完成")
     
     def update_json_records(self) -> None:
-        """更新JSON记录文件，确保所有记录都被保存"""
+        """把目录中的UUID JSON文件合并到记录索引库（批量写入，不再重写整个记录文件）"""
         logger.info("[#current_stats]🔄 开始更新JSON记录...")
-        
-        json_record_path = os.path.join(self.uuid_directory, 'uuid_records.json')
-        
-        # 加载现有记录，确保基础结构正确
+        start_time = time.time()
         try:
-            existing_records = JsonHandler.load(json_record_path)
-            if not isinstance(existing_records, dict):
-                existing_records = {"record": {}}
-            if "record" not in existing_records:
-                existing_records["record"] = {}
+            count = get_uuid_store(self.uuid_directory).import_json_dir(self.uuid_directory)
+            logger.info(f"[#current_stats]✅ JSON记录更新完成：新增或更新 {count} 个UUID，"
+                        f"耗时 {time.time() - start_time:.2f} 秒")
         except Exception as e:
-            logger.error(f"[#process]加载记录文件失败，将创建新记录: {e}")
-            existing_records = {"record": {}}
-        
-        total_files = 0
-        processed = 0
-        
-        # 首先计算总文件数
-        for root, _, files in os.walk(self.uuid_directory):
-            total_files += sum(1 for file in files if file.endswith('.json') and file != 'uuid_records.json')
-        
-        # 遍历目录结构查找所有JSON文件
-        for root, _, files in os.walk(self.uuid_directory):
-            for file in files:
-                if file.endswith('.json') and file != 'uuid_records.json':
-                    uuid = os.path.splitext(file)[0]
-                    json_path = os.path.join(root, file)
-                    try:
-                        file_data = JsonHandler.load(json_path)
-                        if not file_data:
-                            logger.warning(f"[#process]跳过空文件: {file}")
-                            continue
-                            
-                        # 无论是否需要更新，都确保记录存在于缓存中
-                        if uuid not in existing_records["record"]:
-                            # 新记录，直接添加
-                            existing_records["record"][uuid] = file_data
-                            logger.info(f"[#process]✅ 添加新记录: {uuid}")
-                        else:
-                            # 已存在的记录，合并时间戳
-                            if "timestamps" not in existing_records["record"][uuid]:
-                                existing_records["record"][uuid]["timestamps"] = {}
-                            
-                            if "timestamps" in file_data:
-                                # 检查是否有新的时间戳需要更新
-                                has_new_timestamps = False
-                                for timestamp, data in file_data["timestamps"].items():
-                                    if timestamp not in existing_records["record"][uuid]["timestamps"]:
-                                        has_new_timestamps = True
-                                        existing_records["record"][uuid]["timestamps"][timestamp] = data
-                                
-                                if has_new_timestamps:
-                                    logger.info(f"[#process]✅ 更新记录: {uuid}")
-                                else:
-                                    logger.info(f"[#process]✓ 记录已存在且无需更新: {uuid}")
-                            else:
-                                logger.info(f"[#process]✓ 记录已存在且无需更新: {uuid}")
-                            
-                    except Exception as e:
-                        logger.error(f"[#process]处理JSON文件失败 {json_path}: {e}")
-                    
-                    processed += 1
-                    logger.info(f"[@current_progress]更新进度 {processed}/{total_files} ({(processed/total_files*100):.1f}%)")
-        
-        # 使用临时文件保证写入安全性
-        temp_path = f"{json_record_path}.tmp"
+            logger.error(f"[#process]❌ JSON记录更新失败: {e}")
+    
+    def migrate_records(self) -> None:
+        """把旧的 uuid_records.yaml / uuid_records.json 和目录中的JSON文件导入记录索引库"""
+        logger.info("[#current_stats]📦 开始迁移UUID记录...")
+        start_time = time.time()
         try:
-            with open(temp_path, 'w', encoding='utf-8') as f:
-                json.dump(existing_records, f, ensure_ascii=False, indent=2)
-            
-            # 原子性替换
-            if os.path.exists(json_record_path):
-                os.replace(temp_path, json_record_path)
-            else:
-                os.rename(temp_path, json_record_path)
-            logger.info("[#current_stats]✅ JSON记录更新完成")
-            
+            store = get_uuid_store(self.uuid_directory)
+            count = store.migrate(self.uuid_directory)
+            logger.info(f"[#current_stats]✅ 迁移完成：新增或更新 {count} 个UUID，共 {len(store)} 个，"
+                        f"耗时 {time.time() - start_time:.2f} 秒")
         except Exception as e:
-            logger.error(f"[#process]❌ JSON记录更新失败: {e}")
-            if os.path.exists(temp_path):
-                try:
-                    os.remove(temp_path)
-                except:
-                    pass
+            logger.error(f"[#process]❌ 迁移UUID记录失败: {e}")
     
     def convert_yaml_to_json_structure(self) -> None:
         """将现有的YAML文件结构转换为JSON结构"""
         logger.info("[#current_stats]🔄 开始转换YAML到JSON结构...")
         
         yaml_record_path = os.path.join(self.uuid_directory, 'uuid_records.yaml')
-        json_record_path = os.path.join(self.uuid_directory, 'uuid_records.json')
         
-        # 转换主记录文件
+        # 转换主记录文件（导入记录索引库）
         if os.path.exists(yaml_record_path):
             try:
-                with open(yaml_record_path, 'r', encoding='utf-8') as f:
-                    yaml_data = yaml.safe_load(f)
-                    
-                total_records = len(yaml_data)
-                processed = 0
-                
-                json_records = {}
-                for record in yaml_data:
-                    uuid = record.get('UUID')
-                    if not uuid:
-                        continue
-                        
-                    if uuid not in json_records:
-                        json_records[uuid] = {"timestamps": {}}
-                        
-                    timestamp = record.get('LastModified') or record.get('CreatedAt')
-                    if timestamp:
-                        json_records[uuid]["timestamps"][timestamp] = {
-                            "archive_name": record.get('ArchiveName', ''),
-                            "artist_name": record.get('ArtistName', ''),
-                            "relative_path": record.get('LastPath', '')
-                        }
-                    
-                    processed += 1
-                    logger.info(f"[@current_progress]转换进度 {processed}/{total_records} ({(processed/total_records*100):.1f}%)")
-                
-                JsonHandler.save(json_record_path, json_records)
-                logger.info("[#current_stats]✅ 主记录文件转换完成")
+                count = get_uuid_store(self.uuid_directory).import_yaml_records(yaml_record_path)
+                logger.info(f"[#current_stats]✅ 主记录文件转换完成，共 {count} 个UUID")
                 
             except Exception as e:
                 logger.error(f"[#process]转换主记录文件失败: {e}")
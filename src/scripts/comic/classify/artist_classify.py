@@ -7,11 +7,14 @@ import yaml
 from typing import Dict, List, Optional, Tuple
 import sys
 import argparse
+import time
 import pyperclip
 from datetime import datetime
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from nodes.tui.textual_preset import create_config_app
 from nodes.record.logger_config import setup_logger
+from nodes.utils.rule_matcher import RuleMatcher
+from nodes.comic.artist_index import ArtistIndex, USER, split_artist_names
 
 config = {
     'script_name': 'artist_classify',
@@ -38,6 +41,8 @@ class ArtistClassifier:
         self.found_artists_dir = Path(self.config['paths']['found_artists_dir'])
         self.intermediate_mode = False
         self.create_artist_folders = False  # 新增：是否创建画师文件夹的标志
+        self.artist_index: Optional[ArtistIndex] = None
+        self._build_rule_matchers()
         
         # 确保必要的目录存在
         self.found_artists_dir.mkdir(exist_ok=True)
@@ -67,9 +72,22 @@ class ArtistClassifier:
         with open(config_path, 'w', encoding='utf-8') as f:
             yaml.dump(self.config, f, allow_unicode=True)
 
-    def update_artist_list(self):
-        """更新画师列表"""
+    def _parse_folder_names(self, folder_name: str) -> List[str]:
+        """从画师文件夹名解析画师名和社团名（过滤排除关键词）"""
+        # 去掉开头的 [ 和结尾的 ]
+        clean_name = folder_name[1:-1] if folder_name.endswith(']') else folder_name[1:]
+        return [name for name in split_artist_names(clean_name)
+                if name and not self._is_excluded(name)]
+
+    def update_artist_list(self, full: bool = False):
+        """
+        更新画师列表
+        
+        默认只处理新增和已删除的画师文件夹（名称只由文件夹名决定，未变化的文件夹不用重新解析），
+        full 为 True 时重新解析所有文件夹。画师索引同步增量更新
+        """
         logger.info("开始更新画师列表...")
+        start = time.perf_counter()
         
         base_dir = Path(r'E:\1EHV')
         # logger.debug(f"扫描目录: {base_dir}")
@@ -89,74 +107,91 @@ class ArtistClassifier:
                 self.config['artists']['auto_detected'] = {}
             if 'user_defined' not in self.config['artists']:
                 self.config['artists']['user_defined'] = {}
+            auto_detected = self.config['artists']['auto_detected']
+            user_defined = self.config['artists']['user_defined']
+            
+            if self.artist_index is None or full:
+                self.artist_index = ArtistIndex(user_defined, auto_detected)
+            
+            current = set(folders)
+            user_folders = set(user_defined.values())
+            changed = 0
             
             # 清理不存在的文件夹
-            for folder in list(self.config['artists']['auto_detected'].keys()):
-                if folder not in folders:
-                    logger.warning(f"移除不存在的文件夹: {folder}")
-                    del self.config['artists']['auto_detected'][folder]
+            for folder in [f for f in auto_detected if f not in current]:
+                logger.warning(f"移除不存在的文件夹: {folder}")
+                del auto_detected[folder]
+                self.artist_index.remove_folder(folder)
+                changed += 1
             
-            # 更新每个文件夹的画师名称数组
+            # 新增的文件夹（full 时为全部文件夹）解析画师名称数组
             for folder_name in folders:
                 # 如果在用户自定义中已存在，则跳过
-                if any(folder_name == v for v in self.config['artists']['user_defined'].values()):
+                if folder_name in user_folders:
                     logger.debug(f"跳过用户自定义的文件夹: {folder_name}")
                     continue
+                if folder_name in auto_detected and not full:
+                    continue
                 
-                # 自动更新或添加画师名称数组
-                # 去掉开头的 [ 和结尾的 ]
-                clean_name = folder_name[1:-1] if folder_name.endswith(']') else folder_name[1:]
-                
-                # 提取所有名称（画师名和社团名）
-                names = []
-                if '(' in clean_name:
-                    # 处理带括号的情况
-                    circle_part = clean_name.split('(')[0].strip()
-                    artist_part = clean_name.split('(')[1].rstrip(')').strip()
-                    
-                    # 先添加画师名（按顿号分割）
-                    artist_names = [n.strip() for n in artist_part.split('、')]
-                    names.extend(artist_names)
-                    
-                    # 再添加社团名（按顿号分割）
-                    circle_names = [n.strip() for n in circle_part.split('、')]
-                    names.extend(circle_names)
+                valid_names = self._parse_folder_names(folder_name)
+                if not valid_names or auto_detected.get(folder_name) == valid_names:
+                    continue
+                if folder_name in auto_detected:
+                    logger.info(f"更新画师名称: {folder_name} -> {valid_names}")
                 else:
-                    # 没有括号的情况，直接作为画师名
-                    names = [clean_name]
-                
-                # 过滤掉无效名称
-                valid_names = [name for name in names 
-                             if name and not any(k in name for k in self.config['exclude_keywords'])]
-                
-                if valid_names:
-                    if folder_name in self.config['artists']['auto_detected']:
-                        logger.info(f"更新画师名称: {folder_name} -> {valid_names}")
-                    else:
-                        logger.info(f"添加新画师: {folder_name} -> {valid_names}")
-                    self.config['artists']['auto_detected'][folder_name] = valid_names
+                    logger.info(f"添加新画师: {folder_name} -> {valid_names}")
+                auto_detected[folder_name] = valid_names
+                self.artist_index.add_folder(folder_name, valid_names)
+                changed += 1
             
-            # 保存更新后的配置
-            self._save_config(r"D:\1VSCODE\1ehv\archive\config\画师分类.yaml")
+            # 有变化时才保存配置
+            if changed:
+                self._save_config(r"D:\1VSCODE\1ehv\archive\config\画师分类.yaml")
             
-            total_artists = len(self.config['artists']['auto_detected']) + len(self.config['artists']['user_defined'])
-            logger.info(f"画师列表更新完成，共 {total_artists} 个画师")
-            logger.debug(f"自动检测: {len(self.config['artists']['auto_detected'])} 个")
-            logger.debug(f"用户自定义: {len(self.config['artists']['user_defined'])} 个")
+            total_artists = len(auto_detected) + len(user_defined)
+            logger.info(f"画师列表更新完成，共 {total_artists} 个画师，变化 {changed} 个，"
+                        f"耗时 {time.perf_counter() - start:.2f}s")
+            logger.debug(f"自动检测: {len(auto_detected)} 个")
+            logger.debug(f"用户自定义: {len(user_defined)} 个")
             
         except Exception as e:
             logger.error(f"扫描目录出错: {str(e)}")
             raise
 
+    def _build_rule_matchers(self):
+        """把排除关键词和类别关键词编译成匹配器，每个名称/路径只扫描一遍"""
+        self.exclude_matcher = RuleMatcher(ignore_case=False)
+        self.exclude_matcher.add_keywords('exclude', self.config.get('exclude_keywords', [])).compile()
+        self.category_matcher = RuleMatcher()
+        for category, keywords in self.config.get('categories', {}).items():
+            self.category_matcher.add_keywords(category, keywords)
+        self.category_matcher.compile()
+
+    def _is_excluded(self, name: str) -> bool:
+        """名称是否包含排除关键词"""
+        return self.exclude_matcher.matches(name)
+
     def _detect_category(self, file_path: str) -> str:
-        """根据文件路径检测作品类别"""
-        path_str = str(file_path).lower()
-        for category, keywords in self.config['categories'].items():
-            # 检查完整路径中是否包含关键词
-            if any(keyword.lower() in path_str for keyword in keywords):
+        """根据文件路径检测作品类别（按配置顺序取第一个命中的类别）"""
+        # 检查完整路径中是否包含关键词
+        matched = self.category_matcher.match(str(file_path))
+        for category in self.config['categories']:
+            if category in matched:
                 return category
         return "一般"
 
+    def _extract_artist_names(self, filename: str) -> List[str]:
+        """从文件名的方括号中提取候选画师名（画师在前、社团在后，已过滤排除关键词）"""
+        name_str = filename
+        for keyword in self.config['exclude_keywords']:
+            name_str = name_str.replace(keyword, "")
+        
+        # 提取方括号中的内容
+        artist_names = []
+        for match in re.finditer(r'\[([^\[\]]+)\]', name_str):
+            artist_names.extend(split_artist_names(match.group(1).strip()))
+        return [name for name in artist_names if name and not self._is_excluded(name)]
+
     def _find_artist_info(self, filename: str) -> Optional[Tuple[str, str, bool]]:
         """
         查找画师信息的公共函数
@@ -168,54 +203,26 @@ class ArtistClassifier:
             Optional[Tuple[str, str, bool]]: (画师名, 文件夹名, 是否为已存在画师)
             如果未找到则返回None
         """
-        # 从文件名中提取画师名称
-        name_str = filename
-        for keyword in self.config['exclude_keywords']:
-            name_str = name_str.replace(keyword, "")
+        artist_names = self._extract_artist_names(filename)
+        logger.debug(f"从文件名提取的画师名称: {artist_names}")
         
-        # 提取方括号中的内容
-        pattern = r'\[([^\[\]]+)\]'
-        matches = re.finditer(pattern, name_str)
-        artist_names = []
+        if self.artist_index is None:
+            self.artist_index = ArtistIndex(self.config['artists'].get('user_defined', {}),
+                                            self.config['artists'].get('auto_detected', {}))
         
-        for match in matches:
-            content = match.group(1).strip()
-            if '(' in content:
-                # 处理带括号的情况
-                circle_part = content.split('(')[0].strip()
-                artist_part = content.split('(')[1].rstrip(')').strip()
-                
-                # 先添加画师名
-                artist_names.extend([n.strip() for n in artist_part.split('、')])
-                # 再添加社团名
-                artist_names.extend([n.strip() for n in circle_part.split('、')])
+        # 先查用户自定义的画师，再查自动检测的画师
+        found = self.artist_index.lookup(artist_names)
+        if found:
+            artist_name, folder, source = found
+            if source == USER:
+                logger.info(f"找到用户自定义画师: {artist_name} -> {folder}")
             else:
-                # 没有括号的情况
-                artist_names.append(content)
-        
-        logger.debug(f"从文件名提取的画师名称: {artist_names}")
-        
-        # 先检查用户自定义的画师
-        for artist_name in artist_names:
-            if artist_name and not any(k in artist_name for k in self.config['exclude_keywords']):
-                for names, folder in self.config['artists']['user_defined'].items():
-                    if artist_name in names.split():
-                        logger.info(f"找到用户自定义画师: {artist_name} ({names}) -> {folder}")
-                        return artist_name, folder, True
-        
-        # 如果用户自定义中没找到，再检查自动检测的画师
-        for artist_name in artist_names:
-            if artist_name and not any(k in artist_name for k in self.config['exclude_keywords']):
-                for folder, names in self.config['artists']['auto_detected'].items():
-                    if artist_name in names:
-                        logger.info(f"找到自动检测画师: {artist_name} -> {folder}")
-                        return artist_name, folder, True
+                logger.info(f"找到自动检测画师: {artist_name} -> {folder}")
+            return artist_name, folder, True
         
         # 如果都没找到，但有有效的画师名，返回第一个画师名作为新画师
-        for artist_name in artist_names:
-            if artist_name and not any(k in artist_name for k in self.config['exclude_keywords']):
-                folder_name = f"[{artist_name}]"
-                return artist_name, folder_name, False
+        if artist_names:
+            return artist_names[0], f"[{artist_names[0]}]", False
         
         logger.debug(f"未找到匹配画师，文件名: {filename}")
         return None
@@ -275,10 +282,14 @@ class ArtistClassifier:
     def process_files(self):
         """处理待分类文件"""
         supported_formats = {'.zip', '.rar', '.7z'}
+        timings = {'扫描文件': 0.0, '匹配画师': 0.0, '移动文件': 0.0}
+        matched = 0
         
         # 获取所有待处理文件
+        start = time.perf_counter()
         files = list(Path(self.pending_dir).rglob("*"))
         target_files = [f for f in files if f.suffix.lower() in supported_formats]
+        timings['扫描文件'] = time.perf_counter() - start
         
         logger.info(f"开始处理 {len(target_files)} 个文件...")
         
@@ -291,13 +302,17 @@ class ArtistClassifier:
                     f.write(f"{file_path.name}\n")
             
             # 使用文本模式处理
+            start = time.perf_counter()
             result = self.process_to_be_classified(str(temp_txt))
+            timings['匹配画师'] = time.perf_counter() - start
+            matched = result['statistics']['classified_files']
             
             # 在输入路径下创建转移文件夹
             found_dir = Path(self.pending_dir) / "[01已找到画师]"
             found_dir.mkdir(exist_ok=True)
             
             # 移动文件
+            start = time.perf_counter()
             moved_files = []
             
             # 处理已存在的画师
@@ -331,6 +346,8 @@ class ArtistClassifier:
                 for file_name in files_list:
                     logger.info(f"未找到画师文件夹，跳过移动: {file_name} -> {folder_name}")
             
+            timings['移动文件'] = time.perf_counter() - start
+            
             # 删除临时文件
             temp_txt.unlink()
             
@@ -349,17 +366,25 @@ class ArtistClassifier:
             for i, file_path in enumerate(target_files, 1):
                 logger.info(f"正在检查: {file_path.name} ({i}/{len(target_files)})")
                 
+                start = time.perf_counter()
                 artist_info = self._find_artist_folder(file_path.name)
+                timings['匹配画师'] += time.perf_counter() - start
                 if artist_info:
+                    matched += 1
                     artist_name, folder_name = artist_info
                     target_folder = self.base_dir / folder_name
+                    start = time.perf_counter()
                     try:
                         self.move_file(file_path, target_folder)
                         logger.info(f"已移动到画师文件夹: {file_path.name} -> {folder_name}")
                     except Exception as e:
                         logger.error(f"移动文件失败: {file_path.name} - {str(e)}")
+                    timings['移动文件'] += time.perf_counter() - start
                 else:
                     logger.warning(f"未找到匹配画师: {file_path.name}")
+        
+        logger.info(f"分类完成: 匹配 {matched}/{len(target_files)} 个文件，索引 {len(self.artist_index or ())} 个画师")
+        logger.info("耗时: " + " | ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items()))
 
     def extract_artist_info_from_filename(self, filename: str) -> Dict[str, List[str]]:
         """从文件名中提取画师信息"""
@@ -398,9 +423,9 @@ class ArtistClassifier:
         
         # 过滤无效名称
         result['artists'] = [name for name in result['artists'] 
-                           if name and not any(k in name for k in self.config['exclude_keywords'])]
+                           if name and not self._is_excluded(name)]
         result['circles'] = [name for name in result['circles'] 
-                           if name and not any(k in name for k in self.config['exclude_keywords'])]
+                           if name and not self._is_excluded(name)]
         
         return result
 
@@ -544,7 +569,7 @@ def run_classifier(path: Optional[str], args):
         
         if args.update_list:
             logger.info("手动更新画师列表")
-            classifier.update_artist_list()
+            classifier.update_artist_list(full=True)
         
         if path:
             try:
@@ -591,7 +616,7 @@ def main():
         # 更新画师列表
         if args.update_list:
             logger.info("手动更新画师列表")
-            classifier.update_artist_list()
+            classifier.update_artist_list(full=True)
             return
         
         # 文本模式处理
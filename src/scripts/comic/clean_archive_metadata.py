@@ -5,7 +5,6 @@ import zipfile
 import subprocess
 import shutil
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import argparse
 import pyperclip
 from typing import List, Tuple
@@ -13,10 +12,14 @@ from rich.progress import Progress, TextColumn, BarColumn, TaskProgressColumn
 from rich.prompt import Prompt
 from rich.console import Console
 from rich.logging import RichHandler
-import multiprocessing
 from datetime import datetime
 import py7zr
 import tempfile
+import time
+from nodes.archive.archive_access import ArchiveAccess, ArchiveError
+from nodes.archive.zip_encoding import UnsupportedLayout
+from nodes.archive.zip_sidecar import StripResult, strip_members
+from nodes.file.io_scheduler import IOScheduler
 
 # 创建日志目录
 log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs')
@@ -46,33 +49,18 @@ logger.info(f"日志文件保存在: {log_file}")
 class ArchiveCleaner:
     """压缩包清理类"""
     
+    @staticmethod
+    def is_metadata(name: str) -> bool:
+        """需要删除的元数据文件：YAML，以及 meta.json 以外的 JSON"""
+        return name.endswith('.yaml') or (name.endswith('.json') and not name.endswith('meta.json'))
+    
     @staticmethod
     def list_archive_contents(archive_path: str) -> List[str]:
         """列出压缩包中的文件"""
         try:
-            with zipfile.ZipFile(archive_path, 'r') as zf:
-                return zf.namelist()
-        except Exception as e:
-            logger.debug(f"使用zipfile读取失败: {e}，尝试使用7z")
-            try:
-                result = subprocess.run(
-                    ['7z', 'l', archive_path],
-                    capture_output=True,
-                    text=True,
-                    encoding='gbk',
-                    errors='ignore',
-                    check=True
-                )
-                if result.returncode == 0:
-                    files = []
-                    for line in result.stdout.splitlines():
-                        if line.strip() and not line.startswith('---'):
-                            parts = line.split()
-                            if len(parts) >= 5:
-                                files.append(parts[-1])
-                    return files
-            except subprocess.CalledProcessError as e:
-                logger.error(f"使用7z读取失败: {e}")
+            return [member.name for member in ArchiveAccess.list_members(archive_path)]
+        except ArchiveError as e:
+            logger.error(f"读取压缩包失败: {e}")
         return []
 
     @staticmethod
@@ -83,9 +71,9 @@ class ArchiveCleaner:
             Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]: (yaml_files, json_files)
             每个文件以元组形式返回：(完整文件名, 不含扩展名的文件名)
         """
-        files = ArchiveCleaner.list_archive_contents(archive_path)
+        files = [f for f in ArchiveCleaner.list_archive_contents(archive_path) if ArchiveCleaner.is_metadata(f)]
         yaml_files = [(f, os.path.splitext(f)[0]) for f in files if f.endswith('.yaml')]
-        json_files = [(f, os.path.splitext(f)[0]) for f in files if f.endswith('.json') and not f.endswith('meta.json')]
+        json_files = [(f, os.path.splitext(f)[0]) for f in files if f.endswith('.json')]
         return yaml_files, json_files
 
     @staticmethod
@@ -173,41 +161,66 @@ class ArchiveCleaner:
                     logger.error(f"删除备份文件失败: {e}")
 
     @staticmethod
-    def process_archive(archive_path: str) -> None:
-        """处理单个压缩包"""
+    def process_archive(archive_path: str, dry_run: bool = False) -> StripResult:
+        """处理单个压缩包
+        
+        ZIP 一次读出中央目录，删除全部元数据文件后只改写一次（保留的成员按原始字节复制，
+        不重新压缩）；其他格式或不支持的 ZIP 结构退回 BandZip 逐个删除。
+        
+        Args:
+            archive_path: 压缩包路径
+            dry_run: 只统计需要删除的文件，不修改压缩包
+        """
+        try:
+            result = strip_members(archive_path, ArchiveCleaner.is_metadata, dry_run=dry_run)
+            if result.removed:
+                logger.info(result.summary())
+            else:
+                logger.debug(f"跳过处理 {os.path.basename(archive_path)}: {result.skipped}")
+            return result
+        except (zipfile.BadZipFile, UnsupportedLayout) as e:
+            logger.debug(f"无法直接改写 {os.path.basename(archive_path)}，使用BandZip: {e}")
+        
+        result = StripResult(archive_path)
+        start = time.perf_counter()
         try:
             yaml_files, json_files = ArchiveCleaner.analyze_archive(archive_path)
+            result.removed = [f for f, _ in yaml_files] + [f for f, _ in json_files]
             
             # 如果没有需要删除的文件，则跳过处理
-            if not yaml_files and not json_files:
+            if not result.removed:
+                result.skipped = "没有需要删除的文件"
                 logger.debug(f"跳过处理 {os.path.basename(archive_path)}: 未找到需要删除的文件")
-                return
+                return result
             
-            # 合并所有需要删除的文件
-            files_to_delete = [f for f, _ in yaml_files]
-            files_to_delete.extend([f for f, _ in json_files if not f.endswith('meta.json')])
-            
-            if files_to_delete:
-                logger.info(f"找到需要删除的文件: YAML({len(yaml_files)}), JSON({len(json_files)})")
-                if ArchiveCleaner.delete_files_from_archive(archive_path, files_to_delete):
-                    logger.info(f"[完成] {os.path.basename(archive_path)}")
-                else:
-                    logger.error(f"[失败] {os.path.basename(archive_path)}")
+            logger.info(f"找到需要删除的文件: YAML({len(yaml_files)}), JSON({len(json_files)})")
+            if dry_run:
+                return result
+            if ArchiveCleaner.delete_files_from_archive(archive_path, result.removed):
+                result.stripped = True
+                logger.info(f"[完成] {os.path.basename(archive_path)}")
             else:
-                logger.debug(f"跳过处理 {os.path.basename(archive_path)}: 没有需要删除的文件")
+                result.error = "BandZip删除失败"
+                logger.error(f"[失败] {os.path.basename(archive_path)}")
             
         except Exception as e:
+            result.error = str(e)
             logger.error(f"处理失败 {archive_path}: {e}")
+        finally:
+            result.seconds = time.perf_counter() - start
+        return result
 
-def process_directory(target_directory: str, max_workers: int = None) -> None:
-    """处理目录中的所有压缩包"""
-    # 如果没有指定线程数，则使用CPU核心数的2倍（因为是IO密集型任务）
-    if max_workers is None:
-        max_workers = multiprocessing.cpu_count() * 2
+def process_directory(target_directory: str, max_workers: int = None, dry_run: bool = False) -> None:
+    """处理目录中的所有压缩包（按磁盘限制并发：机械盘顺序处理，SSD 并行）
     
+    Args:
+        target_directory: 目标目录
+        max_workers: 每个磁盘的并发数，None 时按磁盘类型自动选择
+        dry_run: 只报告需要删除的文件，不修改压缩包
+    """
     # 记录处理信息
     logger.info(f"开始处理目录: {target_directory}")
-    logger.info(f"使用线程数: {max_workers}")
+    logger.info(f"每个磁盘的并发数: {max_workers or '自动'}{'（试运行）' if dry_run else ''}")
     
     # 收集所有压缩包
     console.print("[bold blue]正在扫描压缩包...[/]")
@@ -219,7 +232,6 @@ def process_directory(target_directory: str, max_workers: int = None) -> None:
     
     total_files = len(archive_files)
     console.print(f"[bold green]找到 {total_files} 个压缩包[/]")
-    console.print(f"[bold blue]使用 {max_workers} 个线程进行处理[/]")
     
     # 记录扫描结果
     logger.info(f"扫描完成，共找到 {total_files} 个压缩包")
@@ -228,6 +240,10 @@ def process_directory(target_directory: str, max_workers: int = None) -> None:
         console.print("[bold red]没有找到需要处理的压缩包[/]")
         return
     
+    results: List[StripResult] = []
+    start = time.perf_counter()
+    scheduler = IOScheduler(per_volume=max_workers)
+    
     # 使用rich进度条
     with Progress(
         TextColumn("[progress.description]{task.description}"),
@@ -242,23 +258,33 @@ def process_directory(target_directory: str, max_workers: int = None) -> None:
             visible=True
         )
         
-        # 并行处理
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = []
-            for path in archive_files:
-                future = executor.submit(ArchiveCleaner.process_archive, path)
-                futures.append(future)
-            
-            # 更新进度
-            completed = 0
-            for future in as_completed(futures):
-                try:
-                    future.result()
-                except Exception as e:
-                    logger.error(f"任务执行失败: {e}")
-                finally:
-                    completed += 1
-                    progress.update(overall_task, advance=1)
+        for task in scheduler.run(archive_files, lambda path: ArchiveCleaner.process_archive(path, dry_run)):
+            if task.error is not None:
+                logger.error(f"任务执行失败 {task.path}: {task.error}")
+                results.append(StripResult(task.path, error=str(task.error), seconds=task.seconds))
+            else:
+                results.append(task.result)
+            progress.update(overall_task, advance=1)
+    
+    elapsed = time.perf_counter() - start
+    matched = [r for r in results if r.removed and not r.error]
+    failed = [r for r in results if r.error]
+    removed = sum(len(r.removed) for r in matched)
+    freed_mb = sum(r.freed_bytes for r in matched) / 1024 / 1024
+    rewritten_mb = sum(r.rewritten_bytes for r in matched) / 1024 / 1024
+    compacted = sum(1 for r in matched if r.compacted)
+    action = "需要清理" if dry_run else "已清理"
+    
+    console.print(f"[bold green]{action} {len(matched)} 个压缩包，共 {removed} 个元数据文件，"
+                  f"释放 {freed_mb:.2f}MB（其中 {compacted} 个需要整包重写，写入 {rewritten_mb:.1f}MB）[/]")
+    if failed:
+        console.print(f"[bold red]失败 {len(failed)} 个，详见日志[/]")
+    console.print(f"[bold blue]耗时 {elapsed:.1f} 秒，{total_files / max(elapsed, 1e-9):.1f} 个/秒[/]")
+    for line in scheduler.summary_lines():
+        console.print(f"[blue]{line}[/]")
+        logger.info(line)
+    logger.info(f"{action} {len(matched)}/{total_files} 个压缩包，删除 {removed} 个文件，释放 {freed_mb:.2f}MB，"
+                f"失败 {len(failed)} 个，耗时 {elapsed:.1f}s")
     
     console.print("[bold green]✨ 处理完成![/]")
 
@@ -299,14 +325,15 @@ def main():
         parser = argparse.ArgumentParser(description='清理压缩包中的元数据文件')
         parser.add_argument('-c', '--clipboard', action='store_true', help='从剪贴板读取路径')
         parser.add_argument('--path', help='要处理的路径')
-        parser.add_argument('-w', '--workers', type=int, help='线程数量（默认为CPU核心数的2倍）')
+        parser.add_argument('-w', '--workers', type=int, help='每个磁盘的并发数（默认按磁盘类型自动选择）')
+        parser.add_argument('-n', '--dry-run', action='store_true', help='只报告需要删除的文件，不修改压缩包')
         args = parser.parse_args()
         
         # 获取目标目录
         target_directory = get_target_directory(args)
         
         # 处理目录
-        process_directory(target_directory, args.workers)
+        process_directory(target_directory, args.workers, args.dry_run)
         
         # 记录完成信息
         logger.info("程序执行完成")
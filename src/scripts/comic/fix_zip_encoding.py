@@ -7,6 +7,10 @@ import tempfile
 import zipfile
 import shutil
 
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nodes.archive.zip_encoding import repair_folder
+
 def setup_logger(verbose=False):
     logger = logging.getLogger('ZipFixer')
     logger.setLevel(logging.DEBUG if verbose else logging.INFO)
@@ -71,6 +75,25 @@ def run_zipu(zip_path: str, destination: str = None, extract: bool = False,
         logger.error(f"执行失败: {str(e)}")
         return False
 
+def bulk_fix(paths, encoding: str = None, dry_run: bool = False, workers: int = 0,
+             verbose: bool = False) -> bool:
+    """批量修复文件夹中所有 ZIP 的文件名编码（进程内完成，不调用 zipu，按磁盘并行）"""
+    logger = setup_logger(verbose)
+    repaired = skipped = failed = 0
+    for result in repair_folder(paths, encoding=encoding, dry_run=dry_run, per_volume=workers):
+        if result.error:
+            failed += 1
+            logger.error(result.summary())
+        elif result.skipped:
+            skipped += 1
+            logger.debug(result.summary())
+        else:
+            repaired += 1
+            logger.info(result.summary())
+    action = "需要修复" if dry_run else "已修复"
+    logger.info(f"{action}: {repaired} 个, 跳过: {skipped} 个, 失败: {failed} 个")
+    return failed == 0
+
 def demo_fix():
     """改进后的演示功能"""
     logger = setup_logger(verbose=True)
@@ -169,6 +192,10 @@ def main():
     parser.add_argument('--password', '-pwd', help='zip 文件的密码')
     parser.add_argument('--verbose', '-v', action='store_true', help='显示详细信息')
     parser.add_argument('--demo', '-d', action='store_true', help='运行演示')
+    parser.add_argument('--bulk', '-b', action='store_true',
+                        help='批量修复模式：zip_file 可以是文件夹，文件名改写为 UTF-8（自动检测编码）')
+    parser.add_argument('--dry-run', '-n', action='store_true', help='批量模式下只检测，不修改文件')
+    parser.add_argument('--workers', '-w', type=int, default=0, help='批量模式下每个磁盘的并发数 (0: 自动)')
     args = parser.parse_args()
     
     if args.demo:
@@ -179,6 +206,11 @@ def main():
         parser.print_help()
         return
     
+    if args.bulk or os.path.isdir(args.zip_file):
+        bulk_fix([args.zip_file], encoding=args.encoding, dry_run=args.dry_run,
+                 workers=args.workers, verbose=args.verbose)
+        return
+    
     run_zipu(
         args.zip_file,
         args.destination,
@@ -36,6 +36,8 @@ from nodes.pics.calculate_hash_custom import ImageHashCalculator
 from nodes.tui.textual_logger import TextualLoggerManager
 from nodes.record.logger_config import setup_logger
 from nodes.archive.group_archives import group_archives
+from nodes.utils.thread_manager import ThreadManager
+from nodes.archive.zip_encoding import decode_member_names
 
 # 在全局配置部分添加以下内容
 # ================= 日志配置 =================
@@ -225,45 +227,6 @@ def check_zip_integrity(zip_path: Path) -> bool:
         logging.info(f"检查压缩包完整性时出错: {zip_path}: {e}")
         return False
 
-def decode_zip_filename(name: bytes) -> str:
-    """尝试使用不同编码解码zip文件名"""
-    """增强版ZIP文件名解码"""
-    zip_flags = 0x800
-    # 检测ZIP的UTF-8标志位（第11位）
-    if (zip_flags & 0x800) != 0:
-        try:
-            return name.decode('utf-8')
-        except UnicodeDecodeError:
-            pass
-    # 其他编码回退逻辑...
-
-    encodings = ['utf-8', 'gbk', 'cp437', 'shift-jis', 'gb18030', 'big5']
-
-
-    try:
-        import chardet
-        detected = chardet.detect(name)
-        if detected and detected['confidence'] > 0.6:  # 降低置信度阈值
-            encodings = [detected['encoding']] + encodings
-    except ImportError:
-        pass
-    
-    # 去重并保持顺序
-    seen = set()
-    encodings = [x for x in encodings if not (x in seen or seen.add(x))]
-    
-    # 尝试不同的编码（使用surrogateescape错误处理）
-    for encoding in encodings:
-        try:
-            return name.decode(encoding, errors='surrogateescape')
-        except (UnicodeDecodeError, LookupError):
-            continue
-            
-    # 使用surrogateescape模式回退
-    return name.decode('utf-8', errors='surrogateescape')
-
-
-
 def update_stats_panel(total_files, processed_files, success_files, total_size, processed_size):
     """统一统计信息显示"""
     progress_percent = int((processed_files / total_files * 100) if total_files > 0 else 0)
@@ -363,9 +326,9 @@ def process_single_zip(zip_path, extract_base_dir, lock, force_update=False, inn
         with zipfile.ZipFile(zip_path, 'r') as zf:
             # 获取所有图片文件，处理文件名编码
             image_files = []
-            for info in zf.filelist:
-                # 处理文件名编码
-                filename = decode_zip_filename(info.filename.encode('utf8'))
+            # 文件名编码按整个压缩包检测一次
+            infos = zf.infolist()
+            for info, filename in zip(infos, decode_member_names(infos)):
                 if any(filename.lower().endswith(ext) for ext in 
                         ('.jpg', '.jpeg', '.png', '.webp', '.jxl', '.avif', '.bmp')):
                     # 直接读取文件数据到内存
@@ -381,10 +344,12 @@ def process_single_zip(zip_path, extract_base_dir, lock, force_update=False, inn
             
             # 使用线程池处理图片
             processed_count = 0
-            with ThreadPoolExecutor(max_workers=inner_workers) as executor:
+            # 外层已按压缩包大小占用在途字节预算，这里只申请线程
+            with ThreadManager.shared().lease('hash_prepare.images', inner_workers) as lease, \
+                    ThreadPoolExecutor(max_workers=lease.workers) as executor:
                 futures = []
                 for filename, img_data in image_files:
-                    futures.append(executor.submit(process_image, (filename, img_data)))
+                    futures.append(executor.submit(lease.wrap(process_image), (filename, img_data)))
             
             for future in futures:
                 future.result()
@@ -664,14 +629,18 @@ def process_file_batch(files: list, config: dict, lock: threading.Lock,
         processed_size=0
     )
 
-    with ThreadPoolExecutor(max_workers=config['max_workers']) as executor:
+    # 向共享的 ThreadManager 申请线程；压缩包会整体读入内存，按大小占用在途字节预算
+    manager = ThreadManager.shared()
+    with manager.lease('hash_prepare', config['max_workers']) as lease, \
+            ThreadPoolExecutor(max_workers=lease.workers) as executor:
         # 修改futures元组携带文件类型信息
         futures = []
         for file_type, file_path in files:
+            nbytes = file_path.stat().st_size
             if file_type == 'zip':
-                future = executor.submit(process_single_zip, file_path, extract_dir, lock, config['force_update'])
+                future = executor.submit(lease.wrap(process_single_zip, nbytes), file_path, extract_dir, lock, config['force_update'])
             else:
-                future = executor.submit(process_single_image, file_path, lock)
+                future = executor.submit(lease.wrap(process_single_image, nbytes), file_path, lock)
             futures.append((future, file_path, file_path.stat().st_size / (1024 * 1024), file_type))
         
         # 处理完成时更新总体进度
@@ -699,7 +668,9 @@ def process_file_batch(files: list, config: dict, lock: threading.Lock,
                 progress = int(processed_count/total_count*100)
                 # 新进度格式
                 logging.info(f"[@hash_progress] 进度 {progress}%")
-                
+    
+    for line in manager.summary_lines():
+        logging.info(f"[#hash_calc]📊 {line}")
     return results
 
 def save_results(results: Dict[str, ProcessResult], path: Path, config: dict) -> None:
@@ -2,7 +2,7 @@ from nodes.config.import_bundles import *
 
 # 导入日志配置
 from nodes.record.logger_config import setup_logger
-from nodes.hash.hash_accelerator import HashAccelerator
+HashAccelerator = lazy_from('nodes.hash.hash_accelerator', 'HashAccelerator')
 
 import mmap  # 添加在文件顶部
 
@@ -17,13 +17,16 @@ import signal
 import functools
 from opencc import OpenCC
 from diff_match_patch import diff_match_patch
-import difflib
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from nodes.tui.textual_preset import create_config_app
 from nodes.record.logger_config import setup_logger
 from nodes.tui.textual_logger import TextualLoggerManager
+from nodes.archive.archive_access import ArchiveAccess
+from nodes.file.io_scheduler import IOScheduler
+from nodes.utils.rule_matcher import RuleMatcher
+from nodes.comic.series_grouping import SERIES_PREFIXES, SeriesGrouper, get_base_filename, preprocess_filename
 import logging
 
 # 导入自定义工具
@@ -95,12 +98,6 @@ IMAGE_EXTENSIONS = {
     '.tiff', '.tif', '.psd', '.xcf'
 }
 
-# 定义系列前缀集合
-SERIES_PREFIXES = {
-    '[#s]',  # 标准系列标记
-    '#',     # 简单系列标记
-}
-
 # 定义路径黑名单关键词
 PATH_BLACKLIST = {
     '画集',
@@ -124,18 +121,16 @@ SERIES_BLACKLIST_PATTERNS = [
     r'损坏压缩包',
 ]
 
+SERIES_BLACKLIST_MATCHER = RuleMatcher().add_patterns('series_blacklist', SERIES_BLACKLIST_PATTERNS).compile()
+PATH_BLACKLIST_MATCHER = RuleMatcher().add_keywords('path_blacklist', PATH_BLACKLIST).compile()
+
 def is_series_blacklisted(filename):
     """检查文件名是否在系列提取黑名单中"""
-    for pattern in SERIES_BLACKLIST_PATTERNS:
-        if re.search(pattern, filename, re.IGNORECASE):
-            return True
-    return False
+    return SERIES_BLACKLIST_MATCHER.matches(filename)
 
 def is_path_blacklisted(path):
-    """检查路径是否在黑名单中"""
-    # 转换为小写进行比较
-    path_lower = path.lower()
-    return any(keyword.lower() in path_lower for keyword in PATH_BLACKLIST)
+    """检查路径是否在黑名单中（不区分大小写）"""
+    return PATH_BLACKLIST_MATCHER.matches(path)
 
 class TimeoutError(Exception):
     """超时异常"""
@@ -170,69 +165,41 @@ def timeout(seconds):
         return wrapper
     return decorator
 
-@timeout(60)
-def run_7z_command(command, archive_path, operation="", additional_args=None):
-    """运行7z命令并返回输出"""
-    try:
-        # 基础命令
-        cmd = ['7z', command]
-        if additional_args:
-            cmd.extend(additional_args)
-        cmd.append(archive_path)
-        
-        # 运行命令并捕获输出
-        # 使用cp932编码(日文Windows默认编码)来处理输出
-        result = subprocess.run(cmd, capture_output=True, text=False, timeout=55)  # 设置subprocess超时为55秒
-        try:
-            # 首先尝试使用cp932解码
-            output = result.stdout.decode('cp932')
-        except UnicodeDecodeError:
-            try:
-                # 如果cp932失败，尝试utf-8
-                output = result.stdout.decode('utf-8')
-            except UnicodeDecodeError:
-                # 如果都失败，使用errors='replace'来替换无法解码的字符
-                output = result.stdout.decode('utf-8', errors='replace')
-        
-        return output if output else ""
-    except subprocess.TimeoutExpired:
-        raise TimeoutError(f"7z命令执行超时: {archive_path}")
-    except Exception as e:
-        logger.error(f"[#update] ❌ 执行7z命令时出错 {archive_path}: {str(e)}")
-        return ""
-
 @timeout(60)
 def is_archive_corrupted(archive_path):
-    """检查压缩包是否损坏"""
+    """检查压缩包是否损坏（加密、超时等无法判断的不算损坏）"""
     try:
-        # 使用7z测试压缩包完整性
-        cmd = ['7z', 't', archive_path]
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=55)
-        return result.returncode != 0
-    except subprocess.TimeoutExpired:
-        raise TimeoutError(f"检查压缩包完整性超时: {archive_path}")
+        # 校验所有成员的CRC，ZIP/7Z/RAR在进程内完成，必要时回退到7z
+        return ArchiveAccess.test_archive(archive_path) is False
     except Exception:
         return True
 
+def confirm_corrupted(archive_path):
+    """
+    用 7z 命令行复核进程内判定为损坏的压缩包
+    
+    zipfile/py7zr/rarfile 的否定结果不一定可靠（如不支持的压缩方法），只有 7z 实际运行并测试失败才返回 True；
+    7z 不可用、执行出错或无法判断（加密、超时）时返回 False，压缩包保留在原位
+    """
+    try:
+        return ArchiveAccess.cli_backend.test(archive_path) is False
+    except Exception as e:
+        logger.warning(f"[#update] ⚠️ 无法用7z复核，保留原位: {os.path.basename(archive_path)} ({e})")
+        return False
+
 @timeout(60)
 def count_images_in_archive(archive_path):
-    """使用7z的列表模式统计压缩包中的图片数量"""
+    """按压缩包成员列表统计图片数量（只读取目录，不解压），无法读取时返回-1"""
     try:
-        # 首先检查压缩包是否损坏
-        if is_archive_corrupted(archive_path):
-            logger.warning(f"[#update] ⚠️ 压缩包已损坏，跳过处理: {archive_path}")
-            return -1
-            
-        # 使用7z的列表命令，添加-slt参数来获取详细信息
-        output = run_7z_command('l', archive_path, additional_args=['-slt'])
+        members = ArchiveAccess.list_members(archive_path)
         
-        # 确保输出不为空
-        if not output:
+        # 确保列表不为空
+        if not members:
             logger.error(f"[#update] ❌ 无法获取压缩包内容列表: {archive_path}")
             return 0
             
-        # 使用更高效的方式统计图片数量
-        image_count = sum(1 for ext in IMAGE_EXTENSIONS if ext in output.lower())
+        # 按每个成员的扩展名计数
+        image_count = sum(1 for member in members if member.suffix in IMAGE_EXTENSIONS)
         
         # 添加到更新日志
         logger.info(f"[#update] 📦 压缩包 '{os.path.basename(archive_path)}' 中包含 {image_count} 张图片")
@@ -334,76 +301,146 @@ CATEGORY_RULES = {
     }
 }
 
+# 所有分类规则编译成一个匹配器：包含规则的 ID 为类别名，排除规则的 ID 为 "类别名:exclude"
+CATEGORY_MATCHER = RuleMatcher()
+for _category, _rules in CATEGORY_RULES.items():
+    CATEGORY_MATCHER.add_patterns(_category, _rules["patterns"])
+    CATEGORY_MATCHER.add_patterns(f"{_category}:exclude", _rules["exclude_patterns"])
+CATEGORY_MATCHER.compile()
+
+# 文件名不匹配任何规则时，图片数量达到该值归为单行本
+TANKOUBON_MIN_IMAGES = 100
+
+def match_category_rules(filename):
+    """只按文件名匹配分类规则（画集优先），未匹配返回 None"""
+    matched = CATEGORY_MATCHER.match(filename)
+    if "4. 画集" in matched:
+        return "4. 画集"
+        
+    for category in CATEGORY_RULES:
+        if category == "4. 画集":  # 已经检查过
+            continue
+        if f"{category}:exclude" in matched:
+            continue
+        if category in matched:
+            return category
+    return None
+
+def category_by_image_count(image_count):
+    """文件名未匹配任何规则时按图片数量分类"""
+    if image_count == -1:  # 表示压缩包无法读取
+        return "损坏"
+    return "3. 单行本" if image_count >= TANKOUBON_MIN_IMAGES else "未分类"
+
 def get_category(path):
-    """根据路径名判断类别，使用正则表达式进行匹配"""
-    filename = os.path.basename(path)
+    """
+    判断单个压缩包的类别
     
+    文件名匹配到规则时直接返回，不读取压缩包；只有未匹配任何规则时才列出成员统计图片数量
+    （图片数量只决定未匹配文件是单行本还是未分类）。完整性检查见 IntegrityCheck
+    """
     # 首先检查是否为压缩包
     if not is_archive(path):
         return "未分类"
         
-    # 检查压缩包是否损坏
-    if is_archive_corrupted(path):
-        return "损坏"
-        
-    # 检查是否为画集
-    for pattern in CATEGORY_RULES["4. 画集"]["patterns"]:
-        if re.search(pattern, filename, re.IGNORECASE):
-            return "4. 画集"
-    
-    # 统计压缩包中的图片数量
-    image_count = count_images_in_archive(path)
-    if image_count == -1:  # 表示压缩包损坏
-        return "损坏"
+    category = match_category_rules(os.path.basename(path))
+    if category:
+        return category
         
-    logger.info(f"[#update] 压缩包 '{filename}' 中包含 {image_count} 张图片")
+    return category_by_image_count(count_images_in_archive(path))
+
+def classify_archives(archives, workers=None):
+    """
+    两阶段并发分类
     
-    # 如果图片数量超过100且不是画集，检查其他分类规则
-    if image_count >= 100:
-        # 检查其他明确的分类规则
-        for category, rules in CATEGORY_RULES.items():
-            if category == "4. 画集":  # 跳过画集分类
-                continue
-                
-            # 检查排除规则
-            excluded = False
-            for exclude_pattern in rules["exclude_patterns"]:
-                if re.search(exclude_pattern, filename, re.IGNORECASE):
-                    excluded = True
-                    break
-            
-            if excluded:
-                continue
-                
-            # 检查包含规则
-            for pattern in rules["patterns"]:
-                if re.search(pattern, filename, re.IGNORECASE):
-                    return category
+    1. 规则阶段：只看文件名，匹配到规则的压缩包直接确定类别
+    2. 目录阶段：剩余压缩包按所在卷并发读取一次成员列表（ZIP 只读中央目录），按图片数量分类
+    
+    Args:
+        archives: 压缩包路径列表
+        workers: 每个卷的并发数，None 时按卷类型自动选择
         
-        # 如果没有匹配其他规则，则归类为单行本
-        return "3. 单行本"
+    Returns:
+        ({路径: 类别}, {阶段名: 耗时秒数})
+    """
+    timings = {}
+    categories = {}
+    pending = []
+    
+    start = time.perf_counter()
+    for path in archives:
+        category = match_category_rules(os.path.basename(path))
+        if category:
+            categories[path] = category
+        else:
+            pending.append(path)
+    timings["规则匹配"] = time.perf_counter() - start
+    logger.info(f"[#process] 📝 文件名规则确定 {len(categories)}/{len(archives)} 个压缩包的类别，"
+                f"{len(pending)} 个需要读取目录")
+    
+    start = time.perf_counter()
+    if pending:
+        scheduler = IOScheduler(per_volume=workers)
+        for i, task in enumerate(scheduler.run(pending, ArchiveAccess.count_images), 1):
+            percentage = i / len(pending) * 100
+            logger.info(f"[#current_progress] 读取压缩包目录... ({i}/{len(pending)}) {percentage:.1f}%")
+            if task.error is not None:
+                logger.warning(f"[#update] ⚠️ 无法读取压缩包目录: {os.path.basename(task.path)} ({task.error})")
+                categories[task.path] = "损坏"
+            else:
+                logger.info(f"[#update] 📦 压缩包 '{os.path.basename(task.path)}' 中包含 {task.result} 张图片")
+                categories[task.path] = category_by_image_count(task.result)
+    timings["读取目录"] = time.perf_counter() - start
     
-    # 如果图片数量不超过100，检查其他分类规则
-    for category, rules in CATEGORY_RULES.items():
-        if category == "4. 画集":  # 跳过画集分类，因为已经检查过了
-            continue
-            
-        # 检查排除规则
-        excluded = False
-        for exclude_pattern in rules["exclude_patterns"]:
-            if re.search(exclude_pattern, filename, re.IGNORECASE):
-                excluded = True
-                break
+    return categories, timings
+
+class IntegrityCheck:
+    """
+    后台完整性检查
+    
+    分类完成后在后台线程中完整解压测试压缩包（校验 CRC），测试失败的再用 7z 复核（见 confirm_corrupted），
+    确认损坏的才移动到损坏压缩包文件夹，无法复核的记入 unverified 并保留在原位。
+    每个卷默认只用一个线程，尽量不影响前台的读写
+    """
+    
+    def __init__(self, archives, base_path, workers=1):
+        self.archives = list(archives)
+        self.base_path = base_path
+        self.workers = workers
+        self.corrupted = []
+        self.unverified = []
+        self.seconds = 0.0
+        self._thread = threading.Thread(target=self._run, name="integrity-check", daemon=True)
         
-        if excluded:
-            continue
-            
-        # 检查包含规则
-        for pattern in rules["patterns"]:
-            if re.search(pattern, filename, re.IGNORECASE):
-                return category
-                
-    return "未分类"
+    def start(self):
+        self._thread.start()
+        return self
+        
+    def join(self):
+        self._thread.join()
+        return self
+        
+    def _run(self):
+        start = time.perf_counter()
+        logger.info(f"[#process] 🔍 后台完整性检查: {len(self.archives)} 个压缩包")
+        scheduler = IOScheduler(per_volume=self.workers)
+        for task in scheduler.run(self.archives, ArchiveAccess.test_archive):
+            if task.error is None and task.result:
+                continue
+            if task.error is None and task.result is None:
+                self.unverified.append(task.path)
+                logger.warning(f"[#update] ⚠️ 无法判断完整性（加密或超时），保留原位: {os.path.basename(task.path)}")
+                continue
+            if not confirm_corrupted(task.path):
+                self.unverified.append(task.path)
+                logger.warning(f"[#update] ⚠️ 完整性检查未通过但7z未确认损坏，保留原位: {os.path.basename(task.path)}")
+                continue
+            self.corrupted.append(task.path)
+            logger.warning(f"[#update] ⚠️ 完整性检查：压缩包已损坏: {os.path.basename(task.path)}")
+            move_corrupted_archive(task.path, self.base_path)
+        self.seconds = time.perf_counter() - start
+        logger.info(f"[#update] 🔍 完整性检查完成: {len(self.archives)} 个压缩包，"
+                    f"损坏 {len(self.corrupted)} 个，未确认 {len(self.unverified)} 个，耗时 {self.seconds:.2f}s")
 
 def create_category_folders(base_path):
     """在指定路径创建分类文件夹"""
@@ -421,10 +458,10 @@ def create_category_folders(base_path):
         logger.info(f"[#update] 📁 创建损坏压缩包文件夹")
 
 def move_file_to_category(file_path, category):
-    """将文件移动到对应的分类文件夹"""
+    """将文件移动到对应的分类文件夹，返回文件最终所在的路径"""
     if category == "未分类":
         logger.info(f"[#update] 文件 '{file_path}' 未能匹配任何分类规则，保持原位置")
-        return
+        return file_path
         
     target_dir = os.path.join(os.path.dirname(file_path), category)
     target_path = os.path.join(target_dir, os.path.basename(file_path))
@@ -432,8 +469,10 @@ def move_file_to_category(file_path, category):
     if not os.path.exists(target_path):
         shutil.move(file_path, target_path)
         logger.info(f"[#update] 已移动到: {target_path}")
+        return target_path
     else:
         logger.info(f"[#update] 目标路径已存在文件: {target_path}")
+        return file_path
 
 def move_corrupted_archive(file_path, base_path):
     """移动损坏的压缩包到损坏压缩包文件夹，保持原有目录结构"""
@@ -465,8 +504,8 @@ def move_corrupted_archive(file_path, base_path):
     except Exception as e:
         logger.error(f"[#update] ❌ 移动损坏压缩包失败 {file_path}: {str(e)}")
 
-def process_single_file(abs_path):
-    """处理单个文件"""
+def process_single_file(abs_path, verify=True):
+    """处理单个文件，verify 为 True 时分类后再做完整性检查"""
     try:
         if not os.path.exists(abs_path):
             logger.error(f"[#update] ❌ 路径不存在: {abs_path}")
@@ -483,13 +522,19 @@ def process_single_file(abs_path):
         
         # 如果是损坏的压缩包，移动到损坏压缩包文件夹
         if category == "损坏":
+            if not confirm_corrupted(abs_path):
+                logger.warning(f"[#process] ⚠️ 无法读取但7z未确认损坏，保留原位: {os.path.basename(abs_path)}")
+                return
             logger.warning(f"[#update] ⚠️ 压缩包已损坏: {os.path.basename(abs_path)}")
             logger.warning(f"[#process] ❌ 损坏: {os.path.basename(abs_path)}")
             move_corrupted_archive(abs_path, os.path.dirname(abs_path))
             return
         
         # 移动文件到对应分类
-        move_file_to_category(abs_path, category)
+        final_path = move_file_to_category(abs_path, category)
+        
+        if verify:
+            IntegrityCheck([final_path], os.path.dirname(abs_path)).start().join()
         
         logger.info(f"[#process] ✅ 完成: {os.path.basename(abs_path)} -> {category}")
         
@@ -497,6 +542,45 @@ def process_single_file(abs_path):
         logger.error(f"[#update] ❌ 处理文件时出错 {abs_path}: {str(e)}")
         logger.error(f"[#process] ❌ 错误: {os.path.basename(abs_path)}")
 
+def classify_directory_archives(directory_path, archives, workers=None, verify=True):
+    """
+    对目录下的压缩包分类并移动
+    
+    分类见 classify_archives；移动完成后如果 verify 为 True，启动后台完整性检查并返回 IntegrityCheck
+    （调用方负责 join），否则返回 None
+    """
+    categories, timings = classify_archives(archives, workers=workers)
+    
+    start = time.perf_counter()
+    classified = []
+    counts = defaultdict(int)
+    for i, archive_path in enumerate(archives, 1):
+        percentage = i / len(archives) * 100
+        logger.info(f"[#current_progress] 移动压缩包... ({i}/{len(archives)}) {percentage:.1f}%")
+        category = categories[archive_path]
+        counts[category] += 1
+        try:
+            if category == "损坏":
+                if not confirm_corrupted(archive_path):
+                    logger.warning(f"[#process] ⚠️ 无法读取但7z未确认损坏，保留原位: {os.path.basename(archive_path)}")
+                    continue
+                logger.warning(f"[#process] ❌ 损坏: {os.path.basename(archive_path)}")
+                move_corrupted_archive(archive_path, directory_path)
+                continue
+            classified.append(move_file_to_category(archive_path, category))
+            logger.info(f"[#process] ✅ 完成: {os.path.basename(archive_path)} -> {category}")
+        except Exception as e:
+            logger.error(f"[#update] ❌ 移动文件时出错 {archive_path}: {str(e)}")
+    timings["移动文件"] = time.perf_counter() - start
+    
+    summary = " | ".join(f"{category} {count}" for category, count in sorted(counts.items()))
+    logger.info(f"[#update] 📊 分类结果: {summary}")
+    logger.info("[#update] ⏱️ 分类耗时: " + " | ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items()))
+    
+    if verify and classified:
+        return IntegrityCheck(classified, directory_path).start()
+    return None
+
 def normalize_filename(filename):
     """去除文件名中的圆括号、方括号及其内容，返回规范化的文件名"""
     # 去掉扩展名
@@ -694,22 +778,6 @@ def preprocess_filenames(files):
         logger.info(f"[#update] 🔄 预处理: {os.path.basename(file_path)} -> {key}")
     return file_keys
 
-def get_base_filename(filename):
-    """获取去除所有标签后的基本文件名"""
-    # 去掉扩展名
-    name = os.path.splitext(filename)[0]
-    
-    # 去除所有方括号及其内容
-    name = re.sub(r'\[[^\]]*\]', '', name)
-    # 去除所有圆括号及其内容
-    name = re.sub(r'\([^)]*\)', '', name)
-    # 去除所有空格和标点
-    name = re.sub(r'[\s!！?？_~～]+', '', name)
-    # 标准化中文（转换为简体）
-    name = normalize_chinese(name)
-    
-    return name
-
 def is_essentially_same_file(file1, file2):
     """检查两个文件是否本质上是同一个文件（只是标签不同）"""
     # 获取文件名（不含路径和扩展名）
@@ -782,7 +850,7 @@ def find_similar_files(current_file, files, file_keys, processed_files):
 def extract_keywords(filename):
     """从文件名中提取关键词"""
     # 去掉扩展名和方括号内容
-    name = get_base_filename(filename)
+    name = get_base_filename(filename, normalize_chinese)
     
     # 使用多种分隔符分割文件名
     separators = r'[\s]+'
@@ -855,312 +923,9 @@ def find_keyword_based_groups(remaining_files, file_keys, processed_files):
     
     return keyword_groups, to_process
 
-def preprocess_filename(filename):
-    """预处理文件名"""
-    # 获取文件名（不含路径）
-    name = os.path.basename(filename)
-    # 去除扩展名
-    name = name.rsplit('.', 1)[0]
-    
-    # 检查是否有系列标记前缀，如果有则去除
-    for prefix in SERIES_PREFIXES:
-        if name.startswith(prefix):
-            name = name[len(prefix):]
-            break
-            
-    # 去除方括号内容
-    name = re.sub(r'\[.*?\]', '', name)
-    # 去除圆括号内容
-    name = re.sub(r'\(.*?\)', '', name)
-    # 去除多余空格
-    name = ' '.join(name.split())
-    return name
-
-def get_keywords(name):
-    """将文件名分割为关键词列表"""
-    return name.strip().split()
-
-def find_longest_common_keywords(keywords1, keywords2):
-    """找出两个关键词列表中最长的连续公共部分"""
-    matcher = difflib.SequenceMatcher(None, keywords1, keywords2)
-    match = matcher.find_longest_match(0, len(keywords1), 0, len(keywords2))
-    return keywords1[match.a:match.a + match.size]
-
-def validate_series_name(name):
-    """验证和清理系列名称
-    
-    Args:
-        name: 原始系列名称
-        
-    Returns:
-        清理后的有效系列名称，如果无效则返回None
-    """
-    if not name or len(name) <= 1:
-        return None
-        
-    # 标准化中文（转换为简体）
-    name = normalize_chinese(name)
-    
-    # 去除末尾的特殊字符、数字和单字
-    name = re.sub(r'[\s.．。·・+＋\-－—_＿\d]+$', '', name)  # 去除末尾的特殊符号和数字
-    name = re.sub(r'[第章话集卷期篇季部册上中下前后完全][篇话集卷期章节部册全]*$', '', name)  # 去除末尾特殊词
-    name = re.sub(r'(?i)vol\.?\s*\d*$', '', name)  # 去除末尾的vol.xxx
-    name = re.sub(r'(?i)volume\s*\d*$', '', name)  # 去除末尾的volume xxx
-    name = re.sub(r'(?i)part\s*\d*$', '', name)  # 去除末尾的part xxx
-    name = name.strip()
-    
-    # 检查是否包含comic关键词
-    if re.search(r'(?i)comic', name):
-        return None
-    
-    # 检查是否只包含3个或更少的单字母
-    words = name.split()
-    if all(len(word) <= 1 for word in words) and len(''.join(words)) <= 3:
-        return None
-    
-    # 最终检查：结果必须长度大于1且不能以单字结尾
-    if not name or len(name) <= 1 or (len(name) > 0 and len(name.split()[-1]) <= 1):
-        return None
-        
-    return name
-
 def find_series_groups(filenames):
-    """查找属于同一系列的文件组，使用三阶段匹配策略"""
-    # 预处理所有文件名
-    processed_names = {f: preprocess_filename(f) for f in filenames}
-    processed_keywords = {f: get_keywords(processed_names[f]) for f in filenames}
-    # 为比较创建简体版本
-    simplified_names = {f: normalize_chinese(n) for f, n in processed_names.items()}
-    simplified_keywords = {f: [normalize_chinese(k) for k in kws] for f, kws in processed_keywords.items()}
-    
-    # 存储系列分组
-    series_groups = defaultdict(list)
-    # 待处理的文件集合
-    remaining_files = set(filenames)
-    # 记录已匹配的文件
-    matched_files = set()
-    
-    # 预处理阶段：检查已标记的系列
-    logger.info("[#process] 🔍 预处理阶段：检查已标记的系列")
-    
-    for file_path in list(remaining_files):
-        if file_path in matched_files:
-            continue
-            
-        file_name = os.path.basename(file_path)
-        for prefix in SERIES_PREFIXES:
-            if file_name.startswith(prefix):
-                # 提取系列名
-                series_name = file_name[len(prefix):]
-                # 去除可能的其他标记
-                series_name = re.sub(r'\[.*?\]|\(.*?\)', '', series_name)
-                series_name = series_name.strip()
-                if series_name:
-                    series_groups[series_name].append(file_path)
-                    matched_files.add(file_path)
-                    remaining_files.remove(file_path)
-                    logger.info(f"[#process] ✨ 预处理阶段：文件 '{os.path.basename(file_path)}' 已标记为系列 '{series_name}'")
-                break
-    
-    # 第一阶段：风格匹配（关键词匹配）
-    logger.info("[#process] 🔍 第一阶段：风格匹配（关键词匹配）")
-    
-    while remaining_files:
-        best_length = 0
-        best_common = None
-        best_pair = None
-        best_series_name = None
-        
-        # 对剩余文件进行两两比较
-        for file1 in remaining_files:
-            if file1 in matched_files:
-                continue
-                
-            keywords1 = simplified_keywords[file1]  # 使用简体版本比较
-            base_name1 = get_base_filename(os.path.basename(file1))
-            
-            for file2 in remaining_files - {file1}:
-                if file2 in matched_files:
-                    continue
-                    
-                # 检查基础名是否完全相同
-                base_name2 = get_base_filename(os.path.basename(file2))
-                if base_name1 == base_name2:
-                    continue  # 如果基础名完全相同,跳过这对文件
-                    
-                keywords2 = simplified_keywords[file2]  # 使用简体版本比较
-                common = find_longest_common_keywords(keywords1, keywords2)
-                
-                if common and len(common) > best_length:
-                    # 验证系列名称
-                    series_name = validate_series_name(' '.join(common))
-                    if series_name:
-                        best_length = len(common)
-                        best_common = common
-                        best_pair = (file1, file2)
-                        best_series_name = series_name
-        
-        if best_pair and best_series_name:
-            matched_files_this_round = set(best_pair)
-            base_name1 = get_base_filename(os.path.basename(best_pair[0]))
-            
-            for other_file in remaining_files - matched_files_this_round - matched_files:
-                # 检查基础名是否与第一个文件相同
-                other_base_name = get_base_filename(os.path.basename(other_file))
-                if base_name1 == other_base_name:
-                    continue  # 如果基础名相同,跳过这个文件
-                    
-                other_keywords = simplified_keywords[other_file]  # 使用简体版本比较
-                common = find_longest_common_keywords(simplified_keywords[best_pair[0]], other_keywords)
-                if common == best_common:
-                    matched_files_this_round.add(other_file)
-            
-            # 使用最佳系列名
-            series_groups[best_series_name].extend(matched_files_this_round)
-            remaining_files -= matched_files_this_round
-            matched_files.update(matched_files_this_round)
-            
-            logger.info(f"[#process] ✨ 第一阶段：通过关键词匹配找到系列 '{best_series_name}'")
-            for file_path in matched_files_this_round:
-                logger.info(f"[#process]   └─ {os.path.basename(file_path)}")
-        else:
-            break  # 没有找到匹配，进入第二阶段
-    
-    # 第二阶段：完全基础名匹配
-    if remaining_files:
-        logger.info("[#process] 🔍 第二阶段：完全基础名匹配")
-        
-        # 获取所有已存在的系列名
-        existing_series = list(series_groups.keys())
-        
-        # 从目录中获取已有的系列文件夹名称
-        dir_path = os.path.dirname(list(remaining_files)[0])  # 获取第一个文件的目录路径
-        try:
-            for folder_name in os.listdir(dir_path):
-                if os.path.isdir(os.path.join(dir_path, folder_name)):
-                    # 检查是否有系列标记
-                    for prefix in SERIES_PREFIXES:
-                        if folder_name.startswith(prefix):
-                            series_name = folder_name[len(prefix):]  # 去掉前缀
-                            if series_name not in existing_series:
-                                existing_series.append(series_name)
-                                logger.info(f"[#process] 📁 第二阶段：从目录中找到已有系列 '{series_name}'")
-                            break
-        except Exception:
-            pass  # 如果读取目录失败，仅使用已有的系列名
-        
-        # 检查剩余文件是否包含已有系列名
-        matched_files_by_series = defaultdict(list)
-        for file in list(remaining_files):
-            if file in matched_files:
-                continue
-                
-            base_name = simplified_names[file]  # 使用简体版本比较
-            base_name_no_space = re.sub(r'\s+', '', base_name)
-            for series_name in existing_series:
-                series_base = normalize_chinese(series_name)  # 只在比较时转换为简体
-                series_base_no_space = re.sub(r'\s+', '', series_base)
-                # 只要文件名中包含系列名就匹配
-                if series_base_no_space in base_name_no_space:
-                    # 检查是否有基础名相同的文件已经在这个系列中
-                    base_name_current = get_base_filename(os.path.basename(file))
-                    has_same_base = False
-                    for existing_file in matched_files_by_series[series_name]:
-                        if get_base_filename(os.path.basename(existing_file)) == base_name_current:
-                            has_same_base = True
-                            break
-                    
-                    if not has_same_base:
-                        matched_files_by_series[series_name].append(file)  # 使用原始系列名
-                        matched_files.add(file)
-                        remaining_files.remove(file)
-                        logger.info(f"[#process] ✨ 第二阶段：文件 '{os.path.basename(file)}' 匹配到已有系列 '{series_name}'（包含系列名）")
-                    break
-        
-        # 将匹配的文件添加到对应的系列组
-        for series_name, files in matched_files_by_series.items():
-            series_groups[series_name].extend(files)
-            logger.info(f"[#process] ✨ 第二阶段：将 {len(files)} 个文件添加到系列 '{series_name}'")
-            for file_path in files:
-                logger.info(f"[#process]   └─ {os.path.basename(file_path)}")
-    
-    # 第三阶段：最长公共子串匹配
-    if remaining_files:
-        logger.info("[#process] 🔍 第三阶段：最长公共子串匹配")
-            
-        while remaining_files:
-            best_ratio = 0
-            best_pair = None
-            best_common = None
-            original_form = None  # 保存原始大小写形式
-            
-            # 对剩余文件进行两两比较
-            for file1 in remaining_files:
-                if file1 in matched_files:
-                    continue
-                    
-                base1 = simplified_names[file1]  # 使用简体版本比较
-                base1_lower = base1.lower()
-                original1 = processed_names[file1]  # 保存原始形式
-                base_name1 = get_base_filename(os.path.basename(file1))
-                
-                for file2 in remaining_files - {file1}:
-                    if file2 in matched_files:
-                        continue
-                        
-                    # 检查基础名是否完全相同
-                    base_name2 = get_base_filename(os.path.basename(file2))
-                    if base_name1 == base_name2:
-                        continue  # 如果基础名完全相同,跳过这对文件
-                        
-                    base2 = simplified_names[file2]  # 使用简体版本比较
-                    base2_lower = base2.lower()
-                    
-                    # 使用小写形式进行比较
-                    matcher = difflib.SequenceMatcher(None, base1_lower, base2_lower)
-                    ratio = matcher.ratio()
-                    if ratio > best_ratio and ratio > 0.6:
-                        best_ratio = ratio
-                        best_pair = (file1, file2)
-                        match = matcher.find_longest_match(0, len(base1_lower), 0, len(base2_lower))
-                        best_common = base1_lower[match.a:match.a + match.size]
-                        # 保存原始形式
-                        original_form = original1[match.a:match.a + match.size]
-            
-            if best_pair and best_common and len(best_common.strip()) > 1:
-                matched_files_this_round = set(best_pair)
-                base_name1 = get_base_filename(os.path.basename(best_pair[0]))
-                
-                for other_file in remaining_files - matched_files_this_round - matched_files:
-                    # 检查基础名是否与第一个文件相同
-                    other_base_name = get_base_filename(os.path.basename(other_file))
-                    if base_name1 == other_base_name:
-                        continue  # 如果基础名相同,跳过这个文件
-                        
-                    other_base = simplified_names[other_file].lower()  # 使用简体小写版本比较
-                    if best_common in other_base:
-                        matched_files_this_round.add(other_file)
-                
-                # 使用原始形式作为系列名
-                series_name = validate_series_name(original_form)
-                if series_name:
-                    series_groups[series_name].extend(matched_files_this_round)
-                    remaining_files -= matched_files_this_round
-                    matched_files.update(matched_files_this_round)
-                    logger.info(f"[#process] ✨ 第三阶段：通过公共子串匹配找到系列 '{series_name}'")
-                    logger.info(f"[#process]   └─ 公共子串：'{best_common}' (相似度: {best_ratio:.2%})")
-                    for file_path in matched_files_this_round:
-                        logger.info(f"[#process]   └─ 文件 '{os.path.basename(file_path)}'")
-                else:
-                    remaining_files.remove(best_pair[0])
-                    matched_files.add(best_pair[0])
-            else:
-                break
-    
-    if remaining_files:
-        logger.warning(f"[#process] ⚠️ 还有 {len(remaining_files)} 个文件未能匹配到任何系列")
-    
-    return dict(series_groups)
+    """查找属于同一系列的文件组，使用三阶段匹配策略（见 nodes.comic.series_grouping）"""
+    return SeriesGrouper(filenames, normalize=normalize_chinese).group()
 
 def create_series_folders(directory_path, archives):
     """为同一系列的文件创建文件夹"""
@@ -1248,9 +1013,8 @@ def validate_directory(directory_path):
     return abs_dir_path
 
 def collect_archives_for_category(directory_path, category_folders):
-    """收集用于分类的压缩包"""
+    """收集用于分类的压缩包（不做完整性检查，见 IntegrityCheck）"""
     archives = []
-    archives_to_check = []
     
     with os.scandir(directory_path) as entries:
         for entry in entries:
@@ -1259,29 +1023,7 @@ def collect_archives_for_category(directory_path, category_folders):
                 # 跳过损坏压缩包文件夹和分类文件夹中的文件
                 if parent_dir == "损坏压缩包" or parent_dir in category_folders:
                     continue
-                archives_to_check.append(entry.path)
-    
-    if archives_to_check:
-        logger.info(f"[#update] 🔍 正在检查 {len(archives_to_check)} 个压缩包的完整性...")
-        
-        # 使用线程池检查压缩包
-        with ThreadPoolExecutor(max_workers=16) as executor:
-            futures = {executor.submit(is_archive_corrupted, path): path for path in archives_to_check}
-            for i, future in enumerate(futures, 1):
-                path = futures[future]
-                # 更新当前任务状态
-                percentage = i / len(archives_to_check) * 100
-                logger.info(f"[#current_progress] 检测压缩包完整性... ({i}/{len(archives_to_check)}) {percentage:.1f}%")
-                try:
-                    is_corrupted = future.result()
-                    if not is_corrupted:
-                        archives.append(path)
-                    else:
-                        logger.warning(f"[#update] ⚠️ 压缩包已损坏，跳过: {os.path.basename(path)}")
-                except TimeoutError:
-                    logger.warning(f"[#update] ⚠️ 压缩包处理超时，跳过: {os.path.basename(path)}")
-                except Exception as e:
-                    logger.error(f"[#update] ❌ 检查压缩包时出错: {os.path.basename(path)}")
+                archives.append(entry.path)
     
     return archives
 
@@ -1337,9 +1079,8 @@ def collect_archives_for_series(directory_path, category_folders):
                     else:
                         archives.append(path)
                 except TimeoutError:
-                    logger.warning(f"[#update] ⚠️ 压缩包处理超时: {os.path.basename(path)}")
-                    # 将超时的压缩包也视为损坏
-                    move_corrupted_archive(path, directory_path)
+                    # 大文件测试超时不代表损坏，保留原位
+                    logger.warning(f"[#update] ⚠️ 压缩包检查超时，无法判断是否损坏，保留原位: {os.path.basename(path)}")
                 except Exception as e:
                     logger.error(f"[#update] ❌ 检查压缩包时出错: {os.path.basename(path)}")
                     # 将出错的压缩包也视为损坏
@@ -1391,10 +1132,18 @@ def run_post_processing(directory_path, enabled_features):
             logger.error(f"[#update] ❌ 运行序号修复脚本失败: {str(e)}")
             logger.error("[#post_process] ❌ 序号修复失败")
 
-def process_directory(directory_path, progress_task=None, enabled_features=None):
-    """处理指定目录下的所有压缩包"""
+def process_directory(directory_path, progress_task=None, enabled_features=None, workers=None,
+                      integrity_checks=None):
+    """
+    处理指定目录下的所有压缩包
+    
+    Args:
+        workers: 分类时每个卷读取压缩包目录的并发数，None 时自动选择
+        integrity_checks: 传入列表时，后台完整性检查加入该列表由调用方等待；
+            否则在本函数返回前等待完成
+    """
     if enabled_features is None:
-        enabled_features = {1, 2, 3, 4}
+        enabled_features = {1, 2, 3, 4, 5}
         
     # 验证目录
     abs_dir_path = validate_directory(directory_path)
@@ -1419,6 +1168,7 @@ def process_directory(directory_path, progress_task=None, enabled_features=None)
         
         category_folders = set(CATEGORY_RULES.keys())
         found_archives = False
+        integrity_check = None
         
         # 功能2（系列提取）
         if 2 in enabled_features:
@@ -1444,16 +1194,10 @@ def process_directory(directory_path, progress_task=None, enabled_features=None)
             if archives:
                 found_archives = True
                 total_archives = len(archives)
-                logger.info(f"[#update] ✨ 在目录 '{abs_dir_path}' 下找到 {total_archives} 个有效压缩包")
+                logger.info(f"[#update] ✨ 在目录 '{abs_dir_path}' 下找到 {total_archives} 个压缩包")
                 
-                # 处理每个压缩包
-                for i, archive_path in enumerate(archives, 1):
-                    # 更新进度
-                    percentage = i / total_archives * 100
-                    logger.info(f"[#current_progress] 处理压缩包... ({i}/{total_archives}) {percentage:.1f}%")
-                    
-                    # 处理单个文件
-                    process_single_file(archive_path)
+                integrity_check = classify_directory_archives(
+                    abs_dir_path, archives, workers=workers, verify=5 in enabled_features)
             else:
                 logger.info("[#process] 没有找到需要分类的压缩包")
         
@@ -1462,6 +1206,12 @@ def process_directory(directory_path, progress_task=None, enabled_features=None)
             logger.warning("[#update] ⚠️ 目录中没有找到任何有效的压缩包")
             return []
         
+        # 后续处理会删除空文件夹，需要等完整性检查移动完损坏压缩包
+        if integrity_check and (3 in enabled_features or 4 in enabled_features or integrity_checks is None):
+            integrity_check.join()
+        elif integrity_check:
+            integrity_checks.append(integrity_check)
+        
         # 运行后续处理
         if 3 in enabled_features or 4 in enabled_features:
             run_post_processing(abs_dir_path, enabled_features)
@@ -1474,8 +1224,10 @@ def process_directory(directory_path, progress_task=None, enabled_features=None)
         logger.error(f"[#process] ❌ 处理失败: {abs_dir_path}")
         return []
 
-def process_paths(paths, enabled_features=None, similarity_config=None, wait_for_confirm=False):
+def process_paths(paths, enabled_features=None, similarity_config=None, wait_for_confirm=False, workers=None):
     """处理输入的路径列表"""
+    if enabled_features is None:
+        enabled_features = {1, 2, 3, 4, 5}
     init_TextualLogger()
     if similarity_config:
         SIMILARITY_CONFIG.update(similarity_config)
@@ -1513,6 +1265,9 @@ def process_paths(paths, enabled_features=None, similarity_config=None, wait_for
     # 初始化TextualLogger
     init_TextualLogger()
     
+    # 各目录的后台完整性检查，处理下一个路径时继续运行，全部处理完后统一等待
+    integrity_checks = []
+    
     for i, path in enumerate(valid_paths, 1):
         try:
             if wait_for_confirm:
@@ -1523,22 +1278,24 @@ def process_paths(paths, enabled_features=None, similarity_config=None, wait_for
             if sys.platform == 'win32':
                 if win32_path_exists(path):
                     if os.path.isdir(path):
-                        process_directory(path, enabled_features=enabled_features)
+                        process_directory(path, enabled_features=enabled_features, workers=workers,
+                                          integrity_checks=integrity_checks)
                     elif os.path.isfile(path) and is_archive(path):
                         if 1 in enabled_features:
                             if wait_for_confirm:
                                 logger.info(f"[#current_progress] 📦 处理单个文件: {path}")
-                            process_single_file(path)
+                            process_single_file(path, verify=5 in enabled_features)
                             if wait_for_confirm:
                                 logger.info("[#update] ✨ 文件处理完成")
             else:
                 if os.path.isdir(path):
-                    process_directory(path, enabled_features=enabled_features)
+                    process_directory(path, enabled_features=enabled_features, workers=workers,
+                                      integrity_checks=integrity_checks)
                 elif os.path.isfile(path) and is_archive(path):
                     if 1 in enabled_features:
                         if wait_for_confirm:
                             logger.info(f"[#current_progress] 📦 处理单个文件: {path}")
-                        process_single_file(path)
+                        process_single_file(path, verify=5 in enabled_features)
                         if wait_for_confirm:
                             logger.info("[#update] ✨ 文件处理完成")
             
@@ -1552,6 +1309,11 @@ def process_paths(paths, enabled_features=None, similarity_config=None, wait_for
                 logger.warning("[#update] ⚠️ 处理出错，是否继续？")
                 input("按回车键继续处理下一个路径，按 Ctrl+C 终止程序...")
     
+    if integrity_checks:
+        logger.info(f"[#current_progress] 等待 {len(integrity_checks)} 个目录的完整性检查完成...")
+        for check in integrity_checks:
+            check.join()
+    
     if wait_for_confirm:
         logger.info("[#update] ✅ 所有路径处理完成！")
     else:
@@ -1563,7 +1325,10 @@ def process_args():
     parser.add_argument('paths', nargs='*', help='要处理的路径列表')
     parser.add_argument('-c', '--clipboard', action='store_true', help='从剪贴板读取路径')
     parser.add_argument('-f', '--features', type=str, default='',
-                      help='启用的功能（1-4，用逗号分隔）：1=分类，2=系列提取，3=删除空文件夹，4=序号修复。默认全部启用')
+                      help='启用的功能（1-5，用逗号分隔）：1=分类，2=系列提取，3=删除空文件夹，4=序号修复，'
+                           '5=完整性检查（分类后在后台完整解压测试）。默认全部启用')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                      help='分类时每个磁盘同时读取压缩包目录的数量，默认按磁盘类型自动选择')
     parser.add_argument('--similarity', type=float, default=80,
                       help='设置基本相似度阈值(0-100)，默认80')
     parser.add_argument('--ratio', type=float, default=75,
@@ -1582,7 +1347,7 @@ def process_args():
         presets = {
             "默认配置": {
                 "description": "启用所有功能的默认配置",
-                "checkbox_options": ["clipboard", "feature1", "feature2", "feature3", "feature4"],
+                "checkbox_options": ["clipboard", "feature1", "feature2", "feature3", "feature4", "feature5"],
                 "input_values": {
                     "similarity": "80",
                     "ratio": "75",
@@ -1633,6 +1398,7 @@ def process_args():
             ("系列提取", "feature2", "-f 2"),
             ("删除空文件夹", "feature3", "-f 3"),
             ("序号修复", "feature4", "-f 4"),
+            ("完整性检查", "feature5", "-f 5"),
             ("等待确认", "wait", "--wait", False),
         ]
 
@@ -1692,17 +1458,17 @@ def run_classifier(paths, args):
         try:
             enabled_features = {int(f.strip()) for f in args.features.split(',') if f.strip()}
             for f in enabled_features.copy():
-                if f not in {1, 2, 3, 4}:
+                if f not in {1, 2, 3, 4, 5}:
                     print(f"无效的功能编号: {f}")
                     enabled_features.remove(f)
         except ValueError:
             print("无效的功能编号格式，将启用所有功能")
-            enabled_features = {1, 2, 3, 4}
+            enabled_features = {1, 2, 3, 4, 5}
     else:
-        enabled_features = {1, 2, 3, 4}
+        enabled_features = {1, 2, 3, 4, 5}
 
     # 处理路径
-    process_paths(paths, enabled_features=enabled_features, wait_for_confirm=args.wait)
+    process_paths(paths, enabled_features=enabled_features, wait_for_confirm=args.wait, workers=args.workers)
 
 def main():
     # 设置控制台编码为UTF-8
@@ -12,9 +12,9 @@ import io
 import functools
 import subprocess
 import threading
+import time
 from functools import partial
 import random
-import zipfile
 import win32com.client  # 用于创建快捷方式
 
 # 第三方库导入
@@ -28,9 +28,13 @@ from typing import List, Dict, Set, Tuple, Optional, Union
 from opencc import OpenCC  # 用于繁简转换
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from nodes.record.logger_config import setup_logger
-from nodes.pics.calculate_hash_custom import ImageClarityEvaluator
+from nodes.pics.clarity import calibrate_default_engine, default_engine
+from nodes.archive.archive_access import ArchiveAccess
+from nodes.archive.archive_metrics import ArchiveMetricCache
+from nodes.file.io_scheduler import IOScheduler
 from nodes.tui.textual_logger import TextualLoggerManager
 from nodes.utils.number_shortener import shorten_number_cn
+from nodes.utils.rule_matcher import RuleMatcher
 from nodes.tui.mode_manager import create_mode_manager
 import json
 from nodes.pics.group_analyzer import GroupAnalyzer
@@ -188,6 +192,10 @@ IMAGE_EXTENSIONS = {
     '.gif', '.bmp', '.tiff', '.tif', '.heic', '.heif'
 }
 
+CLARITY_SAMPLE_COUNT = 5  # 每个压缩包随机抽取的清晰度样本数
+METRICS_VERSION = 2  # 指标计算方式变化时加 1，使缓存的指标失效（2: 页数计入 tif/heic 等格式）
+_metric_cache = None
+
 def preprocess_keywords(keywords: Set[str]) -> Set[str]:
     """预处理关键词集合，添加繁简体变体"""
     processed = set()
@@ -256,6 +264,13 @@ _CHINESE_VERSION_KEYWORDS_FULL = preprocess_keywords(CHINESE_VERSION_KEYWORDS)
 _ORIGINAL_VERSION_KEYWORDS_FULL = preprocess_keywords(ORIGINAL_VERSION_KEYWORDS)
 _BLACKLIST_KEYWORDS_FULL = preprocess_keywords(BLACKLIST_KEYWORDS)
 
+# 三组关键词编译成一个自动机，一次扫描得到文件名命中的全部关键词组
+VERSION_MATCHER = (RuleMatcher()
+                   .add_keywords('chinese', _CHINESE_VERSION_KEYWORDS_FULL)
+                   .add_keywords('original', _ORIGINAL_VERSION_KEYWORDS_FULL)
+                   .add_keywords('blacklist', _BLACKLIST_KEYWORDS_FULL)
+                   .compile())
+
 # 添加线程本地存储
 thread_local = threading.local()
 
@@ -284,29 +299,21 @@ def clean_filename(filename: str) -> str:
     return name, hanhua_info
 
 @functools.lru_cache(maxsize=10000)
+def match_keyword_groups(text: str) -> frozenset:
+    """返回文件名/路径命中的关键词组（chinese / original / blacklist），不区分大小写"""
+    return frozenset(VERSION_MATCHER.match(str(text)))
+
 def is_chinese_version(filename: str) -> bool:
     """判断是否为汉化版本"""
-    # 转换文件名为小写
-    filename_lower = filename.lower()
-    # 直接使用预处理好的关键词集合进行检查
-    return any(keyword in filename_lower for keyword in _CHINESE_VERSION_KEYWORDS_FULL)
+    return 'chinese' in match_keyword_groups(filename)
 
-@functools.lru_cache(maxsize=10000)
 def has_original_keywords(filename: str) -> bool:
     """检查是否包含原版特殊关键字"""
-    # 转换文件名为小写
-    filename_lower = filename.lower()
-    # 直接使用预处理好的关键词集合进行检查
-    return any(keyword in filename_lower for keyword in _ORIGINAL_VERSION_KEYWORDS_FULL)
+    return 'original' in match_keyword_groups(filename)
 
-# 使用 functools.lru_cache 装饰器缓存结果
-@functools.lru_cache(maxsize=10000)
 def is_in_blacklist(filepath: str) -> bool:
     """检查文件名或路径是否包含黑名单关键词"""
-    # 转换路径为小写，只转换一次
-    filepath_lower = str(filepath).lower()
-    # 直接使用预处理好的关键词集合进行检查
-    return any(keyword in filepath_lower for keyword in _BLACKLIST_KEYWORDS_FULL)
+    return 'blacklist' in match_keyword_groups(filepath)
 
 def is_besscan_version(filename: str) -> bool:
     """判断是否为別スキャン版本"""
@@ -353,124 +360,151 @@ def get_7zip_path() -> str:
 def get_image_count(archive_path: str) -> int:
     """计算压缩包中的图片总数"""
     try:
-        with zipfile.ZipFile(archive_path, 'r') as zf:
-            # 统计支持的图片格式文件数量
-            count = sum(1 for f in zf.namelist() 
-                       if os.path.splitext(f.lower())[1] in IMAGE_EXTENSIONS)
-            return count
+        return len(list_archive_images(archive_path))
     except Exception as e:
         logger.error("[#error_log] ❌ 统计图片数量失败 %s: %s", archive_path, str(e))
         return 0
 
-def get_sample_images(archive_path: str, temp_dir: str, sample_count: int = 3) -> List[str]:
-    """从压缩包中提取样本图片到临时目录"""
-    try:
-        with zipfile.ZipFile(archive_path, 'r') as zf:
-            # 获取所有图片文件
-            image_files = [(f, info.file_size) for f, info in 
-                         ((f, zf.getinfo(f)) for f in zf.namelist())
-                         if os.path.splitext(f.lower())[1] in IMAGE_EXTENSIONS]
-            
-            if not image_files:
-                return []
-            
-            # 按文件大小排序
-            image_files.sort(key=lambda x: x[1], reverse=True)
-            
-            # 选择样本
-            samples = []
-            if image_files:
-                samples.append(image_files[0][0])  # 最大的文件
-                if len(image_files) > 2:
-                    samples.append(image_files[len(image_files)//2][0])  # 中间的文件
-                
-                # 从前30%选择剩余样本
-                top_30_percent = image_files[:max(3, len(image_files) // 3)]
-                while len(samples) < sample_count and top_30_percent:
-                    sample = random.choice(top_30_percent)[0]
-                    if sample not in samples:
-                        samples.append(sample)
-            
-            # 提取选中的样本到临时目录
-            extracted_files = []
-            for sample in samples:
-                temp_file = os.path.join(temp_dir, os.path.basename(sample))
-                with zf.open(sample) as source, open(temp_file, 'wb') as target:
-                    shutil.copyfileobj(source, target)
-                if os.path.exists(temp_file):
-                    extracted_files.append(temp_file)
-                    
-            return extracted_files
-            
-    except Exception as e:
-        logger.error("[#error_log] ❌ 提取样本图片失败 %s: %s", archive_path, str(e))
-        return []
+def select_width_samples(image_files: List[Tuple[str, int]], sample_count: int = 3) -> List[str]:
+    """按大小选择宽度样本：最大的、中间的，其余从前30%中随机选"""
+    image_files = sorted(image_files, key=lambda x: x[1], reverse=True)
+    samples = []
+    if image_files:
+        samples.append(image_files[0][0])  # 最大的文件
+        if len(image_files) > 2:
+            samples.append(image_files[len(image_files)//2][0])  # 中间的文件
+        
+        # 从前30%选择剩余样本
+        top_30_percent = [name for name, _ in image_files[:max(3, len(image_files) // 3)]]
+        candidates = [name for name in top_30_percent if name not in samples]
+        samples.extend(random.sample(candidates, min(sample_count - len(samples), len(candidates))))
+    return samples
+
+def list_archive_images(archive_path: str) -> list:
+    """按本脚本的 IMAGE_EXTENSIONS 列出图片成员（比 ArchiveAccess.list_images 多出 tif/heic 等格式）"""
+    return [m for m in ArchiveAccess.list_members(archive_path) if m.suffix in IMAGE_EXTENSIONS]
+
+def read_sample_images(archive_path: str, names: List[str], members: Optional[list] = None) -> Dict[str, bytes]:
+    """在内存中读取压缩包中指定的图片，返回 {成员名: 数据}"""
+    if members is None:
+        members = list_archive_images(archive_path)
+    wanted = set(names)
+    return {member.name: data for member, data in
+            ArchiveAccess.iter_members(archive_path, members=[m for m in members if m.name in wanted])}
+
+def median_width(samples: Dict[str, bytes]) -> int:
+    """样本图片宽度的中位数（只读图片头）"""
+    widths = []
+    for name, data in samples.items():
+        try:
+            with Image.open(io.BytesIO(data)) as img:
+                widths.append(img.width)
+        except Exception as e:
+            logger.info("[#error_log] ⚠️ 读取图片宽度失败 %s: %s", name, str(e))
+    return int(sorted(widths)[len(widths)//2]) if widths else 0
 
 def calculate_representative_width(archive_path: str, sample_count: int = 3) -> int:
     """计算压缩包中图片的代表宽度（使用抽样和中位数）"""
-    try:
-        # 检查文件扩展名
-        ext = os.path.splitext(archive_path)[1].lower()
-        if ext not in {'.zip', '.cbz'}:  # 只处理zip格式
-            return 0
+    return calculate_archive_metrics(archive_path, sample_count)['width']
 
-        # 获取压缩包中的文件信息
-        image_files = []
-        try:
-            with zipfile.ZipFile(archive_path, 'r') as zf:
-                for info in zf.infolist():
-                    if os.path.splitext(info.filename.lower())[1] in IMAGE_EXTENSIONS:
-                        image_files.append((info.filename, info.file_size))
-        except zipfile.BadZipFile:
-            logger.info("[#error_log] ⚠️ 无效的ZIP文件: %s", archive_path)
-            return 0
+def calculate_archive_metrics(archive_path: str, sample_count: int = 3, clarity_workers: Optional[int] = 1) -> Dict[str, Union[int, float]]:
+    """
+    计算压缩包的页数、代表宽度和清晰度
+    
+    成员列表只读取一次；宽度样本和清晰度样本一次性读入内存（不解压到临时目录），
+    宽度和清晰度只对 ZIP/CBZ 计算。无法读取压缩包时抛出异常（不写入缓存）。
+    """
+    metrics = {'width': 0, 'page_count': 0, 'clarity_score': 0.0}
+    members = list_archive_images(archive_path)
+    metrics['page_count'] = len(members)
+    if not members or os.path.splitext(archive_path)[1].lower() not in {'.zip', '.cbz'}:
+        return metrics
+    
+    width_names = select_width_samples([(m.name, m.size) for m in members], sample_count)
+    clarity_names = random.sample([m.name for m in members], min(CLARITY_SAMPLE_COUNT, len(members)))
+    samples = read_sample_images(archive_path, width_names + clarity_names, members)
+    
+    metrics['width'] = median_width({name: samples[name] for name in width_names if name in samples})
+    scores = default_engine().score_many([samples[name] for name in clarity_names if name in samples],
+                                         workers=clarity_workers)
+    metrics['clarity_score'] = sum(scores) / len(scores) if scores else 0.0
+    return metrics
 
-        if not image_files:
-            return 0
+def get_metric_cache() -> ArchiveMetricCache:
+    """本脚本的指标缓存（按压缩包内容指纹，改名后仍然命中）"""
+    global _metric_cache
+    if _metric_cache is None:
+        _metric_cache = ArchiveMetricCache(version=METRICS_VERSION, namespace='no_translate_find')
+    return _metric_cache
 
-        # 按文件大小排序
-        image_files.sort(key=lambda x: x[1], reverse=True)
-        
-        # 选择样本
-        samples = []
-        if image_files:
-            samples.append(image_files[0][0])  # 最大的文件
-            if len(image_files) > 2:
-                samples.append(image_files[len(image_files)//2][0])  # 中间的文件
-            
-            # 从前30%选择剩余样本
-            top_30_percent = image_files[:max(3, len(image_files) // 3)]
-            while len(samples) < sample_count and top_30_percent:
-                sample = random.choice(top_30_percent)[0]
-                if sample not in samples:
-                    samples.append(sample)
+def get_cached_metrics(path: str, sample_count: int = 3) -> Dict[str, Union[int, float]]:
+    """读取或计算单个压缩包的指标，不同宽度样本数、原图/缩小计算清晰度的结果分开缓存"""
+    clarity_mode = 'full' if default_engine().max_side is None else 'calibrated'
+    return get_metric_cache().get_or_compute(path, partial(calculate_archive_metrics, sample_count=sample_count),
+                                             variant=f'samples={sample_count}|clarity={clarity_mode}')
 
-        widths = []
+def calibrate_clarity(directories: List[str], limit: int = 200) -> bool:
+    """从目录下的 ZIP/CBZ 中抽样图片拟合清晰度校准，成功后清晰度改为缩小计算（见 nodes.pics.clarity）"""
+    archives = []
+    for directory in directories:
+        for root, _, files in os.walk(directory):
+            if 'trash' in root or 'multi' in root:
+                continue
+            archives.extend(os.path.join(root, file) for file in files
+                            if os.path.splitext(file.lower())[1] in {'.zip', '.cbz'})
+    random.shuffle(archives)
+    samples = []
+    for archive_path in archives:
+        if len(samples) >= limit:
+            break
         try:
-            with zipfile.ZipFile(archive_path, 'r') as zf:
-                for sample in samples:
-                    try:
-                        # 直接从zip读取到内存
-                        with zf.open(sample) as file:
-                            img_data = file.read()
-                            with Image.open(io.BytesIO(img_data)) as img:
-                                widths.append(img.width)
-                    except Exception as e:
-                        logger.info("[#error_log] ⚠️ 读取图片宽度失败 %s: %s", sample, str(e))
-                        continue
+            members = list_archive_images(archive_path)
+            names = random.sample([m.name for m in members], min(CLARITY_SAMPLE_COUNT, len(members)))
+            samples.extend(read_sample_images(archive_path, names, members).values())
         except Exception as e:
-            logger.info("[#error_log] ⚠️ 打开ZIP文件失败: %s", str(e))
-            return 0
-
-        if not widths:
-            return 0
-
-        # 使用中位数作为代表宽度
-        return int(sorted(widths)[len(widths)//2])
+            logger.info("[#error_log] ⚠️ 读取校准样本失败 %s: %s", archive_path, str(e))
+    logger.info("[#process] 🎯 使用 %d 张样本校准清晰度评分...", len(samples))
+    calibration = calibrate_default_engine(samples[:limit])
+    if calibration is None:
+        logger.info("[#error_log] ❌ 清晰度校准失败（有效样本不足），继续按原图计算")
+        return False
+    logger.info("[#process] ✅ 清晰度校准完成: %s", calibration)
+    return True
 
-    except Exception as e:
-        logger.info("[#error_log] ❌ 计算代表宽度失败 %s: %s", archive_path, str(e))
-        return 0
+def compute_metrics(paths: List[str], sample_count: int = 3, workers: Optional[int] = None) -> Dict[str, Dict[str, Union[int, float]]]:
+    """
+    并发计算所有压缩包的指标，按内容指纹读写缓存
+    
+    Args:
+        paths: 压缩包完整路径
+        sample_count: 宽度样本数
+        workers: 每个卷的并发数，None 时按卷类型自动选择
+        
+    Returns:
+        {路径: 指标}，失败的压缩包指标全为 0
+    """
+    cache = get_metric_cache()
+    hits_before = cache.hits
+    start = time.perf_counter()
+    
+    def compute(path):
+        return get_cached_metrics(path, sample_count)
+    
+    results = {}
+    scheduler = IOScheduler(per_volume=workers)
+    for i, task in enumerate(scheduler.run(paths, compute), 1):
+        logger.info("[@process] 指标计算: (%d/%d) %.2f%%", i, len(paths), i / len(paths) * 100)
+        if task.error is not None:
+            logger.error("[#error_log] ❌ 计算指标失败 %s: %s", task.path, str(task.error))
+            results[task.path] = {'width': 0, 'page_count': 0, 'clarity_score': 0.0}
+        else:
+            results[task.path] = task.result
+    cache.store.flush()
+    
+    hits = cache.hits - hits_before
+    logger.info("[#stats] ⏱️ 指标计算: %d个文件, 缓存命中%d个, 耗时%.1fs",
+                len(paths), hits, time.perf_counter() - start)
+    return results
 
 def extract_width_from_filename(filename: str) -> int:
     """从文件名中提取宽度信息，如果没有则返回0"""
@@ -584,8 +618,8 @@ def safe_move_file(src_path: str, dst_path: str, max_retries: int = 3, delay: fl
                 
     return False
 
-def process_file_with_count(file_path: str) -> Tuple[str, str, Dict[str, Union[int, float]]]:
-    """处理单个文件，返回原始路径、新路径和所有指标"""
+def process_file_with_count(file_path: str, metrics: Optional[Dict[str, Union[int, float]]] = None) -> Tuple[str, str, Dict[str, Union[int, float]]]:
+    """处理单个文件，返回原始路径、新路径和所有指标（metrics 为预先计算好的指标）"""
     full_path = file_path
     dir_name = os.path.dirname(file_path)
     file_name = os.path.basename(file_path)
@@ -594,39 +628,19 @@ def process_file_with_count(file_path: str) -> Tuple[str, str, Dict[str, Union[i
     # 移除已有的标记
     name = re.sub(r'\{[^}]*\}', '', name)  # 移除所有花括号内容
     
-    # 计算所有指标
-    metrics = {
-        'width': 0,
-        'page_count': 0,
-        'clarity_score': 0.0
-    }
+    # 计算所有指标（有缓存时直接使用缓存）
+    if metrics is None:
+        try:
+            metrics = get_cached_metrics(full_path)
+        except Exception as e:
+            logger.error("[#error_log] ❌ 计算指标失败 %s: %s", full_path, str(e))
+            metrics = {'width': 0, 'page_count': 0, 'clarity_score': 0.0}
+    metrics = dict(metrics)
     
-    # 首先尝试从原文件名提取页数信息
+    # 文件名中已有页数信息时以文件名为准
     page_match = re.search(r'\{(\d+)@PX\}', file_name)
     if page_match:
         metrics['page_count'] = int(page_match.group(1))
-    else:
-        # 如果文件名中没有页数信息，才计算页数
-        metrics['page_count'] = get_image_count(full_path)
-    
-    # 计算宽度
-    metrics['width'] = calculate_representative_width(full_path)
-    
-    # 计算清晰度评分
-    try:
-        with zipfile.ZipFile(full_path, 'r') as zf:
-            image_files = [f for f in zf.namelist() if os.path.splitext(f.lower())[1] in IMAGE_EXTENSIONS]
-            if image_files:
-                sample_files = random.sample(image_files, min(5, len(image_files)))
-                scores = []
-                for sample in sample_files:
-                    with zf.open(sample) as f:
-                        img_data = f.read()
-                        scores.append(ImageClarityEvaluator.calculate_definition(img_data))
-                metrics['clarity_score'] = sum(scores) / len(scores) if scores else 0.0
-                
-    except Exception as e:
-        logger.error("[#error_log] 清晰度计算失败 %s: %s", file_path, str(e))
     
     # 生成属性字符串，所有属性放在一个大括号内
     parts = []
@@ -643,8 +657,8 @@ def process_file_with_count(file_path: str) -> Tuple[str, str, Dict[str, Union[i
     
     return file_path, new_path, metrics
 
-def process_file_group(group_files: List[str], base_dir: str, trash_dir: str, report_generator: ReportGenerator, create_shortcuts: bool = False, enable_multi_main: bool = False) -> None:
-    """处理一组相似文件"""
+def process_file_group(group_files: List[str], base_dir: str, trash_dir: str, report_generator: ReportGenerator, create_shortcuts: bool = False, enable_multi_main: bool = False, precomputed: Optional[Dict[str, Dict[str, Union[int, float]]]] = None) -> None:
+    """处理一组相似文件（precomputed 为 compute_metrics 预先计算的 {完整路径: 指标}）"""
     # 获取组的基础名称
     group_base_name, _ = clean_filename(group_files[0])
     
@@ -683,8 +697,9 @@ def process_file_group(group_files: List[str], base_dir: str, trash_dir: str, re
     file_metrics = {}  # 存储每个文件的指标
     
     # 第一轮：计算所有文件的指标，直接使用完整路径
+    precomputed = precomputed or {}
     for file in chinese_versions + other_versions:
-        old_path, new_path, metrics = process_file_with_count(file)  # 现在传入的是完整路径
+        old_path, new_path, metrics = process_file_with_count(file, precomputed.get(file))  # 现在传入的是完整路径
         processed_files.append((old_path, new_path))
         file_metrics[old_path] = metrics
     
@@ -837,7 +852,7 @@ def process_file_group(group_files: List[str], base_dir: str, trash_dir: str, re
             # 单个原版，保持原位置
             logger.info("[#group_info] 🔍 组[%s]处理: 未发现汉化版本，仅有1个原版，保持原位置", group_base_name)
 
-def process_directory(directory: str, report_generator: ReportGenerator, dry_run: bool = False, create_shortcuts: bool = False, enable_multi_main: bool = False) -> None:
+def process_directory(directory: str, report_generator: ReportGenerator, dry_run: bool = False, create_shortcuts: bool = False, enable_multi_main: bool = False, sample_count: int = 3, workers: Optional[int] = None) -> None:
     """处理单个目录"""
     # 创建trash目录
     trash_dir = os.path.join(directory, 'trash')
@@ -876,24 +891,31 @@ def process_directory(directory: str, report_generator: ReportGenerator, dry_run
     # 更新报告统计
     report_generator.update_stats('total_groups', len(groups))
     
+    # 所有组的文件共用一个线程池先算好指标，组内处理只做重命名和移动
+    multi_groups = [group_files for group_files in groups.values() if len(group_files) > 1]
+    metric_paths = [os.path.join(directory, f) for group_files in multi_groups
+                    for f in group_files if not is_in_blacklist(f)]
+    logger.info("[#process] 📐 计算%d个文件的指标...", len(metric_paths))
+    precomputed = compute_metrics(metric_paths, sample_count=sample_count, workers=workers)
+    
     # 创建进程池进行并行处理
     logger.info("[#process] 🔄 开始处理文件组...")
     
     with ThreadPoolExecutor(max_workers=min(os.cpu_count() * 2, 8)) as executor:
         # 创建任务列表
         futures = []
-        for _, group_files in groups.items():
-            if len(group_files) > 1:  # 只处理有多个版本的组
-                future = executor.submit(
-                    process_file_group,
-                    group_files,
-                    directory,
-                    trash_dir,
-                    report_generator,
-                    create_shortcuts,
-                    enable_multi_main
-                )
-                futures.append(future)
+        for group_files in multi_groups:  # 只处理有多个版本的组
+            future = executor.submit(
+                process_file_group,
+                group_files,
+                directory,
+                trash_dir,
+                report_generator,
+                create_shortcuts,
+                enable_multi_main,
+                precomputed
+            )
+            futures.append(future)
         
         # 更新组处理进度
         completed = 0
@@ -1032,9 +1054,11 @@ def setup_cli_parser():
     group.add_argument('-c', '--clipboard', action='store_true', help='从剪贴板读取路径')
     group.add_argument('-p', '--paths', nargs='+', help='要处理的目录路径')
     parser.add_argument('-s', '--sample-count', type=int, default=3, help='每个压缩包抽取的图片样本数量（默认3）')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='计算指标时每个磁盘的并发数（默认按磁盘类型自动选择）')
     parser.add_argument('--create-shortcuts', action='store_true', help='创建快捷方式而不是移动文件')
     parser.add_argument('--enable-multi-main', action='store_true', help='为每个multi组创建主文件副本')
     parser.add_argument('--report', type=str, help='指定报告文件名（默认为"处理报告_时间戳.md"）')
+    parser.add_argument('--calibrate', action='store_true', help='处理前从压缩包抽样校准清晰度评分，之后按缩小分辨率计算（更快、更省内存）')
     return parser
 
 def run_application(args):
@@ -1079,6 +1103,9 @@ def run_application(args):
         logger.info("[#error_log] ❌ 没有有效的路径可处理")
         return False
     
+    if getattr(args, 'calibrate', False):
+        calibrate_clarity(valid_paths)
+    
     # 创建报告生成器
     report_generator = ReportGenerator()
     
@@ -1089,7 +1116,9 @@ def run_application(args):
             path,
             report_generator,
             create_shortcuts=args.create_shortcuts if hasattr(args, 'create_shortcuts') else False,
-            enable_multi_main=args.enable_multi_main if hasattr(args, 'enable_multi_main') else False
+            enable_multi_main=args.enable_multi_main if hasattr(args, 'enable_multi_main') else False,
+            sample_count=getattr(args, 'sample_count', 3) or 3,
+            workers=getattr(args, 'workers', None)
         )
         logger.info("[#process] ✨ 目录处理完成: %s", path)
         
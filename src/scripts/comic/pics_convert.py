@@ -1,9 +1,11 @@
 from nodes.config.import_bundles import *
+from nodes.config.lazy_import import LazyObject
 
 
-import fsspec
+fsspec = lazy_module('fsspec')
 from nodes.file_utils.force_delete import ForceDelete
 import importlib.util
+import hashlib
 import tempfile
 import sys
 import os
@@ -24,19 +26,19 @@ spec.loader.exec_module(performance_config)
 from nodes.config.performance_config import *
 # ---
 ConfigGUI = performance_config.ConfigGUI
-from nodes.tui.textual_logger import TextualLoggerManager
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
 vipshome = Path(os.path.join(BASE_DIR, VIPSHOME_RELATIVE))
-if hasattr(os, 'add_dll_directory'):
-    os.add_dll_directory(str(vipshome))
-os.environ['PATH'] = str(vipshome) + ';' + os.environ['PATH']
-import pyvips
+from nodes.pics.vips_runtime import VipsRuntime
+from nodes.archive.archive_access import ArchiveAccess
+# 第一次解码图片时才加载 libvips
+vips_runtime = LazyObject(lambda: VipsRuntime.get(str(vipshome)), name="VipsRuntime")
 # 全局配置
-if hasattr(os, 'add_dll_directory'):
-    os.add_dll_directory(str(vipshome))
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 # 在全局配置部分添加以下内容
 # ================= 日志配置 =================
 from nodes.record.logger_config import setup_logger
+from nodes.utils.thread_manager import ThreadManager
 
 config = {
     'script_name': 'pics_convert',
@@ -117,6 +119,17 @@ VIDEO_FORMATS = {'.mp4', '.avi', '.mkv', '.wmv', '.flv', '.webm', '.mov', '.m4v'
 AUDIO_FORMATS = {'.mp3', '.wav', '.flac', '.m4a', '.ogg', '.aac', '.wma', '.opus', '.ape', '.alac'}
 EXCLUDED_IMAGE_FORMATS = {'.jxl', '.avif', '.webp', '.gif', '.psd', '.ai', '.cdr', '.eps', '.svg', '.raw', '.cr2', '.nef', '.arw', '.dng', '.tif', '.tiff'}
 
+# 监听模式配置
+WATCH_CONFIG = {
+    'settle_seconds': 10,        # 文件最后一次变化后需静置的秒数
+    'poll_interval': 1,          # 待处理队列的检查间隔（秒）
+    'rescan_minutes': 60,        # 一致性全量扫描间隔（分钟）
+    'processed_file': 'pics_convert_processed.json',
+    'save_every': 50,            # 登记表累计多少条变更后落盘
+    'save_interval': 30,         # 登记表最长落盘间隔（秒）
+}
+WAIT_STATUS_INTERVAL = 5  # 等待下一轮时状态刷新间隔（秒）
+
 # 效率检查配置
 EFFICIENCY_CHECK_CONFIG = {
     'min_files_to_check': 3,
@@ -449,7 +462,7 @@ class Converter:
             else:
                 # 其他情况使用原有转换方式
                 with fs.open(file_path, 'rb') as f:
-                    image = pyvips.Image.new_from_buffer(f.read(), '')
+                    image = vips_runtime.open_buffer(f.read())
                 format_config = IMAGE_CONVERSION_CONFIG[f'{target_ext[1:]}_config']
                 params = {
                     'Q': format_config['quality'],
@@ -505,7 +518,7 @@ class Converter:
                     if cur_format == target_format:
                         logger.info(f"[#image]图片已经是目标格式 {target_format}，跳过转换")
                         return (image_data, None)
-            image = pyvips.Image.new_from_buffer(image_data, '')
+            image = vips_runtime.open_buffer(image_data)
             config = IMAGE_CONVERSION_CONFIG[f'{target_format}_config']
             logger.info(f"[#image]转换配置: 目标格式={target_format}, 参数={config}")
             if target_format == 'avif':
@@ -616,9 +629,12 @@ class BatchProcessor:
         batch_size = get_batch_size()
         logger.info(f"[#performance]当前线程数: {current_threads}, 当前批处理大小: {batch_size}")
      
-        with ThreadPoolExecutor(max_workers=current_threads) as executor:
+        # 线程数向共享的 ThreadManager 申请，内存紧张时自动暂停新任务
+        with ThreadManager.shared().lease('pics_convert', current_threads) as lease, \
+                ThreadPoolExecutor(max_workers=lease.workers) as executor:
             for file_path in batch:
-                future = executor.submit(self.converter.process_single_image, file_path, params)
+                task = lease.wrap(self.converter.process_single_image, nbytes=os.path.getsize(file_path))
+                future = executor.submit(task, file_path, params)
                 futures.append((future, file_path))
                 
             for future, file_path in futures:
@@ -698,6 +714,7 @@ class ArchiveHandler:
         self.low_compression_count = 0  # 添加连续低压缩率计数器
         self.COMPRESSION_THRESHOLD = 0.2  # 压缩率阈值 (20%)
         self.MAX_LOW_COMPRESSION = 3  # 最大允许连续低压缩次数
+        self.nothing_to_do = False  # 检查后确认无需处理（只取决于文件内容和参数，可登记跳过）
 
     def _check_compression_rate(self, original_size, new_size) -> bool:
         """检查压缩率，返回是否为低压缩率"""
@@ -749,6 +766,7 @@ class ArchiveHandler:
         if not self.should_process_file(file_path, params):
             logger.info(f"[#archive]根据过滤条件跳过文件: {file_path}")
             logger.info(f"[#archive]跳过: {file_path.name} - 不符合关键词要求")
+            self.nothing_to_do = True
             return False, 0
             
         logger.info(f"[#archive]🔄 正在处理: {file_path.name}")
@@ -760,9 +778,11 @@ class ArchiveHandler:
             return False, 0
         elif needs_processing is False:
             logger.info(f"[#archive]压缩包 {file_path} 无需处理")
+            self.nothing_to_do = True
             return False, 0
         elif image_count == 0:
             logger.info(f"[#archive]压缩包 {file_path} 不包含图片文件")
+            self.nothing_to_do = True
             return False, 0
             
         return True, image_count
@@ -839,6 +859,7 @@ class ArchiveHandler:
             
             # 重置低压缩率计数器
             self.low_compression_count = 0
+            self.nothing_to_do = False
             
             # 验证压缩包
             is_valid, image_count = self._validate_archive(file_path, params)
@@ -849,32 +870,33 @@ class ArchiveHandler:
             temp_dir = None
             new_zip_path = None
             backup_file_path = None
-            try:
-                temp_dir, new_zip_path, backup_file_path = self._prepare_paths(file_path)
+            with vips_runtime.track(file_path.name):
+                try:
+                    temp_dir, new_zip_path, backup_file_path = self._prepare_paths(file_path)
                 
-                # 设置rename_cbr属性
-                self.rename_cbr = params.get('rename_cbr', False)
+                    # 设置rename_cbr属性
+                    self.rename_cbr = params.get('rename_cbr', False)
                 
-                # 处理内容
-                processed_files, skipped_files = self._process_archive_contents(
-                    file_path, temp_dir, params, image_count
-                )
+                    # 处理内容
+                    processed_files, skipped_files = self._process_archive_contents(
+                        file_path, temp_dir, params, image_count
+                    )
                 
-                # 如果连续低压缩率达到阈值，记录并可能重命名为CBR
-                if self._should_stop_processing():
-                    reason = f"连续{self.MAX_LOW_COMPRESSION}张图片压缩率过低"
-                    self._log_cbr_candidate(str(file_path), reason)
-                    logger.info(f"[#file]{reason}")
-                    self._rename_to_cbr(file_path)
-                    return []
+                    # 如果连续低压缩率达到阈值，记录并可能重命名为CBR
+                    if self._should_stop_processing():
+                        reason = f"连续{self.MAX_LOW_COMPRESSION}张图片压缩率过低"
+                        self._log_cbr_candidate(str(file_path), reason)
+                        logger.info(f"[#file]{reason}")
+                        self._rename_to_cbr(file_path)
+                        return []
                 
-                # 完成处理
-                return self._finalize_archive(
-                    file_path, temp_dir, new_zip_path, backup_file_path,
-                    processed_files, skipped_files, image_count
-                )
-            finally:
-                self.path_handler.cleanup_temp_files(temp_dir, new_zip_path, backup_file_path)
+                    # 完成处理
+                    return self._finalize_archive(
+                        file_path, temp_dir, new_zip_path, backup_file_path,
+                        processed_files, skipped_files, image_count
+                    )
+                finally:
+                    self.path_handler.cleanup_temp_files(temp_dir, new_zip_path, backup_file_path)
                 
         except Exception as e:
             logger.info(f"[#archive]处理压缩包时出错 {file_path}: {e}")
@@ -1283,19 +1305,7 @@ class ArchiveContent:
     def read_zip_contents(self, zip_path):
         """读取压缩包中的文件列表"""
         try:
-            cmd = ['7z', 'l', '-slt', zip_path]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode != 0:
-                logger.info(f"[#file]读取压缩包失败: {zip_path}\n错误: {result.stderr}")
-                return []
-            files = []
-            cur_file = None
-            for line in result.stdout.split('\n'):
-                line = line.strip()
-                if line.startswith('Path = '):
-                    cur_file = line[7:]
-                    if cur_file and (not cur_file.endswith('/')):
-                        files.append(cur_file)
+            files = [member.name for member in ArchiveAccess.list_members(zip_path)]
             logger.info(f"[#file]Found {len(files)} files in archive: {zip_path}")
             return files
         except Exception as e:
@@ -1461,6 +1471,7 @@ class Monitor:
         self.start_time = None
         self.last_config = (0, 0)
         self.current_batch_size = get_batch_size()  # 初始化批处理大小
+        self.registry = ProcessedRegistry()  # 持久化的已处理文件登记表
     def handle_config_update(self, new_threads: int, new_batch: int):
         """统一处理配置更新"""
         if (new_threads, new_batch) == self.last_config:
@@ -1473,6 +1484,10 @@ class Monitor:
         executor.shutdown(wait=False)
         executor = ThreadPoolExecutor(max_workers=new_threads)
         
+        # 按新的Python线程数重新分配libvips内部线程
+        if new_threads != self.last_config[0]:
+            vips_runtime.configure(python_threads=new_threads)
+        
         # 更新批处理大小
         self.current_batch_size = new_batch
         self.last_config = (new_threads, new_batch)
@@ -1496,12 +1511,15 @@ class Monitor:
         try:
             # 初始化布局
             self.start_time = time.time()
+            self.registry.use_params(params)
             
             self._run_process_loop(directories, params, interval_minutes, infinite_mode)
         except KeyboardInterrupt:
             logger.info("[#file]⚠️ 用户中断处理")
         except Exception as e:
             logger.info(f"[#file]❌ 处理过程出错: {e}")
+        finally:
+            self.registry.save()
 
     def _update_status(self):
         """更新统计信息"""
@@ -1532,6 +1550,8 @@ class Monitor:
                         continue
                     else:
                         logger.info("[#file]✅ 所有文件已处理完成")
+                        for line in ThreadManager.shared().summary_lines():
+                            logger.info(f"[#performance]📊 {line}")
                         break
                 
                 # 更新总文件数
@@ -1540,6 +1560,7 @@ class Monitor:
                 
                 # 处理文件
                 self._process_files(files_to_process, params, processed_files, skipped_files, occupied_files)
+                self.registry.save()
                 
                 # 等待下一轮
                 if infinite_mode or occupied_files or len(processed_files) > 0 or len(skipped_files) > 0:
@@ -1562,11 +1583,11 @@ class Monitor:
     def _wait_next_round(self, minutes):
         """等待下一轮处理"""
         total_seconds = minutes * 60
-        for remaining in range(total_seconds, 0, -1):
+        for remaining in range(total_seconds, 0, -WAIT_STATUS_INTERVAL):
             logger.info(f"[#status]⏳ 等待下一轮 剩余时间: {remaining // 60}分{remaining % 60}秒")
             logger.info(f"[@status] 等待下一轮{remaining / total_seconds * 100:.1f}%")
             
-            time.sleep(1)
+            time.sleep(min(WAIT_STATUS_INTERVAL, remaining))
 
 
     def _process_files(self, files, params, processed_files, skipped_files, occupied_files):
@@ -1586,13 +1607,23 @@ class Monitor:
                     continue
                 
                 # 处理单个文件
-                result = ArchiveHandler().process_single_archive(file_path, params)
+                handler = ArchiveHandler()
+                result = handler.process_single_archive(file_path, params)
                 
                 if result:
+                    self.registry.mark(file_path)
+                    self.registry.maybe_save()
                     processed_files.add(file_path)
                     self.processed_files += 1
                     self._update_status()
                     logger.info(f"[#file]✅ 处理完成: {file_name}")
+                elif handler.nothing_to_do:
+                    # 登记为已检查，重启或下一轮扫描时不再重复检查
+                    self.registry.mark(file_path, checked=True)
+                    self.registry.maybe_save()
+                    self.skipped_files += 1
+                    self._update_status()
+                    logger.info(f"[#file]⏭️ 无需处理: {file_name}")
                 else:
                     reason = skipped_files.get(file_path, "未知原因")
                     if file_path in skipped_files:
@@ -1606,29 +1637,111 @@ class Monitor:
 
 
     def _get_files_to_process(self, directories, processed_files, skipped_files, occupied_files):
-        """获取需要处理的文件列表"""
-        files_to_process = []
-        for directory in directories:
-            if os.path.isfile(directory):
-                if any(directory.lower().endswith(ext) for ext in SUPPORTED_ARCHIVE_FORMATS):
-                    if directory not in processed_files and directory not in skipped_files:
-                        files_to_process.append(directory)
-            else:
-                for root, _, files in os.walk(directory):
-                    for file in files:
-                        if any(file.lower().endswith(ext) for ext in SUPPORTED_ARCHIVE_FORMATS):
-                            file_path = os.path.join(root, file)
-                            if file_path not in processed_files and file_path not in skipped_files:
-                                files_to_process.append(file_path)
+        """获取需要处理的文件列表
         
-        # 检查并移除被占用的文件
-        files_to_process = [f for f in files_to_process if not self._is_file_locked(f)]
+        占用检查推迟到 _process_files 中逐个进行，这里只做 stat，
+        登记表中大小和修改时间都未变的文件直接跳过。
+        """
+        files_to_process = [
+            file_path for file_path in self._scan_archives(directories)
+            if file_path not in processed_files and file_path not in skipped_files
+        ]
         
         if files_to_process:
             logger.info(f"[#file]📝 找到 {len(files_to_process)} 个待处理文件")
         
         return files_to_process
 
+    def _scan_archives(self, directories):
+        """遍历输入路径，产出登记表中不存在或已变化的压缩包路径"""
+        for directory in directories:
+            if os.path.isfile(directory):
+                if directory.lower().endswith(tuple(SUPPORTED_ARCHIVE_FORMATS)):
+                    if not self.registry.is_processed(directory):
+                        yield directory
+                continue
+            for root, _, files in os.walk(directory):
+                for file in files:
+                    if file.lower().endswith(tuple(SUPPORTED_ARCHIVE_FORMATS)):
+                        file_path = os.path.join(root, file)
+                        if not self.registry.is_processed(file_path):
+                            yield file_path
+
+    def watch_run_process(self, directories, params, rescan_minutes=None):
+        """基于文件系统通知的增量处理模式
+        
+        启动时扫描一次（登记表命中的文件不再处理），之后只处理 watchdog
+        报告的新建/修改/移入文件，文件静置 settle_seconds 秒后才进入处理；
+        全量扫描仅作为每 rescan_minutes 分钟一次的一致性检查。
+        """
+        rescan_minutes = rescan_minutes or WATCH_CONFIG['rescan_minutes']
+        queue = ProcessingQueue(WATCH_CONFIG['settle_seconds'])
+        handler = FileWatcher(queue)
+        observer = Observer()
+        for directory in directories:
+            watch_dir = directory if os.path.isdir(directory) else os.path.dirname(directory)
+            observer.schedule(handler, watch_dir, recursive=True)
+        
+        self.start_time = time.time()
+        self.registry.use_params(params)
+        observer.start()
+        logger.info(f"[#file]👀 已开始监听 {len(directories)} 个路径，一致性扫描间隔 {rescan_minutes} 分钟")
+        try:
+            last_rescan = 0
+            while True:
+                if time.time() - last_rescan >= rescan_minutes * 60:
+                    found = queue.add_many(self._scan_archives(directories), settled=True)
+                    if found:
+                        logger.info(f"[#file]📝 一致性扫描发现 {found} 个待处理文件")
+                    last_rescan = time.time()
+                
+                for file_path in queue.pop_ready():
+                    self._process_watched_file(file_path, params, queue)
+                self.registry.maybe_save()
+                time.sleep(WATCH_CONFIG['poll_interval'])
+        except KeyboardInterrupt:
+            logger.info("[#file]⚠️ 用户中断监听")
+        except Exception as e:
+            logger.info(f"[#file]❌ 监听过程出错: {e}")
+        finally:
+            observer.stop()
+            observer.join()
+            self.registry.save()
+
+    def _process_watched_file(self, file_path, params, queue):
+        """处理监听队列中一个已静置的文件"""
+        file_name = os.path.basename(file_path)
+        if self.registry.is_processed(file_path):
+            return
+        if self._is_file_locked(file_path):
+            logger.info(f"[#file]⚠️ 文件被占用，稍后重试: {file_name}")
+            queue.add(file_path)
+            return
+        
+        with queue.processing_lock:
+            queue.processing_files.add(file_path)
+        try:
+            self.total_files += 1
+            handler = ArchiveHandler()
+            result = handler.process_single_archive(file_path, params)
+            if result:
+                self.registry.mark(file_path)
+                self.processed_files += 1
+                logger.info(f"[#file]✅ 处理完成: {file_name}")
+            elif handler.nothing_to_do:
+                self.registry.mark(file_path, checked=True)
+                self.skipped_files += 1
+                logger.info(f"[#file]⏭️ 无需处理: {file_name}")
+            else:
+                self.skipped_files += 1
+                logger.info(f"[#file]⚠️ 跳过文件: {file_name} - 处理失败或不需要处理")
+            self._update_status()
+        except Exception as e:
+            logger.info(f"[#file]❌ 处理文件出错 {file_path}: {e}")
+        finally:
+            with queue.processing_lock:
+                queue.processing_files.discard(file_path)
+
     def _is_file_locked(self, file_path):
         """检查文件是否被锁定"""
         try:
@@ -1655,6 +1768,8 @@ class InputHandler:
         parser.add_argument('--performance-config', '-p', type=str, help='指定性能配置文件的路径')
         parser.add_argument('--infinite', '-inf', action='store_true', help='启用无限循环模式，即使没有变化也继续监控')
         parser.add_argument('--rename-cbr', '-r', action='store_true', help='启用低压缩率文件重命名为CBR功能')
+        parser.add_argument('--watch', '-W', action='store_true', help='启用文件系统监听增量模式（只处理新增或变化的压缩包）')
+        parser.add_argument('--rescan-interval', type=int, default=WATCH_CONFIG['rescan_minutes'], help='监听模式下一致性全量扫描间隔（分钟）')
         return parser.parse_args()
 
     def get_paths_from_clipboard(self):
@@ -1680,87 +1795,188 @@ class InputHandler:
 
 
 
+class ProcessedRegistry:
+    """已处理文件登记表
+    
+    以 路径 -> [大小, 修改时间(ns), 转换参数摘要] 持久化到 ~/.glowtoolbox/history 下的 JSON，
+    登记转换成功的文件，以及检查后确认无需处理的文件（无需转换、不符合关键词、不含图片，
+    记录末尾多一项 'checked'）；失败、被占用等可能下次成功的情况不登记。
+    文件被替换或修改后大小/时间变化，或者换了一组转换参数（格式、质量等），
+    都会重新进入处理。删除该 JSON 即可强制全量重新处理。
+    """
+    
+    def __init__(self, registry_file=None):
+        history_dir = os.path.expanduser("~/.glowtoolbox/history")
+        os.makedirs(history_dir, exist_ok=True)
+        self.registry_file = registry_file or os.path.join(history_dir, WATCH_CONFIG['processed_file'])
+        self._lock = threading.Lock()
+        self._params_key = ''
+        self._entries = self._load()
+        self._dirty = 0
+        self._last_save = time.time()
+    
+    def _load(self):
+        """加载登记表"""
+        try:
+            if os.path.exists(self.registry_file):
+                with open(self.registry_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.info(f"[#file]读取已处理登记表失败，将重新建立: {e}")
+        return {}
+    
+    @staticmethod
+    def params_key(params):
+        """转换参数的摘要，参数中的集合、路径等不可序列化的值按字符串处理"""
+        text = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+    
+    def use_params(self, params):
+        """设置本次运行的转换参数，之后的查询和登记都带上参数摘要"""
+        self._params_key = self.params_key(params)
+    
+    def _signature(self, file_path):
+        """返回文件的 [大小, 修改时间, 参数摘要]，文件不存在时返回 None"""
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        return [st.st_size, st.st_mtime_ns, self._params_key]
+    
+    def is_processed(self, file_path):
+        """文件是否已处理（或已确认无需处理）且之后未被修改"""
+        key = os.path.abspath(file_path)
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry is not None and entry[:3] == self._signature(file_path)
+    
+    def mark(self, file_path, checked=False):
+        """记录文件当前状态为已处理（处理后文件可能已被重写，因此重新 stat）
+        
+        checked=True 表示文件检查后无需处理，同样按大小、修改时间和参数判断是否需要重新检查
+        """
+        signature = self._signature(file_path)
+        if signature is None:
+            return
+        if checked:
+            signature.append('checked')
+        with self._lock:
+            self._entries[os.path.abspath(file_path)] = signature
+            self._dirty += 1
+    
+    def maybe_save(self):
+        """变更数或时间间隔达到阈值时落盘"""
+        if self._dirty >= WATCH_CONFIG['save_every'] or (
+                self._dirty and time.time() - self._last_save >= WATCH_CONFIG['save_interval']):
+            self.save()
+    
+    def save(self):
+        """原子写入登记表"""
+        with self._lock:
+            if not self._dirty:
+                return
+            temp_file = f"{self.registry_file}.tmp"
+            try:
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump(self._entries, f, ensure_ascii=False)
+                os.replace(temp_file, self.registry_file)
+                self._dirty = 0
+                self._last_save = time.time()
+            except Exception as e:
+                logger.info(f"[#file]保存已处理登记表失败: {e}")
+
+
 class ProcessingQueue:
-    """文件处理队列管理类"""
+    """文件处理队列管理类
     
-    def __init__(self):
-        self.pending_files = set()
+    pending_files 记录 路径 -> (最后一次变化时间, 当时的大小)，
+    文件在 settle_seconds 内没有新事件且大小不变才会被取出处理。
+    """
+    
+    def __init__(self, settle_seconds=10):
+        self.pending_files = {}
         self.processing_files = set()
         self.processing_lock = threading.Lock()
-        self.last_check_time = time.time()
-        self.check_interval = 10
+        self.settle_seconds = settle_seconds
+
+    @staticmethod
+    def _size(file_path):
+        try:
+            return os.path.getsize(file_path)
+        except OSError:
+            return None
+
+    def add(self, file_path, settled=False):
+        """加入或刷新一个待处理文件；settled=True 表示无需等待静置"""
+        stamp = 0 if settled else time.time()
+        with self.processing_lock:
+            if settled and file_path in self.pending_files:
+                return
+            self.pending_files[file_path] = (stamp, self._size(file_path))
+
+    def add_many(self, file_paths, settled=False):
+        """批量加入，返回新加入的数量"""
+        count = 0
+        for file_path in file_paths:
+            stamp = 0 if settled else time.time()
+            size = self._size(file_path)
+            with self.processing_lock:
+                if file_path not in self.pending_files and file_path not in self.processing_files:
+                    count += 1
+                elif settled and file_path in self.pending_files:
+                    continue
+                self.pending_files[file_path] = (stamp, size)
+        return count
+
+    def pop_ready(self):
+        """取出已静置的文件"""
+        now = time.time()
+        ready = []
+        with self.processing_lock:
+            for file_path, (stamp, size) in list(self.pending_files.items()):
+                if now - stamp < self.settle_seconds:
+                    continue
+                current_size = self._size(file_path)
+                if current_size is None:
+                    del self.pending_files[file_path]
+                    continue
+                if current_size != size:
+                    # 仍在写入中，重新计时
+                    self.pending_files[file_path] = (now, current_size)
+                    continue
+                del self.pending_files[file_path]
+                if file_path not in self.processing_files:
+                    ready.append(file_path)
+        return ready
 
-class FileWatcher:
-    """文件监控类"""
+class FileWatcher(FileSystemEventHandler):
+    """文件监控类，将 watchdog 事件转为待处理队列条目"""
     
     def __init__(self, processing_queue):
         self.processing_queue = processing_queue
+
+    def _enqueue(self, file_path):
+        if not file_path.lower().endswith(tuple(SUPPORTED_ARCHIVE_FORMATS)):
+            return
+        # 忽略自身处理过程中产生的 .new/.bak 等中间文件
+        if file_path in self.processing_queue.processing_files:
+            return
+        self.processing_queue.add(file_path)
     
     def on_created(self, event):
         """处理新文件创建事件"""
-        if event.is_directory:
-            return
-        file_path = event.src_path
-        if not any((file_path.lower().endswith(ext) for ext in SUPPORTED_ARCHIVE_FORMATS)):
-            return
-        with self.processing_queue.processing_lock:
-            self.processing_queue.pending_files.add(file_path)
-            logger.info(f"[#file]添加文件到待处理列表: {file_path}")
-            self.processing_queue.last_check_time = 0
-            self.check_pending_files()
-
-    def check_pending_files(self):
-        """检查待处理文件是否可以处理"""
-        cur_time = time.time()
-        if cur_time - self.processing_queue.last_check_time < self.processing_queue.check_interval:
-            return
-            
-        self.processing_queue.last_check_time = cur_time
-        
-        with self.processing_queue.processing_lock:
-            files_to_remove = set()
-            files_to_process = set()
-            
-            for file_path in self.processing_queue.pending_files:
-                try:
-                    if not os.path.exists(file_path):
-                        files_to_remove.add(file_path)
-                        continue
-                        
-                    try:
-                        with open(file_path, 'rb') as f:
-                            f.read(1)
-                    except (IOError, PermissionError):
-                        logger.info(f"[#file]文件被占用，跳过: {file_path}")
-                        files_to_remove.add(file_path)
-                        continue
-                        
-                    files_to_process.add(file_path)
-                    
-                except Exception as e:
-                    logger.info(f"[#file]检查文件时出错 {file_path}: {e}")
-                    files_to_remove.add(file_path)
-            
-            self.processing_queue.pending_files -= files_to_remove
-            self.processing_queue.pending_files -= files_to_process
-            
-            for file_path in files_to_process:
-                if file_path not in self.processing_queue.processing_files:
-                    self.processing_queue.processing_files.add(file_path)
-                    threading.Thread(
-                        target=self._process_file,
-                        args=(file_path,)
-                    ).start()
-
-    def _process_file(self, file_path):
-        """处理单个文件的线程函数"""
-        try:
-            ArchiveHandler().process_single_archive(file_path, {})
-        except Exception as e:
-            logger.info(f"[#file]处理文件时出错 {file_path}: {e}")
-        finally:
-            with self.processing_queue.processing_lock:
-                self.processing_queue.processing_files.remove(file_path)
+        if not event.is_directory:
+            self._enqueue(event.src_path)
+
+    def on_modified(self, event):
+        """文件写入中会持续触发，刷新静置计时"""
+        if not event.is_directory:
+            self._enqueue(event.src_path)
+
+    def on_moved(self, event):
+        """移入监听目录或重命名为压缩包"""
+        if not event.is_directory:
+            self._enqueue(event.dest_path)
 
 # def parse_arguments():
 #     """解析命令行参数"""
@@ -2000,6 +2216,7 @@ def run_with_args(args):
             'rename_cbr': args.rename_cbr,
             'batch_size': get_batch_size()
         })
+        vips_runtime.configure(python_threads=params['max_workers'])
         
         # 初始化面板布局
 
@@ -2008,8 +2225,12 @@ def run_with_args(args):
         config_gui_thread.start()
         logger.info("[#file]🔧 已启动性能配置调整器")
         
-        logger.info(f"[#file]🚀 启动{('无限循环' if args.infinite else '自动运行')}模式，每 {args.interval} 分钟运行一次...")
         monitor = Monitor()
+        if getattr(args, 'watch', False):
+            logger.info("[#file]🚀 启动文件监听增量模式...")
+            monitor.watch_run_process(directories, params, getattr(args, 'rescan_interval', None))
+            return
+        logger.info(f"[#file]🚀 启动{('无限循环' if args.infinite else '自动运行')}模式，每 {args.interval} 分钟运行一次...")
         monitor.auto_run_process(directories, params, args.interval, args.infinite)
 
 
@@ -2033,6 +2254,7 @@ def main():
             ("JXL的JPEG无损转换", "jxl_jpeg_lossless", "--jxl-jpeg-lossless", False),
             ("无损压缩", "lossless", "--lossless", False),
             ("低压缩率重命名CBR", "rename_cbr", "--rename-cbr", False),
+            ("文件监听增量模式", "watch", "--watch", False),
         ]
 
         # 定义输入框选项
@@ -2040,6 +2262,7 @@ def main():
             ("目标格式", "format", "--format", "avif", "avif/webp/jxl/jpg/png"),
             ("压缩质量", "quality", "--quality", "90", "1-100"),
             ("监控间隔(分钟)", "interval", "--interval", "10", "分钟"),
+            ("一致性扫描间隔(分钟)", "rescan_interval", "--rescan-interval", "60", "分钟"),
             ("最小宽度(像素)", "min_width", "--min-width", "0", "像素"),
             ("性能配置文件", "performance_config", "--performance-config", "", "配置文件路径"),
             ("待处理路径", "path", "-p", "", "输入待处理文件夹路径"),
@@ -11,6 +11,7 @@ from pdf2image import convert_from_path
 import pyperclip
 import argparse
 import zipfile
+from nodes.archive.archive_access import ArchiveAccess
 from multiprocessing import Pool, cpu_count
 
 # 配置日志记录器
@@ -36,14 +37,8 @@ def extract_archive(archive_path, check_content=False):
             # 其他格式在解压后检查
             else:
                 temp_extract = extract_path.with_name(extract_path.name + '_temp')
-                cmd = [
-                    '7z', 'l',
-                    str(archive_path),
-                    '-slt',
-                    '-scsUTF-8'
-                ]
-                result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8')
-                has_target_files = any(line.strip().endswith(('.psd', '.pdf')) for line in result.stdout.split('\n'))
+                has_target_files = any(member.suffix in ('.psd', '.pdf')
+                                       for member in ArchiveAccess.list_members(archive_path))
                 if not has_target_files:
                     print(f"跳过无PSD/PDF的压缩包: {archive_path}")
                     return False
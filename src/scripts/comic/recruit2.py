@@ -39,6 +39,7 @@ from textual.worker import Worker, get_current_worker
 from textual.widgets import DataTable
 from textual.design import ColorSystem
 from nodes.record.logger_config import setup_logger
+from nodes.archive.archive_access import ArchiveAccess, ArchiveError
 config = {
     'script_name': 'recruit_remove',
 }
@@ -123,13 +124,9 @@ def save_hashes(hash_file, hashes):
 def load_yaml_uuid_from_archive(archive_path):
     """尝试从压缩包内加载 YAML 文件以获取 UUID（文件名）。"""
     try:
-        command = ['7z', 'l', archive_path]
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-        for line in result.stdout.splitlines():
-            line = line.strip()
-            if line.endswith('.yaml'):
-                parts = line.split()
-                yaml_filename = parts[-1]
+        for member in ArchiveAccess.list_members(archive_path):
+            if member.name.endswith('.yaml'):
+                yaml_filename = os.path.basename(member.name)
                 yaml_uuid = os.path.splitext(yaml_filename)[0]
                 return yaml_uuid
     except Exception as e:
@@ -149,7 +146,7 @@ def get_image_hash(img_bytes):
 def are_images_similar(hash1, hash2, threshold):
     return abs(hash1 - hash2) <= threshold
 
-# 使用7z命令行工具列出压缩内容（隐藏日志）
+# 列出压缩内容（隐藏日志）
 import subprocess
 import locale
 locale.setlocale(locale.LC_COLLATE, 'zh_CN.UTF-8')  # 根据你的操作系统设置合适的locale
@@ -159,30 +156,26 @@ def natural_sort_key(s):
     return [int(text) if text.isdigit() else locale.strxfrm(text) for text in re.split('([0-9]+)', s)]
 
 def list_zip_contents(zip_path):
-    """使用7z列出压缩包内的所有文件，并按照自然顺序排序"""
+    """列出压缩包内的所有文件，并按照自然顺序排序"""
     try:
-        result = subprocess.run(['7z', 'l', zip_path], capture_output=True, text=True, check=True)
         all_files = []
         image_files = []
         
         # 支持的图片格式和关键词文件
         image_extensions = ('.png', '.jpg', '.jpeg', '.webp', '.avif', '.jxl')
         
-        for line in result.stdout.splitlines():
-            parts = line.split()
-            if len(parts) >= 1:
-                file_name = parts[-1]
-                # 记录所有文件（包括文件夹路径）
-                all_files.append(file_name)
-                # 记录图片文件
-                if any(file_name.lower().endswith(ext) for ext in image_extensions):
-                    image_files.append(file_name)
+        for member in ArchiveAccess.list_members(zip_path, include_dirs=True):
+            # 记录所有文件（包括文件夹路径）
+            all_files.append(member.name)
+            # 记录图片文件
+            if not member.is_dir and member.suffix in image_extensions:
+                image_files.append(member.name)
 
         # 使用自然排序进行排序
         sorted_image_files = sorted(image_files, key=natural_sort_key)
         return all_files, sorted_image_files
 
-    except subprocess.CalledProcessError as e:
+    except ArchiveError as e:
         logger.error(f"无法处理压缩包 {zip_path}: {e}")
         return [], []
     except Exception as e:
@@ -9,6 +9,7 @@ import send2trash  # 添加send2trash库用于将文件移动到回收站
 from nodes.record.logger_config import setup_logger
 from nodes.tui.textual_logger import TextualLoggerManager
 from nodes.error.error_handler import handle_file_operation
+from nodes.archive.archive_access import ArchiveAccess
 
 # 在文件顶部添加布局配置
 TEXTUAL_LAYOUT = {
@@ -214,12 +215,9 @@ def compare_and_copy_archives(source_dir, target_dir, is_move=False):
             logger.info(error)
 
 def check_archive(file_path):
-    """检测压缩包是否损坏"""
+    """检测压缩包是否完好，无法判断（加密、超时）时返回 None"""
     try:
-        result = subprocess.run(['7z', 't', file_path], 
-                              capture_output=True, 
-                              text=True)
-        return result.returncode == 0
+        return ArchiveAccess.test_archive(file_path)
     except Exception as e:
         logger.info(f"[#process_log]检测文件 {file_path} 时发生错误: {str(e)}")
         return False
@@ -354,7 +352,9 @@ def process_corrupted_archives(directory, skip_checked=True, max_workers=4):
                 'timestamp': datetime.now().isoformat()
             })
             
-            if not is_valid:
+            if is_valid is None:
+                logger.info(f"[#process_log]无法判断是否损坏（加密或超时），保留原文件: {file_path}")
+            elif not is_valid:
                 new_path = file_path + '.tdel'
                 if os.path.exists(new_path):
                     try:
@@ -11,7 +11,6 @@ import io
 from concurrent.futures import ThreadPoolExecutor
 import sys
 import warnings
-import subprocess
 from dotenv import load_dotenv
 import argparse
 import pyperclip
@@ -27,6 +26,7 @@ load_dotenv()
 # 导入正确路径的日志记录器配置
 from nodes.record.logger_config import setup_logger
 from nodes.tui.textual_logger import TextualLoggerManager
+from nodes.archive.archive_access import ArchiveAccess
 
 # 设置Textual日志界面布局
 TEXTUAL_LAYOUT = {
@@ -216,75 +216,23 @@ class ImageProcessor:
             self.logger.error(f"[#update_log]处理压缩包时出错 {zip_path}: {str(e)}")
             return zip_path, False
 
-    def run_7z_command(self, command, zip_path, operation="", additional_args=None):
-        """
-        执行7z命令的通用函数
-        
-        Args:
-            command: 主命令 (如 'a', 'x', 'l' 等)
-            zip_path: 压缩包路径
-            operation: 操作描述（用于日志）
-            additional_args: 额外的命令行参数
-        """
+    def check_archive_contents(self, zip_path):
+        """按成员扩展名检查压缩包中是否包含排除格式"""
         try:
-            cmd = ['7z', command, str(zip_path)]
-            if additional_args:
-                cmd.extend(additional_args)
-            
-            result = subprocess.run(cmd, capture_output=True, text=False)  # 使用二进制模式
-            
-            if result.returncode == 0:
-                try:
-                    # 尝试用cp932解码（适用于Windows日文系统）
-                    output = result.stdout.decode('cp932')
-                except UnicodeDecodeError:
-                    try:
-                        # 如果cp932失败，尝试用utf-8解码
-                        output = result.stdout.decode('utf-8')
-                    except UnicodeDecodeError:
-                        # 如果两种编码都失败，使用errors='replace'
-                        output = result.stdout.decode('utf-8', errors='replace')
-            
-                return True, output
-            else:
-                error_output = result.stderr
-                try:
-                    error_text = error_output.decode('cp932')
-                except UnicodeDecodeError:
-                    try:
-                        error_text = error_output.decode('utf-8')
-                    except UnicodeDecodeError:
-                        error_text = error_output.decode('utf-8', errors='replace')
-                    
-                self.logger.error(f"7z {operation}失败: {zip_path}\n错误: {error_text}")
-                return False, error_text
-            
-        except Exception as e:
-            self.logger.error(f"[#update_log]执行7z命令出错: {e}")
-            return False, str(e)
-
-    def check_7z_contents(self, zip_path):
-        """使用7z检查压缩包内容"""
-        try:
-            success, output = self.run_7z_command('l', zip_path, "列出内容")
-            if not success:
-                return True  # 如果出错，保守起见返回True
-            
-            # 检查输出中是否包含排除的格式
-            output = output.lower()
-            for ext in self.exclude_formats:
-                if ext in output:
-                    self.logger.info(f"[#update_log]跳过压缩包 {zip_path.name} 因为包含排除格式: {ext}")
-                    return True
-            return False
-            
+            members = ArchiveAccess.list_members(zip_path)
         except Exception as e:
             self.logger.error(f"[#update_log]检查压缩包格式时出错 {zip_path}: {str(e)}")
-            return True
+            return True  # 如果出错，保守起见返回True
+        
+        for member in members:
+            if member.suffix in self.exclude_formats:
+                self.logger.info(f"[#update_log]跳过压缩包 {zip_path.name} 因为包含排除格式: {member.suffix}")
+                return True
+        return False
 
     def has_excluded_formats(self, zip_path):
         """检查压缩包中是否包含需要排除的文件格式"""
-        return self.check_7z_contents(zip_path)
+        return self.check_archive_contents(zip_path)
 
     def process(self):
         # 获取目标目录中所有zip文件的名称（不区分大小写）
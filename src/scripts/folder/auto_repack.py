@@ -19,6 +19,8 @@ import tempfile
 from nodes.tui.textual_logger import TextualLoggerManager
 from nodes.tui.textual_preset import create_config_app
 from nodes.record.logger_config import setup_logger
+from nodes.file.folder_scanner import FolderScanner, folder_size
+from nodes.archive.zip_writer import PackResult, Manifest, pack_files, folder_entries, zip_manifest, same_manifest
 import sys
 
 # 配置日志面板布局
@@ -55,6 +57,7 @@ logger, config_info = setup_logger(config)
 SEVEN_ZIP_PATH = "C:\\Program Files\\7-Zip\\7z.exe"
 COMPRESSION_LEVEL = 5  # 1-9, 9为最高压缩率
 MAX_WORKERS = 4  # 并行处理的最大工作线程数
+PACK_MODE = "native"  # native: 进程内直接写入 ZIP（已压缩图片用 STORE）；7z: 调用 7-Zip 命令行
 
 # 不需要压缩的文件类型
 UNWANTED_EXTENSIONS: Set[str] = {
@@ -96,6 +99,7 @@ class CompressionResult:
     original_size: int = 0
     compressed_size: int = 0
     error_message: str = ""
+    pack_seconds: float = 0.0  # 进程内打包耗时，7z 模式下为 0
 
 @dataclass
 class CompressionStats:
@@ -103,6 +107,8 @@ class CompressionStats:
     total_compressed_size: int = 0
     successful_compressions: int = 0
     failed_compressions: int = 0
+    total_pack_bytes: int = 0
+    total_pack_seconds: float = 0.0
     
     @property
     def total_space_saved(self) -> int:
@@ -114,6 +120,21 @@ class CompressionStats:
             return 0
         return (self.total_compressed_size / self.total_original_size) * 100
     
+    @property
+    def pack_speed(self) -> float:
+        """进程内打包的平均速度（MB/s）"""
+        if self.total_pack_seconds <= 0:
+            return 0
+        return self.total_pack_bytes / 1024 / 1024 / self.total_pack_seconds
+    
+    def add_result(self, result: CompressionResult) -> None:
+        self.successful_compressions += 1
+        self.total_original_size += result.original_size
+        self.total_compressed_size += result.compressed_size
+        if result.pack_seconds > 0:
+            self.total_pack_bytes += result.original_size
+            self.total_pack_seconds += result.pack_seconds
+    
     def format_size(self, size_in_bytes: int) -> str:
         for unit in ['B', 'KB', 'MB', 'GB']:
             if size_in_bytes < 1024:
@@ -131,6 +152,7 @@ class CompressionStats:
             f"压缩后总大小: {self.format_size(self.total_compressed_size)}\n"
             f"节省空间: {self.format_size(self.total_space_saved)}\n"
             f"平均压缩率: {self.compression_ratio:.1f}"
+            + (f"\n平均打包速度: {self.pack_speed:.1f} MB/s" if self.total_pack_seconds > 0 else "")
         )
 
 @dataclass
@@ -138,6 +160,7 @@ class ZipCompressor:
     """压缩处理类，封装所有压缩相关的操作"""
     seven_zip_path: str = SEVEN_ZIP_PATH
     compression_level: int = COMPRESSION_LEVEL
+    pack_mode: str = PACK_MODE
     
     def create_temp_workspace(self) -> Tuple[Path, Path]:
         """创建临时工作目录"""
@@ -168,19 +191,23 @@ class ZipCompressor:
             logger.info(f"[#process]❌ 压缩失败: {result.stderr}")
         return result
     
-    def process_normal_folder(self, folder_path: Path) -> CompressionResult:
-        """处理普通文件夹的压缩"""
+    def process_normal_folder(self, folder_path: Path, original_size: Optional[int] = None) -> CompressionResult:
+        """处理普通文件夹的压缩（original_size 由扫描阶段提供时不再重复统计）"""
         logger.info(f"[#cur_progress]🔄 处理文件夹: {folder_path.name}")
         
         zip_name = folder_path.name
         zip_path = folder_path.parent / f"{zip_name}.zip"
-        original_size = get_folder_size(folder_path)
+        if original_size is None:
+            original_size = get_folder_size(folder_path)
         
         try:
             if not folder_path.exists():
                 logger.info(f"[#file_ops]❌ 文件夹不存在: {folder_path}")
                 return CompressionResult(False, error_message=f"Folder not found: {folder_path}")
             
+            if self.pack_mode == "native":
+                return self._process_folder_native(folder_path, zip_path, zip_name, original_size)
+            
             # 创建临时工作目录
             temp_base_path, _ = self.create_temp_workspace()
             temp_zip_path = temp_base_path / f"{zip_name}_temp.zip"
@@ -210,12 +237,45 @@ class ZipCompressor:
             logger.info(f"[#file_ops]❌ 处理出错: {str(e)}")
             return CompressionResult(False, error_message=f"Error: {str(e)}")
     
-    def _handle_existing_zip(self, temp_zip_path: Path, target_zip_path: Path, base_name: str) -> Optional[Path]:
-        """处理已存在的压缩包"""
+    def _process_folder_native(self, folder_path: Path, zip_path: Path, zip_name: str, original_size: int) -> CompressionResult:
+        """进程内打包：从原路径直接写入压缩包，成功后再删除源文件（相当于 7z 的 -sdel）"""
+        entries = folder_entries(folder_path)
+        if not entries:
+            logger.info(f"[#file_ops]❌ 文件夹中没有文件: {folder_path}")
+            return CompressionResult(False, error_message=f"No files found in: {folder_path}")
+        
+        # 临时压缩包放在目标旁边，之后的移动只是同盘重命名
+        temp_zip_path = zip_path.with_name(f"{zip_name}_temp.zip")
+        pack = native_pack(entries, temp_zip_path, self.compression_level)
+        if not pack.success:
+            logger.info(f"[#file_ops]❌ 压缩失败: {pack.error_message}")
+            return CompressionResult(False, error_message=f"Compression failed: {pack.error_message}")
+        
+        final_zip_path = self._handle_existing_zip(temp_zip_path, zip_path, zip_name, pack.manifest)
+        if not final_zip_path:
+            if temp_zip_path.exists():
+                temp_zip_path.unlink()
+            return CompressionResult(False, error_message=f"Failed to place zip: {zip_path}")
+        
+        self._delete_source_files([source for source, _ in entries])
+        delete_empty_folders(folder_path)
+        self._cleanup_empty_folder(folder_path)
+        compressed_size = final_zip_path.stat().st_size
+        compression_ratio = (compressed_size / original_size) * 100 if original_size > 0 else 0
+        logger.info(f"[#cur_progress] 压缩率: {compression_ratio:.1f} ({compressed_size/1024/1024:.2f}MB / {original_size/1024/1024:.2f}MB)")
+        return CompressionResult(True, original_size, compressed_size, pack_seconds=pack.seconds)
+    
+    def _handle_existing_zip(self, temp_zip_path: Path, target_zip_path: Path, base_name: str,
+                             manifest: Optional[Manifest] = None) -> Optional[Path]:
+        """处理已存在的压缩包（manifest 为打包时生成的内容清单，提供时不再读取新压缩包）"""
         try:
             if target_zip_path.exists():
                 logger.info(f"[#file_ops]🔍 检查已存在的压缩包: {target_zip_path}")
-                if compare_zip_contents(temp_zip_path, target_zip_path):
+                if manifest is not None:
+                    same_content = same_manifest(manifest, target_zip_path)
+                else:
+                    same_content = compare_zip_contents(temp_zip_path, target_zip_path)
+                if same_content:
                     # 内容相同，替换原文件
                     target_zip_path.unlink()
                     shutil.move(str(temp_zip_path), str(target_zip_path))
@@ -267,132 +327,49 @@ class ZipCompressor:
                 logger.info(f"[#file_ops]❌ 批量删除命令执行失败: {e}")
 
 def get_folder_size(folder_path: Path) -> int:
-    return sum(f.stat().st_size for f in folder_path.rglob('*') if f.is_file())
+    return folder_size(folder_path)
+
+def create_folder_scanner(exclude_keywords: List[str]) -> FolderScanner:
+    """按本脚本的黑名单、媒体文件夹和排除关键词创建文件夹扫描器"""
+    return FolderScanner(
+        image_extensions=IMAGE_EXTENSIONS,
+        ignored_extensions=UNWANTED_EXTENSIONS,
+        skip_keywords=list(BLACKLIST_KEYWORDS) + list(exclude_keywords),
+        skip_folder_names=MEDIA_TYPES,
+    )
 
 def find_min_folder_with_images(base_path: Path, exclude_keywords: List[str]) -> Optional[Tuple[Path, bool, int]]:
     """
     查找需要打包的文件夹（最小的只包含图片和忽略文件的子文件夹）
     返回: (文件夹路径, 是否需要特殊处理, 图片数量)
     """
-    # 检查路径是否包含黑名单关键词
-    if any(keyword in str(base_path) for keyword in BLACKLIST_KEYWORDS):
-        logger.info(f"跳过黑名单路径: {base_path}")
-        return None
-        
-    # 如果路径不存在或不是目录，返回 None
-    if not base_path.exists() or not base_path.is_dir():
-        return None
-    
-    # 检查文件夹名称是否是媒体类型文件夹
-    if base_path.name in MEDIA_TYPES:
-        return None
-        
-    # 检查是否在任何媒体类型文件夹内
-    if any(part in MEDIA_TYPES for part in base_path.parts):
+    best = create_folder_scanner(exclude_keywords).best_in(base_path)
+    if best is None:
         return None
-        
-    # 检查是否在排除列表中
-    if any(keyword in str(base_path) for keyword in exclude_keywords):
-        return None
-    
-    # 获取文件夹内容
-    try:
-        contents = list(base_path.iterdir())
-    except Exception:
-        return None
-    
-    # 获取所有文件和文件夹
-    files = [f for f in contents if f.is_file()]
-    subdirs = [d for d in contents if d.is_dir()]
-    
-    if not files and not subdirs:  # 空文件夹
-        return None
-    
-    # 检查文件类型
-    image_files = [f for f in files if f.suffix.lower() in IMAGE_EXTENSIONS]
-    unwanted_files = [f for f in files if f.suffix.lower() in UNWANTED_EXTENSIONS]
-    zip_files = [f for f in files if f.suffix.lower() == '.zip']
-    other_files = [f for f in files if f not in image_files and f not in unwanted_files and f not in zip_files]
-    
-    # 如果当前文件夹包含zip文件，跳过处理
-    if zip_files:
-        return None
-        
-    # 如果当前文件夹只包含图片和忽略文件，且没有其他文件
-    if image_files and not other_files:
-        # 如果有子文件夹，递归检查子文件夹
-        if subdirs:
-            min_folders = []
-            for subdir in subdirs:
-                result = find_min_folder_with_images(subdir, exclude_keywords)
-                if result:
-                    min_folders.append(result)
-            
-            # 如果找到了符合条件的子文件夹，返回其中图片数量最多的
-            if min_folders:
-                return max(min_folders, key=lambda x: x[2])
-            
-        # 如果没有子文件夹或子文件夹都不符合条件，返回当前文件夹
-        return base_path, False, len(image_files)
-    
-    # 如果当前文件夹包含其他文件，递归检查子文件夹
-    if subdirs:
-        min_folders = []
-        for subdir in subdirs:
-            result = find_min_folder_with_images(subdir, exclude_keywords)
-            if result:
-                min_folders.append(result)
-        
-        # 如果找到了符合条件的子文件夹，返回其中图片数量最多的
-        if min_folders:
-            return max(min_folders, key=lambda x: x[2])
-    
-    return None
+    return best.path, False, best.image_count
 
 def compare_zip_contents(zip1_path: Path, zip2_path: Path) -> bool:
     """
     比较两个压缩包的内容是否相同
-    返回: 如果两个压缩包的文件数量和大小都相同，返回True
+    返回: 如果两个压缩包的文件名、大小和 CRC 都相同，返回True
     """
     try:
-        # 使用7z l命令列出压缩包内容
-        cmd1 = f'"{SEVEN_ZIP_PATH}" l "{zip1_path}"'
-        cmd2 = f'"{SEVEN_ZIP_PATH}" l "{zip2_path}"'
-        
-        result1 = subprocess.run(cmd1, shell=True, capture_output=True, text=True)
-        result2 = subprocess.run(cmd2, shell=True, capture_output=True, text=True)
-        
-        if result1.returncode != 0 or result2.returncode != 0:
-            return False
-            
-        # 解析输出，获取文件列表和大小
-        def parse_7z_output(output: str) -> Dict[str, int]:
-            files = {}
-            for line in output.split('\n'):
-                # 7z输出格式：日期 时间 属性 大小 压缩后大小 文件名
-                parts = line.strip().split()
-                if len(parts) >= 5 and parts[0][0].isdigit():  # 确保是文件行
-                    try:
-                        size = int(parts[3])
-                        name = ' '.join(parts[5:])  # 文件名可能包含空格
-                        files[name] = size
-                    except (ValueError, IndexError):
-                        continue
-            return files
-            
-        files1 = parse_7z_output(result1.stdout)
-        files2 = parse_7z_output(result2.stdout)
-        
-        # 比较文件数量和总大小
-        if len(files1) != len(files2):
-            return False
-            
-        # 比较每个文件的大小
-        return all(files1.get(name) == files2.get(name) for name in files1)
+        # 直接读取中央目录，不再为每个压缩包调用两次 7z l
+        return zip_manifest(zip1_path) == zip_manifest(zip2_path)
     except Exception as e:
         logger.info(f"❌ 比较压缩包时发生错误: {e}")
         return False
 
+def native_pack(entries: List[Tuple[Path, str]], target_zip: Path, compression_level: int = COMPRESSION_LEVEL) -> PackResult:
+    """进程内打包并记录速度，entries 为 (源文件, 压缩包内名称)"""
+    logger.info(f"[#process]🔄 开始压缩: {target_zip.name}")
+    result = pack_files(entries, target_zip, compression_level)
+    if result.success:
+        logger.info(f"[#process]✅ 压缩完成: {target_zip.name} | {result.summary()}")
+    else:
+        logger.info(f"[#process]❌ 压缩失败: {result.error_message}")
+    return result
+
 def get_long_path_name(path_str: str) -> str:
     """转换为长路径格式"""
     if not path_str.startswith("\\\\?\\"):
@@ -486,9 +463,11 @@ def safe_remove_file(file_path: Path) -> bool:
         logger.info(f"❌ 删除文件失败: {file_path}, 错误: {str(e)}")
         return False
 
-def zip_folder_with_7zip(folder_path: Path, only_images: bool = False, image_count: int = 0) -> CompressionResult:
+def zip_folder_with_7zip(folder_path: Path, only_images: bool = False, image_count: int = 0,
+                         pack_mode: str = PACK_MODE) -> CompressionResult:
     """
     压缩文件夹，可以选择是否只压缩图片文件
+    native 模式下直接按 img_001 等名称写入压缩包，不再复制到临时目录
     """
     # 如果是只压缩图片且图片数量小于3，跳过处理
     if only_images and image_count < 3:
@@ -512,9 +491,34 @@ def zip_folder_with_7zip(folder_path: Path, only_images: bool = False, image_cou
             
             # 如果目标压缩包已存在，创建临时压缩包
             temp_zip_path = temp_base_path / f"{zip_name}_temp.zip"
+            manifest = None
+            pack_seconds = 0.0
             
             # 构建要压缩的文件列表
-            if only_images:
+            if pack_mode == "native":
+                if only_images:
+                    files_to_zip = [f for f in folder_path.iterdir() if f.is_file() and f.suffix.lower() in IMAGE_EXTENSIONS]
+                    entries = [(file, f"img_{idx:03d}{file.suffix}") for idx, file in enumerate(files_to_zip, 1)]
+                else:
+                    entries = folder_entries(folder_path)
+                if not entries:
+                    return CompressionResult(False, error_message=f"No files found in: {folder_path}")
+                
+                # 临时压缩包放在目标旁边，避免跨盘移动
+                temp_zip_path = zip_path.with_name(f"{zip_name}_temp.zip")
+                pack = native_pack(entries, temp_zip_path)
+                manifest = pack.manifest
+                pack_seconds = pack.seconds
+                result = subprocess.CompletedProcess([], 0 if pack.success else 1, stderr=pack.error_message)
+                
+                # 如果压缩成功，删除原始文件
+                if pack.success:
+                    for file, _ in entries:
+                        if not safe_remove_file(file):
+                            logger.info(f"⚠️ 无法删除原始文件: {file}")
+                    if not only_images:
+                        delete_empty_folders(folder_path)
+            elif only_images:
                 # 只压缩图片文件
                 files_to_zip = [f for f in folder_path.iterdir() if f.is_file() and f.suffix.lower() in IMAGE_EXTENSIONS]
                 if not files_to_zip:
@@ -559,7 +563,11 @@ def zip_folder_with_7zip(folder_path: Path, only_images: bool = False, image_cou
                     try:
                         # 如果目标文件已存在，先检查内容
                         if zip_path.exists():
-                            if compare_zip_contents(temp_zip_path, zip_path):
+                            if manifest is not None:
+                                same_content = same_manifest(manifest, zip_path)
+                            else:
+                                same_content = compare_zip_contents(temp_zip_path, zip_path)
+                            if same_content:
                                 # 内容相同，替换原文件
                                 zip_path.unlink()
                                 shutil.move(str(temp_zip_path), str(zip_path))
@@ -592,7 +600,7 @@ def zip_folder_with_7zip(folder_path: Path, only_images: bool = False, image_cou
                             except Exception as e:
                                 logger.info(f"❌ 删除空文件夹失败: {folder_path}, 错误: {e}")
                         
-                        return CompressionResult(True, original_size, compressed_size)
+                        return CompressionResult(True, original_size, compressed_size, pack_seconds=pack_seconds)
                     except Exception as e:
                         return CompressionResult(False, error_message=f"Error moving zip file: {str(e)}")
             
@@ -600,7 +608,7 @@ def zip_folder_with_7zip(folder_path: Path, only_images: bool = False, image_cou
     except Exception as e:
         return CompressionResult(False, error_message=f"Error: {str(e)}")
 
-def process_folders(base_path: str, exclude_keywords: List[str]) -> List[Path]:
+def process_folders(base_path: str, exclude_keywords: List[str], pack_mode: str = PACK_MODE) -> List[Path]:
     base_path = Path(base_path)
     if not base_path.exists():
         logger.info(f"[#process]❌ 基础路径不存在: {base_path}")
@@ -608,36 +616,20 @@ def process_folders(base_path: str, exclude_keywords: List[str]) -> List[Path]:
     
     stats = CompressionStats()
     zip_paths: List[Path] = []
-    compressor = ZipCompressor()
+    compressor = ZipCompressor(pack_mode=pack_mode)
     
-    # 查找需要打包的文件夹
+    # 查找需要打包的文件夹：一次遍历得到每个目标及其大小
     logger.info("[#process]🔍 开始查找需要打包的文件夹...")
-    folders_to_process = []
-    
-    # 遍历所有文件夹
-    for root, dirs, _ in os.walk(base_path):
-        root_path = Path(root)
-        
-        # 检查是否包含黑名单关键词
-        if any(keyword in str(root_path) for keyword in BLACKLIST_KEYWORDS):
-            logger.info(f"[#process]⏭️ 跳过黑名单路径: {root_path}")
-            dirs.clear()  # 跳过子目录
-            continue
-        
-        # 如果当前文件夹是媒体类型文件夹，跳过它和它的所有子文件夹
-        if root_path.name in MEDIA_TYPES:
-            dirs.clear()  # 清空子文件夹列表，这样就不会继续遍历
-            continue
-            
-        # 如果当前文件夹的任何父文件夹是媒体类型文件夹，也跳过
-        if any(part in MEDIA_TYPES for part in root_path.parts):
-            continue
-        
-        # 检查当前文件夹
-        result = find_min_folder_with_images(root_path, exclude_keywords)
-        if result:
-            folders_to_process.append(result[0])  # 只保存文件夹路径
-            logger.info(f"[#process]📁 找到需要打包的文件夹: {result[0]}")
+    scan_start = time.time()
+    scanner = create_folder_scanner(exclude_keywords)
+    folders_to_process = scanner.scan(base_path)
+    for skipped in scanner.skipped:
+        if any(keyword in str(skipped) for keyword in BLACKLIST_KEYWORDS):
+            logger.info(f"[#process]⏭️ 跳过黑名单路径: {skipped}")
+    for info in folders_to_process:
+        logger.info(f"[#process]📁 找到需要打包的文件夹: {info.path}")
+    logger.info(f"[#process]🔍 扫描完成: {scanner.dirs_scanned} 个文件夹, "
+                f"{scanner.files_seen} 个文件, 耗时 {time.time() - scan_start:.2f}s")
     
     if folders_to_process:
         # logger.info(f"[#cur_stats]📊 共找到 {len(folders_to_process)} 个文件夹需要打包")
@@ -649,17 +641,15 @@ def process_folders(base_path: str, exclude_keywords: List[str]) -> List[Path]:
         # 使用线程池处理普通文件夹
         with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
             futures = []
-            for folder in folders_to_process:
-                future = executor.submit(compressor.process_normal_folder, folder)
-                futures.append((future, folder))
+            for info in folders_to_process:
+                future = executor.submit(compressor.process_normal_folder, info.path, info.total_size)
+                futures.append((future, info.path))
             
             for future, folder in futures:
                 try:
                     result = future.result()
                     if result.success:
-                        stats.successful_compressions += 1
-                        stats.total_original_size += result.original_size
-                        stats.total_compressed_size += result.compressed_size
+                        stats.add_result(result)
                         zip_paths.append(folder.parent / f"{folder.name}.zip")
                         logger.info(f"[#file_ops]✅ 成功处理: {folder.name}")
                     else:
@@ -681,7 +671,8 @@ def process_folders(base_path: str, exclude_keywords: List[str]) -> List[Path]:
                                   f"原始: {stats.format_size(stats.total_original_size)} | "
                                   f"压缩后: {stats.format_size(stats.total_compressed_size)}\n"
                                   f"压缩率: {compression_ratio:.1f} | "
-                                  f"节省: {stats.format_size(stats.total_space_saved)}")
+                                  f"节省: {stats.format_size(stats.total_space_saved)}"
+                                  + (f" | 速度: {stats.pack_speed:.1f} MB/s" if stats.total_pack_seconds > 0 else ""))
     else:
         logger.info("[#process]⚠️ 未找到需要打包的文件夹")
     
@@ -690,7 +681,7 @@ def process_folders(base_path: str, exclude_keywords: List[str]) -> List[Path]:
     logger.info(f"[#cur_stats]{summary}")
     return zip_paths
 
-def process_scattered_images_in_directory(directory: Path) -> int:
+def process_scattered_images_in_directory(directory: Path, pack_mode: str = PACK_MODE) -> int:
     """处理目录中的散图
     返回：处理的散图文件夹数量
     """
@@ -710,7 +701,7 @@ def process_scattered_images_in_directory(directory: Path) -> int:
         has_scattered, image_files = find_scattered_images(root_path)
         if has_scattered:
             logger.info(f"[#process]🔍 发现散图文件夹: {root_path}")
-            result = zip_scattered_images(root_path, image_files)
+            result = zip_scattered_images(root_path, image_files, pack_mode)
             if result.success:
                 processed_scattered += 1
                 logger.info(f"[#file_ops]✅ 成功处理散图 - 原始大小: {result.original_size/1024/1024:.2f}MB, "
@@ -949,12 +940,14 @@ def find_scattered_images(folder_path: Path) -> Tuple[bool, List[Path]]:
                 
     return False, []
 
-def zip_scattered_images(folder_path: Path, image_files: List[Path]) -> CompressionResult:
+def zip_scattered_images(folder_path: Path, image_files: List[Path], pack_mode: str = PACK_MODE) -> CompressionResult:
     """
     专门处理散落图片的压缩
     """
     zip_path = folder_path / f"{folder_path.name}_散图.zip"
     original_size = sum(f.stat().st_size for f in image_files)
+    if pack_mode == "native":
+        return zip_scattered_images_native(folder_path, image_files, zip_path, original_size)
     temp_folder = folder_path / f"{folder_path.name}_temp"
     
     try:
@@ -1018,6 +1011,23 @@ def zip_scattered_images(folder_path: Path, image_files: List[Path]) -> Compress
             cmd_delete(str(temp_folder), is_directory=True)
         return CompressionResult(False, error_message=f"Error: {str(e)}")
 
+def zip_scattered_images_native(folder_path: Path, image_files: List[Path], zip_path: Path, original_size: int) -> CompressionResult:
+    """进程内打包散图：直接从原路径写入，无需临时文件夹；已有同名压缩包时按内容清单比较"""
+    temp_zip_path = folder_path / f"{folder_path.name}_散图_temp.zip"
+    pack = native_pack([(file, file.name) for file in image_files], temp_zip_path)
+    if not pack.success:
+        return CompressionResult(False, error_message=f"Compression failed: {pack.error_message}")
+    
+    compressor = ZipCompressor(pack_mode="native")
+    final_zip_path = compressor._handle_existing_zip(temp_zip_path, zip_path, f"{folder_path.name}_散图", pack.manifest)
+    if not final_zip_path:
+        if temp_zip_path.exists():
+            temp_zip_path.unlink()
+        return CompressionResult(False, error_message=f"Failed to place zip: {zip_path}")
+    
+    compressor._delete_source_files(image_files)
+    return CompressionResult(True, original_size, final_zip_path.stat().st_size, pack_seconds=pack.seconds)
+
 def ensure_file_access(file_path: Path) -> bool:
     """
     确保文件可访问，通过修改文件权限和清除只读属性
@@ -1120,6 +1130,8 @@ def process_with_prompt(directories: List[Path], options: Dict[str, bool]) -> No
     # 初始化日志面板
     TextualLoggerManager.set_layout(TEXTUAL_LAYOUT, config_info['log_file'])
     
+    pack_mode = "7z" if options.get('use_7z') else "native"
+    
     # 处理每个目录
     for directory in directories:
         logger.info(f"\n[#process]📂 开始处理目录: {directory}")
@@ -1146,12 +1158,12 @@ def process_with_prompt(directories: List[Path], options: Dict[str, bool]) -> No
                 *BLACKLIST_KEYWORDS,  # 包含所有黑名单关键词
                 *[k for k in MEDIA_TYPES.keys()]  # 包含所有媒体类型文件夹
             ]
-            zip_paths = process_folders(str(directory), exclude_keywords)
+            zip_paths = process_folders(str(directory), exclude_keywords, pack_mode)
             logger.info(f"[#process]✅ 已完成文件夹压缩，共处理 {len(zip_paths)} 个文件夹")
 
         if options.get('process_scattered'):
             logger.info("\n[#process]🔍 开始查找和处理散图...")
-            processed_count = process_scattered_images_in_directory(directory)
+            processed_count = process_scattered_images_in_directory(directory, pack_mode)
             logger.info(f"[#process]✅ 散图处理完成，共处理 {processed_count} 个散图文件夹")
     
     logger.info("\n[#process]✨ 所有操作已完成")
@@ -1208,6 +1220,7 @@ def run_with_args(args):
     # 如果没有指定任何选项，默认执行所有操作
     if not any(options.values()):
         options = {k: True for k in options}
+    options["use_7z"] = getattr(args, 'use_7z', False)
 
     # 处理目录
     process_with_prompt(directories, options)
@@ -1223,6 +1236,7 @@ def main():
         parser.add_argument('--compress', '-cm', action='store_true', help='压缩文件夹')
         parser.add_argument('--process-scattered', '-ps', action='store_true', help='处理散图')
         parser.add_argument('--all', '-a', action='store_true', help='执行所有操作')
+        parser.add_argument('--use-7z', action='store_true', help='使用7-Zip命令行打包（默认进程内直接写入ZIP）')
         parser.add_argument('--path', '-p', type=str, help='指定处理路径')
         
         try:
@@ -1241,6 +1255,7 @@ def main():
             ("压缩文件夹", "compress", "--compress", True),
             ("处理散图", "process_scattered", "--process-scattered", True),
             ("执行所有操作", "all", "--all", False),
+            ("使用7z打包", "use_7z", "--use-7z", False),
         ]
 
         # 定义输入框选项
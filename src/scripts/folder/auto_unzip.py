@@ -2,7 +2,6 @@ import os
 import logging
 import subprocess
 from tqdm import tqdm
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from threading import Lock
 import yaml
 from datetime import datetime
@@ -18,6 +17,8 @@ from nodes.tui.textual_logger import TextualLoggerManager
 from nodes.record.logger_config import setup_logger
 from nodes.tui.textual_preset import create_config_app
 from nodes.tui.mode_manager import create_mode_manager
+from nodes.file.io_scheduler import IOScheduler
+from nodes.record.timestamp_manager import TimestampManager
 # 设置日志记录器
 config = {
     'script_name': 'name',
@@ -69,6 +70,8 @@ class Config:
         parser.add_argument('-a', '--archive-types', nargs='+', 
                           choices=['zip', 'cbz', 'rar', 'cbr', '7z'],
                           help='指定要处理的压缩包格式 (例如: zip cbz)')
+        parser.add_argument('-w', '--io-workers', type=int, default=0,
+                          help='每个磁盘的并发数 (0: 按机械盘/SSD自动选择)')
         
         # 保存解析器
         self.parser = parser
@@ -92,6 +95,7 @@ class Config:
         self.disable_zipfile = False
         self.archive_types = None
         self.source_directories = []
+        self.io_workers = 0  # 每个磁盘的并发数，0 为自动
         
         # 初始化日志
         
@@ -104,6 +108,7 @@ class Config:
         self.exclude_formats = self.args.exclude if self.args.exclude else []
         self.disable_zipfile = self.args.disable_zipfile
         self.archive_types = self._get_archive_types()
+        self.io_workers = self.args.io_workers or 0
         
         # 获取源目录
         self.source_directories = self._get_multiple_paths()
@@ -182,54 +187,6 @@ class Config:
             return ['.zip', '.cbz', '.rar', '.cbr', '.7z']
 
 
-class TimestampManager:
-    def __init__(self, yaml_file):
-        # 将.yaml后缀改为.json
-        self.json_file = yaml_file.replace('.yaml', '.json')
-        self.file_timestamps = self._load_json()
-        
-    def _load_json(self):
-        """加载JSON文件,添加错误处理"""
-        try:
-            if os.path.exists(self.json_file):
-                with open(self.json_file, 'r', encoding='utf-8') as file:
-                    import json
-                    return json.load(file)
-            return {}
-        except json.JSONDecodeError as e:
-            logger.error(f"[#update]❌ JSON解析错误: {str(e)}")
-            return {}
-        except Exception as e:
-            logger.error(f"[#update]❌ 读取时间戳文件失败: {str(e)}")
-            return {}
-    
-    def save_json(self):
-        """保存JSON文件,添加错误处理"""
-        try:
-            with open(self.json_file, 'w', encoding='utf-8') as file:
-                import json
-                json.dump(self.file_timestamps, file, ensure_ascii=False, indent=2)
-        except Exception as e:
-            logger.error(f"[#update]❌ 保存时间戳文件失败: {str(e)}")
-            
-    def record_timestamp(self, file_path):
-        try:
-            self.file_timestamps[file_path] = os.path.getmtime(file_path)
-            self.save_json()
-        except Exception as e:
-            logger.error(f"[#update]❌ 记录时间戳失败: {str(e)}")
-        
-    def restore_timestamp(self, file_path):
-        try:
-            if file_path in self.file_timestamps:
-                timestamp = self.file_timestamps[file_path]
-                os.utime(file_path, (timestamp, timestamp))
-                logger.info(f"[#process]✅ 已恢复时间戳: {file_path} -> {datetime.fromtimestamp(timestamp)}")
-            else:
-                logger.warning(f"[#update]⚠️ 未找到时间戳记录: {file_path}")
-        except Exception as e:
-            logger.error(f"[#update]❌ 恢复时间戳失败: {str(e)}")
-
 class ArchiveProcessor:
     def __init__(self, config):
         self.config = config
@@ -451,22 +408,8 @@ class BatchProcessor:
         # 更新总体进度
         logger.info(f"[#current_stats]总文件数: {total_files}")
         
-        # 处理文件
-        with ThreadPoolExecutor() as executor:
-            futures = [
-                executor.submit(self.processor.decompress, archive_path)
-                for archive_path in archive_files
-            ]
-            
-            completed = 0
-            for future in as_completed(futures):
-                completed += 1
-                # 更新进度条
-                percentage = (completed / total_files) * 100
-                logger.info(f"[@current_progress]解压进度 ({completed}/{total_files}) {percentage:.1f}%")
-                future.result()
-                # 更新总体进度
-                logger.info(f"[#current_stats]已处理: {completed}/{total_files}")
+        # 处理文件：按磁盘分组，每个磁盘单独限制并发
+        self._run_scheduled(archive_files, self.processor.decompress, "解压")
                     
     def _process_folders(self):
         folders = []
@@ -497,21 +440,26 @@ class BatchProcessor:
         logger.info(f"[#current_stats]总文件夹数: {total_folders}")
         
         # 处理文件夹
-        with ThreadPoolExecutor() as executor:
-            futures = [
-                executor.submit(self.processor.compress, folder_path)
-                for folder_path in folders
-            ]
-            
-            completed = 0
-            for future in as_completed(futures):
-                completed += 1
-                # 更新进度条
-                percentage = (completed / total_folders) * 100
-                logger.info(f"[@current_progress]压缩进度 ({completed}/{total_folders}) {percentage:.1f}%")
-                future.result()
-                # 更新总体进度
-                logger.info(f"[#current_stats]已处理: {completed}/{total_folders}")
+        self._run_scheduled(folders, self.processor.compress, "压缩")
+    
+    def _run_scheduled(self, paths, func, action):
+        """用按磁盘限流的调度器执行任务，并输出每个磁盘的吞吐"""
+        scheduler = IOScheduler(per_volume=self.config.io_workers)
+        total = len(paths)
+        completed = 0
+        for task in scheduler.run(paths, func):
+            completed += 1
+            if task.error:
+                logger.error(f"[#update]❌ 处理异常: {task.path}, 错误: {task.error}")
+            # 更新进度条
+            percentage = (completed / total) * 100
+            logger.info(f"[@current_progress]{action}进度 ({completed}/{total}) {percentage:.1f}%")
+            # 更新总体进度
+            logger.info(f"[#current_stats]已处理: {completed}/{total}")
+        for line in scheduler.summary_lines():
+            logger.info(f"[#current_stats]💽 {line}")
+        # 时间戳记录是批量延迟写入的，批次结束时立即落盘
+        self.processor.timestamp_manager.save_json()
 
 def create_cli_parser():
     """创建命令行参数解析器"""
@@ -525,6 +473,8 @@ def create_cli_parser():
     parser.add_argument('-a', '--archive-types', nargs='+', 
                       choices=['zip', 'cbz', 'rar', 'cbr', '7z'],
                       help='指定要处理的压缩包格式 (例如: zip cbz)')
+    parser.add_argument('-w', '--io-workers', type=int, default=0,
+                      help='每个磁盘的并发数 (0: 按机械盘/SSD自动选择)')
     return parser
 
 def run_application(args):
@@ -538,6 +488,7 @@ def run_application(args):
     config.exclude_formats = args.exclude if args.exclude else []
     config.disable_zipfile = args.disable_zipfile
     config.archive_types = config._get_archive_types()
+    config.io_workers = getattr(args, 'io_workers', 0) or 0
     
     # 获取源目录
     config.source_directories = config._get_multiple_paths()
@@ -562,6 +513,7 @@ def main():
                 ("包含格式", "--include", "-i", "", "例如: jpg png"),
                 ("排除格式", "--exclude", "-e", "", "例如: gif mp4"),
                 ("压缩包格式", "--archive-types", "-a", "", "zip/cbz/rar/cbr/7z"),
+                ("每盘并发数", "--io-workers", "-w", "", "留空按机械盘/SSD自动选择"),
             ],
             'title': "压缩包处理配置",
             'preset_configs': {
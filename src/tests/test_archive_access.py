@@ -0,0 +1,149 @@
+import os
+import struct
+import subprocess
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+
+from nodes.archive.archive_access import (ArchiveAccess, ArchiveError, BackendUnavailable,
+                                          SevenZipCliBackend, ZipBackend)
+
+DEFLATE64 = 9
+
+
+def write_zip(path, members, method=None, flags=0):
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED) as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    if method is None and not flags:
+        return
+    # 改写本地头和中央目录里的压缩方法和标志字段，模拟 Deflate64 等 zipfile 不支持的方法或加密成员
+    with open(path, 'r+b') as f:
+        data = bytearray(f.read())
+        for signature, offset in ((b'PK\x03\x04', 6), (b'PK\x01\x02', 8)):
+            start = data.find(signature)
+            while start != -1:
+                flag_bits, = struct.unpack_from('<H', data, start + offset)
+                struct.pack_into('<H', data, start + offset, flag_bits | flags)
+                if method is not None:
+                    struct.pack_into('<H', data, start + offset + 2, method)
+                start = data.find(signature, start + 4)
+        f.seek(0)
+        f.write(data)
+
+
+class FakeCliBackend:
+    name = '7z'
+
+    def __init__(self, ok=True):
+        self.ok = ok
+        self.tested = []
+
+    def test(self, path):
+        self.tested.append(path)
+        return self.ok
+
+    def iter(self, path, members):
+        for member in members:
+            yield member, b'from-7z'
+
+
+class ZipBackendTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'book.zip')
+        self.cache = mock.patch.object(ArchiveAccess, 'use_cache', False)
+        self.cache.start()
+
+    def tearDown(self):
+        self.cache.stop()
+        self.tmp.cleanup()
+
+    def test_plain_zip_tests_in_process(self):
+        write_zip(self.path, {'001.jpg': b'a' * 100})
+        cli = FakeCliBackend()
+        with mock.patch.object(ArchiveAccess, 'cli_backend', cli):
+            self.assertTrue(ArchiveAccess.test_archive(self.path))
+        self.assertEqual(cli.tested, [])
+
+    def test_unsupported_method_falls_back_to_7z(self):
+        write_zip(self.path, {'001.jpg': b'a' * 100, '002.jpg': b'b' * 100}, method=DEFLATE64)
+        with self.assertRaises(BackendUnavailable):
+            ZipBackend().test(self.path)
+        members = ZipBackend().list(self.path)
+        with self.assertRaises(BackendUnavailable):
+            next(ZipBackend().iter(self.path, members))
+
+        cli = FakeCliBackend()
+        with mock.patch.object(ArchiveAccess, 'cli_backend', cli):
+            self.assertTrue(ArchiveAccess.test_archive(self.path))
+            data = [content for _, content in ArchiveAccess.iter_members(self.path)]
+        self.assertEqual(cli.tested, [self.path])
+        self.assertEqual(data, [b'from-7z', b'from-7z'])
+
+    def test_corrupt_member_is_reported(self):
+        write_zip(self.path, {'001.jpg': b'a' * 100})
+        with open(self.path, 'r+b') as f:
+            data = f.read()
+            f.seek(data.find(b'a' * 100))
+            f.write(b'x')
+        cli = FakeCliBackend()
+        with mock.patch.object(ArchiveAccess, 'cli_backend', cli):
+            self.assertFalse(ArchiveAccess.test_archive(self.path))
+            with self.assertRaises(ArchiveError):
+                ArchiveAccess.read_member(self.path, '001.jpg')
+        self.assertEqual(cli.tested, [])
+
+    def test_misnamed_archive_falls_back_to_7z(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'Rar!\x1a\x07\x00' + os.urandom(100))
+        with self.assertRaises(BackendUnavailable):
+            next(ZipBackend().iter(self.path, []))
+        cli = FakeCliBackend()
+        with mock.patch.object(ArchiveAccess, 'cli_backend', cli):
+            members = [mock.Mock(raw_name='001.jpg')]
+            self.assertEqual([data for _, data in ArchiveAccess.iter_members(self.path, members=members)],
+                             [b'from-7z'])
+
+    def test_encrypted_zip_is_unknown(self):
+        write_zip(self.path, {'001.jpg': b'a' * 100}, flags=0x1)
+        cli = FakeCliBackend(ok=False)
+        with mock.patch.object(ArchiveAccess, 'cli_backend', cli):
+            self.assertIsNone(ArchiveAccess.test_archive(self.path))
+        self.assertEqual(cli.tested, [])
+
+
+class SevenZipCliTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'big.7z')
+        with open(self.path, 'wb') as f:
+            f.write(b'7z' * 100)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_with(self, **kwargs):
+        with mock.patch.object(subprocess, 'run', **kwargs) as run:
+            result = SevenZipCliBackend('7z').test(self.path)
+        return result, run
+
+    def test_timeout_is_unknown(self):
+        result, run = self.run_with(side_effect=subprocess.TimeoutExpired('7z', 55))
+        self.assertIsNone(result)
+        self.assertEqual(run.call_args.kwargs['stdin'], subprocess.DEVNULL)
+
+    def test_wrong_password_is_unknown(self):
+        completed = subprocess.CompletedProcess([], 2, b'', b'ERROR: Wrong password : 001.jpg')
+        self.assertIsNone(self.run_with(return_value=completed)[0])
+
+    def test_failure_and_success(self):
+        self.assertFalse(self.run_with(return_value=subprocess.CompletedProcess([], 2, b'', b'CRC Failed'))[0])
+        self.assertTrue(self.run_with(return_value=subprocess.CompletedProcess([], 0, b'Everything is Ok', b''))[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
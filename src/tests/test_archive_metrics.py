@@ -0,0 +1,71 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from nodes.archive.archive_metrics import ArchiveMetricCache, FINGERPRINT_BLOCK, archive_fingerprint
+from nodes.record.record_store import RecordStore
+
+
+class ArchiveMetricCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.store = RecordStore(os.path.join(self.tmp, 'metrics.db'))
+        self.path = os.path.join(self.tmp, 'a.zip')
+        with open(self.path, 'wb') as f:
+            f.write(os.urandom(FINGERPRINT_BLOCK * 3))
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_fingerprint_follows_content(self):
+        fingerprint = archive_fingerprint(self.path)
+        renamed = os.path.join(self.tmp, 'a{1.2k@WD}.zip')
+        os.rename(self.path, renamed)
+        self.assertEqual(archive_fingerprint(renamed), fingerprint)
+        with open(renamed, 'ab') as f:
+            f.write(b'x')
+        self.assertNotEqual(archive_fingerprint(renamed), fingerprint)
+
+    def test_get_or_compute(self):
+        cache = ArchiveMetricCache(self.store)
+        calls = []
+
+        def compute(path):
+            calls.append(path)
+            return {'width': 1200, 'page_count': 20}
+
+        self.assertEqual(cache.get_or_compute(self.path, compute), {'width': 1200, 'page_count': 20})
+        renamed = os.path.join(self.tmp, 'b.zip')
+        os.rename(self.path, renamed)
+        self.assertEqual(cache.get_or_compute(renamed, compute), {'width': 1200, 'page_count': 20})
+        self.assertEqual(calls, [self.path])
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_variants_are_cached_separately(self):
+        cache = ArchiveMetricCache(self.store)
+        cache.get_or_compute(self.path, lambda path: {'width': 3}, variant='samples=3')
+        self.assertEqual(cache.get(self.path, 'samples=5')[1], None)
+        self.assertEqual(cache.get(self.path)[1], None)
+        self.assertEqual(cache.get_or_compute(self.path, lambda path: {'width': 5}, variant='samples=5'), {'width': 5})
+        self.assertEqual(cache.get(self.path, 'samples=3')[1], {'width': 3})
+
+    def test_version_and_errors(self):
+        ArchiveMetricCache(self.store, version=1).get_or_compute(self.path, lambda path: {'width': 1})
+        self.assertEqual(ArchiveMetricCache(self.store, version=2).get(self.path)[1], None)
+        self.assertEqual(ArchiveMetricCache(self.store, version=1).get(self.path)[1], {'width': 1})
+
+        def broken(path):
+            raise ValueError('bad archive')
+
+        cache = ArchiveMetricCache(self.store, namespace='other')
+        with self.assertRaises(ValueError):
+            cache.get_or_compute(self.path, broken)
+        self.assertEqual(cache.get(self.path)[1], None)
+        self.assertEqual(cache.get(os.path.join(self.tmp, 'missing.zip')), (None, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
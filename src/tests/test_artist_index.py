@@ -0,0 +1,56 @@
+import unittest
+
+from nodes.comic.artist_index import ArtistIndex, AUTO, USER, fold_name, split_artist_names
+
+
+class SplitArtistNamesTest(unittest.TestCase):
+
+    def test_artists_before_circles(self):
+        self.assertEqual(split_artist_names('社团A(画师1、画师2)'), ['画师1', '画师2', '社团A'])
+        self.assertEqual(split_artist_names('画师'), ['画师'])
+
+
+class ArtistIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = ArtistIndex(
+            user_defined={'别名甲 alias_a': '[画师甲]', 'shared': '[用户文件夹]'},
+            auto_detected={
+                '[社团 (画师甲)]': ['画师甲', '社团'],
+                '[shared]': ['shared'],
+                '[画师乙]': ['画师乙'],
+                '[画师乙 重复]': ['画师乙'],
+                '[東方画师]': ['東方画师'],
+                '[Artist]': ['Artist'],
+            })
+
+    def test_user_defined_first(self):
+        self.assertEqual(self.index.lookup(['shared']), ('shared', '[用户文件夹]', USER))
+        self.assertEqual(self.index.lookup(['画师乙', 'alias_a']), ('alias_a', '[画师甲]', USER))
+
+    def test_auto_detected_in_name_order(self):
+        self.assertEqual(self.index.lookup(['未知', '社团', '画师乙']), ('社团', '[社团 (画师甲)]', AUTO))
+        self.assertEqual(self.index.lookup(['画师乙']), ('画师乙', '[画师乙]', AUTO))
+        self.assertIsNone(self.index.lookup(['未知', '']))
+
+    def test_folded_match(self):
+        self.assertEqual(fold_name(' ARTIST '), 'artist')
+        self.assertEqual(self.index.lookup(['artist']), ('artist', '[Artist]', AUTO))
+        # 精确匹配优先于归一化匹配
+        self.assertEqual(self.index.lookup(['artist', '画师乙']), ('画师乙', '[画师乙]', AUTO))
+        if fold_name('東方') == '东方':
+            self.assertEqual(self.index.lookup(['东方画师']), ('东方画师', '[東方画师]', AUTO))
+
+    def test_incremental_update(self):
+        self.index.remove_folder('[画师乙]')
+        self.assertEqual(self.index.lookup(['画师乙']), ('画师乙', '[画师乙 重复]', AUTO))
+        self.index.add_folder('[画师乙 重复]', ['新名字'])
+        self.assertIsNone(self.index.lookup(['画师乙']))
+        self.assertEqual(self.index.lookup(['新名字']), ('新名字', '[画师乙 重复]', AUTO))
+        self.index.set_user_defined({})
+        self.assertEqual(self.index.lookup(['shared']), ('shared', '[shared]', AUTO))
+        self.assertEqual(len(self.index), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
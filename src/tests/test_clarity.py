@@ -0,0 +1,137 @@
+import os
+import tempfile
+import unittest
+from io import BytesIO
+from unittest import mock
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from nodes.pics import clarity
+from nodes.pics.clarity import (ClarityCalibration, ClarityEngine, DEFAULT_MAX_SIDE, build_default_engine,
+                                calibrate_default_engine, decode_gray)
+
+
+def make_page(height, width, blur=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    page = np.full((height, width), 255, np.uint8)
+    for _ in range(80):
+        start = tuple(int(v) for v in rng.integers(0, [width, height]))
+        end = tuple(int(v) for v in rng.integers(0, [width, height]))
+        cv2.line(page, start, end, 0, 2)
+    if blur:
+        page = cv2.GaussianBlur(page, (0, 0), blur)
+    return page
+
+
+def encode(page, ext='.png'):
+    return cv2.imencode(ext, cv2.cvtColor(page, cv2.COLOR_GRAY2BGR))[1].tobytes()
+
+
+def legacy_definition(data):
+    gray = cv2.cvtColor(cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR), cv2.COLOR_BGR2GRAY)
+    sobelx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
+    sobely = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
+    return float(np.mean(sobelx**2 + sobely**2))
+
+
+class ClarityEngineTest(unittest.TestCase):
+
+    def test_full_resolution_matches_legacy(self):
+        data = encode(make_page(300, 200))
+        self.assertAlmostEqual(ClarityEngine(max_side=None).score(data), legacy_definition(data), delta=1)
+
+    def test_bounded_plane(self):
+        gray, scale = decode_gray(encode(make_page(1200, 500), '.jpg'), max_side=256)
+        self.assertEqual(max(gray.shape), 256)
+        self.assertAlmostEqual(scale, 1200 / 256, places=3)
+        gray, scale = decode_gray(encode(make_page(100, 80)), max_side=256)
+        self.assertEqual(gray.shape, (100, 80))
+        self.assertEqual(scale, 1.0)
+
+    def test_input_types(self):
+        page = make_page(200, 150)
+        data = encode(page)
+        engine = ClarityEngine(max_side=128)
+        expected = engine.score(data)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, '图片.png')
+            with open(path, 'wb') as f:
+                f.write(data)
+            self.assertAlmostEqual(engine.score(path), expected, places=3)
+        self.assertAlmostEqual(engine.score(BytesIO(data)), expected, places=3)
+        self.assertAlmostEqual(engine.score(Image.fromarray(page)), expected, places=3)
+
+    def test_score_many_keeps_order(self):
+        images = [encode(make_page(400, 300, blur)) for blur in (0, 3)] + [b'not an image']
+        engine = ClarityEngine(max_side=128)
+        scores = engine.score_many(images, workers=3)
+        self.assertEqual(scores, [engine.score(image) for image in images])
+        self.assertGreater(scores[0], scores[1])
+        self.assertEqual(scores[2], 0.0)
+
+
+class ClarityCalibrationTest(unittest.TestCase):
+
+    def test_fit_recovers_model(self):
+        expected = ClarityCalibration(slope=1.2, scale_exponent=-0.5, intercept=0.3)
+        samples = []
+        for energy in (100.0, 500.0, 2000.0):
+            for scale in (2.0, 3.0):
+                samples.append((energy, scale, expected.apply(energy, scale)))
+        fitted = ClarityCalibration.fit(samples)
+        self.assertAlmostEqual(fitted.slope, 1.2, places=6)
+        self.assertAlmostEqual(fitted.scale_exponent, -0.5, places=6)
+        self.assertAlmostEqual(fitted.intercept, 0.3, places=6)
+        self.assertEqual(fitted.samples, 6)
+
+    def test_default_engine_keeps_legacy_ranking(self):
+        # 扫描图尺寸：细线稿 vs 粗笔画 + 网点，缩小后未校准的分数排序会翻转
+        pages = []
+        for seed, blur in enumerate((0.0, 0.8, 1.6)):
+            page = make_page(3000, 2100, blur=blur, seed=seed)
+            if seed == 1:
+                page[::3, ::3] = 0
+            pages.append(encode(page))
+        legacy = [legacy_definition(data) for data in pages]
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = build_default_engine(os.path.join(tmp, 'missing.json'))
+            self.assertIsNone(engine.max_side)
+            scores = engine.score_many(pages)
+            for score, expected in zip(scores, legacy):
+                self.assertAlmostEqual(score, expected, delta=max(1.0, expected * 1e-4))
+            self.assertEqual(sorted(range(3), key=scores.__getitem__), sorted(range(3), key=legacy.__getitem__))
+
+            path = os.path.join(tmp, 'calibration.json')
+            ClarityCalibration(1.1, -0.8, 0.2, 10).save(path)
+            calibrated = build_default_engine(path)
+            self.assertEqual(calibrated.max_side, DEFAULT_MAX_SIDE)
+            self.assertEqual(calibrated.calibration, ClarityCalibration(1.1, -0.8, 0.2, 10))
+
+    def test_calibrate_writes_file_for_default_engine(self):
+        pages = [encode(make_page(2000, 1600, blur=blur, seed=seed)) for seed, blur in enumerate((0, 1, 2, 0.5))]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cache', 'calibration.json')
+            with mock.patch.object(clarity, 'MIN_CALIBRATION_SAMPLES', 3):
+                self.assertIsNone(calibrate_default_engine(pages[:2], calibration_file=path))
+                self.assertFalse(os.path.exists(path))
+                calibration = calibrate_default_engine(pages, calibration_file=path)
+            self.assertEqual(calibration.samples, 4)
+            self.assertEqual(build_default_engine(path).calibration, calibration)
+
+    def test_defaults_and_persistence(self):
+        calibration = ClarityCalibration()
+        self.assertEqual(calibration.apply(500.0, 1.0), 500.0)
+        self.assertAlmostEqual(calibration.apply(500.0, 2.0), 250.0)
+        self.assertEqual(ClarityCalibration.fit([(1.0, 2.0, 1.0)]).slope, 1.0)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cache', 'calibration.json')
+            self.assertEqual(ClarityCalibration.load(path), ClarityCalibration())
+            fitted = ClarityCalibration(1.1, -0.8, 0.2, 10)
+            fitted.save(path)
+            self.assertEqual(ClarityCalibration.load(path), fitted)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import importlib
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+monitor_module = None
+_cwd = None
+_tmp = None
+
+
+def setUpModule():
+    # 模块导入时会在当前目录创建日志文件，监控器的日志和备份目录也都是相对路径
+    global monitor_module, _cwd, _tmp
+    _cwd = os.getcwd()
+    _tmp = tempfile.TemporaryDirectory()
+    os.chdir(_tmp.name)
+    monitor_module = importlib.import_module('nodes.utils.file_operation_monitor')
+
+
+def tearDownModule():
+    os.chdir(_cwd)
+    _tmp.cleanup()
+
+
+class FileOperationMonitorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp(dir=_tmp.name)
+        os.chdir(self.dir)
+        self.monitor = self.reopen()
+
+    def tearDown(self):
+        self.monitor._save_history()
+        os.chdir(_tmp.name)
+
+    def reopen(self):
+        cls = monitor_module.FileOperationMonitor
+        if cls._instance is not None:
+            cls._instance._save_history()
+            cls._instance._journal.close()
+        cls._instance = None
+        return cls()
+
+    def journal_lines(self):
+        with open(self.monitor.journal_file, 'rb') as f:
+            return f.read().splitlines()
+
+    def record_files(self, count):
+        paths = []
+        for i in range(count):
+            path = os.path.join(self.dir, f'{i:03d}.txt')
+            with open(path, 'w') as f:
+                f.write(str(i))
+            self.monitor.record_operation('CREATE', path, script_name='test')
+            paths.append(path)
+        return paths
+
+    def test_journal_append_and_reload(self):
+        self.record_files(3)
+        self.monitor._save_history()
+        lines = self.journal_lines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(all('op' in json.loads(line) for line in lines))
+        self.monitor = self.reopen()
+        self.assertEqual([op.source_path for op in self.monitor.operations],
+                         [os.path.join(self.dir, f'{i:03d}.txt') for i in range(3)])
+
+    def test_partial_record_is_truncated(self):
+        self.record_files(2)
+        self.monitor._save_history()
+        with open(self.monitor.journal_file, 'ab') as f:
+            f.write(b'{"op": {"operation_type": "CRE')
+        self.monitor = self.reopen()
+        self.assertEqual(len(self.monitor.operations), 2)
+        with open(self.monitor.journal_file, 'rb') as f:
+            self.assertTrue(f.read().endswith(b'\n'))
+        self.record_files(1)
+        self.monitor._save_history()
+        self.assertEqual(len(self.journal_lines()), 3)
+
+    def test_compaction_drops_undone_records(self):
+        self.record_files(5)
+        for _ in range(4):
+            self.assertTrue(self.monitor.undo_last_operation())
+        self.monitor._save_history()
+        self.assertEqual(len(self.journal_lines()), 9)
+        with mock.patch.object(monitor_module.FileOperationMonitor, 'COMPACT_MIN_DEAD', 2):
+            self.monitor = self.reopen()
+        self.assertEqual(len(self.journal_lines()), 1)
+        self.assertEqual([op.source_path for op in self.monitor.operations], [os.path.join(self.dir, '000.txt')])
+
+    def test_undo_and_paging(self):
+        paths = self.record_files(30)
+        start = time.perf_counter()
+        for _ in range(20):
+            self.assertTrue(self.monitor.undo_last_operation())
+        # 每次撤销只等待一次立即写入，不再每次等待攒批间隔
+        self.assertLess(time.perf_counter() - start, 20 * self.monitor.JOURNAL_BATCH_DELAY / 2)
+        self.assertEqual([os.path.exists(path) for path in paths], [True] * 10 + [False] * 20)
+
+        page = self.monitor.get_operation_history(offset=2, limit=3, newest_first=True)
+        self.assertEqual([op['source_path'] for op in page], paths[7:4:-1])
+        self.assertEqual(len(self.monitor.get_operation_history(script_name='test')), 10)
+        self.assertEqual(self.monitor.get_operation_history(script_name='other'), [])
+
+        self.assertTrue(self.monitor.undo_all_operations())
+        self.assertFalse(any(os.path.exists(path) for path in paths))
+        self.assertEqual(self.monitor.get_operation_history(), [])
+        self.monitor = self.reopen()
+        self.assertEqual(self.monitor.get_operation_history(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+import os
+import sys
+import json
+import time
+import signal
+import sqlite3
+import tempfile
+import unittest
+import subprocess
+from pathlib import Path
+from unittest import mock
+
+from nodes.record.path_history import PathHistoryManager
+from nodes.record.record_store import MIGRATED_NAMESPACE, RecordStore
+from nodes.record.timestamp_manager import TimestampManager
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+BATCH = 50
+
+# 子进程：每批写入 BATCH 条记录后 flush 并输出批号，一直写到被杀死
+WRITER = f'''
+import sys, os
+sys.path.insert(0, {str(SRC_DIR)!r})
+from nodes.record.record_store import RecordStore
+store = RecordStore(sys.argv[1], flush_interval=3600, max_batch=10 ** 9)
+mode = sys.argv[2]
+batch = 0
+while True:
+    for i in range({BATCH}):
+        store.put("kv", f"{{batch}}-{{i}}", {{"batch": batch, "blob": "x" * 2000}})
+        store.append("log", str(batch), i)
+    store.flush()
+    print(batch, flush=True)
+    batch += 1
+    if mode == "exit" and batch == 3:
+        store.put("kv", "unflushed", 1)  # 未 flush 的写入
+        os._exit(0)
+'''
+
+
+class TestRecordStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "records.db")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _run_writer(self, mode):
+        return subprocess.Popen([sys.executable, "-c", WRITER, self.db_path, mode],
+                                stdout=subprocess.PIPE, text=True)
+
+    def _check_consistent(self, flushed_batches):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            self.assertEqual(conn.execute("PRAGMA integrity_check").fetchone()[0], "ok")
+            kv_counts = dict(conn.execute(
+                "SELECT json_extract(value, '$.batch'), COUNT(*) FROM kv WHERE namespace = 'kv' GROUP BY 1"))
+            log_counts = dict(conn.execute(
+                "SELECT CAST(key AS INTEGER), COUNT(*) FROM log WHERE namespace = 'log' GROUP BY key"))
+        finally:
+            conn.close()
+        # 已确认 flush 的批次必须完整存在
+        for batch in flushed_batches:
+            self.assertEqual(kv_counts.get(batch), BATCH)
+            self.assertEqual(log_counts.get(batch), BATCH)
+        # 不存在只写入一部分的批次
+        for counts in (kv_counts, log_counts):
+            self.assertTrue(all(count == BATCH for count in counts.values()), counts)
+        return kv_counts
+
+    @unittest.skipIf(os.name == "nt", "需要 SIGKILL")
+    def test_killed_during_writes(self):
+        proc = self._run_writer("loop")
+        flushed = []
+        for line in proc.stdout:
+            flushed.append(int(line))
+            if len(flushed) >= 5:
+                break
+        proc.send_signal(signal.SIGKILL)
+        proc.wait()
+        proc.stdout.close()
+        self._check_consistent(flushed)
+
+        # 重新打开后可以继续写入
+        store = RecordStore(self.db_path)
+        store.put("kv", "after", 1)
+        store.close()
+        self.assertEqual(RecordStore(self.db_path).get("kv", "after"), 1)
+
+    def test_exit_without_flush(self):
+        proc = self._run_writer("exit")
+        flushed = [int(line) for line in proc.stdout]
+        proc.wait()
+        proc.stdout.close()
+        self.assertEqual(flushed, [0, 1, 2])
+        self._check_consistent(flushed)
+        self.assertIsNone(RecordStore(self.db_path).get("kv", "unflushed"))
+
+    def test_debounced_flush(self):
+        store = RecordStore(self.db_path, flush_interval=0.1)
+        for i in range(100):
+            store.put("kv", str(i), i)
+        self.assertEqual(store.get("kv", "42"), 42)  # 缓冲中的值立即可读
+        deadline = time.time() + 5
+        while store.flushes == 0 and time.time() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(store.flushes, 1)  # 100 次写入合并为一次事务
+        store.close()
+
+    def test_log_and_delete(self):
+        store = RecordStore(self.db_path)
+        for i in range(5):
+            store.append("log", "a", {"i": i})
+        store.append("log", "b", {"i": 0})
+        self.assertEqual(store.entries("log", "a", limit=2), [{"i": 3}, {"i": 4}])
+        self.assertEqual(store.log_keys("log"), ["a", "b"])
+        self.assertEqual(store.clear_log("log", "a"), 5)
+        store.put("kv", "k", None)
+        store.delete("kv", "k")
+        self.assertEqual(store.get("kv", "k", "default"), "default")
+        store.close()
+
+
+class TestLegacyMigration(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.home = mock.patch.dict(os.environ, {"HOME": self.temp_dir.name})
+        self.home.start()
+
+    def tearDown(self):
+        self.home.stop()
+        self.temp_dir.cleanup()
+
+    def write_json(self, name, data):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        return path
+
+    def test_timestamps_are_not_reimported_after_clear(self):
+        json_file = self.write_json("timestamps.json", {"a": 1.0, "b": 2.0})
+        manager = TimestampManager(json_file)
+        self.assertEqual(manager._store.count("timestamps"), 2)
+        manager.clear_timestamps()
+        self.assertEqual(TimestampManager(json_file)._store.count("timestamps"), 0)
+
+    def test_database_migrated_before_flag_existed(self):
+        json_file = self.write_json("old.json", {"a": 1.0})
+        store = RecordStore.open(os.path.splitext(json_file)[0] + ".db")
+        store.put("timestamps", "a", 1.0)
+        store.flush()
+        manager = TimestampManager(json_file)
+        self.assertEqual(store.get(MIGRATED_NAMESPACE, "timestamps"), json_file)
+        manager.clear_timestamps()
+        self.assertEqual(TimestampManager(json_file)._store.count("timestamps"), 0)
+
+    def test_path_history_is_not_reimported_after_clear(self):
+        history_file = self.write_json("path_history.json", {"script": {"records": [{"paths": ["a"]}]}})
+        manager = PathHistoryManager(history_file)
+        self.assertEqual(manager.get_all_scripts(), ["script"])
+        self.assertTrue(manager.clear_script_history("script"))
+        self.assertEqual(PathHistoryManager(history_file).get_all_scripts(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import re
+import random
+import unittest
+
+from nodes.utils.rule_matcher import KeywordAutomaton, RuleMatcher
+
+
+class KeywordAutomatonTest(unittest.TestCase):
+
+    def test_overlapping_keywords(self):
+        automaton = KeywordAutomaton()
+        for keyword, rule in [('he', 'a'), ('she', 'b'), ('his', 'c'), ('hers', 'd')]:
+            automaton.add(keyword, rule)
+        self.assertEqual(automaton.scan('ushers'), {'a', 'b', 'd'})
+        self.assertEqual(automaton.scan('ahishe'), {'a', 'b', 'c'})
+        self.assertEqual(automaton.scan('xyz'), set())
+
+    def test_matches_naive_search(self):
+        rng = random.Random(0)
+        alphabet = 'ab汉化c'
+        keywords = {''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))): f'r{i % 5}'
+                    for i in range(40)}
+        automaton = KeywordAutomaton()
+        for keyword, rule in keywords.items():
+            automaton.add(keyword, rule)
+        for _ in range(500):
+            text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 20)))
+            expected = {rule for keyword, rule in keywords.items() if keyword in text}
+            self.assertEqual(automaton.scan(text), expected, text)
+
+
+class RuleMatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.matcher = (RuleMatcher()
+                        .add_patterns('doujin', [r'\(C\d+\)', r'COMIC\s*MARKET', r'同人誌'])
+                        .add_patterns('commercial', [r'(?i)COMIC', r'\d{4}年\d{1,2}月号'])
+                        .add_patterns('artbook', [r'art\s*works'])
+                        .add_patterns('tankoubon:exclude', [r'art\s*works'])
+                        .add_keywords('chinese', ['汉化', '中国翻訳'])
+                        .compile())
+
+    def test_all_rules_in_one_call(self):
+        self.assertEqual(self.matcher.match('(C99) [作者] comic market [中国翻訳].zip'),
+                         {'doujin', 'commercial', 'chinese'})
+        self.assertEqual(self.matcher.match('ART WORKS 2020年12月号'),
+                         {'artbook', 'tankoubon:exclude', 'commercial'})
+        self.assertEqual(self.matcher.match('plain name.zip'), set())
+
+    def test_matches(self):
+        self.assertTrue(self.matcher.matches('[汉化组] 同人誌', 'doujin'))
+        self.assertFalse(self.matcher.matches('[汉化组] 同人誌', 'artbook'))
+        self.assertTrue(self.matcher.matches('汉化'))
+        self.assertFalse(self.matcher.matches('nothing'))
+
+    def test_case_sensitive(self):
+        matcher = RuleMatcher(ignore_case=False).add_keywords('cg', ['CG']).add_patterns('vol', [r'Vol\.\d+'])
+        self.assertEqual(matcher.match('CG Vol.2'), {'cg', 'vol'})
+        self.assertEqual(matcher.match('cg vol.2'), set())
+
+    def test_same_result_as_regex_loop(self):
+        patterns = {'a': [r'\[C\d+\]', r'コミケ'], 'b': [r'vol\.?\d+', r'第\d+巻'], 'c': [r'(?i)doujin', r'画集']}
+        matcher = RuleMatcher()
+        for rule, rule_patterns in patterns.items():
+            matcher.add_patterns(rule, rule_patterns)
+        for text in ['[C97] コミケ vol3', 'Doujin 画集 第2巻', '[c1]', 'VOL.10', '']:
+            expected = {rule for rule, rule_patterns in patterns.items()
+                        if any(re.search(p, text, re.IGNORECASE) for p in rule_patterns)}
+            self.assertEqual(matcher.match(text), expected, text)
+
+
+if __name__ == '__main__':
+    unittest.main()
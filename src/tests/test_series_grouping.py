@@ -0,0 +1,61 @@
+import random
+import unittest
+
+from nodes.comic.series_grouping import SeriesGrouper
+
+# 覆盖三个阶段的样例，期望结果与旧的逐对比较实现一致（包括它的一些特殊行为：
+# 已标记系列的系列名带扩展名、末尾的"期"被当作卷号后缀去掉）
+FIXTURE = [
+    'a/[Artist] Magic Girl Vol.1 [DL版].zip',
+    'a/[Artist] Magic Girl Vol.2 [中国翻訳].zip',
+    'a/[Artist] Magic Girl Vol.3.zip',
+    'a/[作者] 魔法少女夏日 第1卷.zip',
+    'a/[作者] 魔法少女夏日 第2卷 (C99).zip',
+    'a/[#s]秘密花园.zip',
+    'a/[作者] 秘密花园后日谈.zip',
+    'a/妹妹的夏日假期上.zip',
+    'a/妹妹的夏日假期下.zip',
+    'a/[Artist] Lonely Night.zip',
+    'a/[Artist] Magic Girl Vol.1 [无修正].zip',
+    'a/Holiday Maid Story.rar',
+    'a/Holiday Maid Story 2.rar',
+]
+
+EXPECTED = {
+    'Holiday Maid Story': ['a/Holiday Maid Story 2.rar', 'a/Holiday Maid Story.rar'],
+    'Magic Girl': [
+        'a/[Artist] Magic Girl Vol.1 [DL版].zip',
+        'a/[Artist] Magic Girl Vol.1 [无修正].zip',
+        'a/[Artist] Magic Girl Vol.2 [中国翻訳].zip',
+        'a/[Artist] Magic Girl Vol.3.zip',
+    ],
+    '妹妹的夏日假': ['a/妹妹的夏日假期上.zip', 'a/妹妹的夏日假期下.zip'],
+    '秘密花园.zip': ['a/[#s]秘密花园.zip'],
+    '魔法少女夏日': ['a/[作者] 魔法少女夏日 第1卷.zip', 'a/[作者] 魔法少女夏日 第2卷 (C99).zip'],
+}
+
+
+def _sorted_groups(groups):
+    return {name: sorted(files) for name, files in groups.items()}
+
+
+class SeriesGrouperTest(unittest.TestCase):
+
+    def test_fixture_groups(self):
+        groups = SeriesGrouper(FIXTURE, existing_dir='').group()
+        self.assertEqual(_sorted_groups(groups), EXPECTED)
+
+    def test_order_independent_membership(self):
+        # 打乱顺序后，无并列得分的样例分组结果不变
+        shuffled = FIXTURE[:]
+        random.Random(1).shuffle(shuffled)
+        groups = SeriesGrouper(shuffled, existing_dir='').group()
+        self.assertEqual(_sorted_groups(groups), EXPECTED)
+
+    def test_duplicates_ignored(self):
+        groups = SeriesGrouper(FIXTURE + FIXTURE[:3], existing_dir='').group()
+        self.assertEqual(_sorted_groups(groups), EXPECTED)
+
+
+if __name__ == '__main__':
+    unittest.main()
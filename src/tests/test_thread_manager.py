@@ -0,0 +1,86 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from nodes.utils.thread_manager import DEFAULT_CONFIG, DEFAULT_CONFIG_PATH, ThreadManager
+
+
+class ThreadManagerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.managers = []
+
+    def tearDown(self):
+        for manager in self.managers:
+            manager.cleanup()
+        self.tmp.cleanup()
+
+    def make(self, config_text=None):
+        path = os.path.join(self.tmp.name, 'config.yaml')
+        if config_text is not None:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(config_text)
+        manager = ThreadManager(path)
+        self.managers.append(manager)
+        return manager
+
+    def test_default_config_is_next_to_module(self):
+        import nodes.utils.thread_manager as module
+        self.assertEqual(DEFAULT_CONFIG_PATH,
+                         os.path.join(os.path.dirname(os.path.abspath(module.__file__)), 'config.yaml'))
+
+    def test_missing_config_uses_default_budget(self):
+        manager = self.make()
+        self.assertFalse(manager.config_loaded)
+        limit = DEFAULT_CONFIG['thread_config']['normal']['max_total_threads']
+        self.assertEqual(manager.max_total_threads, limit)
+        with manager.lease('a', 32) as first, manager.lease('b', 32) as second:
+            self.assertEqual((first.workers, second.workers), (limit, 1))
+
+    def test_budget_can_be_disabled(self):
+        manager = self.make("memory_limit: 100\nthread_config:\n  normal:\n    max_threads: 4\n    memory_multiplier: 2\n"
+                            "    cpu_multiplier: 2\n    max_total_threads: 0\n")
+        self.assertIsNone(manager.max_total_threads)
+        with manager.lease('a', 32) as first, manager.lease('b', 32) as second:
+            self.assertEqual((first.workers, second.workers), (32, 32))
+
+    def test_configured_budget_and_nested_lease(self):
+        manager = self.make("memory_limit: 100\nthread_config:\n  normal:\n    max_threads: 4\n    memory_multiplier: 2\n"
+                            "    cpu_multiplier: 2\n    max_total_threads: 4\n")
+        self.assertEqual(manager.max_total_threads, 4)
+        with manager.lease('outer', 4) as outer:
+            with manager.lease('other', 3) as other:
+                self.assertEqual(other.workers, 1)
+            with outer.track(1):
+                with manager.lease('inner', 6) as inner:
+                    self.assertEqual(inner.workers, 6)
+            self.assertEqual(manager.workers_in_use, 4)
+        self.assertEqual(manager.workers_in_use, 0)
+
+    def test_zero_byte_tasks_are_not_throttled(self):
+        manager = self.make("memory_limit: 100\nmax_inflight_mb: 1\nthrottle_timeout: 5\n")
+        with manager.lease('zip', 2) as lease:
+            started = threading.Event()
+            release = threading.Event()
+
+            def big():
+                with lease.track(4 * 1024 * 1024):
+                    started.set()
+                    release.wait(5)
+
+            thread = threading.Thread(target=big)
+            thread.start()
+            started.wait(5)
+            start = time.perf_counter()
+            with lease.track(0):
+                pass
+            self.assertLess(time.perf_counter() - start, 0.5)
+            release.set()
+            thread.join()
+
+
+if __name__ == '__main__':
+    unittest.main()
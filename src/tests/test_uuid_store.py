@@ -0,0 +1,93 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+import yaml
+
+from nodes.record.record_store import RecordStore
+from nodes.record.uuid_store import UuidRecordStore
+
+
+class UuidRecordStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp, 'uuid_records.db')
+        self.store = UuidRecordStore(RecordStore(self.db_path))
+
+    def tearDown(self):
+        self.store.store.close()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_generate_reserves_without_persisting(self):
+        candidates = iter(['a', 'a', 'b'])
+        self.assertEqual(self.store.generate(lambda: next(candidates)), 'a')
+        candidates = iter(['a', 'b'])
+        self.assertEqual(self.store.generate(lambda: next(candidates)), 'b')
+        # 预留的 UUID 不写入库，写入失败时释放后可以再次生成
+        self.assertNotIn('a', self.store)
+        self.assertEqual(len(self.store), 0)
+        self.store.release('a')
+        self.assertEqual(self.store.generate(lambda: 'a'), 'a')
+
+        self.store.add('b', '2024-01-01 00:00:00', 'b.zip', '画师', '画师')
+        self.assertIn('b', self.store)
+        candidates = iter(['b', 'c'])
+        self.assertEqual(self.store.generate(lambda: next(candidates)), 'c')
+        self.store.release('b')
+        candidates = iter(['b', 'd'])
+        self.assertEqual(self.store.generate(lambda: next(candidates)), 'd')
+
+    def test_merge_keeps_existing_timestamps(self):
+        self.store.add('u1', '2024-01-01 00:00:00', 'a.zip', '画师', '画师')
+        records = {'u1': {'timestamps': {'2024-01-01 00:00:00': {'archive_name': 'changed.zip'}}}}
+        self.assertEqual(self.store.add_many(records), 0)
+        self.assertEqual(self.store.get('u1')['timestamps']['2024-01-01 00:00:00']['archive_name'], 'a.zip')
+
+    def test_add_merges_timestamps(self):
+        self.store.add('u1', '2024-01-01 00:00:00', 'a.zip', '画师', '画师')
+        self.store.add('u1', '2024-02-01 00:00:00', 'b.zip', '画师', '画师/新')
+        self.assertEqual(len(self.store.get('u1')['timestamps']), 2)
+        self.assertEqual(self.store.latest('u1')[1]['archive_name'], 'b.zip')
+        self.assertIsNone(self.store.latest('missing'))
+
+    def test_add_many_counts_changes(self):
+        records = {
+            'u1': {'timestamps': {'2024-01-01 00:00:00': {'archive_name': 'a.zip'}}},
+            'u2': {'timestamps': {'2024-01-02 00:00:00': {'archive_name': 'b.zip'}}},
+        }
+        self.assertEqual(self.store.add_many(records), 2)
+        self.assertEqual(self.store.add_many(records), 0)
+        records['u2']['timestamps']['2024-01-03 00:00:00'] = {'archive_name': 'c.zip'}
+        self.assertEqual(self.store.add_many(records), 1)
+        self.assertEqual(self.store.uuids(), {'u1', 'u2'})
+
+    def test_migrate_legacy_files(self):
+        with open(os.path.join(self.tmp, 'uuid_records.json'), 'w', encoding='utf-8') as f:
+            json.dump({'record': {'j1': {'timestamps': {'2024-01-01 00:00:00': {'archive_name': 'j.zip'}}}}}, f)
+        with open(os.path.join(self.tmp, 'uuid_records.yaml'), 'w', encoding='utf-8') as f:
+            yaml.safe_dump([{'UUID': 'y1', 'CreatedAt': '2023-01-01 00:00:00', 'ArchiveName': 'y.zip',
+                             'ArtistName': '画师', 'LastPath': '画师'}], f, allow_unicode=True)
+        day_dir = os.path.join(self.tmp, '2024', '03', '01')
+        os.makedirs(day_dir)
+        with open(os.path.join(day_dir, 'd1.json'), 'w', encoding='utf-8') as f:
+            json.dump({'uuid': 'd1', 'timestamps': {'2024-03-01 00:00:00': {'archive_name': 'd.zip'}}}, f)
+
+        self.assertEqual(self.store.migrate(self.tmp), 3)
+        self.assertEqual(self.store.uuids(), {'j1', 'y1', 'd1'})
+        self.assertEqual(self.store.get('y1')['timestamps']['2023-01-01 00:00:00']['artist_name'], '画师')
+        self.assertEqual(self.store.migrate(self.tmp), 0)
+
+    def test_persists_across_reopen(self):
+        self.store.add('u1', '2024-01-01 00:00:00', 'a.zip', '画师', '画师')
+        self.store.flush()
+        self.store.store.close()
+        self.store = UuidRecordStore(RecordStore(self.db_path))
+        self.assertIn('u1', self.store)
+        self.assertEqual(len(self.store), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
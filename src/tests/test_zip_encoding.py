@@ -0,0 +1,127 @@
+import io
+import os
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+
+from nodes.archive import zip_encoding
+from nodes.archive.zip_encoding import UTF8_FLAG, detect_zip_encoding, repair_zip_names
+
+GBK_NAMES = ['第一话/001.jpg', '第一话/002.jpg', '第二话/封面.png', '说明.txt']
+CP932_NAMES = ['第1話/カバー.jpg', '第1話/ページ01.jpg', 'あとがき.png', 'おまけ/イラスト.jpg']
+
+
+class _Unseekable(io.RawIOBase):
+    """让 zipfile 写出带数据描述符的成员"""
+
+    def __init__(self, f):
+        self.f = f
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        return self.f.write(data)
+
+
+def write_legacy_zip(path, names, encoding, stream=False, prefix=b''):
+    """写入文件名按 encoding 编码、未设置 UTF-8 标志位的压缩包，返回 {文件名: 内容}"""
+    raw_names = [name.encode(encoding) for name in names]
+    placeholders = [(b'p%03d' % i).ljust(len(raw), b'_') for i, raw in enumerate(raw_names)]
+    contents = {name: bytes([i + 1]) * (200 + i) for i, name in enumerate(names)}
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(_Unseekable(buffer) if stream else buffer, 'w') as zf:
+        for placeholder, name in zip(placeholders, names):
+            zf.writestr(placeholder.decode('ascii'), contents[name], zipfile.ZIP_DEFLATED)
+    data = buffer.getvalue()
+    # 占位名与原始文件名字节数相同，替换后偏移量不变
+    for placeholder, raw in zip(placeholders, raw_names):
+        assert data.count(placeholder) == 2
+        data = data.replace(placeholder, raw)
+    with open(path, 'wb') as f:
+        f.write(prefix + data)
+    return contents
+
+
+class RepairZipNamesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'book.zip')
+        # 不读写用户目录下的检测缓存
+        self.cache = mock.patch.object(zip_encoding, '_cache_store', False)
+        self.cache.start()
+
+    def tearDown(self):
+        self.cache.stop()
+        self.tmp.cleanup()
+
+    def read_back(self):
+        with zipfile.ZipFile(self.path) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertTrue(all(info.flag_bits & UTF8_FLAG for info in zf.infolist()))
+            return {info.filename: zf.read(info) for info in zf.infolist()}
+
+    def assert_round_trip(self, names, encoding, stream=False):
+        contents = write_legacy_zip(self.path, names, encoding, stream=stream)
+        os.utime(self.path, ns=(1_600_000_000_000_000_000, 1_600_000_000_000_000_000))
+        result = repair_zip_names(self.path)
+        self.assertEqual(result.verdict.encoding, encoding)
+        self.assertTrue(result.repaired, result.summary())
+        self.assertEqual(result.renamed, len(names))
+        self.assertEqual(self.read_back(), contents)
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 1_600_000_000_000_000_000)
+        self.assertFalse(os.path.exists(f"{self.path}.fixing"))
+        self.assertEqual(repair_zip_names(self.path).skipped, "文件名无需修复")
+
+    def test_gbk_round_trip(self):
+        self.assert_round_trip(GBK_NAMES, 'gbk')
+
+    def test_cp932_round_trip(self):
+        self.assert_round_trip(CP932_NAMES, 'cp932')
+
+    def test_data_descriptors_are_copied(self):
+        self.assert_round_trip(GBK_NAMES, 'gbk', stream=True)
+
+    def test_detect_without_repair(self):
+        write_legacy_zip(self.path, CP932_NAMES, 'cp932')
+        with zipfile.ZipFile(self.path) as zf:
+            verdict = detect_zip_encoding(zf.infolist(), use_cache=False)
+        self.assertEqual(verdict.encoding, 'cp932')
+        self.assertTrue(verdict.needs_repair)
+
+    def test_skip_paths_leave_file_untouched(self):
+        cases = {
+            'ascii': (lambda: write_legacy_zip(self.path, ['001.jpg', '002.jpg'], 'ascii'), {}),
+            'dry_run': (lambda: write_legacy_zip(self.path, GBK_NAMES, 'gbk'), {'dry_run': True}),
+            'sfx': (lambda: write_legacy_zip(self.path, GBK_NAMES, 'gbk', prefix=b'MZ' + b'\0' * 510), {}),
+        }
+        for case, (make, kwargs) in cases.items():
+            with self.subTest(case):
+                make()
+                with open(self.path, 'rb') as f:
+                    before = f.read()
+                result = repair_zip_names(self.path, **kwargs)
+                self.assertFalse(result.repaired)
+                self.assertEqual(result.error, '')
+                with open(self.path, 'rb') as f:
+                    self.assertEqual(f.read(), before)
+                self.assertFalse(os.path.exists(f"{self.path}.fixing"))
+                if case == 'ascii':
+                    self.assertEqual(result.skipped, "文件名无需修复")
+                elif case == 'dry_run':
+                    self.assertEqual((result.skipped, result.renamed), ('', len(GBK_NAMES)))
+                else:
+                    self.assertIn('自解压', result.skipped)
+
+    def test_not_a_zip_is_an_error(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'Rar!\x1a\x07\x00' + os.urandom(100))
+        result = repair_zip_names(self.path)
+        self.assertTrue(result.error)
+        self.assertFalse(result.repaired)
+
+
+if __name__ == '__main__':
+    unittest.main()
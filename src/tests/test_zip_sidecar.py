@@ -0,0 +1,165 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+
+from nodes.archive import zip_sidecar
+from nodes.archive.zip_sidecar import read_sidecars, strip_members, update_sidecars
+
+
+class _Unseekable(io.RawIOBase):
+    """让 zipfile 写出带数据描述符的成员"""
+
+    def __init__(self, f):
+        self.f = f
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        return self.f.write(data)
+
+
+class ZipSidecarTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'a.zip')
+        self.images = {f"{i:03d}.jpg": os.urandom(20000) for i in range(5)}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _make(self, sidecars_first=None, sidecars_last=None, stream=False):
+        with open(self.path, 'wb') as raw:
+            target = _Unseekable(raw) if stream else raw
+            with zipfile.ZipFile(target, 'w') as zf:
+                for name, data in (sidecars_first or {}).items():
+                    zf.writestr(name, data, zipfile.ZIP_DEFLATED)
+                for name, data in self.images.items():
+                    zf.writestr(name, data)
+                for name, data in (sidecars_last or {}).items():
+                    zf.writestr(name, data, zipfile.ZIP_DEFLATED)
+
+    def _assert_images_intact(self):
+        with zipfile.ZipFile(self.path) as zf:
+            self.assertIsNone(zf.testzip())
+            for name, data in self.images.items():
+                self.assertEqual(zf.read(name), data)
+
+    def test_read_sidecars(self):
+        self._make(sidecars_last={'u1.json': b'{"uuid": "u1"}', 'old.yaml': b'- UUID: old'})
+        self.assertEqual(read_sidecars(self.path), {'u1.json': b'{"uuid": "u1"}', 'old.yaml': b'- UUID: old'})
+        self.assertEqual(list(read_sidecars(self.path, ('.yaml',))), ['old.yaml'])
+
+    def test_replace_at_tail_does_not_grow(self):
+        self._make(sidecars_last={'u1.json': b'{"uuid": "u1", "n": 0}'})
+        self.assertEqual(update_sidecars(self.path, {'u1.json': b'{"uuid": "u1", "n": 1}'}), ['u1.json'])
+        size = os.path.getsize(self.path)
+        self.assertEqual(update_sidecars(self.path, {'u1.json': b'{"uuid": "u1", "n": 2}'}), ['u1.json'])
+        self.assertEqual(os.path.getsize(self.path), size)
+        self.assertEqual(read_sidecars(self.path), {'u1.json': b'{"uuid": "u1", "n": 2}'})
+        self._assert_images_intact()
+
+    def test_add_to_archive_without_sidecar(self):
+        self._make()
+        self.assertEqual(update_sidecars(self.path, {'new.json': b'{}' * 100}), [])
+        self.assertEqual(read_sidecars(self.path), {'new.json': b'{}' * 100})
+        self._assert_images_intact()
+
+    def test_remove_from_middle_compacts(self):
+        self._make(sidecars_first={'old.yaml': b'- UUID: old\n' * 50}, stream=True)
+        removed = update_sidecars(self.path, {'u2.json': b'{"uuid": "u2"}'}, remove=['old.yaml'])
+        self.assertEqual(removed, ['old.yaml'])
+        self.assertEqual(read_sidecars(self.path), {'u2.json': b'{"uuid": "u2"}'})
+        with open(self.path, 'rb') as f:
+            self.assertNotIn(b'old.yaml', f.read())
+        with zipfile.ZipFile(self.path) as zf:
+            self.assertEqual(zf.namelist(), list(self.images) + ['u2.json'])
+        self._assert_images_intact()
+
+    def test_legacy_names_keep_raw_bytes(self):
+        raw_name = '插图.jpg'.encode('gbk')
+        with zipfile.ZipFile(self.path, 'w') as zf:
+            zf.writestr('abcd.jpg', b'x' * 1000)
+            zf.writestr('u1.json', b'{}')
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        # 把文件名原样替换为等长的 GBK 字节（未设置 UTF-8 标志）
+        with open(self.path, 'wb') as f:
+            f.write(data.replace(b'abcd.jpg', raw_name))
+        update_sidecars(self.path, {'u1.json': b'{"uuid": "u1"}'})
+        with zipfile.ZipFile(self.path) as zf:
+            info = zf.infolist()[0]
+            self.assertEqual(info.filename.encode('cp437'), raw_name)
+            self.assertIsNone(zf.testzip())
+
+    def test_strip_members(self):
+        self._make(sidecars_first={'old.yaml': b'- UUID: old'},
+                   sidecars_last={'u1.json': b'{}', 'meta.json': b'{}'})
+        select = lambda name: name.endswith('.yaml') or (name.endswith('.json') and not name.endswith('meta.json'))
+        with open(self.path, 'rb') as f:
+            original = f.read()
+
+        preview = strip_members(self.path, select, dry_run=True)
+        self.assertEqual(preview.removed, ['old.yaml', 'u1.json'])
+        self.assertTrue(preview.compacted)
+        self.assertFalse(preview.stripped)
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(), original)
+
+        result = strip_members(self.path, select)
+        self.assertTrue(result.stripped)
+        # 重写后的文件 = 保留的成员 + 中央目录 + 结束记录（22 字节）
+        self.assertEqual(os.path.getsize(self.path), result.rewritten_bytes + 22)
+        self.assertLessEqual(os.path.getsize(self.path), len(original) - result.freed_bytes)
+        self.assertEqual(read_sidecars(self.path), {'meta.json': b'{}'})
+        self._assert_images_intact()
+        self.assertEqual(strip_members(self.path, select).skipped, "没有需要删除的文件")
+
+    def test_strip_members_at_tail_truncates(self):
+        self._make(sidecars_last={'u1.json': b'{"uuid": "u1"}' * 20})
+        size = os.path.getsize(self.path)
+        result = strip_members(self.path, lambda name: name.endswith('.json'))
+        self.assertFalse(result.compacted)
+        # 截断掉成员数据，中央目录少一条记录（46 字节 + 文件名）
+        self.assertEqual(os.path.getsize(self.path), size - result.freed_bytes - 46 - len('u1.json'))
+        self.assertEqual(read_sidecars(self.path), {})
+        self._assert_images_intact()
+
+    def test_interrupted_tail_write_keeps_archive_readable(self):
+        self._make(sidecars_last={'u1.json': b'{"uuid": "u1", "n": 0}'})
+        new = {'u1.json': b'{"uuid": "u1", "n": 1}' * 50}
+        states = []
+
+        def sync(f):
+            f.flush()
+            # 每次落盘时文件都应是完整的新压缩包；第二次落盘后模拟崩溃，不再截断
+            states.append(read_sidecars(self.path))
+            self._assert_images_intact()
+            if len(states) == 2:
+                raise KeyboardInterrupt
+
+        with mock.patch.object(zip_sidecar, '_sync', sync), self.assertRaises(KeyboardInterrupt):
+            update_sidecars(self.path, new)
+        self.assertEqual(states, [new, new])
+        self.assertEqual(read_sidecars(self.path), new)
+        # 中断后的压缩包仍可继续更新
+        self.assertEqual(update_sidecars(self.path, {'u1.json': b'{}'}), ['u1.json'])
+        self.assertEqual(read_sidecars(self.path), {'u1.json': b'{}'})
+        self._assert_images_intact()
+
+    def test_not_a_zip(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'Rar!\x1a\x07\x00' + os.urandom(100))
+        with self.assertRaises(zipfile.BadZipFile):
+            read_sidecars(self.path)
+        with self.assertRaises(zipfile.BadZipFile):
+            update_sidecars(self.path, {'u1.json': b'{}'})
+
+
+if __name__ == '__main__':
+    unittest.main()